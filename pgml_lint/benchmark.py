@@ -0,0 +1,386 @@
+# Standard Library
+import gc
+import os
+import json
+import time
+import random
+
+# Local modules
+import pgml_lint.context
+import pgml_lint.engine
+
+
+# Bump when the baseline JSON layout changes
+BASELINE_FORMAT = "1"
+# Stage names that are not plugins
+STAGE_BUILD_CONTEXT = "build_context"
+STAGE_LINT_FILE = "lint_file"
+# File size classes: (label, weight, problem parts per file)
+SIZE_CLASSES = (
+	("small", 6, (1, 2)),
+	("medium", 3, (3, 6)),
+	("large", 1, (10, 24)),
+)
+
+SUBJECTS = ("Algebra", "Calculus - single variable", "Linear algebra", "Statistics", "Trigonometry")
+MACRO_CHOICES = (
+	"PGstandard.pl",
+	"PGML.pl",
+	"MathObjects.pl",
+	"PGcourse.pl",
+	"parserPopUp.pl",
+	"parserRadioButtons.pl",
+	"contextFraction.pl",
+	"niceTables.pl",
+	"parserMultiAnswer.pl",
+)
+CONTEXTS = ("Numeric", "Fraction", "Vector", "Interval", "Point")
+WORDS = (
+	"Find", "the", "value", "of", "when", "each", "function", "is", "evaluated",
+	"at", "point", "Enter", "your", "answer", "exactly", "simplify", "slope",
+	"line", "area", "region", "between", "curves", "probability", "that",
+)
+
+
+#============================================
+
+
+def _sentence(rng: random.Random, low: int = 6, high: int = 14) -> str:
+	"""
+	Return a short prose sentence.
+	"""
+	words = [rng.choice(WORDS) for _ in range(rng.randint(low, high))]
+	sentence = " ".join(words).capitalize() + "."
+	return sentence
+
+
+#============================================
+
+
+def _setup_part(rng: random.Random, part: int, kind: int) -> list[str]:
+	"""
+	Return Perl setup lines for one problem part.
+	"""
+	a = f"$a{part}"
+	b = f"$b{part}"
+	lines = [
+		f"{a} = random(2, 9, 1);",
+		f"{b} = non_zero_random(-5, 5, 1);",
+		f"$f{part} = Formula(\"{a} x^2 + {b} x\")->reduce;",
+		f"$ans{part} = Compute(\"2 * {a} + {b}\");",
+	]
+	if kind == 0:
+		lines.append(f"$choice{part} = PopUp([\"?\", \"increasing\", \"decreasing\"], \"increasing\");")
+	elif kind == 1:
+		lines.append(f"@order{part} = shuffle(3);")
+		lines.append(f"$choice{part} = RadioButtons([\"yes\", \"no\"], \"yes\");")
+	elif kind == 2:
+		lines.append(f"$br{part} = MODES(TeX => '', HTML => '<br>');")
+	else:
+		lines.append(f"$note{part} = Compute(\"{a}/{b}\"); # kept exact")
+	return lines
+
+
+#============================================
+
+
+def _pgml_part(rng: random.Random, part: int, kind: int) -> list[str]:
+	"""
+	Return PGML body lines for one problem part.
+	"""
+	lines = [
+		_sentence(rng),
+		"",
+		f"If [`f(x) = [$f{part}]`], then [`f'(1) =`] [_]{{$ans{part}}}{{10}}",
+		"",
+		f"*{_sentence(rng, 3, 6)}* and _{_sentence(rng, 2, 4)}_",
+		f"[@ {_sentence(rng, 2, 4)!r} @]* [: x^2 + {part} :]",
+	]
+	if kind in (0, 1):
+		lines.append(f"Choose one: [_]{{$choice{part}}}")
+	elif kind == 2:
+		lines.append(f"[$a{part}] [@ $br{part} @]* [$b{part}]")
+	if rng.random() < 0.3:
+		lines.append("[<Note>]{['span', class => 'note']}{''}")
+	return lines
+
+
+#============================================
+
+
+def generate_pg_text(rng: random.Random, parts: int) -> str:
+	"""
+	Generate one synthetic .pg problem.
+
+	Args:
+		rng: Random source; the same seed gives the same text.
+		parts: Number of problem parts, which scales the file size.
+
+	Returns:
+		str: Problem text.
+	"""
+	kinds = [rng.randrange(4) for _part in range(parts)]
+	macros = ["PGstandard.pl", "PGML.pl"] + rng.sample(MACRO_CHOICES[2:], rng.randint(1, 3))
+	for kind, macro in ((0, "parserPopUp.pl"), (1, "parserRadioButtons.pl")):
+		if kind in kinds and macro not in macros:
+			macros.append(macro)
+	context_name = rng.choice(CONTEXTS)
+	if context_name == "Fraction" and "contextFraction.pl" not in macros:
+		macros.append("contextFraction.pl")
+	macro_lines = ",\n".join(f"  '{macro}'" for macro in macros)
+	keywords = ", ".join(f"'{word}'" for word in rng.sample(WORDS, 3))
+	lines = [
+		"## DESCRIPTION",
+		f"## {_sentence(rng)}",
+		"## ENDDESCRIPTION",
+		f"## DBsubject({rng.choice(SUBJECTS)})",
+		"## DBchapter(Synthetic)",
+		"## DBsection(Benchmark)",
+		f"## KEYWORDS({keywords})",
+		"",
+		"DOCUMENT();",
+		"",
+		f"loadMacros(\n{macro_lines},\n);",
+		"",
+		"TEXT(beginproblem());",
+		f"Context(\"{context_name}\");",
+		"",
+	]
+	for part, kind in enumerate(kinds, start=1):
+		lines.extend(_setup_part(rng, part, kind))
+		lines.append("")
+	for part, kind in enumerate(kinds, start=1):
+		if rng.random() < 0.25:
+			lines.append(f"$text{part} = <<'END_PGML';")
+			lines.extend(_pgml_part(rng, part, kind))
+			lines.append("END_PGML")
+			lines.append(f"PGML::Format($text{part});")
+		else:
+			lines.append("BEGIN_PGML")
+			lines.extend(_pgml_part(rng, part, kind))
+			lines.append("END_PGML")
+		lines.append("")
+	lines.append("BEGIN_PGML_SOLUTION")
+	lines.append(_sentence(rng))
+	lines.append("END_PGML_SOLUTION")
+	lines.append("")
+	lines.append("ENDDOCUMENT();")
+	text = "\n".join(lines) + "\n"
+	return text
+
+
+#============================================
+
+
+def generate_corpus(output_dir: str, count: int, seed: int = 1) -> list[str]:
+	"""
+	Write count synthetic .pg files of mixed sizes to output_dir.
+
+	Args:
+		output_dir: Directory for the generated files (created if missing).
+		count: Number of files.
+		seed: Random seed; the same seed and count give the same corpus.
+
+	Returns:
+		list[str]: Sorted paths of the written files.
+	"""
+	rng = random.Random(seed)
+	os.makedirs(output_dir, exist_ok=True)
+	weights = [weight for _label, weight, _parts in SIZE_CLASSES]
+	paths: list[str] = []
+	for index in range(count):
+		_label, _weight, (low, high) = rng.choices(SIZE_CLASSES, weights=weights)[0]
+		text = generate_pg_text(rng, rng.randint(low, high))
+		path = os.path.join(output_dir, f"synthetic_{index:05d}.pg")
+		with open(path, "w", encoding="utf-8") as handle:
+			handle.write(text)
+		paths.append(path)
+	return sorted(paths)
+
+
+#============================================
+
+
+def _time_round(
+	file_paths: list[str],
+	texts: list[str],
+	block_rules: list[dict[str, str]],
+	macro_rules: list[dict[str, object]],
+	plugins: list[dict[str, object]],
+	pg_version: str | None,
+) -> dict[str, float]:
+	"""
+	Time every stage once over the corpus.
+	"""
+	times: dict[str, float] = {}
+	contexts: list[pgml_lint.context.LintContext] = []
+	start = time.perf_counter()
+	for file_path, text in zip(file_paths, texts):
+		context = pgml_lint.engine.build_context(text, file_path, block_rules, macro_rules, pg_version)
+		# Force every lazy field so the stage covers the whole context build
+		for field in pgml_lint.context.LAZY_FIELDS:
+			context.get(field)
+		contexts.append(context)
+	times[STAGE_BUILD_CONTEXT] = time.perf_counter() - start
+
+	for plugin in plugins:
+		plugin_run = plugin["run"]
+		start = time.perf_counter()
+		for context in contexts:
+			plugin_run(context)
+		times["plugin:" + str(plugin["id"])] = time.perf_counter() - start
+
+	start = time.perf_counter()
+	for file_path in file_paths:
+		pgml_lint.engine.lint_file(file_path, block_rules, macro_rules, plugins, pg_version)
+	times[STAGE_LINT_FILE] = time.perf_counter() - start
+	return times
+
+
+#============================================
+
+
+def run_benchmark(
+	file_paths: list[str],
+	block_rules: list[dict[str, str]],
+	macro_rules: list[dict[str, object]],
+	plugins: list[dict[str, object]],
+	pg_version: str | None = None,
+	repeat: int = 3,
+) -> dict[str, object]:
+	"""
+	Time build_context, each plugin, and end-to-end lint_file over a corpus.
+
+	Each stage keeps its fastest round, with garbage collection paused while
+	timing. Plugins run on fully built contexts, so their times exclude parsing.
+
+	Args:
+		file_paths: Corpus files.
+		block_rules: Block rules.
+		macro_rules: Macro rules.
+		plugins: Plugins to time, in run order.
+		pg_version: Target PG version.
+		repeat: Timing rounds.
+
+	Returns:
+		dict[str, object]: Corpus size and per-stage seconds, files/s, and us/KB.
+	"""
+	texts: list[str] = []
+	for file_path in file_paths:
+		with open(file_path, "r", encoding="utf-8") as handle:
+			texts.append(handle.read())
+	total_kb = sum(len(text.encode("utf-8")) for text in texts) / 1024.0
+	best: dict[str, float] = {}
+	# Collector pauses land on whichever stage happens to allocate; keep them out like timeit does
+	gc_was_enabled = gc.isenabled()
+	gc.disable()
+	try:
+		for _round in range(max(1, repeat)):
+			times = _time_round(file_paths, texts, block_rules, macro_rules, plugins, pg_version)
+			for stage, elapsed in times.items():
+				best[stage] = min(best.get(stage, float("inf")), elapsed)
+			gc.collect()
+	finally:
+		if gc_was_enabled:
+			gc.enable()
+
+	stages: dict[str, dict[str, float]] = {}
+	for stage, elapsed in best.items():
+		files_per_sec = len(texts) / elapsed if elapsed > 0 else float("inf")
+		us_per_kb = elapsed * 1e6 / total_kb if total_kb > 0 else 0.0
+		stages[stage] = {
+			"seconds": elapsed,
+			"files_per_sec": files_per_sec,
+			"us_per_kb": us_per_kb,
+		}
+	results = {
+		"format": BASELINE_FORMAT,
+		"files": len(texts),
+		"kb": total_kb,
+		"stages": stages,
+	}
+	return results
+
+
+#============================================
+
+
+def find_regressions(
+	results: dict[str, object],
+	baseline: dict[str, object],
+	threshold_pct: float,
+	min_us_per_kb: float = 0.0,
+) -> list[dict[str, object]]:
+	"""
+	Compare a run against a stored baseline by us/KB.
+
+	A stage regresses when it is more than threshold_pct slower than the
+	baseline and also slower by more than min_us_per_kb, which keeps
+	microsecond-scale plugins from failing on timer noise. Stages missing
+	from either side are ignored.
+
+	Args:
+		results: Output of run_benchmark().
+		baseline: A stored run_benchmark() result.
+		threshold_pct: Allowed slowdown in percent.
+		min_us_per_kb: Absolute slowdown floor in us/KB.
+
+	Returns:
+		list[dict[str, object]]: One dict per regressed stage, slowest change first.
+	"""
+	if str(baseline.get("format")) != BASELINE_FORMAT:
+		raise ValueError(f"Unsupported baseline format: {baseline.get('format')}")
+	regressions: list[dict[str, object]] = []
+	base_stages = baseline.get("stages", {})
+	for stage, current in results["stages"].items():
+		previous = base_stages.get(stage)
+		if previous is None:
+			continue
+		before = float(previous["us_per_kb"])
+		after = float(current["us_per_kb"])
+		if before <= 0:
+			continue
+		change_pct = 100.0 * (after - before) / before
+		if change_pct > threshold_pct and after - before > min_us_per_kb:
+			regressions.append({
+				"stage": stage,
+				"baseline_us_per_kb": before,
+				"us_per_kb": after,
+				"change_pct": change_pct,
+			})
+	regressions.sort(key=lambda item: -float(item["change_pct"]))
+	return regressions
+
+
+#============================================
+
+
+def load_baseline(path: str) -> dict[str, object]:
+	"""
+	Read a stored baseline.
+
+	Args:
+		path: Baseline JSON path.
+
+	Returns:
+		dict[str, object]: Baseline results.
+	"""
+	with open(path, "r", encoding="utf-8") as handle:
+		baseline = json.load(handle)
+	return baseline
+
+
+#============================================
+
+
+def save_baseline(path: str, results: dict[str, object]) -> None:
+	"""
+	Store a run as the baseline for later comparisons.
+
+	Args:
+		path: Baseline JSON path.
+		results: Output of run_benchmark().
+	"""
+	with open(path, "w", encoding="utf-8") as handle:
+		json.dump(results, handle, indent=2, sort_keys=True)
+		handle.write("\n")
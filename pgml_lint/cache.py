@@ -0,0 +1,563 @@
+# Standard Library
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import tempfile
+
+# Local modules
+import pgml_lint.pg_version
+
+
+# Default size cap for the on-disk result cache (256 MB)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Bump when the cache entry layout changes so old entries are ignored
+CACHE_FORMAT = "4"
+ENTRY_SUFFIX = ".json"
+TMP_SUFFIX = ".tmp"
+# A temp file older than this was left by a writer that died before its rename
+STALE_TMP_SECONDS = 3600
+# Permissions for new entries before the umask; mkstemp alone gives 0600,
+# which other users on a shared cache could not read
+ENTRY_MODE = 0o666
+
+
+#============================================
+
+
+def content_hash(text: str) -> str:
+	"""
+	Hash file contents for use in a cache key.
+
+	Args:
+		text: File contents.
+
+	Returns:
+		str: Hex SHA-256 digest.
+	"""
+	digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+	return digest
+
+
+#============================================
+
+
+def rules_digest(
+	block_rules: list[dict[str, str]],
+	macro_rules: list[dict[str, object]],
+) -> str:
+	"""
+	Hash block and macro rules so rule edits invalidate cached results.
+
+	Args:
+		block_rules: Block rules.
+		macro_rules: Macro rules.
+
+	Returns:
+		str: Hex SHA-256 digest.
+	"""
+	payload = json.dumps([block_rules, macro_rules], sort_keys=True, default=str)
+	digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+	return digest
+
+
+#============================================
+
+
+def make_cache_key(
+	text_hash: str,
+	linter_version: str,
+	rules_hash: str,
+	pg_version: str | None,
+) -> str:
+	"""
+	Combine the inputs shared by every plugin's result into the results entry key.
+
+	Plugins are not part of the key; the entry holds results per plugin
+	fingerprint, so toggling a plugin keeps the others' results.
+
+	Args:
+		text_hash: Content hash from content_hash().
+		linter_version: Linter version string.
+		rules_hash: Rules hash from rules_digest().
+		pg_version: Target PG version (normalized here).
+
+	Returns:
+		str: Hex SHA-256 cache key.
+	"""
+	parts = [
+		CACHE_FORMAT,
+		linter_version,
+		pgml_lint.pg_version.normalize_pg_version(pg_version),
+		rules_hash,
+		text_hash,
+	]
+	key = hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+	return key
+
+
+#============================================
+
+
+def make_analysis_key(text_hash: str, linter_version: str) -> str:
+	"""
+	Build the key of the analysis entry, which depends on the text alone.
+
+	Args:
+		text_hash: Content hash from content_hash().
+		linter_version: Linter version string.
+
+	Returns:
+		str: Hex SHA-256 cache key.
+	"""
+	parts = [CACHE_FORMAT, "analysis", linter_version, text_hash]
+	key = hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+	return key
+
+
+#============================================
+
+
+def plugin_fingerprints(plugins: list[dict[str, object]]) -> dict[str, str]:
+	"""
+	Name each plugin's results by its id, version, and the producers it reads.
+
+	A consumer's output depends on what its producers wrote into the
+	context, so a producer version bump changes its consumers' fingerprints.
+
+	Args:
+		plugins: Plugins in run order, producers first.
+
+	Returns:
+		dict[str, str]: Fingerprint by plugin id.
+	"""
+	fingerprints: dict[str, str] = {}
+	provider_prints: dict[str, str] = {}
+	for plugin in plugins:
+		plugin_id = str(plugin.get("id"))
+		fingerprint = f"{plugin_id}@{plugin.get('version', '1')}"
+		producers = sorted({provider_prints[key] for key in plugin.get("requires", ()) if key in provider_prints})
+		if producers:
+			fingerprint += "<" + ",".join(producers)
+		fingerprints[plugin_id] = fingerprint
+		for key in plugin.get("provides", ()):
+			provider_prints[key] = fingerprint
+	return fingerprints
+
+
+#============================================
+
+
+def encode_entry(key: str, value: dict[str, object]) -> str:
+	"""
+	Serialize an entry value with the key it belongs to.
+
+	Args:
+		key: Cache key.
+		value: JSON-ready entry value.
+
+	Returns:
+		str: Entry JSON.
+	"""
+	payload = json.dumps({"key": key, "value": value}, separators=(",", ":"))
+	return payload
+
+
+#============================================
+
+
+def decode_entry(raw: str, key: str) -> dict[str, object] | None:
+	"""
+	Parse an entry, rejecting anything that is not a whole entry for this key.
+
+	A truncated or partly written file does not parse, and a file whose
+	embedded key differs (a stray copy, a damaged volume) is not trusted.
+
+	Args:
+		raw: Entry file contents.
+		key: Expected cache key.
+
+	Returns:
+		dict[str, object] | None: Entry value, or None when the entry is unusable.
+	"""
+	try:
+		entry = json.loads(raw)
+	except json.JSONDecodeError:
+		return None
+	if not isinstance(entry, dict) or entry.get("key") != key:
+		return None
+	value = entry.get("value")
+	if not isinstance(value, dict):
+		return None
+	return value
+
+
+#============================================
+
+
+def _current_umask() -> int:
+	"""
+	Return the process umask without changing it for longer than one call.
+
+	Returns:
+		int: Umask bits.
+	"""
+	mask = os.umask(0)
+	os.umask(mask)
+	return mask
+
+
+#============================================
+
+
+def select_garbage(
+	entries: list[tuple[int, int, str]],
+	max_bytes: int,
+	max_age_ns: int | None = None,
+	now_ns: int = 0,
+) -> list[tuple[int, int, str]]:
+	"""
+	Choose the entries to remove: any unused for max_age_ns, then the least
+	recently used until the rest fit max_bytes.
+
+	Args:
+		entries: (mtime_ns, size, path) per entry.
+		max_bytes: Size cap for the entries that remain.
+		max_age_ns: Remove entries whose mtime is older than this, if given.
+		now_ns: Current time for the age check.
+
+	Returns:
+		list[tuple[int, int, str]]: Entries to remove, oldest first.
+	"""
+	total = sum(size for _mtime, size, _path in entries)
+	removed = []
+	# Oldest mtime first: the least recently read or written entries go first
+	for entry in sorted(entries):
+		mtime_ns, size, _path = entry
+		expired = max_age_ns is not None and now_ns - mtime_ns > max_age_ns
+		if not expired and total <= max_bytes:
+			break
+		removed.append(entry)
+		total -= size
+	return removed
+
+
+#============================================
+
+
+def collect_garbage(
+	cache_dir: str,
+	max_bytes: int,
+	max_age_ns: int | None = None,
+	dry_run: bool = False,
+) -> dict[str, int]:
+	"""
+	Remove expired and least recently used entries and stale temp files.
+
+	Safe while other processes use the cache: entries and temp files that
+	vanish mid-scan are skipped, directories are never removed, and temp
+	files younger than STALE_TMP_SECONDS may still be mid-write.
+
+	Args:
+		cache_dir: Cache directory.
+		max_bytes: Size cap for the entries that remain.
+		max_age_ns: Also remove entries unused for this long.
+		dry_run: Count what would be removed without removing it.
+
+	Returns:
+		dict[str, int]: Entries and bytes removed and kept, and temp files removed.
+	"""
+	now_ns = time.time_ns()
+	stale_ns = now_ns - STALE_TMP_SECONDS * 1000 * 1000 * 1000
+	entries: list[tuple[int, int, str]] = []
+	temp_paths: list[str] = []
+	for sub_entry in os.scandir(cache_dir):
+		if not sub_entry.is_dir():
+			continue
+		for entry in os.scandir(sub_entry.path):
+			try:
+				stat = entry.stat()
+			except FileNotFoundError:
+				continue
+			if entry.name.endswith(ENTRY_SUFFIX):
+				entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+			elif entry.name.endswith(TMP_SUFFIX) and stat.st_mtime_ns < stale_ns:
+				temp_paths.append(entry.path)
+	garbage = select_garbage(entries, max_bytes, max_age_ns, now_ns)
+	stats = {
+		"removed": len(garbage),
+		"removed_bytes": sum(size for _mtime, size, _path in garbage),
+		"kept": len(entries) - len(garbage),
+		"kept_bytes": sum(size for _mtime, size, _path in entries),
+		"temp_removed": len(temp_paths),
+	}
+	stats["kept_bytes"] -= stats["removed_bytes"]
+	if dry_run:
+		return stats
+	for path in [path for _mtime, _size, path in garbage] + temp_paths:
+		try:
+			os.remove(path)
+		except FileNotFoundError:
+			# Another process removed it first
+			pass
+	return stats
+
+
+#============================================
+
+
+class ResultCache:
+	"""
+	On-disk cache of lint results in two levels, keyed by file content.
+
+	An analysis entry holds the text-only context fields from
+	LintContext.export_analysis(). A results entry, also keyed by rules and
+	PG version, maps plugin fingerprints to issue lists, so enabling a
+	plugin runs only that plugin, against the stored analysis.
+
+	Many processes and hosts may share one directory. Entries are written to
+	a temp file and renamed into place, so a reader sees a whole entry or
+	none, and a read that races a removal is a miss. With shared set, the
+	end-of-run prune() does nothing; "pgml-lint cache gc" evicts instead.
+	"""
+
+	def __init__(
+		self,
+		cache_dir: str,
+		linter_version: str,
+		max_bytes: int = DEFAULT_MAX_BYTES,
+		shared: bool = False,
+	) -> None:
+		self.cache_dir = cache_dir
+		self.linter_version = linter_version
+		self.max_bytes = max_bytes
+		self.shared = shared
+		self.entry_mode = ENTRY_MODE & ~_current_umask()
+		self.hits = 0
+		self.misses = 0
+		# Plugin fingerprints by the id tuple of a plugin list
+		self._fingerprints: dict[tuple[str, ...], dict[str, str]] = {}
+		os.makedirs(cache_dir, exist_ok=True)
+
+	def keys_for(
+		self,
+		text: str,
+		block_rules: list[dict[str, str]],
+		macro_rules: list[dict[str, object]],
+		pg_version: str | None,
+	) -> tuple[str, str]:
+		"""
+		Build the results and analysis entry keys for a file's contents.
+
+		Args:
+			text: File contents.
+			block_rules: Block rules.
+			macro_rules: Macro rules.
+			pg_version: Target PG version.
+
+		Returns:
+			tuple[str, str]: Results key and analysis key.
+		"""
+		text_hash = content_hash(text)
+		results_key = make_cache_key(
+			text_hash,
+			self.linter_version,
+			rules_digest(block_rules, macro_rules),
+			pg_version,
+		)
+		return results_key, make_analysis_key(text_hash, self.linter_version)
+
+	def fingerprints(self, plugins: list[dict[str, object]]) -> dict[str, str]:
+		"""
+		Return plugin_fingerprints() for a plugin list, computed once per selection.
+
+		Args:
+			plugins: Plugins in run order.
+
+		Returns:
+			dict[str, str]: Fingerprint by plugin id.
+		"""
+		selection = tuple(str(plugin.get("id")) for plugin in plugins)
+		fingerprints = self._fingerprints.get(selection)
+		if fingerprints is None:
+			fingerprints = plugin_fingerprints(plugins)
+			self._fingerprints[selection] = fingerprints
+		return fingerprints
+
+	def _entry_path(self, key: str) -> str:
+		"""
+		Return the entry path for a key, fanned out by the first two hex digits.
+
+		Args:
+			key: Cache key.
+
+		Returns:
+			str: Entry file path.
+		"""
+		path = os.path.join(self.cache_dir, key[:2], key + ENTRY_SUFFIX)
+		return path
+
+	def get(self, key: str) -> dict[str, object] | None:
+		"""
+		Return an entry value and mark the entry as recently used.
+
+		Args:
+			key: Cache key.
+
+		Returns:
+			dict[str, object] | None: Entry value, or None on a miss.
+		"""
+		path = self._entry_path(key)
+		try:
+			with open(path, "r", encoding="utf-8") as handle:
+				raw = handle.read()
+		except (OSError, UnicodeDecodeError):
+			# Missing, or removed by another process's eviction
+			self.misses += 1
+			return None
+		value = decode_entry(raw, key)
+		if value is None:
+			self.misses += 1
+			return None
+		try:
+			# Touch the entry so LRU eviction sees it as recently used
+			os.utime(path)
+		except OSError:
+			# Another user's entry on a shared cache, or already evicted
+			pass
+		self.hits += 1
+		return value
+
+	def put(self, key: str, value: dict[str, object]) -> None:
+		"""
+		Store an entry value for a key with an atomic rename.
+
+		Args:
+			key: Cache key.
+			value: JSON-ready entry value.
+		"""
+		path = self._entry_path(key)
+		entry_dir = os.path.dirname(path)
+		os.makedirs(entry_dir, exist_ok=True)
+		payload = encode_entry(key, value)
+		fd, tmp_path = tempfile.mkstemp(dir=entry_dir, suffix=TMP_SUFFIX)
+		try:
+			with os.fdopen(fd, "w", encoding="utf-8") as handle:
+				handle.write(payload)
+				if self.shared:
+					# Other hosts must not see the name before the data reaches the server
+					handle.flush()
+					os.fsync(handle.fileno())
+			os.chmod(tmp_path, self.entry_mode)
+			os.replace(tmp_path, path)
+		except BaseException:
+			try:
+				os.remove(tmp_path)
+			except OSError:
+				pass
+			raise
+
+	def prune(self) -> int:
+		"""
+		Evict least recently used entries until the cache fits max_bytes.
+
+		A shared cache is left alone: scanning it after every run on every
+		runner is slow, and runners would evict each other's entries.
+
+		Returns:
+			int: Number of entries removed.
+		"""
+		if self.shared:
+			return 0
+		stats = collect_garbage(self.cache_dir, self.max_bytes)
+		return stats["removed"]
+
+
+#============================================
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+	"""
+	Parse arguments for the "pgml-lint cache" command.
+
+	Args:
+		argv: Arguments after "cache".
+
+	Returns:
+		argparse.Namespace: Parsed arguments.
+	"""
+	parser = argparse.ArgumentParser(
+		prog="pgml-lint cache",
+		description="Garbage-collect or summarize a lint result cache directory.",
+	)
+	parser.add_argument(
+		"action",
+		choices=("gc", "stats"),
+		help="Remove old entries and stale temp files, or only report sizes.",
+	)
+	parser.add_argument(
+		"-c",
+		"--cache-dir",
+		dest="cache_dir",
+		required=True,
+		help="Cache directory, as passed to --cache-dir.",
+	)
+	parser.add_argument(
+		"--max-mb",
+		dest="max_mb",
+		type=float,
+		help=f"Size cap in MB for the entries kept (default: {DEFAULT_MAX_BYTES // (1024 * 1024)}).",
+	)
+	parser.add_argument(
+		"--max-age-days",
+		dest="max_age_days",
+		type=float,
+		help="Also remove entries not read or written for this many days.",
+	)
+	parser.add_argument(
+		"-n",
+		"--dry-run",
+		dest="dry_run",
+		action="store_true",
+		help="Report what gc would remove without removing it.",
+	)
+	parser.set_defaults(
+		max_mb=DEFAULT_MAX_BYTES / (1024 * 1024),
+		max_age_days=None,
+		dry_run=False,
+	)
+	args = parser.parse_args(argv)
+	if not os.path.isdir(args.cache_dir):
+		parser.error(f"cache directory not found: {args.cache_dir}")
+	return args
+
+
+#============================================
+
+
+def main(argv: list[str], version: str) -> None:
+	"""
+	Run the "pgml-lint cache" command.
+
+	Args:
+		argv: Arguments after "cache".
+		version: Linter version.
+	"""
+	args = parse_args(argv)
+	print(f"pgml-lint {version}", file=sys.stderr)
+	max_age_ns = None
+	if args.max_age_days is not None:
+		max_age_ns = int(args.max_age_days * 86400 * 1000 * 1000 * 1000)
+	if args.action == "stats":
+		stats = collect_garbage(args.cache_dir, sys.maxsize, None, True)
+		print(f"{stats['kept']} entries, {stats['kept_bytes'] / (1024 * 1024):.1f} MB")
+		return
+	stats = collect_garbage(args.cache_dir, int(args.max_mb * 1024 * 1024), max_age_ns, args.dry_run)
+	verb = "Would remove" if args.dry_run else "Removed"
+	print(
+		f"{verb} {stats['removed']} entries ({stats['removed_bytes'] / (1024 * 1024):.1f} MB)"
+		f" and {stats['temp_removed']} stale temp files;"
+		f" {stats['kept']} entries ({stats['kept_bytes'] / (1024 * 1024):.1f} MB) kept"
+	)
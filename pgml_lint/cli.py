@@ -0,0 +1,730 @@
+"""Command-line entry point for pgml-lint (declared in pyproject.toml)."""
+
+# Standard Library
+import argparse
+import collections.abc
+import importlib
+import json
+import os
+import sys
+
+# Local modules
+import pgml_lint.core
+import pgml_lint.diff_scope
+import pgml_lint.engine
+import pgml_lint.pg_version
+import pgml_lint.profiling
+import pgml_lint.registry
+import pgml_lint.rules
+
+# Distribution name used to look up the installed version
+DIST_NAME = "webwork-pgml-linter"
+# Subcommands, each a module with main(argv, version), imported only when run
+SUBCOMMANDS = {
+	"cache": "pgml_lint.cache",
+	"daemon": "pgml_lint.daemon",
+	"history": "pgml_lint.history",
+	"lsp": "pgml_lint.lsp",
+	"merge": "pgml_lint.shard",
+}
+
+
+#============================================
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+	"""
+	Parse command-line arguments.
+
+	Args:
+		argv: Arguments to parse (default: sys.argv[1:]).
+
+	Returns:
+		argparse.Namespace: Parsed arguments.
+	"""
+	parser = argparse.ArgumentParser(
+		description="Check WeBWorK .pg files for common PGML errors.",
+	)
+	# Input - simple and clear
+	input_group = parser.add_mutually_exclusive_group()
+	input_group.add_argument(
+		"-i",
+		"--input",
+		dest="input_file",
+		help="Check a single .pg file.",
+	)
+	input_group.add_argument(
+		"-d",
+		"--directory",
+		dest="input_dir",
+		help="Check all .pg files in a directory.",
+	)
+	# Output control - just verbose or quiet
+	verbosity_group = parser.add_mutually_exclusive_group()
+	verbosity_group.add_argument(
+		"-v",
+		"--verbose",
+		dest="verbose",
+		action="store_true",
+		help="Show more details.",
+	)
+	verbosity_group.add_argument(
+		"-q",
+		"--quiet",
+		dest="quiet",
+		action="store_true",
+		help="Only show problems, no summary.",
+	)
+	# JSON for scripting (suppress from help - advanced users know about it)
+	format_group = parser.add_mutually_exclusive_group()
+	format_group.add_argument(
+		"--json",
+		dest="json_output",
+		action="store_true",
+		help=argparse.SUPPRESS,
+	)
+	format_group.add_argument(
+		"--jsonl",
+		dest="jsonl_output",
+		action="store_true",
+		help="Stream one JSON record per issue and per file as each file finishes.",
+	)
+	parser.add_argument(
+		"-p",
+		"--pg-version",
+		dest="pg_version",
+		help="Target PG version for versioned rules (default: 2.17).",
+	)
+	parser.add_argument(
+		"-j",
+		"--jobs",
+		dest="jobs",
+		type=int,
+		help="Worker processes for directory mode (0 = one per CPU, default: 1).",
+	)
+	parser.add_argument(
+		"-c",
+		"--cache-dir",
+		dest="cache_dir",
+		help="Reuse lint results for unchanged files from this cache directory.",
+	)
+	parser.add_argument(
+		"--cache-shared",
+		dest="cache_shared",
+		action="store_true",
+		help="The cache directory is shared by other runners; leave eviction to 'pgml-lint cache gc'.",
+	)
+	parser.add_argument(
+		"--shard",
+		dest="shard",
+		metavar="K/N",
+		help="Lint only shard K of N of the directory's files, split by a stable hash of each path.",
+	)
+	git_group = parser.add_mutually_exclusive_group()
+	git_group.add_argument(
+		"--changed-since",
+		dest="changed_since",
+		metavar="REF",
+		help="Lint only .pg files changed between REF and HEAD, as committed in HEAD.",
+	)
+	git_group.add_argument(
+		"--staged",
+		dest="staged",
+		action="store_true",
+		help="Lint only staged .pg files, as staged in the git index.",
+	)
+	parser.add_argument(
+		"--diff",
+		dest="diff_path",
+		metavar="PATCH",
+		help="Lint only files in this unified diff ('-' for stdin) and report only issues on changed lines.",
+	)
+	parser.add_argument(
+		"-m",
+		"--manifest",
+		dest="manifest_path",
+		help="Reuse results for files whose size and mtime match this manifest, and rewrite it after the run.",
+	)
+	parser.add_argument(
+		"-D",
+		"--daemon",
+		dest="use_daemon",
+		action="store_true",
+		help="Lint through a running 'pgml-lint daemon' (falls back to linting in process).",
+	)
+	parser.add_argument(
+		"-s",
+		"--socket",
+		dest="socket_path",
+		help="Daemon socket path for --daemon.",
+	)
+	parser.add_argument(
+		"-P",
+		"--profile-plugins",
+		dest="profile_plugins",
+		action="store_true",
+		help="Time each plugin and context stage and print a report to stderr.",
+	)
+	parser.add_argument(
+		"--profile-json",
+		dest="profile_json",
+		help="Also write the plugin profile as JSON to this path (implies --profile-plugins).",
+	)
+	parser.add_argument(
+		"-w",
+		"--watch",
+		dest="watch",
+		action="store_true",
+		help="After the directory scan, keep re-linting changed files and print new and resolved issues.",
+	)
+	parser.add_argument(
+		"--watch-interval",
+		dest="watch_interval",
+		type=float,
+		help="Seconds between checks for --watch when polling (default: 1.0).",
+	)
+	parser.set_defaults(
+		changed_since=None,
+		staged=False,
+		diff_path=None,
+		watch=False,
+		watch_interval=None,
+		use_daemon=False,
+		socket_path=None,
+		cache_dir=None,
+		cache_shared=False,
+		shard=None,
+		manifest_path=None,
+		profile_plugins=False,
+		profile_json=None,
+		jobs=1,
+		verbose=False,
+		quiet=False,
+		json_output=False,
+		jsonl_output=False,
+	)
+	args = parser.parse_args(argv)
+	# Default to current directory if no input specified
+	if not args.input_file and not args.input_dir:
+		args.input_dir = "."
+	if args.jobs < 0:
+		parser.error(f"--jobs must be 0 (one per CPU) or a positive count, got {args.jobs}")
+	if args.cache_shared and not args.cache_dir:
+		parser.error("--cache-shared needs --cache-dir")
+	if args.shard:
+		if args.input_file or args.changed_since or args.staged or args.diff_path or args.watch:
+			parser.error("--shard splits a full directory run; drop -i, --staged, --changed-since, --diff, and -w")
+		shard_number, _slash, shard_count = args.shard.partition("/")
+		if not (shard_number.isdigit() and shard_count.isdigit() and 1 <= int(shard_number) <= int(shard_count)):
+			parser.error(f"--shard expects K/N with 1 <= K <= N, got {args.shard}")
+		args.shard = (int(shard_number), int(shard_count))
+	if args.manifest_path and args.input_file:
+		parser.error("--manifest needs directory mode (-d)")
+	if args.changed_since or args.staged:
+		if args.input_file:
+			parser.error("--changed-since and --staged pick files themselves; use -d to limit them")
+		if args.manifest_path or args.watch or args.use_daemon:
+			parser.error("--changed-since and --staged lint git contents in process; drop -m, -w, and -D")
+	if args.diff_path:
+		if args.input_file:
+			parser.error("--diff picks files from the patch; use -d to limit them")
+		if args.manifest_path or args.watch or args.use_daemon:
+			parser.error("--diff reports partial results in process; drop -m, -w, and -D")
+	if args.watch:
+		if args.input_file:
+			parser.error("--watch needs directory mode (-d)")
+		if args.json_output or args.jsonl_output:
+			parser.error("--watch prints text deltas; it cannot be combined with --json or --jsonl")
+		if args.use_daemon:
+			parser.error("--watch lints in process; it cannot be combined with --daemon")
+	return args
+
+
+#============================================
+
+
+# Default file extension for WeBWorK problem files
+DEFAULT_EXTENSIONS = [".pg"]
+
+
+#============================================
+
+
+def find_files(input_dir: str, extensions: list[str] = DEFAULT_EXTENSIONS) -> list[str]:
+	"""
+	Find files under input_dir matching extensions.
+
+	Args:
+		input_dir: Root directory to scan.
+		extensions: File extensions to include.
+
+	Returns:
+		list[str]: Sorted file paths.
+	"""
+	matches: list[str] = []
+	for root, dirs, files in os.walk(input_dir):
+		dirs.sort()
+		files.sort()
+		for filename in files:
+			ext = os.path.splitext(filename)[1].lower()
+			if ext in extensions:
+				matches.append(os.path.join(root, filename))
+	paths = sorted(matches)
+	return paths
+
+
+#============================================
+
+
+def package_version() -> str:
+	"""
+	Return the linter version without importing importlib.metadata up front.
+
+	An installed wheel is read from its dist-info directory name and a source
+	checkout from the VERSION file beside the package; importlib.metadata,
+	which alone costs tens of milliseconds to import, is only the fallback.
+
+	Returns:
+		str: Version string, or "unknown".
+	"""
+	package_parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+	prefix = DIST_NAME.replace("-", "_") + "-"
+	try:
+		names = os.listdir(package_parent)
+	except OSError:
+		names = []
+	for name in names:
+		if name.startswith(prefix) and name.endswith(".dist-info"):
+			return name[len(prefix) : -len(".dist-info")]
+	version_path = os.path.join(package_parent, "VERSION")
+	if os.path.isfile(version_path):
+		with open(version_path, "r", encoding="utf-8") as handle:
+			version = handle.read().strip()
+		if version:
+			return version
+	import importlib.metadata
+	try:
+		return importlib.metadata.version(DIST_NAME)
+	except importlib.metadata.PackageNotFoundError:
+		return "unknown"
+
+
+#============================================
+
+
+def _import_on_demand(module_name: str) -> object:
+	"""
+	Import a module only on the code path that needs it.
+
+	pgml_lint.parallel (multiprocessing) and pgml_lint.cache (tempfile,
+	hashlib) add noticeably to startup, which matters when editor hooks run
+	the linter once per saved file.
+
+	Args:
+		module_name: Dotted module name.
+
+	Returns:
+		object: The imported module.
+	"""
+	module = importlib.import_module(module_name)
+	return module
+
+
+#============================================
+
+
+def _iter_file_results(
+	file_paths: list[str],
+	block_rules: list[dict[str, str]],
+	macro_rules: list[dict[str, object]],
+	plugins: list[dict[str, object]],
+	pg_version: str,
+	jobs: int,
+	cache: "pgml_lint.cache.ResultCache | None",
+	profiler: pgml_lint.profiling.LintProfiler | None = None,
+	excerpts: bool = True,
+) -> collections.abc.Iterator:
+	"""
+	Yield (file_path, issues) pairs in file order, serially or with a process pool.
+
+	Args:
+		file_paths: Files to lint.
+		block_rules: Block rules.
+		macro_rules: Macro rules.
+		plugins: Enabled plugins.
+		pg_version: Target PG version.
+		jobs: Worker process count (0 = one per CPU).
+		cache: Optional result cache.
+		profiler: Optional plugin profiler.
+		excerpts: Attach source excerpts to issues.
+
+	Yields:
+		tuple[str, list[dict[str, object]]]: File path and its issues.
+	"""
+	if jobs == 0:
+		jobs = os.cpu_count() or 1
+	if jobs > 1 and len(file_paths) > 1:
+		plugin_ids = [str(plugin.get("id")) for plugin in plugins if plugin.get("report") is not False]
+		parallel = _import_on_demand("pgml_lint.parallel")
+		yield from parallel.lint_files_parallel(
+			file_paths,
+			block_rules,
+			macro_rules,
+			plugin_ids,
+			pg_version,
+			jobs,
+			cache,
+			profiler,
+			excerpts,
+		)
+		return
+	for file_path in file_paths:
+		file_issues = pgml_lint.engine.lint_file(
+			file_path,
+			block_rules,
+			macro_rules,
+			plugins,
+			pg_version,
+			cache,
+			profiler,
+			excerpts,
+		)
+		yield file_path, file_issues
+
+
+#============================================
+
+
+def _iter_scoped_results(
+	file_paths: list[str],
+	line_scopes: dict[str, list[tuple[int, int]]],
+	block_rules: list[dict[str, str]],
+	macro_rules: list[dict[str, object]],
+	plugins: list[dict[str, object]],
+	pg_version: str,
+	cache: "pgml_lint.cache.ResultCache | None",
+	profiler: pgml_lint.profiling.LintProfiler | None = None,
+	excerpts: bool = True,
+) -> collections.abc.Iterator:
+	"""
+	Yield (file_path, issues) pairs for --diff, keeping issues on changed lines only.
+
+	Args:
+		file_paths: Files named by the patch.
+		line_scopes: Changed-line ranges by file path.
+		block_rules: Block rules.
+		macro_rules: Macro rules.
+		plugins: Enabled plugins.
+		pg_version: Target PG version.
+		cache: Optional result cache; full cached results are filtered to the scope.
+		profiler: Optional plugin profiler.
+		excerpts: Attach source excerpts to issues.
+
+	Yields:
+		tuple[str, list[dict[str, object]]]: File path and its issues.
+	"""
+	for file_path in file_paths:
+		file_issues = pgml_lint.engine.lint_file(
+			file_path,
+			block_rules,
+			macro_rules,
+			plugins,
+			pg_version,
+			cache,
+			profiler,
+			excerpts,
+			line_scopes[file_path],
+		)
+		yield file_path, file_issues
+
+
+#============================================
+
+
+def _read_patch(diff_path: str) -> dict[str, list[tuple[int, int]]]:
+	"""
+	Read a unified diff from a file or stdin ("-") and return its changed-line ranges.
+
+	Args:
+		diff_path: Patch path, or "-".
+
+	Returns:
+		dict[str, list[tuple[int, int]]]: Line ranges by path as named in the patch.
+	"""
+	if diff_path == "-":
+		diff_text = sys.stdin.read()
+	else:
+		with open(diff_path, "r", encoding="utf-8", errors="replace") as handle:
+			diff_text = handle.read()
+	line_scopes = pgml_lint.diff_scope.parse_unified_diff(diff_text)
+	return line_scopes
+
+
+#============================================
+
+
+def _connect_daemon(args: argparse.Namespace, linter_version: str) -> tuple | None:
+	"""
+	Find a usable lint daemon for --daemon, or explain on stderr why not.
+
+	Profiling and the on-disk cache run in this process, so those options
+	keep linting local.
+
+	Args:
+		args: Parsed arguments.
+		linter_version: Version the daemon must be running.
+
+	Returns:
+		tuple | None: (daemon module, socket path, status), or None to lint in process.
+	"""
+	if args.profile_plugins or args.profile_json or args.cache_dir:
+		print("pgml-lint: --daemon ignored with profiling or --cache-dir", file=sys.stderr)
+		return None
+	daemon = _import_on_demand("pgml_lint.daemon")
+	socket_path = args.socket_path or daemon.default_socket_path()
+	status = daemon.daemon_status(socket_path)
+	if status is None:
+		print(f"pgml-lint: no daemon on {socket_path}; linting in process", file=sys.stderr)
+		return None
+	if status.get("version") != linter_version:
+		print(
+			f"pgml-lint: daemon runs {status.get('version')}, restart it; linting in process",
+			file=sys.stderr,
+		)
+		return None
+	return daemon, socket_path, status
+
+
+#============================================
+
+
+def main(argv: list[str] | None = None) -> None:
+	"""
+	Run the lint checker, or a subcommand ("cache", "daemon", "history", "lsp", "merge") when argv starts with one.
+
+	Args:
+		argv: Command-line arguments (default: sys.argv[1:]).
+	"""
+	if argv is None:
+		argv = sys.argv[1:]
+	if argv and argv[0] in SUBCOMMANDS:
+		command = _import_on_demand(SUBCOMMANDS[argv[0]])
+		command.main(argv[1:], package_version())
+		return
+	args = parse_args(argv)
+	pg_version = pgml_lint.pg_version.normalize_pg_version(args.pg_version)
+	linter_version = package_version()
+	print(f"pgml-lint {linter_version}", file=sys.stderr)
+
+	daemon_client = None
+	if args.use_daemon:
+		daemon_client = _connect_daemon(args, linter_version)
+	if daemon_client is None:
+		# Use built-in rules and plugins - no configuration needed
+		block_rules, macro_rules = pgml_lint.rules.load_rules(None)
+		registry = pgml_lint.registry.build_registry()
+		plugins = registry.resolve_plugins(set(), set(), set())
+		plugin_ids = [str(plugin.get("id")) for plugin in plugins]
+	else:
+		plugin_ids = daemon_client[2]["plugins"]
+
+	# Keep stdout pure JSON Lines; notes go to stderr instead
+	note_stream = sys.stderr if args.jsonl_output else sys.stdout
+	if args.verbose:
+		print(f"Active checks: {', '.join(plugin_ids)}", file=note_stream)
+
+	cache = None
+	if args.cache_dir:
+		cache_module = _import_on_demand("pgml_lint.cache")
+		cache = cache_module.ResultCache(args.cache_dir, linter_version, shared=args.cache_shared)
+
+	profiler = None
+	if args.profile_plugins or args.profile_json:
+		profiler = pgml_lint.profiling.LintProfiler()
+
+	# Only --json needs every issue at the end; other formats keep counters
+	issues: list[dict[str, object]] = []
+	error_count = 0
+	warn_count = 0
+	# Excerpts are only printed by --json and verbose text output
+	excerpts = args.json_output or (args.verbose and not args.jsonl_output)
+
+	git_changes = None
+	if args.input_file:
+		files_to_check = [args.input_file]
+	elif args.changed_since or args.staged:
+		git_changes = _import_on_demand("pgml_lint.git_changes")
+		try:
+			git_root, git_names, object_names = git_changes.changed_files(
+				args.input_dir, args.changed_since, args.staged
+			)
+		except RuntimeError as error:
+			print(f"pgml-lint: {error}", file=sys.stderr)
+			raise SystemExit(2)
+		if args.diff_path:
+			# Patch paths from git diff are relative to the work tree root, like git_names
+			patch_scopes = _read_patch(args.diff_path)
+			kept = [index for index, name in enumerate(git_names) if name in patch_scopes]
+			git_names = [git_names[index] for index in kept]
+			object_names = [object_names[index] for index in kept]
+		files_to_check = [git_changes.display_path(git_root, name) for name in git_names]
+		if args.verbose:
+			print(f"Checking {len(files_to_check)} changed files in {args.input_dir}", file=note_stream)
+	elif args.diff_path:
+		patch_scopes = _read_patch(args.diff_path)
+		input_root = os.path.abspath(args.input_dir)
+		files_to_check = []
+		for file_path in sorted(patch_scopes):
+			if os.path.splitext(file_path)[1].lower() not in DEFAULT_EXTENSIONS:
+				continue
+			if os.path.commonpath([input_root, os.path.abspath(file_path)]) != input_root:
+				continue
+			if os.path.isfile(file_path):
+				files_to_check.append(file_path)
+		if args.verbose:
+			print(f"Checking {len(files_to_check)} files from {args.diff_path}", file=note_stream)
+	else:
+		files_to_check = find_files(args.input_dir)
+		if args.shard:
+			all_count = len(files_to_check)
+			sharding = _import_on_demand("pgml_lint.shard")
+			shard, shard_count = args.shard
+			files_to_check = sharding.select_shard(files_to_check, args.input_dir, shard, shard_count)
+			if args.verbose:
+				print(f"Shard {shard}/{shard_count}: {len(files_to_check)} of {all_count} files", file=note_stream)
+		if args.verbose:
+			print(f"Checking {len(files_to_check)} files in {args.input_dir}", file=note_stream)
+	files_to_lint = files_to_check
+	lint_excerpts = excerpts
+	manifest = None
+	if args.manifest_path:
+		manifest_module = _import_on_demand("pgml_lint.manifest")
+		manifest = manifest_module.LibraryManifest(
+			args.manifest_path,
+			manifest_module.config_key(linter_version, pg_version, plugin_ids, block_rules, macro_rules),
+		)
+		reused = manifest.plan(files_to_check)
+		files_to_lint = [file_path for file_path in files_to_check if file_path not in reused]
+		# Recorded issues keep excerpts so a later --json or -v run can reuse them
+		lint_excerpts = True
+		if args.verbose:
+			print(
+				f"Manifest: {manifest.stat_hits} unchanged, {manifest.hash_hits} same content, "
+				f"{len(files_to_lint)} to lint",
+				file=note_stream,
+			)
+	if git_changes is not None:
+		file_results = git_changes.iter_file_results(
+			git_root,
+			git_names,
+			object_names,
+			block_rules,
+			macro_rules,
+			plugins,
+			pg_version,
+			cache,
+			profiler,
+			excerpts,
+			patch_scopes if args.diff_path else None,
+		)
+	elif args.diff_path:
+		file_results = _iter_scoped_results(
+			files_to_check,
+			patch_scopes,
+			block_rules,
+			macro_rules,
+			plugins,
+			pg_version,
+			cache,
+			profiler,
+			excerpts,
+		)
+	elif daemon_client is not None:
+		daemon, socket_path, _status = daemon_client
+		file_results = daemon.iter_file_results(socket_path, files_to_lint, pg_version, lint_excerpts, linter_version)
+	else:
+		file_results = _iter_file_results(
+			files_to_lint,
+			block_rules,
+			macro_rules,
+			plugins,
+			pg_version,
+			args.jobs,
+			cache,
+			profiler,
+			lint_excerpts,
+		)
+	if manifest is not None:
+		file_results = manifest.merge(files_to_check, reused, file_results, excerpts)
+	# Watch mode keeps every file's issues so later passes can print deltas
+	session = None
+	if args.watch:
+		watch = _import_on_demand("pgml_lint.watch")
+		session = watch.WatchSession(
+			lambda file_path: pgml_lint.engine.lint_file(
+				file_path, block_rules, macro_rules, plugins, pg_version, cache, None, excerpts
+			)
+		)
+		session.track(files_to_check)
+	for file_path, file_issues in file_results:
+		if session is not None:
+			session.record(file_path, file_issues)
+		file_errors, file_warnings = pgml_lint.core.summarize_issues(file_issues)
+		error_count += file_errors
+		warn_count += file_warnings
+		if args.json_output:
+			issues.extend(file_issues)
+		elif args.jsonl_output:
+			for record in pgml_lint.core.format_jsonl_records(file_path, file_issues):
+				sys.stdout.write(record + "\n")
+			sys.stdout.flush()
+		else:
+			for issue in file_issues:
+				print(pgml_lint.core.format_issue(file_path, issue, args.verbose))
+
+	if manifest is not None:
+		manifest.save()
+
+	if cache is not None:
+		# Evict least recently used entries once per run, not per file
+		cache.prune()
+
+	if profiler is not None:
+		# Keep the report on stderr so lint and --json output stay parseable
+		print(profiler.format_table(), file=sys.stderr)
+		if args.profile_json:
+			with open(args.profile_json, "w", encoding="utf-8") as handle:
+				json.dump(profiler.to_dict(), handle, indent=2)
+
+	if args.json_output:
+		summary = {
+			"files_checked": len(files_to_check),
+			"errors": error_count,
+			"warnings": warn_count,
+			"issues": [dict(issue) for issue in issues],
+		}
+		print(json.dumps(summary, indent=2))
+	elif args.jsonl_output:
+		summary = {
+			"type": "summary",
+			"files_checked": len(files_to_check),
+			"errors": error_count,
+			"warnings": warn_count,
+		}
+		print(json.dumps(summary, separators=(",", ":")))
+	elif not args.quiet:
+		if error_count or warn_count:
+			print(f"Found {error_count} errors and {warn_count} warnings.")
+		elif args.verbose:
+			print(f"No issues found in {len(files_to_check)} files.")
+
+	if session is not None:
+		watch.run(session, args.input_dir, args.watch_interval, args.verbose, args.quiet)
+		error_count = session.error_count
+
+	if error_count > 0:
+		raise SystemExit(1)
+
+
+if __name__ == "__main__":
+	main()
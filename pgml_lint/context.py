@@ -0,0 +1,255 @@
+# Standard Library
+
+# Local modules
+import pgml_lint.lexer
+import pgml_lint.parser
+import pgml_lint.pg_version
+import pgml_lint.pgml
+import pgml_lint.profiling
+
+
+# Context fields computed on first access, mapped to the method that fills them
+LAZY_FIELDS = {
+	"newlines": "_compute_newlines",
+	"stripped_comments": "_compute_structure",
+	"stripped_text": "_compute_structure",
+	"macros_loaded": "_compute_macros_loaded",
+	"assigned_vars": "_compute_assigned_vars",
+	"uses_pgml": "_compute_uses_pgml",
+	"block_marker_issues": "_compute_structure",
+	"pgml_block_regions": "_compute_structure",
+	"pgml_heredoc_issues": "_compute_structure",
+	"pgml_heredoc_regions": "_compute_structure",
+	"pgml_regions": "_compute_pgml_regions",
+	"pgml_blocks": "_compute_pgml_blocks",
+	"call_index": "_compute_call_index",
+	"text_tokens": "_compute_text_tokens",
+	"stripped_tokens": "_compute_stripped_tokens",
+}
+
+INPUT_FIELDS = (
+	"pg_version",
+	"file_path",
+	"text",
+	"block_rules",
+	"macro_rules",
+	"line_scope",
+	"region_scope",
+)
+
+FIELD_NAMES = frozenset(INPUT_FIELDS) | frozenset(LAZY_FIELDS)
+
+# Lazy fields that depend only on the text, stored by the result cache so a
+# newly enabled plugin can skip the structure scan; stripped texts are saved
+# as kept spans of the original text, and sets as sorted lists
+ANALYSIS_FIELDS = (
+	"stripped_comments",
+	"stripped_text",
+	"block_marker_issues",
+	"pgml_block_regions",
+	"pgml_heredoc_issues",
+	"pgml_heredoc_regions",
+	"macros_loaded",
+	"assigned_vars",
+)
+SPAN_FIELDS = frozenset(("stripped_comments", "stripped_text"))
+SET_FIELDS = frozenset(("macros_loaded", "assigned_vars"))
+
+
+#============================================
+
+
+class LintContext:
+	"""
+	Shared plugin context whose parsed fields are computed on first access.
+
+	Known fields live in slots and are memoized after their first read, so a
+	plugin selection only pays for the analyses it touches. Keys written by
+	plugins (for example pgml_inline_spans) go to a side dict. The dict-style
+	get(), [] and "in" interface matches the plain context dict it replaces.
+	"""
+
+	__slots__ = INPUT_FIELDS + tuple(LAZY_FIELDS) + ("_extra", "_profiler")
+
+	def __init__(
+		self,
+		text: str,
+		file_path: str | None,
+		block_rules: list[dict[str, str]],
+		macro_rules: list[dict[str, object]],
+		pg_version: str | None = None,
+		profiler: pgml_lint.profiling.LintProfiler | None = None,
+		line_scope: list[tuple[int, int]] | None = None,
+	) -> None:
+		self.pg_version = pgml_lint.pg_version.normalize_pg_version(pg_version)
+		self.file_path = file_path
+		self.text = text
+		self.block_rules = block_rules
+		self.macro_rules = macro_rules
+		# Changed-line ranges for --diff; None means the whole file
+		self.line_scope = line_scope
+		# The engine sets this to line_scope while a SEGMENT_LOCAL plugin runs
+		self.region_scope = None
+		self._extra: dict[str, object] = {}
+		# Optional profiler timing each stage as it is computed
+		self._profiler = profiler
+
+	def __getattr__(self, name: str) -> object:
+		# Only reached when a slot has not been filled yet
+		method_name = LAZY_FIELDS.get(name)
+		if method_name is None:
+			raise AttributeError(name)
+		if self._profiler is None:
+			getattr(self, method_name)()
+		else:
+			stage = method_name[len("_compute_"):]
+			self._profiler.measure(pgml_lint.profiling.KIND_STAGE, stage, getattr(self, method_name))
+		value = object.__getattribute__(self, name)
+		return value
+
+	def _compute_newlines(self) -> None:
+		"""Fill newlines with the newline index."""
+		self.newlines = pgml_lint.parser.build_newline_index(self.text)
+
+	def _compute_structure(self) -> None:
+		"""Fill stripped texts, block markers, and heredoc regions in one scan."""
+		structure = pgml_lint.parser.scan_structure(self.text)
+		self.stripped_comments = structure["stripped_comments"]
+		self.stripped_text = structure["stripped_text"]
+		self.block_marker_issues = structure["block_marker_issues"]
+		self.pgml_block_regions = structure["pgml_block_regions"]
+		self.pgml_heredoc_issues = structure["pgml_heredoc_issues"]
+		self.pgml_heredoc_regions = structure["pgml_heredoc_regions"]
+
+	def _compute_macros_loaded(self) -> None:
+		"""Fill macros_loaded from loadMacros() calls."""
+		self.macros_loaded = pgml_lint.parser.extract_loaded_macros(self.stripped_text)
+
+	def _compute_assigned_vars(self) -> None:
+		"""Fill assigned_vars from declarations and assignments."""
+		self.assigned_vars = pgml_lint.parser.extract_assigned_vars(self.stripped_text)
+
+	def _compute_uses_pgml(self) -> None:
+		"""Fill uses_pgml from text signals or PGML regions."""
+		uses_pgml = pgml_lint.parser.detect_pgml_usage(self.stripped_text)
+		# Only fall back to region scanning when the cheap text check fails
+		self.uses_pgml = uses_pgml or bool(self.pgml_regions)
+
+	def _compute_pgml_regions(self) -> None:
+		"""Fill pgml_regions with block regions then heredoc regions."""
+		self.pgml_regions = list(self.pgml_block_regions) + list(self.pgml_heredoc_regions)
+
+	def _compute_pgml_blocks(self) -> None:
+		"""Fill pgml_blocks with one parsed PgmlBlock per PGML region."""
+		self.pgml_blocks = pgml_lint.pgml.parse_pgml_blocks(self.text, self.pgml_regions, self.newlines)
+
+	def _compute_call_index(self) -> None:
+		"""Fill call_index with name( call sites found in stripped_text."""
+		self.call_index = pgml_lint.parser.build_call_index(self.stripped_text)
+
+	def _compute_text_tokens(self) -> None:
+		"""Fill text_tokens with the Perl token stream of the raw text."""
+		self.text_tokens = pgml_lint.lexer.lex_perl(self.text)
+
+	def _compute_stripped_tokens(self) -> None:
+		"""Fill stripped_tokens with the Perl token stream of stripped_text."""
+		# Heredoc bodies are already blank in stripped_text
+		self.stripped_tokens = pgml_lint.lexer.lex_perl(self.stripped_text, heredocs=False)
+
+	def get(self, key: str, default: object = None) -> object:
+		"""
+		Return a context value, computing it on first access.
+
+		Args:
+			key: Context key.
+			default: Value for unknown keys that no plugin has set.
+
+		Returns:
+			object: Context value.
+		"""
+		if key in FIELD_NAMES:
+			value = getattr(self, key)
+			return value
+		value = self._extra.get(key, default)
+		return value
+
+	def __getitem__(self, key: str) -> object:
+		if key in FIELD_NAMES:
+			value = getattr(self, key)
+			return value
+		value = self._extra[key]
+		return value
+
+	def __setitem__(self, key: str, value: object) -> None:
+		if key in FIELD_NAMES:
+			setattr(self, key, value)
+			return
+		self._extra[key] = value
+
+	def __contains__(self, key: object) -> bool:
+		return key in FIELD_NAMES or key in self._extra
+
+	def keys(self) -> list[str]:
+		"""
+		Return every available key, including plugin-written keys.
+
+		Returns:
+			list[str]: Context keys.
+		"""
+		keys = list(INPUT_FIELDS) + list(LAZY_FIELDS) + list(self._extra)
+		return keys
+
+	def export_analysis(self) -> dict[str, object]:
+		"""
+		Return the computed ANALYSIS_FIELDS in a JSON-ready form.
+
+		Returns:
+			dict[str, object]: Field values by name; fields not computed yet are left out.
+		"""
+		computed = set(self.computed_fields())
+		analysis: dict[str, object] = {}
+		for name in ANALYSIS_FIELDS:
+			if name not in computed:
+				continue
+			value = object.__getattribute__(self, name)
+			if name in SPAN_FIELDS:
+				value = pgml_lint.parser.kept_spans(self.text, value)
+				if value is None:
+					continue
+			elif name in SET_FIELDS:
+				value = sorted(value)
+			analysis[name] = value
+		return analysis
+
+	def seed_analysis(self, analysis: dict[str, object]) -> None:
+		"""
+		Fill fields from export_analysis() output for the same text, so they are not recomputed.
+
+		Args:
+			analysis: Stored analysis; unknown or malformed fields are ignored.
+		"""
+		for name in ANALYSIS_FIELDS:
+			value = analysis.get(name)
+			if not isinstance(value, list):
+				continue
+			if name in SPAN_FIELDS:
+				value = pgml_lint.parser.join_spans(self.text, value)
+			elif name in SET_FIELDS:
+				value = set(value)
+			setattr(self, name, value)
+
+	def computed_fields(self) -> list[str]:
+		"""
+		Return lazy fields that have been computed so far.
+
+		Returns:
+			list[str]: Field names in declaration order.
+		"""
+		computed: list[str] = []
+		for name in LAZY_FIELDS:
+			try:
+				object.__getattribute__(self, name)
+			except AttributeError:
+				continue
+			computed.append(name)
+		return computed
@@ -1,8 +1,151 @@
 # Standard Library
+import sys
+import json
 
 
 SEVERITY_ERROR = "ERROR"
 SEVERITY_WARNING = "WARNING"
+# Issue keys in output order; absent keys are stored as None
+ISSUE_FIELDS = ("severity", "message", "line", "column", "plugin", "excerpt")
+
+
+#============================================
+
+
+class Issue:
+	"""
+	Compact lint issue record with a dict-compatible view.
+
+	Severity and plugin ids are interned, so a corpus-wide report shares one
+	string per id. get(), [], "in", keys(), and iteration behave like the
+	issue dict this replaces, with None fields treated as missing keys, and
+	an Issue compares equal to the equivalent dict. Keys outside
+	ISSUE_FIELDS go to a side dict that is only created when used.
+	"""
+
+	__slots__ = ISSUE_FIELDS + ("_extra",)
+
+	def __init__(
+		self,
+		severity: str,
+		message: str,
+		line: int | None = None,
+		column: int | None = None,
+		plugin: str | None = None,
+		excerpt: str | None = None,
+	) -> None:
+		self.severity = sys.intern(str(severity))
+		self.message = message
+		self.line = line
+		self.column = column
+		self.plugin = None if plugin is None else sys.intern(str(plugin))
+		self.excerpt = excerpt
+		self._extra: dict[str, object] | None = None
+
+	@classmethod
+	def from_mapping(cls, data: object, plugin: str | None = None) -> "Issue":
+		"""
+		Build an Issue from an issue dict (or return an Issue unchanged).
+
+		Args:
+			data: Issue dict or Issue.
+			plugin: Plugin id to use when the issue does not name one.
+
+		Returns:
+			Issue: Issue record.
+		"""
+		if isinstance(data, Issue):
+			issue = data
+		else:
+			issue = cls(
+				str(data.get("severity", SEVERITY_WARNING)),
+				str(data.get("message", "")),
+				data.get("line"),
+				data.get("column"),
+				data.get("plugin"),
+				data.get("excerpt"),
+			)
+			for key in data:
+				if key not in ISSUE_FIELDS:
+					issue[key] = data[key]
+		if issue.plugin is None and plugin is not None:
+			issue.plugin = sys.intern(plugin)
+		return issue
+
+	def get(self, key: str, default: object = None) -> object:
+		if key in ISSUE_FIELDS:
+			value = getattr(self, key)
+			return default if value is None else value
+		if self._extra is None:
+			return default
+		return self._extra.get(key, default)
+
+	def __getitem__(self, key: str) -> object:
+		value = self.get(key)
+		if value is None:
+			raise KeyError(key)
+		return value
+
+	def __setitem__(self, key: str, value: object) -> None:
+		if key in ISSUE_FIELDS:
+			if key in ("severity", "plugin") and value is not None:
+				value = sys.intern(str(value))
+			setattr(self, key, value)
+			return
+		if self._extra is None:
+			self._extra = {}
+		self._extra[key] = value
+
+	def __contains__(self, key: object) -> bool:
+		return self.get(key) is not None
+
+	def keys(self) -> list[str]:
+		"""
+		Return the keys that hold a value, in output order.
+
+		Returns:
+			list[str]: Issue keys.
+		"""
+		keys = [key for key in ISSUE_FIELDS if getattr(self, key) is not None]
+		if self._extra:
+			keys.extend(self._extra)
+		return keys
+
+	def __iter__(self) -> object:
+		return iter(self.keys())
+
+	def __len__(self) -> int:
+		return len(self.keys())
+
+	def to_dict(self) -> dict[str, object]:
+		"""
+		Return the issue as a plain dict, for JSON output.
+
+		Returns:
+			dict[str, object]: Issue dict.
+		"""
+		data = {key: self.get(key) for key in self.keys()}
+		return data
+
+	def __eq__(self, other: object) -> bool:
+		if isinstance(other, (Issue, dict)):
+			return self.to_dict() == dict(other)
+		return NotImplemented
+
+	__hash__ = None
+
+	def __repr__(self) -> str:
+		return f"Issue({self.to_dict()!r})"
+
+	def __reduce__(self) -> tuple:
+		# A flat tuple pickles smaller than the slot state dict
+		args = (self.severity, self.message, self.line, self.column, self.plugin, self.excerpt)
+		if self._extra:
+			return (Issue, args, self._extra)
+		return (Issue, args)
+
+	def __setstate__(self, state: dict[str, object]) -> None:
+		self._extra = dict(state)
 
 
 #============================================
@@ -13,9 +156,9 @@ def make_issue(
 	message: str,
 	line: int | None = None,
 	plugin: str | None = None,
-) -> dict[str, object]:
+) -> Issue:
 	"""
-	Create an issue dict.
+	Create an issue record.
 
 	Args:
 		severity: Severity label.
@@ -24,34 +167,33 @@ def make_issue(
 		plugin: Optional plugin id.
 
 	Returns:
-		dict[str, object]: Issue dict.
+		Issue: Issue record.
 	"""
-	issue: dict[str, object] = {
-		"severity": severity,
-		"message": message,
-	}
 	if line is not None:
-		issue["line"] = int(line)
-	if plugin is not None:
-		issue["plugin"] = plugin
+		line = int(line)
+	issue = Issue(severity, message, line, None, plugin)
 	return issue
 
 
 #============================================
 
 
-def summarize_issues(issues: list[dict[str, object]]) -> tuple[int, int]:
+def summarize_issues(issues: list) -> tuple[int, int]:
 	"""
 	Summarize issue counts.
 
 	Args:
-		issues: Issue list.
+		issues: Issue records or issue dicts.
 
 	Returns:
 		tuple[int, int]: (errors, warnings)
 	"""
-	errors = len([issue for issue in issues if issue.get("severity") == SEVERITY_ERROR])
-	warnings = len([issue for issue in issues if issue.get("severity") != SEVERITY_ERROR])
+	errors = 0
+	for issue in issues:
+		severity = issue.severity if isinstance(issue, Issue) else issue.get("severity")
+		if severity == SEVERITY_ERROR:
+			errors += 1
+	warnings = len(issues) - errors
 	return errors, warnings
 
 
@@ -84,3 +226,31 @@ def format_issue(file_path: str, issue: dict[str, object], show_plugin: bool) ->
 		return formatted
 	formatted = f"{file_path}: {severity}: {message}"
 	return formatted
+
+
+#============================================
+
+
+def format_jsonl_records(file_path: str, issues: list[dict[str, object]]) -> list[str]:
+	"""
+	Format one file's results as JSON Lines records.
+
+	Each issue becomes a {"type": "issue", "file": ...} record, followed by a
+	{"type": "file", ...} record with the file's error and warning counts.
+
+	Args:
+		file_path: Path to the file.
+		issues: The file's issues.
+
+	Returns:
+		list[str]: One compact JSON string per record.
+	"""
+	records: list[str] = []
+	for issue in issues:
+		record = {"type": "issue", "file": file_path}
+		record.update(issue)
+		records.append(json.dumps(record, separators=(",", ":")))
+	errors, warnings = summarize_issues(issues)
+	file_record = {"type": "file", "file": file_path, "errors": errors, "warnings": warnings}
+	records.append(json.dumps(file_record, separators=(",", ":")))
+	return records
@@ -0,0 +1,461 @@
+"""Warm lint daemon on a Unix socket and the thin client that talks to it."""
+
+# Standard Library
+import argparse
+import collections.abc
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import time
+
+# Local modules
+import pgml_lint.core
+import pgml_lint.engine
+import pgml_lint.registry
+import pgml_lint.rules
+
+# Environment variable that overrides the default socket path
+SOCKET_ENV = "PGML_LINT_SOCKET"
+# Socket file name inside the runtime or cache directory
+SOCKET_NAME = "pgml-lint.sock"
+# Seconds to wait for a background daemon to accept connections
+START_TIMEOUT = 10.0
+# Per-file results kept in memory before the oldest are dropped
+MAX_CACHED_FILES = 20000
+
+
+#============================================
+
+
+def default_socket_path() -> str:
+	"""
+	Return the socket path from PGML_LINT_SOCKET, XDG_RUNTIME_DIR, or ~/.cache.
+
+	Returns:
+		str: Socket path.
+	"""
+	path = os.environ.get(SOCKET_ENV)
+	if path:
+		return path
+	runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+	if runtime_dir and os.path.isdir(runtime_dir):
+		return os.path.join(runtime_dir, SOCKET_NAME)
+	cache_dir = os.path.join(os.path.expanduser("~"), ".cache", "pgml_lint")
+	return os.path.join(cache_dir, SOCKET_NAME)
+
+
+#============================================
+
+
+def encode_message(message: dict[str, object]) -> bytes:
+	"""
+	Encode one protocol message as a JSON line.
+
+	Args:
+		message: Request or response.
+
+	Returns:
+		bytes: UTF-8 JSON followed by a newline.
+	"""
+	line = json.dumps(message, separators=(",", ":")) + "\n"
+	return line.encode("utf-8")
+
+
+#============================================
+
+
+class DaemonState:
+	"""
+	Rules, resolved plugins, and per-file results kept warm between requests.
+
+	Requests are dicts with a "command" key: "lint" (files on disk),
+	"lint_text" (an unsaved buffer), "status", and "stop". handle() yields
+	response dicts; a lint request yields one {"file", "issues"} record per
+	file followed by {"done": True}. Results for a file are reused while its
+	size, mtime, and the request options are unchanged.
+	"""
+
+	def __init__(self, version: str) -> None:
+		self.version = version
+		self.block_rules, self.macro_rules = pgml_lint.rules.load_rules(None)
+		registry = pgml_lint.registry.build_registry()
+		self.plugins = registry.resolve_plugins(set(), set(), set())
+		# Absolute path -> (stat and option key, issue dicts)
+		self._results: dict[str, tuple[tuple, list[dict[str, object]]]] = {}
+		self.requests = 0
+		self.files_linted = 0
+		self.cache_hits = 0
+		self.stopping = False
+
+	def handle(self, request: dict[str, object]) -> collections.abc.Iterator:
+		"""
+		Run one request and yield its response messages.
+
+		Args:
+			request: Decoded request.
+
+		Yields:
+			dict[str, object]: Response messages.
+		"""
+		self.requests += 1
+		command = request.get("command")
+		if command == "status":
+			yield self.status()
+			return
+		if command == "stop":
+			self.stopping = True
+			yield {"stopped": True, "pid": os.getpid()}
+			return
+		if command not in ("lint", "lint_text"):
+			yield {"error": f"Unknown daemon command: {command}"}
+			return
+		if request.get("version") != self.version:
+			yield {"error": f"Daemon runs pgml-lint {self.version}, client is {request.get('version')}"}
+			return
+		pg_version = request.get("pg_version")
+		excerpts = bool(request.get("excerpts", True))
+		if command == "lint_text":
+			issues = pgml_lint.engine.lint_text(
+				str(request.get("text", "")),
+				request.get("file"),
+				self.block_rules,
+				self.macro_rules,
+				self.plugins,
+				pg_version,
+				None,
+				excerpts,
+			)
+			yield {"file": request.get("file"), "issues": [dict(issue) for issue in issues]}
+		else:
+			for file_path in request.get("files", []):
+				yield {"file": file_path, "issues": self._lint_path(str(file_path), pg_version, excerpts)}
+		yield {"done": True}
+
+	def _lint_path(self, file_path: str, pg_version: str | None, excerpts: bool) -> list[dict[str, object]]:
+		"""
+		Lint one file, reusing the stored result while the file is unchanged.
+		"""
+		stat = os.stat(file_path)
+		key = (stat.st_mtime_ns, stat.st_size, pg_version, excerpts)
+		stored = self._results.get(file_path)
+		if stored is not None and stored[0] == key:
+			self.cache_hits += 1
+			return stored[1]
+		issues = pgml_lint.engine.lint_file(
+			file_path,
+			self.block_rules,
+			self.macro_rules,
+			self.plugins,
+			pg_version,
+			None,
+			None,
+			excerpts,
+		)
+		records = [dict(issue) for issue in issues]
+		self.files_linted += 1
+		self._results.pop(file_path, None)
+		if len(self._results) >= MAX_CACHED_FILES:
+			# Dicts keep insertion order, so the first key is the stalest entry
+			del self._results[next(iter(self._results))]
+		self._results[file_path] = (key, records)
+		return records
+
+	def status(self) -> dict[str, object]:
+		"""
+		Return version, process, and counter information.
+
+		Returns:
+			dict[str, object]: Status message.
+		"""
+		status = {
+			"version": self.version,
+			"pid": os.getpid(),
+			"plugins": [str(plugin.get("id")) for plugin in self.plugins],
+			"requests": self.requests,
+			"files_linted": self.files_linted,
+			"cache_hits": self.cache_hits,
+			"files_cached": len(self._results),
+		}
+		return status
+
+
+#============================================
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+	"""
+	Read one JSON request line and stream the response lines back.
+	"""
+
+	def handle(self) -> None:
+		state = self.server.state
+		try:
+			request = json.loads(self.rfile.readline().decode("utf-8"))
+			for message in state.handle(request):
+				self.wfile.write(encode_message(message))
+		except BrokenPipeError:
+			# The client went away; nothing is left to report to
+			return
+		except (OSError, ValueError) as error:
+			self.wfile.write(encode_message({"error": f"{type(error).__name__}: {error}"}))
+
+
+#============================================
+
+
+def is_running(socket_path: str) -> bool:
+	"""
+	Report whether a daemon accepts connections on socket_path.
+
+	Args:
+		socket_path: Socket path.
+
+	Returns:
+		bool: True when a connection succeeds.
+	"""
+	with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+		try:
+			sock.connect(socket_path)
+		except OSError:
+			return False
+	return True
+
+
+#============================================
+
+
+def serve(socket_path: str, version: str) -> None:
+	"""
+	Serve lint requests on socket_path until a "stop" request arrives.
+
+	Requests are handled one at a time, so the state needs no locking. The
+	socket is created with owner-only permissions.
+
+	Args:
+		socket_path: Socket path.
+		version: Linter version that clients must match.
+	"""
+	if is_running(socket_path):
+		raise RuntimeError(f"A pgml-lint daemon is already running on {socket_path}")
+	if os.path.exists(socket_path):
+		# Left behind by a daemon that was killed
+		os.unlink(socket_path)
+	os.makedirs(os.path.dirname(os.path.abspath(socket_path)), exist_ok=True)
+	state = DaemonState(version)
+	old_umask = os.umask(0o077)
+	try:
+		server = socketserver.UnixStreamServer(socket_path, _RequestHandler)
+	finally:
+		os.umask(old_umask)
+	server.state = state
+	try:
+		while not state.stopping:
+			server.handle_request()
+	finally:
+		server.server_close()
+		if os.path.exists(socket_path):
+			os.unlink(socket_path)
+
+
+#============================================
+
+
+def send_request(socket_path: str, request: dict[str, object]) -> collections.abc.Iterator:
+	"""
+	Send one request and yield the daemon's response messages as they arrive.
+
+	Args:
+		socket_path: Socket path.
+		request: Request message.
+
+	Yields:
+		dict[str, object]: Response messages.
+	"""
+	with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+		sock.connect(socket_path)
+		sock.sendall(encode_message(request))
+		with sock.makefile("r", encoding="utf-8") as reader:
+			for line in reader:
+				message = json.loads(line)
+				if "error" in message:
+					raise RuntimeError(f"pgml-lint daemon: {message['error']}")
+				yield message
+
+
+#============================================
+
+
+def daemon_status(socket_path: str) -> dict[str, object] | None:
+	"""
+	Return the daemon's status message, or None when no daemon answers.
+
+	Args:
+		socket_path: Socket path.
+
+	Returns:
+		dict[str, object] | None: Status message.
+	"""
+	try:
+		return next(send_request(socket_path, {"command": "status"}))
+	except (OSError, StopIteration):
+		return None
+
+
+#============================================
+
+
+def iter_file_results(
+	socket_path: str,
+	file_paths: list[str],
+	pg_version: str | None,
+	excerpts: bool,
+	version: str,
+) -> collections.abc.Iterator:
+	"""
+	Yield (file_path, issues) pairs linted by the daemon, in file order.
+
+	Paths are sent absolute because the daemon has its own working
+	directory; each result is reported under the path the caller gave.
+
+	Args:
+		socket_path: Socket path.
+		file_paths: Files to lint.
+		pg_version: Target PG version.
+		excerpts: Attach source excerpts to issues.
+		version: Client linter version.
+
+	Yields:
+		tuple[str, list[pgml_lint.core.Issue]]: File path and its issues.
+	"""
+	request = {
+		"command": "lint",
+		"version": version,
+		"files": [os.path.abspath(file_path) for file_path in file_paths],
+		"pg_version": pg_version,
+		"excerpts": excerpts,
+	}
+	remaining = iter(file_paths)
+	for message in send_request(socket_path, request):
+		if message.get("done"):
+			return
+		issues = [pgml_lint.core.Issue.from_mapping(issue) for issue in message["issues"]]
+		yield next(remaining), issues
+	# A crashed handler closes the socket without the final "done" record
+	raise RuntimeError("pgml-lint daemon closed the connection before finishing")
+
+
+#============================================
+
+
+def start_background(socket_path: str, timeout: float = START_TIMEOUT) -> int:
+	"""
+	Start a detached daemon process and wait until it accepts connections.
+
+	Args:
+		socket_path: Socket path.
+		timeout: Seconds to wait.
+
+	Returns:
+		int: Daemon process id.
+	"""
+	package_parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+	env = dict(os.environ)
+	# A repo checkout is not on the child's path unless we put it there
+	env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_parent, env.get("PYTHONPATH")]))
+	command = [sys.executable, "-m", "pgml_lint.cli", "daemon", "start", "--foreground", "-s", socket_path]
+	process = subprocess.Popen(
+		command,
+		env=env,
+		stdin=subprocess.DEVNULL,
+		stdout=subprocess.DEVNULL,
+		stderr=subprocess.DEVNULL,
+		start_new_session=True,
+	)
+	deadline = time.monotonic() + timeout
+	while time.monotonic() < deadline:
+		if is_running(socket_path):
+			return process.pid
+		if process.poll() is not None:
+			raise RuntimeError(f"pgml-lint daemon exited with status {process.returncode}")
+		time.sleep(0.02)
+	raise RuntimeError(f"pgml-lint daemon did not start on {socket_path} within {timeout:.0f} s")
+
+
+#============================================
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+	"""
+	Parse arguments for the "pgml-lint daemon" command.
+
+	Args:
+		argv: Arguments after "daemon".
+
+	Returns:
+		argparse.Namespace: Parsed arguments.
+	"""
+	parser = argparse.ArgumentParser(
+		prog="pgml-lint daemon",
+		description="Keep rules and plugins loaded and lint files sent over a Unix socket.",
+	)
+	parser.add_argument(
+		"action",
+		choices=("start", "stop", "status"),
+		help="Start, stop, or query the daemon.",
+	)
+	parser.add_argument(
+		"-s",
+		"--socket",
+		dest="socket_path",
+		help=f"Socket path (default: ${SOCKET_ENV}, else $XDG_RUNTIME_DIR/{SOCKET_NAME}).",
+	)
+	parser.add_argument(
+		"-f",
+		"--foreground",
+		dest="foreground",
+		action="store_true",
+		help="Serve in this process instead of starting a background daemon.",
+	)
+	parser.set_defaults(
+		socket_path=None,
+		foreground=False,
+	)
+	args = parser.parse_args(argv)
+	return args
+
+
+#============================================
+
+
+def main(argv: list[str], version: str) -> None:
+	"""
+	Run the "pgml-lint daemon" command.
+
+	Args:
+		argv: Arguments after "daemon".
+		version: Linter version.
+	"""
+	args = parse_args(argv)
+	socket_path = args.socket_path or default_socket_path()
+	if args.action == "start":
+		if args.foreground:
+			serve(socket_path, version)
+			return
+		if is_running(socket_path):
+			print(f"pgml-lint daemon already running on {socket_path}")
+			return
+		pid = start_background(socket_path)
+		print(f"pgml-lint daemon started (pid {pid}) on {socket_path}")
+		return
+	status = daemon_status(socket_path)
+	if status is None:
+		print(f"No pgml-lint daemon on {socket_path}")
+		raise SystemExit(1)
+	if args.action == "stop":
+		list(send_request(socket_path, {"command": "stop"}))
+		print(f"pgml-lint daemon stopped (pid {status['pid']})")
+		return
+	print(json.dumps(status, indent=2))
@@ -0,0 +1,212 @@
+"""Changed-line scopes from unified diffs, for reporting only on touched lines."""
+
+# Standard Library
+import bisect
+import codecs
+import re
+
+# Local modules
+import pgml_lint.parser
+
+# Hunk header: @@ -old_start[,old_count] +new_start[,new_count] @@
+HUNK_RX = re.compile(r"^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+#============================================
+
+
+def _diff_path(raw_path: str) -> str | None:
+	"""
+	Return the path named on a "+++ " line, without git's b/ prefix.
+
+	Args:
+		raw_path: Text after "+++ ".
+
+	Returns:
+		str | None: Path, or None for a deleted file (/dev/null).
+	"""
+	# Non-git diffs append a tab and a timestamp
+	path = raw_path.split("\t", 1)[0].rstrip("\r")
+	if path.startswith('"') and path.endswith('"'):
+		# git C-quotes names with special characters; octal escapes are UTF-8 bytes
+		path = codecs.decode(path[1:-1], "unicode_escape").encode("latin-1").decode("utf-8")
+	if path == "/dev/null":
+		return None
+	if path.startswith("b/"):
+		path = path[2:]
+	return path
+
+
+#============================================
+
+
+def merge_lines(lines: set[int]) -> list[tuple[int, int]]:
+	"""
+	Collapse line numbers into sorted inclusive (first, last) ranges.
+
+	Args:
+		lines: 1-based line numbers.
+
+	Returns:
+		list[tuple[int, int]]: Non-overlapping ranges in order.
+	"""
+	ranges: list[tuple[int, int]] = []
+	for line in sorted(lines):
+		if ranges and line == ranges[-1][1] + 1:
+			ranges[-1] = (ranges[-1][0], line)
+		else:
+			ranges.append((line, line))
+	return ranges
+
+
+#============================================
+
+
+def parse_unified_diff(diff_text: str) -> dict[str, list[tuple[int, int]]]:
+	"""
+	Find the new-side lines each file's hunks add or change.
+
+	Only "+" lines count, plus the lines on both sides of a deletion that
+	nothing replaced, so context lines from "git diff" without -U0 are not
+	in scope.
+
+	Args:
+		diff_text: Unified diff, as from "git diff" or "diff -u".
+
+	Returns:
+		dict[str, list[tuple[int, int]]]: Line ranges by path as named in the diff.
+	"""
+	changed: dict[str, set[int]] = {}
+	# New-side line that follows each removed line
+	deletions: dict[str, set[int]] = {}
+	path = None
+	new_line = 0
+	old_left = 0
+	new_left = 0
+	for line in diff_text.splitlines():
+		if old_left > 0 or new_left > 0:
+			tag = line[:1]
+			if tag == "+":
+				changed[path].add(new_line)
+				new_line += 1
+				new_left -= 1
+			elif tag == "-":
+				deletions[path].add(new_line)
+				old_left -= 1
+			elif tag == "\\":
+				# "\ No newline at end of file"
+				continue
+			else:
+				new_line += 1
+				old_left -= 1
+				new_left -= 1
+			continue
+		if line.startswith("+++ "):
+			path = _diff_path(line[4:])
+			if path is not None:
+				changed.setdefault(path, set())
+				deletions.setdefault(path, set())
+			continue
+		match = HUNK_RX.match(line)
+		if match is None or path is None:
+			continue
+		old_left = 1 if match.group(1) is None else int(match.group(1))
+		new_line = int(match.group(2))
+		new_left = 1 if match.group(3) is None else int(match.group(3))
+		if new_left == 0:
+			# A pure deletion's start names the line before the removed ones
+			new_line += 1
+	for name, lines in changed.items():
+		for line in deletions[name] - lines:
+			# A removal with no replacement touches the lines around it
+			lines.update((max(line - 1, 1), line))
+	scopes = {name: merge_lines(lines) for name, lines in changed.items()}
+	return scopes
+
+
+#============================================
+
+
+def lines_in_scope(line_scope: list[tuple[int, int]], first: int, last: int) -> bool:
+	"""
+	Report whether any line from first to last (inclusive) is in scope.
+
+	Args:
+		line_scope: Sorted ranges from merge_lines().
+		first: First line.
+		last: Last line.
+
+	Returns:
+		bool: True when the lines overlap a range.
+	"""
+	index = bisect.bisect_right(line_scope, (first, float("inf")))
+	if index > 0 and line_scope[index - 1][1] >= first:
+		return True
+	return index < len(line_scope) and line_scope[index][0] <= last
+
+
+#============================================
+
+
+def offsets_in_scope(line_scope: list[tuple[int, int]], newlines: list[int], start: int, end: int) -> bool:
+	"""
+	Report whether the text from start to end overlaps a line range.
+
+	Args:
+		line_scope: Sorted ranges from merge_lines().
+		newlines: Newline index of the text.
+		start: Span start offset.
+		end: Span end offset (exclusive).
+
+	Returns:
+		bool: True when the span overlaps a range.
+	"""
+	first = pgml_lint.parser.pos_to_line(newlines, start)
+	last = pgml_lint.parser.pos_to_line(newlines, max(start, end - 1))
+	return lines_in_scope(line_scope, first, last)
+
+
+#============================================
+
+
+def span_in_scope(context: dict[str, object], start: int, end: int) -> bool:
+	"""
+	Report whether a plugin should analyze a text span under the context's region scope.
+
+	The engine sets region_scope to the changed lines only while a
+	SEGMENT_LOCAL plugin runs; every other plugin sees the whole file.
+
+	Args:
+		context: Lint context; a missing or None region_scope means the whole file.
+		start: Span start offset.
+		end: Span end offset (exclusive).
+
+	Returns:
+		bool: True when the span should be analyzed.
+	"""
+	region_scope = context.get("region_scope")
+	if region_scope is None:
+		return True
+	return offsets_in_scope(region_scope, context.get("newlines", []), start, end)
+
+
+#============================================
+
+
+def filter_issues(issues: list, line_scope: list[tuple[int, int]]) -> list:
+	"""
+	Keep the issues reported on lines in scope; issues without a line are dropped.
+
+	Args:
+		issues: Issue records.
+		line_scope: Sorted ranges from merge_lines().
+
+	Returns:
+		list: Issues in scope, in their original order.
+	"""
+	kept = []
+	for issue in issues:
+		line = issue.get("line")
+		if isinstance(line, int) and lines_in_scope(line_scope, line, line):
+			kept.append(issue)
+	return kept
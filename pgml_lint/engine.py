@@ -1,8 +1,11 @@
 # Standard Library
 
 # Local modules
-import pgml_lint.parser
-import pgml_lint.pg_version
+import pgml_lint.context
+import pgml_lint.core
+import pgml_lint.diff_scope
+import pgml_lint.profiling
+import pgml_lint.registry
 
 
 #============================================
@@ -14,55 +17,43 @@ def build_context(
 	block_rules: list[dict[str, str]],
 	macro_rules: list[dict[str, object]],
 	pg_version: str | None = None,
-) -> dict[str, object]:
+	profiler: pgml_lint.profiling.LintProfiler | None = None,
+	line_scope: list[tuple[int, int]] | None = None,
+) -> pgml_lint.context.LintContext:
 	"""
-	Build a shared context dict for plugins.
+	Build a shared context for plugins.
+
+	Parsed fields (stripped text, regions, macros, and so on) are computed
+	on first access, so plugins only pay for the analyses they read.
 
 	Args:
 		text: Full file contents.
 		file_path: Optional file path.
 		block_rules: Block rules.
 		macro_rules: Macro rules.
+		pg_version: Target PG version.
+		profiler: Optional profiler that times each context stage.
+		line_scope: Optional changed-line ranges; SEGMENT_LOCAL plugins may skip regions outside them.
 
 	Returns:
-		dict[str, object]: Context dict.
-	"""
-	pg_version_normalized = pgml_lint.pg_version.normalize_pg_version(pg_version)
-	newlines = pgml_lint.parser.build_newline_index(text)
-	stripped_comments = pgml_lint.parser.strip_comments(text)
-	stripped_text = pgml_lint.parser.strip_heredocs(stripped_comments)
-	macros_loaded = pgml_lint.parser.extract_loaded_macros(stripped_text)
-	assigned_vars = pgml_lint.parser.extract_assigned_vars(stripped_text)
-	uses_pgml = pgml_lint.parser.detect_pgml_usage(stripped_text)
-	block_marker_issues, pgml_regions = pgml_lint.parser.extract_block_markers(text)
-	heredoc_issues, heredoc_regions = pgml_lint.parser.extract_pgml_heredoc_regions(text)
-	pgml_regions_all = list(pgml_regions) + list(heredoc_regions)
-
-	context = {
-		"pg_version": pg_version_normalized,
-		"file_path": file_path,
-		"text": text,
-		"newlines": newlines,
-		"stripped_comments": stripped_comments,
-		"stripped_text": stripped_text,
-		"macros_loaded": macros_loaded,
-		"assigned_vars": assigned_vars,
-		"uses_pgml": uses_pgml or bool(pgml_regions_all),
-		"block_rules": block_rules,
-		"macro_rules": macro_rules,
-		"block_marker_issues": block_marker_issues,
-		"pgml_regions": pgml_regions_all,
-		"pgml_block_regions": pgml_regions,
-		"pgml_heredoc_regions": heredoc_regions,
-		"pgml_heredoc_issues": heredoc_issues,
-	}
+		pgml_lint.context.LintContext: Lazy context with a dict-style interface.
+	"""
+	context = pgml_lint.context.LintContext(
+		text,
+		file_path,
+		block_rules,
+		macro_rules,
+		pg_version,
+		profiler,
+		line_scope,
+	)
 	return context
 
 
 #============================================
 
 
-def _sort_issues(issues: list[dict[str, object]]) -> list[dict[str, object]]:
+def _sort_issues(issues: list[pgml_lint.core.Issue]) -> list[pgml_lint.core.Issue]:
 	"""
 	Return issues sorted by line number then message.
 
@@ -70,13 +61,13 @@ def _sort_issues(issues: list[dict[str, object]]) -> list[dict[str, object]]:
 		issues: Issue list.
 
 	Returns:
-		list[dict[str, object]]: Sorted issues.
+		list[pgml_lint.core.Issue]: Sorted issues.
 	"""
-	def issue_key(issue: dict[str, object]) -> tuple[int, str]:
-		line = issue.get("line")
+	def issue_key(issue: pgml_lint.core.Issue) -> tuple[int, str]:
+		line = issue.line
 		if isinstance(line, int):
-			return (line, str(issue.get("message", "")))
-		return (10**9, str(issue.get("message", "")))
+			return (line, issue.message)
+		return (10**9, issue.message)
 
 	return sorted(issues, key=issue_key)
 
@@ -86,9 +77,9 @@ def _sort_issues(issues: list[dict[str, object]]) -> list[dict[str, object]]:
 
 def _attach_issue_excerpts(
 	text: str,
-	issues: list[dict[str, object]],
+	issues: list[pgml_lint.core.Issue],
 	window: int = 40,
-) -> list[dict[str, object]]:
+) -> list[pgml_lint.core.Issue]:
 	"""
 	Attach excerpt strings for issues with line and column info.
 
@@ -98,12 +89,12 @@ def _attach_issue_excerpts(
 		window: Characters to include before/after the column.
 
 	Returns:
-		list[dict[str, object]]: Updated issue list.
+		list[pgml_lint.core.Issue]: Updated issue list.
 	"""
 	lines = text.splitlines()
 	for issue in issues:
-		line = issue.get("line")
-		column = issue.get("column")
+		line = issue.line
+		column = issue.column
 		if not isinstance(line, int) or not isinstance(column, int):
 			continue
 		if line < 1 or line > len(lines):
@@ -121,36 +112,108 @@ def _attach_issue_excerpts(
 			excerpt = "..." + excerpt
 		if end < len(line_text):
 			excerpt = excerpt + "..."
-		issue["excerpt"] = excerpt
+		issue.excerpt = excerpt
 	return issues
 
 
 #============================================
 
 
-def run_plugins(
-	context: dict[str, object],
+def _plugin_triggered(
+	plugin: dict[str, object],
+	context: pgml_lint.context.LintContext | dict[str, object],
+	present: set[str],
+) -> bool:
+	"""
+	Check a plugin's trigger predicates before running it.
+
+	Args:
+		plugin: Plugin metadata.
+		context: Lint context.
+		present: Trigger substrings found in the file text.
+
+	Returns:
+		bool: True when the plugin could report anything for this file.
+	"""
+	triggers = plugin.get("triggers")
+	if triggers and present.isdisjoint(triggers):
+		return False
+	for field in plugin.get("trigger_fields", ()):
+		if not context.get(field):
+			return False
+	return True
+
+
+#============================================
+
+
+def run_plugins_by_id(
+	context: pgml_lint.context.LintContext | dict[str, object],
 	plugins: list[dict[str, object]],
-) -> list[dict[str, object]]:
+	profiler: pgml_lint.profiling.LintProfiler | None = None,
+) -> dict[str, list[pgml_lint.core.Issue]]:
 	"""
-	Run plugins and return aggregated issues.
+	Run plugins and return each reporting plugin's issues, unsorted.
 
 	Args:
-		context: Shared context dict.
-		plugins: Plugin metadata list.
+		context: Shared context from build_context() or a plain dict.
+		plugins: Plugin metadata list; "report": False helpers get no entry,
+			and plugins whose triggers do not match the file are skipped.
+		profiler: Optional profiler that times each plugin.
 
 	Returns:
-		list[dict[str, object]]: Issue list.
+		dict[str, list[pgml_lint.core.Issue]]: Issues by plugin id, in run order.
 	"""
-	issues: list[dict[str, object]] = []
+	issues_by_id: dict[str, list[pgml_lint.core.Issue]] = {}
+	# Test every trigger substring once per file, not once per plugin
+	text = str(context.get("text", ""))
+	triggers = {trigger for plugin in plugins for trigger in plugin.get("triggers", ())}
+	present = {trigger for trigger in triggers if trigger in text}
+	line_scope = context.get("line_scope")
 	for plugin in plugins:
+		if not _plugin_triggered(plugin, context, present):
+			continue
+		if line_scope is not None:
+			# Only plugins whose findings stay inside one region may skip the
+			# regions outside the scope; the rest see the whole file, and
+			# their issues are filtered by line afterwards
+			context["region_scope"] = line_scope if plugin.get("segment_local") else None
 		plugin_id = str(plugin.get("id"))
 		plugin_run = plugin.get("run")
-		plugin_issues = plugin_run(context)
-		for issue in plugin_issues:
-			if issue.get("plugin") is None:
-				issue["plugin"] = plugin_id
-			issues.append(issue)
+		if profiler is None:
+			plugin_issues = plugin_run(context)
+		else:
+			plugin_issues = profiler.measure(pgml_lint.profiling.KIND_PLUGIN, plugin_id, plugin_run, context)
+		if plugin.get("report") is False:
+			# Helper producer run only for the context keys it provides
+			continue
+		# Plugins may return plain issue dicts; store them as Issue records
+		issues_by_id[plugin_id] = [pgml_lint.core.Issue.from_mapping(issue, plugin_id) for issue in plugin_issues]
+	return issues_by_id
+
+
+#============================================
+
+
+def run_plugins(
+	context: pgml_lint.context.LintContext | dict[str, object],
+	plugins: list[dict[str, object]],
+	profiler: pgml_lint.profiling.LintProfiler | None = None,
+) -> list[pgml_lint.core.Issue]:
+	"""
+	Run plugins and return aggregated issues.
+
+	Args:
+		context: Shared context from build_context() or a plain dict.
+		plugins: Plugin metadata list; issues from "report": False helpers are dropped,
+			and plugins whose triggers do not match the file are skipped.
+		profiler: Optional profiler that times each plugin.
+
+	Returns:
+		list[pgml_lint.core.Issue]: Issue list.
+	"""
+	issues_by_id = run_plugins_by_id(context, plugins, profiler)
+	issues = [issue for plugin_issues in issues_by_id.values() for issue in plugin_issues]
 	return _sort_issues(issues)
 
 
@@ -164,7 +227,10 @@ def lint_text(
 	macro_rules: list[dict[str, object]],
 	plugins: list[dict[str, object]],
 	pg_version: str | None = None,
-) -> list[dict[str, object]]:
+	profiler: pgml_lint.profiling.LintProfiler | None = None,
+	excerpts: bool = True,
+	line_scope: list[tuple[int, int]] | None = None,
+) -> list[pgml_lint.core.Issue]:
 	"""
 	Lint a text blob with configured plugins.
 
@@ -174,13 +240,83 @@ def lint_text(
 		block_rules: Block rules.
 		macro_rules: Macro rules.
 		plugins: Enabled plugins.
+		pg_version: Target PG version.
+		profiler: Optional profiler for plugin and context stage timings.
+		excerpts: Attach source excerpts to issues that carry a column.
+		line_scope: Optional changed-line ranges; only issues on these lines are kept.
 
 	Returns:
-		list[dict[str, object]]: Issue list.
+		list[pgml_lint.core.Issue]: Issue list.
 	"""
-	context = build_context(text, file_path, block_rules, macro_rules, pg_version)
-	issues = run_plugins(context, plugins)
-	issues = _attach_issue_excerpts(text, issues)
+	context = build_context(text, file_path, block_rules, macro_rules, pg_version, profiler, line_scope)
+	issues = run_plugins(context, plugins, profiler)
+	if line_scope is not None:
+		issues = pgml_lint.diff_scope.filter_issues(issues, line_scope)
+	if excerpts:
+		issues = _attach_issue_excerpts(text, issues)
+	return issues
+
+
+#============================================
+
+
+def _lint_cached(
+	text: str,
+	file_path: str,
+	block_rules: list[dict[str, str]],
+	macro_rules: list[dict[str, object]],
+	plugins: list[dict[str, object]],
+	pg_version: str | None,
+	cache: "pgml_lint.cache.ResultCache",
+	profiler: pgml_lint.profiling.LintProfiler | None,
+	line_scope: list[tuple[int, int]] | None,
+) -> list[pgml_lint.core.Issue]:
+	"""
+	Lint text through the two-level cache, running only plugins without stored results.
+
+	Args:
+		text: File contents.
+		file_path: Path reported with the issues.
+		block_rules: Block rules.
+		macro_rules: Macro rules.
+		plugins: Enabled plugins.
+		pg_version: Target PG version.
+		cache: Result cache.
+		profiler: Optional profiler.
+		line_scope: Optional changed-line ranges.
+
+	Returns:
+		list[pgml_lint.core.Issue]: Sorted issues without excerpts.
+	"""
+	results_key, analysis_key = cache.keys_for(text, block_rules, macro_rules, pg_version)
+	fingerprints = cache.fingerprints(plugins)
+	stored = cache.get(results_key) or {}
+	reporting = [str(plugin.get("id")) for plugin in plugins if plugin.get("report") is not False]
+	missing = {plugin_id for plugin_id in reporting if not isinstance(stored.get(fingerprints[plugin_id]), list)}
+	fresh: dict[str, list[pgml_lint.core.Issue]] = {}
+	if missing:
+		context = build_context(text, file_path, block_rules, macro_rules, pg_version, profiler, line_scope)
+		analysis = cache.get(analysis_key)
+		if analysis is not None:
+			context.seed_analysis(analysis)
+		fresh = run_plugins_by_id(context, pgml_lint.registry.with_producers(plugins, missing), profiler)
+		computed = context.export_analysis()
+		if analysis is None or not set(computed) <= set(analysis):
+			cache.put(analysis_key, dict(analysis or {}, **computed))
+		if line_scope is None:
+			for plugin_id in missing:
+				stored[fingerprints[plugin_id]] = [dict(issue) for issue in fresh.get(plugin_id, [])]
+			cache.put(results_key, stored)
+	issues: list[pgml_lint.core.Issue] = []
+	# Gather in run order so equal sort keys keep the uncached order
+	for plugin_id in reporting:
+		if plugin_id in missing:
+			issues.extend(fresh.get(plugin_id, []))
+		else:
+			issues.extend(pgml_lint.core.Issue.from_mapping(issue, plugin_id) for issue in stored[fingerprints[plugin_id]])
+	issues = _sort_issues(issues)
+	if line_scope is not None:
+		issues = pgml_lint.diff_scope.filter_issues(issues, line_scope)
 	return issues
 
 
@@ -193,7 +329,12 @@ def lint_file(
 	macro_rules: list[dict[str, object]],
 	plugins: list[dict[str, object]],
 	pg_version: str | None = None,
-) -> list[dict[str, object]]:
+	# String annotation: pgml_lint.cache (tempfile, hashlib) loads only when caching
+	cache: "pgml_lint.cache.ResultCache | None" = None,
+	profiler: pgml_lint.profiling.LintProfiler | None = None,
+	excerpts: bool = True,
+	line_scope: list[tuple[int, int]] | None = None,
+) -> list[pgml_lint.core.Issue]:
 	"""
 	Lint a single file.
 
@@ -202,11 +343,78 @@ def lint_file(
 		block_rules: Block rules.
 		macro_rules: Macro rules.
 		plugins: Enabled plugins.
+		pg_version: Target PG version.
+		cache: Optional result cache; unchanged contents skip linting.
+		profiler: Optional profiler; the file is recorded as one profiled file.
+		excerpts: Attach source excerpts; cached entries are stored without them.
+		line_scope: Optional changed-line ranges; only issues on these lines are kept.
 
 	Returns:
-		list[dict[str, object]]: Issue list.
+		list[pgml_lint.core.Issue]: Issue list.
 	"""
 	with open(file_path, "r", encoding="utf-8") as handle:
 		text = handle.read()
-	issues = lint_text(text, file_path, block_rules, macro_rules, plugins, pg_version)
+	issues = lint_source(
+		text,
+		file_path,
+		block_rules,
+		macro_rules,
+		plugins,
+		pg_version,
+		cache,
+		profiler,
+		excerpts,
+		line_scope,
+	)
+	return issues
+
+
+#============================================
+
+
+def lint_source(
+	text: str,
+	file_path: str,
+	block_rules: list[dict[str, str]],
+	macro_rules: list[dict[str, object]],
+	plugins: list[dict[str, object]],
+	pg_version: str | None = None,
+	cache: "pgml_lint.cache.ResultCache | None" = None,
+	profiler: pgml_lint.profiling.LintProfiler | None = None,
+	excerpts: bool = True,
+	line_scope: list[tuple[int, int]] | None = None,
+) -> list[pgml_lint.core.Issue]:
+	"""
+	Lint the contents of one file that were read elsewhere (disk, git blob).
+
+	With a cache, each plugin's stored results are reused and only the
+	plugins without results run. A scoped lint is partial, so its plugin
+	results are never stored, but stored full results are filtered down to
+	the scope.
+
+	Args:
+		text: File contents.
+		file_path: Path reported with the issues.
+		block_rules: Block rules.
+		macro_rules: Macro rules.
+		plugins: Enabled plugins.
+		pg_version: Target PG version.
+		cache: Optional result cache; unchanged contents skip linting.
+		profiler: Optional profiler; the file is recorded as one profiled file.
+		excerpts: Attach source excerpts; cached entries are stored without them.
+		line_scope: Optional changed-line ranges; only issues on these lines are kept.
+
+	Returns:
+		list[pgml_lint.core.Issue]: Issue list.
+	"""
+	if profiler is not None:
+		profiler.begin_file(file_path)
+	if cache is None:
+		issues = lint_text(text, file_path, block_rules, macro_rules, plugins, pg_version, profiler, False, line_scope)
+	else:
+		issues = _lint_cached(text, file_path, block_rules, macro_rules, plugins, pg_version, cache, profiler, line_scope)
+	if excerpts:
+		issues = _attach_issue_excerpts(text, issues)
+	if profiler is not None:
+		profiler.end_file()
 	return issues
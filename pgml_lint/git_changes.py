@@ -0,0 +1,334 @@
+"""Pick changed .pg files with git and lint their committed or staged contents."""
+
+# Standard Library
+import collections.abc
+import os
+import subprocess
+import threading
+
+# Local modules
+import pgml_lint.cli
+import pgml_lint.engine
+import pgml_lint.profiling
+
+# Added, copied, modified, renamed, or type-changed; deleted files have nothing to lint
+DIFF_FILTER = "ACMRT"
+
+
+#============================================
+
+
+def run_git(args: list[str]) -> bytes:
+	"""
+	Run a git command and return its stdout.
+
+	Args:
+		args: Arguments after "git".
+
+	Returns:
+		bytes: Standard output.
+	"""
+	result = subprocess.run(["git", *args], capture_output=True, check=False)
+	if result.returncode != 0:
+		message = result.stderr.decode("utf-8", "replace").strip()
+		raise RuntimeError(f"git failed: {message}")
+	return result.stdout
+
+
+#============================================
+
+
+def repo_root(path: str) -> str:
+	"""
+	Return the root of the git work tree that contains path.
+
+	Args:
+		path: Directory inside a work tree.
+
+	Returns:
+		str: Work tree root.
+	"""
+	root = os.fsdecode(run_git(["-C", path, "rev-parse", "--show-toplevel"]).strip())
+	return root
+
+
+#============================================
+
+
+def blob_text(data: bytes, errors: str = "strict") -> str:
+	"""
+	Decode blob contents the way a text-mode read of the checked-out file would.
+
+	Args:
+		data: Blob contents.
+		errors: UTF-8 decoding error handler.
+
+	Returns:
+		str: Text with universal newlines.
+	"""
+	text = data.decode("utf-8", errors)
+	return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+#============================================
+
+
+def changed_files(
+	input_dir: str,
+	since: str | None = None,
+	staged: bool = False,
+	extensions: list[str] = pgml_lint.cli.DEFAULT_EXTENSIONS,
+) -> tuple[str, list[str], list[str]]:
+	"""
+	List changed files under input_dir and the git objects that hold their contents.
+
+	With staged, files differ between HEAD and the index, and contents come
+	from the index. Otherwise files differ between the merge base of since
+	and HEAD, and contents come from HEAD, as a CI job sees a branch.
+
+	Args:
+		input_dir: Directory inside a git work tree; only files below it are listed.
+		since: Revision to compare HEAD against (for --changed-since).
+		staged: Compare the index with HEAD (for --staged).
+		extensions: File extensions to include.
+
+	Returns:
+		tuple[str, list[str], list[str]]: Work tree root, repo-relative
+		names, and one object name per file for git cat-file.
+	"""
+	root = repo_root(input_dir)
+	pathspec = os.path.relpath(os.path.abspath(input_dir), root)
+	if staged:
+		diff_args = ["diff", "--cached"]
+		object_prefix = ":"
+	else:
+		diff_args = ["diff", f"{since}...HEAD"]
+		object_prefix = "HEAD:"
+	output = run_git(["-C", root, *diff_args, "--name-only", "-z", f"--diff-filter={DIFF_FILTER}", "--", pathspec])
+	names = parse_name_list(output, extensions)
+	object_names = [object_prefix + name for name in names]
+	return root, names, object_names
+
+
+#============================================
+
+
+def parse_name_list(output: bytes, extensions: list[str]) -> list[str]:
+	"""
+	Pick the files with a lint extension from "git diff --name-only -z" output.
+
+	Args:
+		output: NUL-separated repo-relative names.
+		extensions: File extensions to include.
+
+	Returns:
+		list[str]: Sorted names.
+	"""
+	names = []
+	for raw_name in output.split(b"\0"):
+		name = os.fsdecode(raw_name)
+		# cat-file --batch reads one object name per line
+		if not name or "\n" in name:
+			continue
+		if os.path.splitext(name)[1].lower() in extensions:
+			names.append(name)
+	names.sort()
+	return names
+
+
+#============================================
+
+
+def read_batch_object(stream: object, object_name: str) -> tuple[str, bytes] | None:
+	"""
+	Read one "git cat-file --batch" answer from its output stream.
+
+	Args:
+		stream: Binary stream positioned at the answer's header line.
+		object_name: Name that was asked for, for the error message.
+
+	Returns:
+		tuple[str, bytes] | None: Object type and contents, or None when
+		git reports the name missing or ambiguous.
+	"""
+	header = stream.readline()
+	if not header:
+		raise RuntimeError(f"git cat-file stopped before {object_name}")
+	# "<oid> <type> <size>", or "<name> missing" and "<name> ambiguous"
+	fields = header.split()
+	if len(fields) != 3:
+		return None
+	data = stream.read(int(fields[2]))
+	# The contents are followed by a newline
+	stream.read(1)
+	return fields[1].decode("ascii"), data
+
+
+#============================================
+
+
+def iter_blobs(root: str, object_names: list[str]) -> collections.abc.Iterator:
+	"""
+	Read many objects through a single "git cat-file --batch" process.
+
+	Object names are written from a thread, so neither pipe can fill up and
+	stall the other side.
+
+	Args:
+		root: Work tree root.
+		object_names: Object names such as ":path" or "HEAD:path".
+
+	Yields:
+		tuple[str, bytes | None]: Object name and its contents, or None when
+		it is missing or not a blob (a submodule, for example).
+	"""
+	process = subprocess.Popen(
+		["git", "-C", root, "cat-file", "--batch"],
+		stdin=subprocess.PIPE,
+		stdout=subprocess.PIPE,
+	)
+
+	def write_names() -> None:
+		try:
+			for object_name in object_names:
+				process.stdin.write(os.fsencode(object_name) + b"\n")
+		except BrokenPipeError:
+			pass
+		finally:
+			try:
+				process.stdin.close()
+			except BrokenPipeError:
+				pass
+
+	writer = threading.Thread(target=write_names, daemon=True)
+	writer.start()
+	try:
+		for object_name in object_names:
+			result = read_batch_object(process.stdout, object_name)
+			if result is None or result[0] != "blob":
+				yield object_name, None
+				continue
+			yield object_name, result[1]
+	finally:
+		process.stdout.close()
+		writer.join()
+		process.wait()
+
+
+#============================================
+
+
+class CatFile:
+	"""
+	A "git cat-file --batch" process for objects chosen one at a time.
+
+	Walking trees needs each object before the next name is known, so this
+	reader writes one name, flushes, and reads the answer, instead of
+	streaming a known list the way iter_blobs() does.
+	"""
+
+	def __init__(self, root: str) -> None:
+		self.process = subprocess.Popen(
+			["git", "-C", root, "cat-file", "--batch"],
+			stdin=subprocess.PIPE,
+			stdout=subprocess.PIPE,
+		)
+		self.reads = 0
+
+	def read(self, object_name: str) -> tuple[str, bytes] | None:
+		"""
+		Read one object.
+
+		Args:
+			object_name: Object id or any name git cat-file accepts.
+
+		Returns:
+			tuple[str, bytes] | None: Object type and contents, or None when missing.
+		"""
+		self.process.stdin.write(os.fsencode(object_name) + b"\n")
+		self.process.stdin.flush()
+		result = read_batch_object(self.process.stdout, object_name)
+		if result is not None:
+			self.reads += 1
+		return result
+
+	def close(self) -> None:
+		"""
+		Stop the git process.
+		"""
+		self.process.stdin.close()
+		self.process.stdout.close()
+		self.process.wait()
+
+
+#============================================
+
+
+def display_path(root: str, name: str) -> str:
+	"""
+	Return a repo-relative name as a path relative to the current directory.
+
+	Args:
+		root: Work tree root.
+		name: Repo-relative name.
+
+	Returns:
+		str: Path for output.
+	"""
+	return os.path.relpath(os.path.join(root, name))
+
+
+#============================================
+
+
+def iter_file_results(
+	root: str,
+	names: list[str],
+	object_names: list[str],
+	block_rules: list[dict[str, str]],
+	macro_rules: list[dict[str, object]],
+	plugins: list[dict[str, object]],
+	pg_version: str | None,
+	# String annotation: pgml_lint.cache loads only when caching
+	cache: "pgml_lint.cache.ResultCache | None" = None,
+	profiler: pgml_lint.profiling.LintProfiler | None = None,
+	excerpts: bool = True,
+	line_scopes: dict[str, list[tuple[int, int]]] | None = None,
+) -> collections.abc.Iterator:
+	"""
+	Lint each file's git object contents; the work tree is never read.
+
+	Args:
+		root: Work tree root.
+		names: Repo-relative names from changed_files().
+		object_names: Matching object names from changed_files().
+		block_rules: Block rules.
+		macro_rules: Macro rules.
+		plugins: Enabled plugins.
+		pg_version: Target PG version.
+		cache: Optional result cache.
+		profiler: Optional plugin profiler.
+		excerpts: Attach source excerpts to issues.
+		line_scopes: Optional changed-line ranges by repo-relative name.
+
+	Yields:
+		tuple[str, list[pgml_lint.core.Issue]]: Display path and its issues.
+	"""
+	for name, (object_name, data) in zip(names, iter_blobs(root, object_names)):
+		if data is None:
+			continue
+		file_path = display_path(root, name)
+		text = blob_text(data)
+		issues = pgml_lint.engine.lint_source(
+			text,
+			file_path,
+			block_rules,
+			macro_rules,
+			plugins,
+			pg_version,
+			cache,
+			profiler,
+			excerpts,
+			None if line_scopes is None else line_scopes.get(name),
+		)
+		yield file_path, issues
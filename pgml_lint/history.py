@@ -0,0 +1,348 @@
+"""Per-commit lint totals across git history, memoized by blob and tree id."""
+
+# Standard Library
+import argparse
+import collections
+import collections.abc
+import json
+import os
+import sys
+
+# Local modules
+import pgml_lint.cli
+import pgml_lint.engine
+import pgml_lint.git_changes
+import pgml_lint.pg_version
+import pgml_lint.registry
+import pgml_lint.rules
+
+# Tree entry mode of a subdirectory
+TREE_MODE = b"40000"
+# Modes of regular files; symlinks (120000) and submodules (160000) hold no source
+BLOB_MODES = (b"100644", b"100755")
+# Raw object id size in tree entries, by repository object format
+OID_SIZES = {"sha1": 20, "sha256": 32}
+
+
+#============================================
+
+
+def parse_tree(data: bytes, oid_size: int = 20) -> list[tuple[bytes, str, str]]:
+	"""
+	Split a raw tree object into its entries.
+
+	Args:
+		data: Tree contents; each entry is "<mode> <name>\\0<raw id>".
+		oid_size: Raw object id length in bytes.
+
+	Returns:
+		list[tuple[bytes, str, str]]: Mode, name, and hex object id per entry.
+	"""
+	entries = []
+	pos = 0
+	while pos < len(data):
+		space = data.index(b" ", pos)
+		nul = data.index(b"\0", space)
+		oid_end = nul + 1 + oid_size
+		entries.append((data[pos:space], os.fsdecode(data[space + 1:nul]), data[nul + 1:oid_end].hex()))
+		pos = oid_end
+	return entries
+
+
+#============================================
+
+
+def parse_commit(data: bytes) -> tuple[str, int]:
+	"""
+	Read the root tree and committer time from a raw commit object.
+
+	Args:
+		data: Commit contents.
+
+	Returns:
+		tuple[str, int]: Tree id and committer Unix time.
+	"""
+	tree = ""
+	timestamp = 0
+	for line in data.split(b"\n"):
+		if not line:
+			# Headers end at the first blank line
+			break
+		if line.startswith(b"tree "):
+			tree = line[5:].decode("ascii")
+		elif line.startswith(b"committer "):
+			# "committer Name <email> 1700000000 +0000"
+			timestamp = int(line.rsplit(b" ", 2)[1])
+	return tree, timestamp
+
+
+#============================================
+
+
+class LintTotals:
+	"""
+	File, error, and warning counts and issues per plugin for a blob or tree.
+	"""
+
+	__slots__ = ("files", "errors", "warnings", "plugins")
+
+	def __init__(self) -> None:
+		self.files = 0
+		self.errors = 0
+		self.warnings = 0
+		self.plugins: collections.Counter = collections.Counter()
+
+	def add(self, other: "LintTotals") -> None:
+		"""
+		Add another set of totals to this one.
+
+		Args:
+			other: Totals to add.
+		"""
+		self.files += other.files
+		self.errors += other.errors
+		self.warnings += other.warnings
+		self.plugins.update(other.plugins)
+
+	def to_dict(self) -> dict[str, object]:
+		"""
+		Return the totals as a JSON-ready dict with plugins sorted by id.
+
+		Returns:
+			dict[str, object]: Counts.
+		"""
+		plugins = {plugin_id: self.plugins[plugin_id] for plugin_id in sorted(self.plugins)}
+		return {"files": self.files, "errors": self.errors, "warnings": self.warnings, "plugins": plugins}
+
+
+#============================================
+
+
+class HistoryScanner:
+	"""
+	Lint totals for commits, walking trees read one object at a time.
+
+	A blob is linted once however many commits contain it, and a subtree
+	whose id is unchanged since an earlier commit reuses its totals without
+	being read again, so a commit costs only the trees and files it changed.
+	Both memos live in memory for one scan.
+	"""
+
+	def __init__(
+		self,
+		reader: pgml_lint.git_changes.CatFile,
+		lint: collections.abc.Callable,
+		oid_size: int = 20,
+		extensions: list[str] = pgml_lint.cli.DEFAULT_EXTENSIONS,
+	) -> None:
+		self.reader = reader
+		self.lint = lint
+		self.oid_size = oid_size
+		self.extensions = extensions
+		self.blob_totals: dict[str, LintTotals] = {}
+		self.tree_totals: dict[str, LintTotals] = {}
+
+	def _read(self, object_id: str, kind: str) -> bytes:
+		"""
+		Read an object that must exist with the given type.
+
+		Args:
+			object_id: Object id.
+			kind: Expected type ("commit", "tree", "blob").
+
+		Returns:
+			bytes: Object contents.
+		"""
+		result = self.reader.read(object_id)
+		if result is None or result[0] != kind:
+			raise RuntimeError(f"git object {object_id} is not a {kind}")
+		return result[1]
+
+	def commit_totals(self, commit_id: str, subdir: str = "") -> tuple[LintTotals, int]:
+		"""
+		Total the lint results of one commit's files.
+
+		Args:
+			commit_id: Commit id.
+			subdir: Repo-relative directory to scan ("" for the whole tree).
+
+		Returns:
+			tuple[LintTotals, int]: Totals and committer Unix time.
+		"""
+		tree_id, timestamp = parse_commit(self._read(commit_id, "commit"))
+		prefix = ""
+		for part in subdir.split("/") if subdir else []:
+			entries = parse_tree(self._read(tree_id, "tree"), self.oid_size)
+			matches = [oid for mode, name, oid in entries if name == part and mode == TREE_MODE]
+			if not matches:
+				# The directory does not exist yet at this commit
+				return LintTotals(), timestamp
+			tree_id = matches[0]
+			prefix += part + "/"
+		return self._tree(tree_id, prefix), timestamp
+
+	def _tree(self, tree_id: str, prefix: str) -> LintTotals:
+		"""
+		Total a tree's files, reusing the memo for a tree seen before.
+
+		Args:
+			tree_id: Tree id.
+			prefix: Repo-relative path of the tree, with a trailing slash.
+
+		Returns:
+			LintTotals: Totals for every file below the tree.
+		"""
+		totals = self.tree_totals.get(tree_id)
+		if totals is not None:
+			return totals
+		totals = LintTotals()
+		for mode, name, oid in parse_tree(self._read(tree_id, "tree"), self.oid_size):
+			if mode == TREE_MODE:
+				totals.add(self._tree(oid, prefix + name + "/"))
+			elif mode in BLOB_MODES and os.path.splitext(name)[1].lower() in self.extensions:
+				totals.add(self._blob(oid, prefix + name))
+		self.tree_totals[tree_id] = totals
+		return totals
+
+	def _blob(self, blob_id: str, name: str) -> LintTotals:
+		"""
+		Lint a blob, or reuse its totals when the same content was seen before.
+
+		Args:
+			blob_id: Blob id.
+			name: Repo-relative path where the blob was found.
+
+		Returns:
+			LintTotals: Totals for the one file.
+		"""
+		totals = self.blob_totals.get(blob_id)
+		if totals is not None:
+			return totals
+		# Old commits may hold files that are not valid UTF-8; lint them anyway
+		text = pgml_lint.git_changes.blob_text(self._read(blob_id, "blob"), "replace")
+		totals = LintTotals()
+		totals.files = 1
+		for issue in self.lint(text, name):
+			if issue.get("severity") == "ERROR":
+				totals.errors += 1
+			else:
+				totals.warnings += 1
+			totals.plugins[str(issue.get("plugin"))] += 1
+		self.blob_totals[blob_id] = totals
+		return totals
+
+
+#============================================
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+	"""
+	Parse arguments for the "pgml-lint history" command.
+
+	Args:
+		argv: Arguments after "history".
+
+	Returns:
+		argparse.Namespace: Parsed arguments.
+	"""
+	parser = argparse.ArgumentParser(
+		prog="pgml-lint history",
+		description="Print lint totals per plugin for each commit, one JSON record per line, oldest first.",
+	)
+	parser.add_argument(
+		"revisions",
+		nargs="*",
+		help="Revisions or ranges passed to git rev-list (default: HEAD).",
+	)
+	parser.add_argument(
+		"-d",
+		"--directory",
+		dest="input_dir",
+		help="Scan only the .pg files below this directory of the repository (default: .).",
+	)
+	parser.add_argument(
+		"-p",
+		"--pg-version",
+		dest="pg_version",
+		help="Target PG version for versioned rules (default: 2.17).",
+	)
+	parser.add_argument(
+		"-n",
+		"--max-count",
+		dest="max_count",
+		type=int,
+		help="Scan only the most recent N commits.",
+	)
+	parser.add_argument(
+		"-f",
+		"--first-parent",
+		dest="first_parent",
+		action="store_true",
+		help="Follow only the first parent of merge commits.",
+	)
+	parser.set_defaults(
+		revisions=[],
+		input_dir=".",
+		pg_version=None,
+		max_count=None,
+		first_parent=False,
+	)
+	args = parser.parse_args(argv)
+	if args.max_count is not None and args.max_count < 1:
+		parser.error("--max-count must be at least 1")
+	return args
+
+
+#============================================
+
+
+def main(argv: list[str], version: str) -> None:
+	"""
+	Run the "pgml-lint history" command.
+
+	Args:
+		argv: Arguments after "history".
+		version: Linter version.
+	"""
+	args = parse_args(argv)
+	pg_version = pgml_lint.pg_version.normalize_pg_version(args.pg_version)
+	print(f"pgml-lint {version}", file=sys.stderr)
+	rev_list = ["rev-list", "--reverse"]
+	if args.first_parent:
+		rev_list.append("--first-parent")
+	if args.max_count is not None:
+		rev_list.append(f"--max-count={args.max_count}")
+	try:
+		root = pgml_lint.git_changes.repo_root(args.input_dir)
+		object_format = pgml_lint.git_changes.run_git(["-C", root, "rev-parse", "--show-object-format"])
+		commits = pgml_lint.git_changes.run_git(["-C", root, *rev_list, *(args.revisions or ["HEAD"]), "--"])
+	except RuntimeError as error:
+		print(error, file=sys.stderr)
+		raise SystemExit(2)
+	# git before 2.25 echoes the unknown option; those repositories are SHA-1
+	oid_size = OID_SIZES.get(object_format.decode("ascii", "replace").strip(), 20)
+	subdir = os.path.relpath(os.path.abspath(args.input_dir), root).replace(os.sep, "/")
+	if subdir == ".":
+		subdir = ""
+
+	block_rules, macro_rules = pgml_lint.rules.load_rules(None)
+	plugins = pgml_lint.registry.build_registry().resolve_plugins(set(), set(), set())
+
+	def lint(text: str, name: str) -> list:
+		return pgml_lint.engine.lint_source(text, name, block_rules, macro_rules, plugins, pg_version, excerpts=False)
+
+	reader = pgml_lint.git_changes.CatFile(root)
+	scanner = HistoryScanner(reader, lint, oid_size)
+	commit_ids = commits.decode("ascii").split()
+	try:
+		for commit_id in commit_ids:
+			totals, timestamp = scanner.commit_totals(commit_id, subdir)
+			record = {"commit": commit_id, "time": timestamp, **totals.to_dict()}
+			print(json.dumps(record, separators=(",", ":")), flush=True)
+	finally:
+		reader.close()
+	print(
+		f"{len(commit_ids)} commits, {len(scanner.blob_totals)} unique files linted,"
+		f" {reader.reads} objects read",
+		file=sys.stderr,
+	)
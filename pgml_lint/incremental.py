@@ -0,0 +1,361 @@
+# Standard Library
+import bisect
+import re
+
+# Local modules
+import pgml_lint.context
+import pgml_lint.core
+import pgml_lint.engine
+import pgml_lint.lexer
+import pgml_lint.parser
+import pgml_lint.registry
+
+# Segment results kept per linter before the oldest are dropped
+MAX_SEGMENTS = 4096
+# A code line ending in one of these (comments stripped) finishes a statement
+STATEMENT_ENDS = (";", "{", "}")
+# Line breaks other than LF and CRLF, which str.splitlines() counts but the newline index does not
+LINE_BREAK_RX = re.compile("\r(?!\n)|[\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+
+#============================================
+
+
+def _line_of(newlines: list[int], pos: int) -> int:
+	"""
+	Return the 0-based line holding offset pos.
+	"""
+	return bisect.bisect_left(newlines, pos)
+
+
+#============================================
+
+
+def _covered_lines(tokens: pgml_lint.lexer.LexedCode, line_count: int) -> bytearray:
+	"""
+	Mark every line whose start falls inside a token or a bracket pair.
+
+	Args:
+		tokens: Token stream of a text with line_count lines.
+		line_count: Number of lines.
+
+	Returns:
+		bytearray: Nonzero for lines that start inside a token or bracket pair.
+	"""
+	starts = tokens.starts
+	ends = tokens.ends
+	opens = sorted(tokens.closers)
+	closes = sorted(tokens.closers.values())
+	covered = bytearray(line_count)
+	for line, newline in enumerate(tokens.newlines, 1):
+		pos = newline + 1
+		# A token that starts right at the line start does not cross into it
+		index = bisect.bisect_left(starts, pos) - 1
+		if index >= 0 and pos < ends[index]:
+			covered[line] = 1
+		# Bracket pairs opened before pos minus pairs already closed before it
+		elif bisect.bisect_left(opens, pos) > bisect.bisect_left(closes, pos):
+			covered[line] = 1
+	return covered
+
+
+#============================================
+
+
+def _structure_busy(context: pgml_lint.context.LintContext, line_count: int) -> bytearray:
+	"""
+	Mark every line where parser.scan_structure() carries state in from above.
+
+	The structure scan is line based and tracks heredocs and BEGIN/END
+	blocks without the lexer, so it can disagree with the lexer tokens.
+
+	Args:
+		context: Lint context for the full text.
+		line_count: Number of lines.
+
+	Returns:
+		bytearray: Nonzero for lines inside a heredoc body or an open block.
+	"""
+	text = str(context.text)
+	newlines = context.newlines
+	lines = text.split("\n")
+	clean_lines = str(context.stripped_comments).split("\n")
+	# Only lines holding "<<" can open a heredoc
+	openers: set[int] = set()
+	pos = text.find("<<")
+	while pos >= 0:
+		openers.add(_line_of(newlines, pos))
+		pos = text.find("<<", pos + 2)
+	markers = {
+		_line_of(newlines, match.start()): match
+		for match in pgml_lint.parser.BLOCK_MARKER_RX.finditer(text)
+	}
+	busy = bytearray(line_count)
+	stack: list[str] = []
+	raw_end: str | None = None
+	clean_end: str | None = None
+	for line in range(line_count):
+		if raw_end is not None or clean_end is not None or stack:
+			busy[line] = 1
+		elif line not in openers and line not in markers:
+			continue
+		raw = lines[line]
+		if raw_end is not None:
+			clean = raw
+			if raw.strip() == raw_end:
+				raw_end = None
+		else:
+			clean = clean_lines[line]
+			if line in openers:
+				raw_end = pgml_lint.parser._scan_heredoc_terminator(raw)
+			match = markers.get(line)
+			if raw_end is None and match is not None:
+				tag = match.group(2)
+				if match.group(1) == "BEGIN":
+					stack.append(tag)
+				elif stack and stack[-1] == tag:
+					stack.pop()
+		if clean_end is None:
+			if line in openers:
+				clean_end = pgml_lint.parser._scan_heredoc_terminator(clean)
+		elif clean.strip() == clean_end:
+			clean_end = None
+	return busy
+
+
+#============================================
+
+
+def segment_starts(context: pgml_lint.context.LintContext) -> list[int]:
+	"""
+	Return the 0-based lines where independent segments of the file begin.
+
+	A segment boundary sits at the start of a line that no token or bracket
+	pair of the stripped text crosses, that is outside every heredoc body
+	and BEGIN_/END_ block seen by parser.scan_structure(), and where the
+	previous code line finished a statement. Each PGML region is therefore
+	one segment, and Perl code splits into statements. Lexer and structure
+	state is neutral at every boundary, so a segment parses the same with
+	or without the text around it.
+
+	Args:
+		context: Lint context for the full text.
+
+	Returns:
+		list[int]: Sorted segment start lines, beginning with 0.
+	"""
+	line_count = len(context.newlines) + 1
+	# Stripped text keeps the line layout, with comments and heredoc bodies blanked
+	stripped = pgml_lint.lexer.tokens_for(context, "stripped_text")
+	inside = _covered_lines(stripped, line_count)
+	begin_lines: set[int] = set()
+	end_lines: set[int] = set()
+	depth = 0
+	open_line = 0
+	for marker in pgml_lint.parser.BLOCK_MARKER_RX.finditer(stripped.text):
+		if not stripped.is_code(marker.start()):
+			continue
+		line = _line_of(stripped.newlines, marker.start())
+		if marker.group(1) == "BEGIN":
+			begin_lines.add(line)
+			if depth == 0:
+				open_line = line
+			depth += 1
+		elif depth > 0:
+			end_lines.add(line)
+			depth -= 1
+			if depth == 0:
+				inside[open_line + 1 : line + 1] = b"\x01" * (line - open_line)
+	if depth > 0:
+		# An unclosed block runs to the end of the file
+		inside[open_line + 1 :] = b"\x01" * (line_count - open_line - 1)
+	busy = _structure_busy(context, line_count)
+	stripped_lines = stripped.text.split("\n")
+	bounds = [0]
+	# Last non-blank code line before the current one; blank lines do not end statements
+	previous = ""
+	previous_line = -1
+	for line in range(1, line_count):
+		code = stripped_lines[line - 1].rstrip()
+		if code:
+			previous = code
+			previous_line = line - 1
+		if inside[line] or busy[line]:
+			continue
+		if previous and not previous.endswith(STATEMENT_ENDS):
+			if line not in begin_lines and previous_line not in end_lines:
+				continue
+		bounds.append(line)
+	return bounds
+
+
+#============================================
+
+
+class IncrementalLinter:
+	"""
+	Re-lint a changing document, reusing results for unchanged segments.
+
+	Plugins that declare SEGMENT_LOCAL report issues that depend only on the
+	text of the segment (see segment_starts()) they fall in. Their issues are
+	stored per segment text, relative to the segment's first line, and only
+	segments not seen before are linted again: the changed segments are kept
+	and every other line is blanked, so line numbers stay put. All other
+	plugins run on the full text every time.
+	"""
+
+	def __init__(
+		self,
+		block_rules: list[dict[str, str]],
+		macro_rules: list[dict[str, object]],
+		plugins: list[dict[str, object]],
+		pg_version: str | None = None,
+		max_segments: int = MAX_SEGMENTS,
+	) -> None:
+		self.block_rules = block_rules
+		self.macro_rules = macro_rules
+		self.pg_version = pg_version
+		self.max_segments = max_segments
+		local = [plugin for plugin in plugins if plugin.get("segment_local")]
+		whole = [plugin for plugin in plugins if not plugin.get("segment_local") and plugin.get("report") is not False]
+		self.local_plugins = pgml_lint.registry.with_producers(plugins, {plugin["id"] for plugin in local})
+		self.file_plugins = pgml_lint.registry.with_producers(plugins, {plugin["id"] for plugin in whole})
+		# Rank of each plugin in resolved order, to break sort ties like run_plugins()
+		self._rank = {plugin["id"]: index for index, plugin in enumerate(plugins)}
+		# Segment text -> issues with lines relative to the segment start
+		self._segments: dict[str, list[pgml_lint.core.Issue]] = {}
+		self.segments_linted = 0
+		self.segments_reused = 0
+
+	def lint(
+		self,
+		text: str,
+		file_path: str | None = None,
+		newlines: list[int] | None = None,
+	) -> list[pgml_lint.core.Issue]:
+		"""
+		Lint text, linting only the segments that changed since earlier calls.
+
+		Args:
+			text: Full document text.
+			file_path: Optional file path.
+			newlines: Newline index for text, when the caller maintains one.
+
+		Returns:
+			list[pgml_lint.core.Issue]: Issues, sorted like lint_text().
+		"""
+		context = pgml_lint.engine.build_context(
+			text,
+			file_path,
+			self.block_rules,
+			self.macro_rules,
+			self.pg_version,
+		)
+		if newlines is not None:
+			context.newlines = newlines
+		issues = pgml_lint.engine.run_plugins(context, self.file_plugins)
+		if not self.local_plugins:
+			return issues
+		if LINE_BREAK_RX.search(text):
+			# Plugins that count str.splitlines() lines would disagree with segment lines
+			issues.extend(pgml_lint.engine.run_plugins(context, self.local_plugins))
+			return self._sorted(issues)
+		issues.extend(self._lint_segments(context))
+		return self._sorted(issues)
+
+	def _lint_segments(self, context: pgml_lint.context.LintContext) -> list[pgml_lint.core.Issue]:
+		"""
+		Return segment-local issues, linting only segments without stored results.
+		"""
+		text = str(context.text)
+		line_starts = [0] + [pos + 1 for pos in context.newlines]
+		bounds = segment_starts(context)
+		bounds.append(len(line_starts))
+		issues: list[pgml_lint.core.Issue] = []
+		dirty: list[tuple[int, int, str]] = []
+		for first, stop in zip(bounds, bounds[1:]):
+			end = line_starts[stop] if stop < len(line_starts) else len(text)
+			segment = text[line_starts[first] : end]
+			stored = self._segments.pop(segment, None)
+			if stored is None:
+				dirty.append((first, stop, segment))
+				continue
+			# Re-insert to keep the dict in least recently used order
+			self._segments[segment] = stored
+			self.segments_reused += 1
+			issues.extend(_shift_issue(issue, first) for issue in stored)
+		if not dirty:
+			return issues
+		if len(dirty) == len(bounds) - 1:
+			part_context = context
+		else:
+			part_context = pgml_lint.engine.build_context(
+				_blank_except(text, line_starts, dirty),
+				context.file_path,
+				self.block_rules,
+				self.macro_rules,
+				self.pg_version,
+			)
+		dirty_issues = pgml_lint.engine.run_plugins(part_context, self.local_plugins)
+		dirty_starts = [first for first, _stop, _segment in dirty]
+		grouped: list[list[pgml_lint.core.Issue]] = [[] for _ in dirty]
+		for issue in dirty_issues:
+			issues.append(issue)
+			if not isinstance(issue.line, int):
+				continue
+			index = bisect.bisect_right(dirty_starts, issue.line - 1) - 1
+			if index >= 0 and issue.line - 1 < dirty[index][1]:
+				grouped[index].append(_shift_issue(issue, -dirty[index][0]))
+		for (first, _stop, segment), segment_issues in zip(dirty, grouped):
+			self.segments_linted += 1
+			if len(self._segments) >= self.max_segments:
+				del self._segments[next(iter(self._segments))]
+			self._segments[segment] = segment_issues
+		return issues
+
+	def _sorted(self, issues: list[pgml_lint.core.Issue]) -> list[pgml_lint.core.Issue]:
+		"""
+		Sort by line and message, breaking ties by plugin order.
+		"""
+		ranked = sorted(issues, key=lambda issue: self._rank.get(issue.plugin, 0))
+		return pgml_lint.engine._sort_issues(ranked)
+
+
+#============================================
+
+
+def _blank_except(text: str, line_starts: list[int], keep: list[tuple[int, int, str]]) -> str:
+	"""
+	Return text with every line outside the kept segments emptied.
+
+	Args:
+		text: Full text.
+		line_starts: Offset of each line start.
+		keep: (first_line, stop_line, segment_text) for the kept segments, in order.
+
+	Returns:
+		str: Text with the same line count.
+	"""
+	parts: list[str] = []
+	line = 0
+	for first, stop, segment in keep:
+		parts.append("\n" * (first - line))
+		parts.append(segment)
+		line = stop
+	# Keep the newline count equal so trailing line numbers still match
+	total_lines = len(line_starts)
+	parts.append("\n" * (total_lines - 1 - line))
+	return "".join(parts)
+
+
+#============================================
+
+
+def _shift_issue(issue: pgml_lint.core.Issue, offset: int) -> pgml_lint.core.Issue:
+	"""
+	Return a copy of issue with its line moved by offset.
+	"""
+	shifted = pgml_lint.core.Issue.from_mapping(issue.to_dict())
+	if isinstance(shifted.line, int):
+		shifted.line = shifted.line + offset
+	return shifted
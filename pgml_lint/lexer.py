@@ -0,0 +1,629 @@
+# Standard Library
+import bisect
+import re
+
+# Local modules
+import pgml_lint.parser
+
+
+# Quote-like operators that take a delimited literal right after the name
+QUOTE_OPERATORS = {"q", "qq", "qw", "qr", "m", "s", "tr", "y"}
+# Quote-like operators with a pattern part and a replacement part
+TWO_PART_OPERATORS = {"s", "tr", "y"}
+DELIM_PAIRS = {"(": ")", "[": "]", "{": "}", "<": ">"}
+OPEN_BRACKETS = {"(", "[", "{"}
+CLOSE_TO_OPEN = {")": "(", "]": "[", "}": "{"}
+
+# Token kinds
+STRING = "string"
+QUOTE = "quote"
+HEREDOC = "heredoc"
+COMMENT = "comment"
+
+# Quote-like operator followed by a delimiter; the lookarounds keep $s, @q,
+# Foo::s, this, {s}, s => 1, and $h{y} as plain names
+QUOTE_OP = r"(?<![\w$@%&*:])(?:q[qwr]?|tr|m|s|y)(?=[^\w\s=,;)\]}>])"
+# Perl code: quote-like operators, heredoc openers, and punctuation
+CODE_RX = re.compile(QUOTE_OP + r"|<<|[\"'#()\[\]{},/]")
+# Block prose (BEGIN_PGML, BEGIN_TEXT, ...): inline code openers, quotes, escapes, and punctuation
+PROSE_RX = re.compile(r"\[@|[\"'\\()\[\]{},]")
+# PGML inline code ([@ ... @]) inside block prose: Perl code plus the closing marker
+INLINE_CODE_RX = re.compile(r"@\]|" + QUOTE_OP + r"|<<|[\"'#()\[\]{},/]")
+STRING_RX = {
+	'"': re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL),
+	"'": re.compile(r"'(?:[^'\\]|\\.)*'", re.DOTALL),
+}
+LINE_STRING_RX = {
+	'"': re.compile(r'"(?:[^"\\\n]|\\.)*"'),
+	"'": re.compile(r"'(?:[^'\\\n]|\\.)*'"),
+}
+HEREDOC_RX = re.compile(r"<<[~-]?\s*(?:([A-Za-z_]\w*)|\"([^\"\n]*)\"|'([^'\n]*)')")
+POD_START_RX = re.compile(r"^=[A-Za-z]", re.MULTILINE)
+# Characters and keywords after which "/" starts a regex rather than a division
+REGEX_PREFIX_CHARS = set("(,=~!{;&|?:[")
+REGEX_PREFIX_WORDS = {"and", "grep", "if", "map", "not", "or", "return", "split", "unless", "until", "while"}
+POD_CUT_RX = re.compile(r"^=cut\b.*$", re.MULTILINE)
+# Context key holding the cached token stream for each lintable text
+TOKEN_KEYS = {"text": "text_tokens", "stripped_text": "stripped_tokens"}
+
+
+#============================================
+
+
+class LexedCode:
+	"""
+	Token stream for one text with O(log n) position queries.
+
+	Strings, quote-like literals, heredoc bodies, and comments are stored as
+	sorted, non-overlapping spans. Brackets outside those spans are matched
+	once, and commas are recorded against the innermost open bracket, so
+	argument splitting is a lookup instead of a rescan.
+	"""
+
+	__slots__ = ("text", "newlines", "starts", "ends", "kinds", "bodies", "closers", "commas")
+
+	def __init__(self, text: str) -> None:
+		self.text = text
+		self.newlines = pgml_lint.parser.build_newline_index(text)
+		self.starts: list[int] = []
+		self.ends: list[int] = []
+		self.kinds: list[str] = []
+		self.bodies: list[tuple[int, int]] = []
+		self.closers: dict[int, int] = {}
+		self.commas: dict[int, list[int]] = {}
+
+	def _token_index(self, pos: int) -> int:
+		"""Return the index of the token covering pos, or -1."""
+		idx = bisect.bisect_right(self.starts, pos) - 1
+		if idx >= 0 and pos < self.ends[idx]:
+			return idx
+		return -1
+
+	def in_string(self, pos: int) -> bool:
+		"""
+		Return True when pos is inside a string, quote-like literal, or heredoc body.
+
+		Args:
+			pos: Offset into the text.
+
+		Returns:
+			bool: True for string positions, including the delimiters.
+		"""
+		idx = self._token_index(pos)
+		return idx != -1 and self.kinds[idx] != COMMENT
+
+	def in_comment(self, pos: int) -> bool:
+		"""
+		Return True when pos is inside a comment or POD block.
+
+		Args:
+			pos: Offset into the text.
+
+		Returns:
+			bool: True for comment positions.
+		"""
+		idx = self._token_index(pos)
+		return idx != -1 and self.kinds[idx] == COMMENT
+
+	def is_code(self, pos: int) -> bool:
+		"""
+		Return True when pos is outside every string and comment token.
+
+		Args:
+			pos: Offset into the text.
+
+		Returns:
+			bool: True for code positions.
+		"""
+		return self._token_index(pos) == -1
+
+	def string_at(self, pos: int) -> tuple[int, int] | None:
+		"""
+		Return the body span of a string token that starts exactly at pos.
+
+		Args:
+			pos: Offset of the opening quote or quote-like operator.
+
+		Returns:
+			tuple[int, int] | None: (start, end) of the string contents.
+		"""
+		idx = self._token_index(pos)
+		if idx == -1 or self.starts[idx] != pos or self.kinds[idx] == COMMENT:
+			return None
+		return self.bodies[idx]
+
+	def matching_close(self, open_pos: int) -> int | None:
+		"""
+		Return the offset of the bracket that closes the one at open_pos.
+
+		Args:
+			open_pos: Offset of "(", "[", or "{" outside strings and comments.
+
+		Returns:
+			int | None: Closing bracket offset, or None when unbalanced.
+		"""
+		return self.closers.get(open_pos)
+
+	def argument_spans(self, open_pos: int) -> list[tuple[int, int]] | None:
+		"""
+		Split a balanced bracket into top-level comma-separated spans.
+
+		An empty payload yields no spans; a trailing comma yields a final
+		empty span, so "f(1,)" reports two arguments.
+
+		Args:
+			open_pos: Offset of the opening bracket.
+
+		Returns:
+			list[tuple[int, int]] | None: (start, end) spans, or None when unbalanced.
+		"""
+		close_pos = self.closers.get(open_pos)
+		if close_pos is None:
+			return None
+		commas = self.commas.get(open_pos, [])
+		if not commas and self.text[open_pos + 1 : close_pos].strip() == "":
+			return []
+		spans: list[tuple[int, int]] = []
+		start = open_pos + 1
+		for comma in commas:
+			spans.append((start, comma))
+			start = comma + 1
+		spans.append((start, close_pos))
+		return spans
+
+	def code_text(self, start: int, end: int) -> str:
+		"""
+		Return text[start:end] with comment tokens removed.
+
+		Args:
+			start: Start offset.
+			end: End offset.
+
+		Returns:
+			str: Text without comments; newlines are kept.
+		"""
+		pieces: list[str] = []
+		cursor = start
+		idx = max(0, bisect.bisect_right(self.starts, start) - 1)
+		while idx < len(self.starts) and self.starts[idx] < end:
+			if self.kinds[idx] == COMMENT and self.ends[idx] > cursor:
+				pieces.append(self.text[cursor : max(cursor, self.starts[idx])])
+				cursor = min(end, self.ends[idx])
+			idx += 1
+		if cursor < end:
+			pieces.append(self.text[cursor:end])
+		return "".join(pieces)
+
+	def call_spans(self, call_rx: re.Pattern) -> list[tuple[int, int]]:
+		"""
+		Return (open, close) paren offsets for balanced calls matched by call_rx.
+
+		call_rx must end at the opening paren (for example r"\\bMODES\\s*\\(").
+		Calls inside strings or comments are skipped, and calls nested in an
+		earlier payload are not reported separately.
+
+		Args:
+			call_rx: Compiled call pattern.
+
+		Returns:
+			list[tuple[int, int]]: Paren offsets, in text order.
+		"""
+		spans: list[tuple[int, int]] = []
+		cursor = 0
+		for match in call_rx.finditer(self.text):
+			open_pos = match.end() - 1
+			if open_pos < cursor or not self.is_code(open_pos):
+				continue
+			close_pos = self.closers.get(open_pos)
+			if close_pos is None:
+				continue
+			spans.append((open_pos, close_pos))
+			cursor = close_pos + 1
+		return spans
+
+	def line_of(self, pos: int) -> int:
+		"""
+		Return the 1-based line number for pos.
+
+		Args:
+			pos: Offset into the text.
+
+		Returns:
+			int: Line number.
+		"""
+		return pgml_lint.parser.pos_to_line(self.newlines, pos)
+
+
+#============================================
+
+
+def _scan_delimited(text: str, pos: int) -> int:
+	"""
+	Scan one delimited part of a quote-like literal.
+
+	Args:
+		text: Full text.
+		pos: Offset of the opening delimiter.
+
+	Returns:
+		int: Offset after the closing delimiter, or -1 when unterminated.
+	"""
+	open_delim = text[pos]
+	close_delim = DELIM_PAIRS.get(open_delim, open_delim)
+	nests = close_delim != open_delim
+	depth = 1
+	i = pos + 1
+	length = len(text)
+	while i < length:
+		ch = text[i]
+		if ch == "\\":
+			i += 2
+			continue
+		if nests and ch == open_delim:
+			depth += 1
+		elif ch == close_delim:
+			depth -= 1
+			if depth == 0:
+				return i + 1
+		i += 1
+	return -1
+
+
+#============================================
+
+
+def _scan_quote_like(text: str, name: str, pos: int) -> tuple[int, int] | None:
+	"""
+	Scan a quote-like literal such as q{...}, qq(...), s/a/b/g, or tr/a/b/.
+
+	Args:
+		text: Full text.
+		name: Operator name.
+		pos: Offset of the first delimiter (right after the name).
+
+	Returns:
+		tuple[int, int] | None: (end of first part, end of literal), or None when unterminated.
+	"""
+	first_end = _scan_delimited(text, pos)
+	if first_end == -1:
+		return None
+	end = first_end
+	if name in TWO_PART_OPERATORS:
+		if text[pos] in DELIM_PAIRS:
+			# s{a}{b} takes a second, separately delimited part
+			while end < len(text) and text[end].isspace():
+				end += 1
+			if end >= len(text):
+				return None
+			end = _scan_delimited(text, end)
+		else:
+			# s/a/b/ reuses the closing delimiter as the second opener
+			end = _scan_delimited(text, first_end - 1)
+		if end == -1:
+			return None
+	if name not in ("q", "qq", "qw"):
+		# Skip regex and transliteration modifiers
+		while end < len(text) and text[end].isalpha():
+			end += 1
+	return first_end, end
+
+
+#============================================
+
+
+def _is_apostrophe(text: str, pos: int) -> bool:
+	"""
+	Return True when a quote at pos cannot open a string.
+
+	Covers the $' and $" special variables and an apostrophe between word
+	characters (don't, $main'x).
+
+	Args:
+		text: Full text.
+		pos: Offset of the quote.
+
+	Returns:
+		bool: True when the quote is not a string delimiter.
+	"""
+	if pos == 0 or pos + 1 >= len(text):
+		return False
+	prev = text[pos - 1]
+	if prev == "$":
+		# $' and $" are special variables
+		return True
+	if text[pos] != "'":
+		return False
+	return (prev.isalnum() or prev == "_") and text[pos + 1].isalpha()
+
+
+#============================================
+
+
+def _starts_regex(text: str, pos: int) -> bool:
+	"""
+	Return True when a "/" at pos opens a regex literal instead of dividing.
+
+	Args:
+		text: Full text.
+		pos: Offset of the slash.
+
+	Returns:
+		bool: True after operators, openers, and keywords such as split.
+	"""
+	j = pos - 1
+	while j >= 0 and text[j].isspace():
+		j -= 1
+	if j < 0:
+		return True
+	prev = text[j]
+	if prev in REGEX_PREFIX_CHARS:
+		return True
+	if not (prev.isalnum() or prev == "_"):
+		return False
+	word_start = j
+	while word_start > 0 and (text[word_start - 1].isalnum() or text[word_start - 1] == "_"):
+		word_start -= 1
+	return text[word_start : j + 1] in REGEX_PREFIX_WORDS
+
+
+#============================================
+
+
+def _line_end(text: str, pos: int) -> int:
+	"""Return the offset of the newline ending the line at pos, or len(text)."""
+	end = text.find("\n", pos)
+	if end == -1:
+		end = len(text)
+	return end
+
+
+#============================================
+
+
+def lex_perl(text: str, heredocs: bool = True) -> LexedCode:
+	"""
+	Tokenize PG source once for string, comment, and bracket queries.
+
+	Perl code follows Perl quoting: strings and quote-like literals may span
+	lines, # starts a comment, POD blocks and heredoc bodies are skipped.
+	Lines inside BEGIN_PGML/BEGIN_TEXT style blocks are prose, so quotes only
+	pair within a line there and an apostrophe inside a word is not a quote;
+	PGML inline code ([@ ... @]) inside that prose is lexed as Perl again.
+	Heredoc openers whose terminator line is missing are ignored.
+
+	Args:
+		text: Text to tokenize (raw text or stripped_text).
+		heredocs: Treat heredoc bodies as strings; pass False for text whose
+			heredoc bodies were already blanked by strip_heredocs().
+
+	Returns:
+		LexedCode: Token spans and bracket matches.
+	"""
+	lexed = LexedCode(text)
+	starts = lexed.starts
+	ends = lexed.ends
+	kinds = lexed.kinds
+	bodies = lexed.bodies
+	closers = lexed.closers
+	commas = lexed.commas
+	length = len(text)
+
+	# Line-start events: block markers switch prose mode, POD lines start comments
+	events: list[tuple[int, str]] = []
+	for marker in pgml_lint.parser.BLOCK_MARKER_RX.finditer(text):
+		events.append((marker.start(), marker.group(1)))
+	for pod in POD_START_RX.finditer(text):
+		events.append((pod.start(), "POD"))
+	events.sort()
+	event_idx = 0
+
+	stack: list[tuple[str, int]] = []
+	prose_depth = 0
+	prose_mark = 0
+	inline_depth = 0
+	pending_heredocs: list[str] = []
+	heredoc_line_end = length
+	i = 0
+
+	while i < length:
+		# Events inside a string or heredoc that was just consumed no longer apply
+		while event_idx < len(events) and events[event_idx][0] < i:
+			event_idx += 1
+		limit = events[event_idx][0] if event_idx < len(events) else length
+		if pending_heredocs:
+			limit = min(limit, heredoc_line_end)
+
+		prose = prose_depth > 0 and inline_depth == 0
+		if prose:
+			scan_rx = PROSE_RX
+		elif inline_depth > 0:
+			scan_rx = INLINE_CODE_RX
+		else:
+			scan_rx = CODE_RX
+		# Brackets and commas never move the cursor, so run them in a tight loop
+		match = None
+		for candidate in scan_rx.finditer(text, i, limit):
+			token = candidate.group()
+			if token in OPEN_BRACKETS:
+				stack.append((token, candidate.start()))
+			elif token == ",":
+				if stack:
+					commas.setdefault(stack[-1][1], []).append(candidate.start())
+			elif token in CLOSE_TO_OPEN:
+				# Match the nearest opener of the same kind and discard any
+				# unclosed brackets opened after it
+				opener = CLOSE_TO_OPEN[token]
+				for depth in range(len(stack) - 1, -1, -1):
+					if stack[depth][0] == opener:
+						closers[stack[depth][1]] = candidate.start()
+						del stack[depth:]
+						break
+			else:
+				match = candidate
+				break
+		if match is None:
+			i = limit
+			if pending_heredocs and limit == heredoc_line_end:
+				# Heredoc bodies start on the line after their openers
+				i = heredoc_line_end + 1
+				for terminator in pending_heredocs:
+					term_rx = re.compile(r"^[ \t]*" + re.escape(terminator) + r"[ \t\r]*$", re.MULTILINE)
+					term_match = term_rx.search(text, i)
+					if term_match is None:
+						break
+					token_end = min(length, term_match.end() + 1)
+					starts.append(i)
+					ends.append(token_end)
+					kinds.append(HEREDOC)
+					bodies.append((i, term_match.start()))
+					i = token_end
+				pending_heredocs = []
+				continue
+			if event_idx >= len(events):
+				break
+			i, kind = events[event_idx]
+			event_idx += 1
+			if kind == "BEGIN":
+				if prose_depth == 0:
+					prose_mark = len(stack)
+				prose_depth += 1
+			elif kind == "END":
+				if prose_depth > 0:
+					prose_depth -= 1
+					if prose_depth == 0:
+						# Drop brackets left open by block prose
+						del stack[prose_mark:]
+						inline_depth = 0
+			elif prose_depth == 0:
+				cut = POD_CUT_RX.search(text, i)
+				pod_end = length if cut is None else cut.end()
+				starts.append(i)
+				ends.append(pod_end)
+				kinds.append(COMMENT)
+				bodies.append((i, pod_end))
+				i = pod_end
+			continue
+
+		pos = match.start()
+		token = match.group()
+		ch = token[0]
+
+		if ch.isalpha():
+			i = match.end()
+			if text[pos - 2 : pos] == "->":
+				# $obj->s(...) is a method call
+				continue
+			scanned = _scan_quote_like(text, token, i)
+			if scanned is None:
+				continue
+			first_end, end = scanned
+			starts.append(pos)
+			ends.append(end)
+			kinds.append(QUOTE)
+			bodies.append((i + 1, first_end - 1))
+			i = end
+			continue
+
+		if ch == "/":
+			i = pos + 1
+			if not _starts_regex(text, pos):
+				continue
+			end = _scan_delimited(text, pos)
+			if end == -1 or "\n" in text[pos:end]:
+				# Bare regexes stay on one line; anything else is a division
+				continue
+			body_end = end - 1
+			while end < length and text[end].isalpha():
+				end += 1
+			starts.append(pos)
+			ends.append(end)
+			kinds.append(QUOTE)
+			bodies.append((pos + 1, body_end))
+			i = end
+			continue
+
+		if token == "[@":
+			inline_depth += 1
+			i = pos + 2
+			continue
+
+		if token == "@]":
+			inline_depth -= 1
+			i = pos + 2
+			continue
+
+		if ch == "\\":
+			# Only reached in prose: skip the escaped character
+			i = pos + 2
+			continue
+
+		if ch in "\"'":
+			if _is_apostrophe(text, pos):
+				i = pos + 1
+				continue
+			string_rx = LINE_STRING_RX[ch] if prose else STRING_RX[ch]
+			string_match = string_rx.match(text, pos)
+			if string_match is not None and "\n" in string_match.group():
+				# A string never runs across a BEGIN_/END_ block marker line
+				if pgml_lint.parser.BLOCK_MARKER_RX.search(text, pos, string_match.end()):
+					string_match = None
+			if string_match is None:
+				# Unterminated: mask to the end of the line only
+				end = _line_end(text, pos)
+				body_end = end
+			else:
+				end = string_match.end()
+				body_end = end - 1
+			starts.append(pos)
+			ends.append(end)
+			kinds.append(STRING)
+			bodies.append((pos + 1, body_end))
+			i = end
+			continue
+
+		if ch == "#":
+			if pos > 0 and text[pos - 1] == "$":
+				# $#array is the last index, not a comment
+				i = pos + 1
+				continue
+			end = _line_end(text, pos)
+			starts.append(pos)
+			ends.append(end)
+			kinds.append(COMMENT)
+			bodies.append((pos + 1, end))
+			i = end
+			continue
+
+		if token == "<<":
+			heredoc = HEREDOC_RX.match(text, pos) if heredocs else None
+			if heredoc is None:
+				i = pos + 2
+				continue
+			terminator = next(group for group in heredoc.groups() if group is not None)
+			if not pending_heredocs:
+				heredoc_line_end = _line_end(text, heredoc.end())
+			pending_heredocs.append(terminator)
+			i = heredoc.end()
+			continue
+
+	return lexed
+
+
+#============================================
+
+
+def tokens_for(context: dict[str, object], text_key: str) -> LexedCode:
+	"""
+	Return the cached token stream for a context text, lexing if none is cached.
+
+	Args:
+		context: Lint context.
+		text_key: "text" or "stripped_text".
+
+	Returns:
+		LexedCode: Token stream for context[text_key].
+	"""
+	tokens = context.get(TOKEN_KEYS[text_key])
+	if tokens is None:
+		tokens = lex_perl(str(context.get(text_key, "")), text_key == "text")
+	return tokens
@@ -0,0 +1,562 @@
+"""Language server over stdio that lints open documents as they are edited."""
+
+# Standard Library
+import argparse
+import bisect
+import io
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import urllib.parse
+
+# Local modules
+import pgml_lint.core
+import pgml_lint.incremental
+import pgml_lint.parser
+import pgml_lint.registry
+import pgml_lint.rules
+
+# Seconds without edits before a changed document is linted again
+DEBOUNCE = 0.3
+# DiagnosticSeverity values from the LSP specification
+SEVERITY_CODES = {"ERROR": 1, "WARNING": 2}
+# Source name shown next to each diagnostic
+DIAGNOSTIC_SOURCE = "pgml-lint"
+# TextDocumentSyncKind.Incremental
+SYNC_INCREMENTAL = 2
+# JSON-RPC error codes
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+
+
+#============================================
+
+
+def read_message(stream: io.BufferedIOBase) -> dict[str, object] | None:
+	"""
+	Read one Content-Length framed JSON-RPC message.
+
+	Args:
+		stream: Binary input stream.
+
+	Returns:
+		dict[str, object] | None: Decoded message, or None at end of input.
+	"""
+	length = None
+	while True:
+		header = stream.readline()
+		if not header:
+			return None
+		header = header.strip()
+		if not header:
+			break
+		name, _, value = header.decode("ascii").partition(":")
+		if name.strip().lower() == "content-length":
+			length = int(value.strip())
+	if length is None:
+		raise ValueError("LSP message without a Content-Length header")
+	body = stream.read(length)
+	if len(body) < length:
+		return None
+	message = json.loads(body.decode("utf-8"))
+	return message
+
+
+#============================================
+
+
+def write_message(stream: io.BufferedIOBase, message: dict[str, object]) -> None:
+	"""
+	Write one JSON-RPC message with its Content-Length header.
+
+	Args:
+		stream: Binary output stream.
+		message: Message to send.
+	"""
+	body = json.dumps(message, separators=(",", ":")).encode("utf-8")
+	stream.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii"))
+	stream.write(body)
+	stream.flush()
+
+
+#============================================
+
+
+def _utf16_length(text: str) -> int:
+	"""
+	Return the length of text in UTF-16 code units.
+	"""
+	if text.isascii():
+		return len(text)
+	return len(text) + sum(1 for char in text if ord(char) > 0xFFFF)
+
+
+#============================================
+
+
+def _utf16_to_index(text: str, units: int) -> int:
+	"""
+	Return the index into text that sits units UTF-16 code units in, clamped to its end.
+	"""
+	if text.isascii():
+		return min(units, len(text))
+	count = 0
+	for index, char in enumerate(text):
+		if count >= units:
+			return index
+		count += 2 if ord(char) > 0xFFFF else 1
+	return len(text)
+
+
+#============================================
+
+
+class TextDocument:
+	"""
+	An open document with a newline index kept current across edits.
+
+	Positions follow the LSP convention: 0-based lines and UTF-16 code unit
+	characters. Only LF ends a line, as in pgml_lint.parser; a CR before it
+	is treated as part of the line ending.
+	"""
+
+	def __init__(self, uri: str, text: str, version: int | None = None) -> None:
+		self.uri = uri
+		self.text = text
+		self.version = version
+		self.newlines = pgml_lint.parser.build_newline_index(text)
+
+	def _line_bounds(self, line: int) -> tuple[int, int]:
+		"""
+		Return the start and end offsets of a 0-based line, without its line ending.
+		"""
+		start = 0 if line == 0 else self.newlines[line - 1] + 1
+		if line < len(self.newlines):
+			end = self.newlines[line]
+			if end > start and self.text[end - 1] == "\r":
+				end -= 1
+		else:
+			end = len(self.text)
+		return start, end
+
+	def offset_at(self, position: dict[str, int]) -> int:
+		"""
+		Return the text offset of an LSP position, clamped to the document.
+
+		Args:
+			position: {"line", "character"} position.
+
+		Returns:
+			int: Offset into text.
+		"""
+		line = int(position["line"])
+		if line < 0:
+			return 0
+		if line > len(self.newlines):
+			return len(self.text)
+		start, end = self._line_bounds(line)
+		return start + _utf16_to_index(self.text[start:end], int(position["character"]))
+
+	def position_at(self, line: int, column: int) -> dict[str, int]:
+		"""
+		Return the LSP position of a 1-based line and character column.
+
+		Args:
+			line: 1-based line number.
+			column: 1-based column, counted in characters.
+
+		Returns:
+			dict[str, int]: {"line", "character"} position.
+		"""
+		line_index = max(0, min(line - 1, len(self.newlines)))
+		start, end = self._line_bounds(line_index)
+		prefix = self.text[start : min(end, start + max(0, column - 1))]
+		return {"line": line_index, "character": _utf16_length(prefix)}
+
+	def line_end(self, line: int) -> dict[str, int]:
+		"""
+		Return the LSP position at the end of a 1-based line.
+		"""
+		line_index = max(0, min(line - 1, len(self.newlines)))
+		start, end = self._line_bounds(line_index)
+		return {"line": line_index, "character": _utf16_length(self.text[start:end])}
+
+	def apply_change(self, change: dict[str, object]) -> None:
+		"""
+		Apply one TextDocumentContentChangeEvent.
+
+		A change with a range replaces that range; the newline index drops
+		the newlines inside it, shifts the ones after it, and adds the ones
+		in the new text, so the rest of the document is not rescanned. A
+		change without a range replaces the whole text.
+
+		Args:
+			change: Change event with "text" and an optional "range".
+		"""
+		new_text = str(change["text"])
+		change_range = change.get("range")
+		if change_range is None:
+			self.text = new_text
+			self.newlines = pgml_lint.parser.build_newline_index(new_text)
+			return
+		start = self.offset_at(change_range["start"])
+		end = max(start, self.offset_at(change_range["end"]))
+		self.text = self.text[:start] + new_text + self.text[end:]
+		first = bisect.bisect_left(self.newlines, start)
+		after = bisect.bisect_left(self.newlines, end)
+		delta = len(new_text) - (end - start)
+		inserted = [start + pos for pos in pgml_lint.parser.build_newline_index(new_text)]
+		if delta:
+			inserted.extend(pos + delta for pos in self.newlines[after:])
+		else:
+			inserted.extend(self.newlines[after:])
+		self.newlines[first:] = inserted
+
+
+#============================================
+
+
+def uri_to_path(uri: str) -> str | None:
+	"""
+	Return the local file path for a file:// URI, or None for other schemes.
+
+	Args:
+		uri: Document URI.
+
+	Returns:
+		str | None: File path.
+	"""
+	parsed = urllib.parse.urlparse(uri)
+	if parsed.scheme != "file":
+		return None
+	return urllib.parse.unquote(parsed.path)
+
+
+#============================================
+
+
+class LanguageServer:
+	"""
+	Track open documents and publish lint diagnostics for them.
+
+	handle() processes one decoded message. Edits only mark a document as
+	pending; publish_due() lints documents whose last edit is older than
+	the debounce delay, so a burst of keystrokes costs one lint. Each
+	document keeps its own IncrementalLinter, which reuses results for
+	segments the edits did not touch.
+	"""
+
+	def __init__(
+		self,
+		writer: io.BufferedIOBase,
+		version: str,
+		pg_version: str | None = None,
+		debounce: float = DEBOUNCE,
+	) -> None:
+		self.writer = writer
+		self.version = version
+		self.pg_version = pg_version
+		self.debounce = debounce
+		self.block_rules, self.macro_rules = pgml_lint.rules.load_rules(None)
+		registry = pgml_lint.registry.build_registry()
+		self.plugins = registry.resolve_plugins(set(), set(), set())
+		self.documents: dict[str, TextDocument] = {}
+		self._linters: dict[str, pgml_lint.incremental.IncrementalLinter] = {}
+		# URI -> monotonic time when its diagnostics are due
+		self._pending: dict[str, float] = {}
+		self.shutdown_requested = False
+		self.exit_code: int | None = None
+
+	def handle(self, message: dict[str, object]) -> None:
+		"""
+		Process one request or notification.
+
+		Args:
+			message: Decoded JSON-RPC message.
+		"""
+		method = message.get("method")
+		params = message.get("params") or {}
+		handler = getattr(self, "_on_" + str(method).replace("/", "_").replace("$", "_"), None)
+		is_request = "id" in message
+		if handler is None:
+			# Notifications get no reply, so unknown ones are ignored
+			if is_request:
+				self._respond_error(message["id"], METHOD_NOT_FOUND, f"Unsupported method: {method}")
+			return
+		try:
+			result = handler(params)
+		except (KeyError, TypeError, ValueError) as error:
+			text = f"{method}: {type(error).__name__}: {error}"
+			if is_request:
+				self._respond_error(message["id"], INVALID_PARAMS, text)
+			else:
+				print(f"pgml-lint lsp: {text}", file=sys.stderr)
+			return
+		if is_request:
+			write_message(self.writer, {"jsonrpc": "2.0", "id": message["id"], "result": result})
+
+	def _respond_error(self, request_id: object, code: int, text: str) -> None:
+		"""
+		Send a JSON-RPC error response.
+		"""
+		error = {"code": code, "message": text}
+		write_message(self.writer, {"jsonrpc": "2.0", "id": request_id, "error": error})
+
+	def _on_initialize(self, params: dict[str, object]) -> dict[str, object]:
+		"""
+		Report incremental document sync; diagnostics are pushed, not pulled.
+		"""
+		capabilities = {
+			"textDocumentSync": {"openClose": True, "change": SYNC_INCREMENTAL},
+		}
+		return {
+			"capabilities": capabilities,
+			"serverInfo": {"name": "pgml-lint", "version": self.version},
+		}
+
+	def _on_initialized(self, params: dict[str, object]) -> None:
+		"""
+		Nothing to do once the client confirms initialization.
+		"""
+		return None
+
+	def _on_shutdown(self, params: dict[str, object]) -> None:
+		"""
+		Remember the shutdown request so "exit" can return success.
+		"""
+		self.shutdown_requested = True
+		return None
+
+	def _on_exit(self, params: dict[str, object]) -> None:
+		"""
+		Stop serving; exit code 1 when no shutdown request came first.
+		"""
+		self.exit_code = 0 if self.shutdown_requested else 1
+
+	def _on_textDocument_didOpen(self, params: dict[str, object]) -> None:
+		"""
+		Track a newly opened document and lint it right away.
+		"""
+		item = params["textDocument"]
+		uri = str(item["uri"])
+		self.documents[uri] = TextDocument(uri, str(item["text"]), item.get("version"))
+		self._linters[uri] = pgml_lint.incremental.IncrementalLinter(
+			self.block_rules,
+			self.macro_rules,
+			self.plugins,
+			self.pg_version,
+		)
+		self._pending[uri] = time.monotonic()
+
+	def _on_textDocument_didChange(self, params: dict[str, object]) -> None:
+		"""
+		Apply edits in order and restart the debounce timer.
+		"""
+		identifier = params["textDocument"]
+		document = self.documents.get(str(identifier["uri"]))
+		if document is None:
+			return
+		for change in params.get("contentChanges", []):
+			document.apply_change(change)
+		document.version = identifier.get("version")
+		self._pending[document.uri] = time.monotonic() + self.debounce
+
+	def _on_textDocument_didClose(self, params: dict[str, object]) -> None:
+		"""
+		Forget a closed document and clear its diagnostics.
+		"""
+		uri = str(params["textDocument"]["uri"])
+		self.documents.pop(uri, None)
+		self._linters.pop(uri, None)
+		self._pending.pop(uri, None)
+		self._publish(uri, [], None)
+
+	def next_deadline(self) -> float | None:
+		"""
+		Return the monotonic time of the earliest pending lint, if any.
+		"""
+		if not self._pending:
+			return None
+		return min(self._pending.values())
+
+	def publish_due(self, now: float | None = None) -> None:
+		"""
+		Lint and publish diagnostics for every document whose debounce has expired.
+
+		Args:
+			now: Monotonic time (default: time.monotonic()).
+		"""
+		if now is None:
+			now = time.monotonic()
+		due = [uri for uri, deadline in self._pending.items() if deadline <= now]
+		for uri in due:
+			del self._pending[uri]
+			document = self.documents[uri]
+			issues = self._linters[uri].lint(document.text, uri_to_path(uri), document.newlines)
+			diagnostics = [diagnostic_for(document, issue) for issue in issues]
+			self._publish(uri, diagnostics, document.version)
+
+	def _publish(self, uri: str, diagnostics: list[dict[str, object]], version: int | None) -> None:
+		"""
+		Send a publishDiagnostics notification.
+		"""
+		params: dict[str, object] = {"uri": uri, "diagnostics": diagnostics}
+		if version is not None:
+			params["version"] = version
+		notification = {"jsonrpc": "2.0", "method": "textDocument/publishDiagnostics", "params": params}
+		write_message(self.writer, notification)
+
+
+#============================================
+
+
+def diagnostic_for(document: TextDocument, issue: pgml_lint.core.Issue) -> dict[str, object]:
+	"""
+	Convert a lint issue to an LSP Diagnostic.
+
+	Issues with a column start there; others cover their whole line. Issues
+	without a line are shown on the first line.
+
+	Args:
+		document: Document the issue belongs to.
+		issue: Lint issue.
+
+	Returns:
+		dict[str, object]: Diagnostic.
+	"""
+	line = issue.line if isinstance(issue.line, int) else 1
+	column = issue.column if isinstance(issue.column, int) else 1
+	diagnostic: dict[str, object] = {
+		"range": {"start": document.position_at(line, column), "end": document.line_end(line)},
+		"severity": SEVERITY_CODES.get(str(issue.severity), 2),
+		"source": DIAGNOSTIC_SOURCE,
+		"message": str(issue.message),
+	}
+	if issue.plugin:
+		diagnostic["code"] = issue.plugin
+	return diagnostic
+
+
+#============================================
+
+
+def _read_loop(stream: io.BufferedIOBase, messages: queue.Queue) -> None:
+	"""
+	Move messages from stream to the queue, ending with None.
+	"""
+	try:
+		while True:
+			message = read_message(stream)
+			if message is None:
+				break
+			messages.put(message)
+	except ValueError as error:
+		print(f"pgml-lint lsp: {error}", file=sys.stderr)
+	finally:
+		messages.put(None)
+
+
+#============================================
+
+
+def serve(
+	reader: io.BufferedIOBase,
+	writer: io.BufferedIOBase,
+	version: str,
+	pg_version: str | None = None,
+	debounce: float = DEBOUNCE,
+) -> int:
+	"""
+	Serve LSP messages from reader until "exit" or end of input.
+
+	A thread reads messages so the main loop can wait for either the next
+	message or the next debounce deadline, whichever comes first.
+
+	Args:
+		reader: Binary input stream.
+		writer: Binary output stream.
+		version: Linter version reported to the client.
+		pg_version: Target PG version.
+		debounce: Seconds without edits before a document is linted.
+
+	Returns:
+		int: Process exit code.
+	"""
+	server = LanguageServer(writer, version, pg_version, debounce)
+	messages: queue.Queue = queue.Queue()
+	thread = threading.Thread(target=_read_loop, args=(reader, messages), daemon=True)
+	thread.start()
+	while server.exit_code is None:
+		deadline = server.next_deadline()
+		timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+		try:
+			message = messages.get(timeout=timeout)
+		except queue.Empty:
+			server.publish_due()
+			continue
+		if message is None:
+			# The client closed stdin without "exit"
+			return 0 if server.shutdown_requested else 1
+		server.handle(message)
+		server.publish_due()
+	return server.exit_code
+
+
+#============================================
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+	"""
+	Parse arguments for the "pgml-lint lsp" command.
+
+	Args:
+		argv: Arguments after "lsp".
+
+	Returns:
+		argparse.Namespace: Parsed arguments.
+	"""
+	parser = argparse.ArgumentParser(
+		prog="pgml-lint lsp",
+		description="Run a language server on stdin/stdout that reports lint issues as you edit.",
+	)
+	parser.add_argument(
+		"-p",
+		"--pg-version",
+		dest="pg_version",
+		help="Target PG version for versioned rules (default: 2.17).",
+	)
+	parser.add_argument(
+		"-d",
+		"--debounce",
+		dest="debounce",
+		type=float,
+		help=f"Seconds without edits before re-linting (default: {DEBOUNCE}).",
+	)
+	parser.set_defaults(
+		pg_version=None,
+		debounce=DEBOUNCE,
+	)
+	args = parser.parse_args(argv)
+	return args
+
+
+#============================================
+
+
+def main(argv: list[str], version: str) -> None:
+	"""
+	Run the "pgml-lint lsp" command.
+
+	Args:
+		argv: Arguments after "lsp".
+		version: Linter version.
+	"""
+	args = parse_args(argv)
+	exit_code = serve(sys.stdin.buffer, sys.stdout.buffer, version, args.pg_version, args.debounce)
+	sys.stdout.flush()
+	sys.stderr.flush()
+	# The reader thread may still be blocked on stdin, which would abort a normal interpreter shutdown
+	os._exit(exit_code)
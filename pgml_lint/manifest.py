@@ -0,0 +1,216 @@
+"""Stat-keyed manifest of per-file lint results from the last directory run."""
+
+# Standard Library
+import collections.abc
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+# Local modules
+import pgml_lint.cache
+import pgml_lint.core
+import pgml_lint.pg_version
+
+# Bump when the manifest layout changes so old manifests are ignored
+MANIFEST_FORMAT = "1"
+# Bytes read per chunk when hashing a file whose stat changed
+HASH_CHUNK = 1024 * 1024
+# A file modified this close to the last save may have changed again within
+# one timestamp tick (2 s on FAT, 1 s on some NFS servers), so its stat
+# alone is not trusted
+RACY_WINDOW_NS = 2 * 1000 * 1000 * 1000
+
+
+#============================================
+
+
+def config_key(
+	linter_version: str,
+	pg_version: str | None,
+	plugin_ids: list[str],
+	block_rules: list[dict[str, str]],
+	macro_rules: list[dict[str, object]],
+) -> str:
+	"""
+	Hash the settings that affect lint output; a manifest from other settings is ignored.
+
+	Args:
+		linter_version: Linter version string.
+		pg_version: Target PG version (normalized here).
+		plugin_ids: Enabled plugin ids.
+		block_rules: Block rules.
+		macro_rules: Macro rules.
+
+	Returns:
+		str: Hex SHA-256 digest.
+	"""
+	parts = [
+		MANIFEST_FORMAT,
+		linter_version,
+		pgml_lint.pg_version.normalize_pg_version(pg_version),
+		",".join(plugin_ids),
+		pgml_lint.cache.rules_digest(block_rules, macro_rules),
+	]
+	digest = hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+	return digest
+
+
+#============================================
+
+
+def file_digest(file_path: str) -> str:
+	"""
+	Hash a file's bytes.
+
+	Args:
+		file_path: File to hash.
+
+	Returns:
+		str: Hex SHA-256 digest.
+	"""
+	digest = hashlib.sha256()
+	with open(file_path, "rb") as handle:
+		for chunk in iter(lambda: handle.read(HASH_CHUNK), b""):
+			digest.update(chunk)
+	return digest.hexdigest()
+
+
+#============================================
+
+
+class LibraryManifest:
+	"""
+	Size, mtime_ns, content hash, and issues for every file of a directory run.
+
+	plan() reuses a file's recorded issues without opening it when its size
+	and mtime_ns match, and after a single read when only the stat moved but
+	the content hash matches (a touch, a checkout, an rsync). merge() records
+	what the remaining files produce, and save() replaces the manifest with
+	this run's files only, so deleted files drop out.
+	"""
+
+	def __init__(self, path: str, config: str) -> None:
+		self.path = path
+		self.config = config
+		self.saved_ns = 0
+		self.entries = self._load()
+		self.next_entries: dict[str, dict[str, object]] = {}
+		self.stat_hits = 0
+		self.hash_hits = 0
+
+	def _load(self) -> dict[str, dict[str, object]]:
+		"""
+		Read the manifest, or start empty when it is missing, unreadable, or stale.
+
+		Returns:
+			dict[str, dict[str, object]]: Entries keyed by absolute path.
+		"""
+		try:
+			with open(self.path, "r", encoding="utf-8") as handle:
+				data = json.load(handle)
+		except (OSError, ValueError):
+			return {}
+		if not isinstance(data, dict) or data.get("config") != self.config:
+			return {}
+		files = data.get("files")
+		if not isinstance(files, dict):
+			return {}
+		self.saved_ns = int(data.get("saved_ns", 0))
+		return files
+
+	def plan(self, file_paths: list[str]) -> dict[str, list[pgml_lint.core.Issue]]:
+		"""
+		Find the files whose recorded issues are still valid.
+
+		Args:
+			file_paths: Files in this run.
+
+		Returns:
+			dict[str, list[pgml_lint.core.Issue]]: Reused issues by path; every
+			other file must be linted and passed through merge().
+		"""
+		reused: dict[str, list[pgml_lint.core.Issue]] = {}
+		for file_path in file_paths:
+			key = os.path.abspath(file_path)
+			try:
+				stat = os.stat(file_path)
+			except OSError:
+				# Linting reports the missing file as usual
+				continue
+			entry = self.entries.get(key)
+			if not isinstance(entry, dict) or not isinstance(entry.get("issues"), list):
+				entry = None
+			if (
+				entry is not None
+				and entry.get("size") == stat.st_size
+				and entry.get("mtime_ns") == stat.st_mtime_ns
+				and stat.st_mtime_ns + RACY_WINDOW_NS < self.saved_ns
+			):
+				self.stat_hits += 1
+				self.next_entries[key] = entry
+				reused[file_path] = entry["issues"]
+				continue
+			digest = file_digest(file_path)
+			next_entry: dict[str, object] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+			self.next_entries[key] = next_entry
+			if entry is not None and entry.get("sha256") == digest:
+				self.hash_hits += 1
+				next_entry.update(errors=entry.get("errors"), warnings=entry.get("warnings"), issues=entry["issues"])
+				reused[file_path] = entry["issues"]
+		return {
+			file_path: [pgml_lint.core.Issue.from_mapping(issue) for issue in issues]
+			for file_path, issues in reused.items()
+		}
+
+	def merge(
+		self,
+		file_paths: list[str],
+		reused: dict[str, list[pgml_lint.core.Issue]],
+		file_results: collections.abc.Iterable,
+		excerpts: bool,
+	) -> collections.abc.Iterator:
+		"""
+		Yield every file's issues in file_paths order, recording the linted ones.
+
+		Issues are recorded with excerpts, so any later output format can reuse
+		them; excerpts are dropped from what is yielded when not wanted.
+
+		Args:
+			file_paths: Files in this run, in output order.
+			reused: Result of plan().
+			file_results: (path, issues) pairs for the other files, in order,
+				linted with excerpts.
+			excerpts: Keep excerpts in the yielded issues.
+
+		Yields:
+			tuple[str, list[pgml_lint.core.Issue]]: File path and its issues.
+		"""
+		linted = iter(file_results)
+		for file_path in file_paths:
+			if file_path in reused:
+				issues = reused[file_path]
+			else:
+				linted_path, issues = next(linted)
+				entry = self.next_entries.get(os.path.abspath(linted_path))
+				if entry is not None:
+					errors, warnings = pgml_lint.core.summarize_issues(issues)
+					entry.update(errors=errors, warnings=warnings, issues=[dict(issue) for issue in issues])
+			if not excerpts:
+				for issue in issues:
+					issue["excerpt"] = None
+			yield file_path, issues
+
+	def save(self) -> None:
+		"""
+		Write this run's entries with an atomic rename.
+		"""
+		files = {key: entry for key, entry in self.next_entries.items() if "issues" in entry}
+		data = {"format": MANIFEST_FORMAT, "config": self.config, "saved_ns": time.time_ns(), "files": files}
+		manifest_dir = os.path.dirname(os.path.abspath(self.path))
+		os.makedirs(manifest_dir, exist_ok=True)
+		fd, tmp_path = tempfile.mkstemp(dir=manifest_dir, suffix=".tmp")
+		with os.fdopen(fd, "w", encoding="utf-8") as handle:
+			json.dump(data, handle, separators=(",", ":"))
+		os.replace(tmp_path, self.path)
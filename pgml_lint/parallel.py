@@ -0,0 +1,175 @@
+# Standard Library
+import os
+import collections.abc
+import multiprocessing
+
+# Local modules
+import pgml_lint.cache
+import pgml_lint.engine
+import pgml_lint.profiling
+import pgml_lint.registry
+
+
+# Per-process worker state, filled once by _init_worker() and read-only afterwards
+WORKER_STATE: dict[str, object] = {}
+
+
+#============================================
+
+
+def order_by_size(file_paths: list[str]) -> list[int]:
+	"""
+	Return file indices ordered largest file first.
+
+	Dispatching the largest files first keeps a long file from starting
+	last and holding up the whole pool. Ties keep the input order.
+
+	Args:
+		file_paths: File paths in serial output order.
+
+	Returns:
+		list[int]: Indices into file_paths, largest file first.
+	"""
+	sizes: list[int] = []
+	for file_path in file_paths:
+		sizes.append(os.path.getsize(file_path))
+	order = sorted(range(len(file_paths)), key=lambda idx: (-sizes[idx], idx))
+	return order
+
+
+#============================================
+
+
+def reorder_results(results: collections.abc.Iterable) -> collections.abc.Iterator:
+	"""
+	Yield (index, value) pairs in index order from an unordered stream.
+
+	Results that arrive early wait in a reorder buffer until every lower
+	index has been yielded, so output matches the serial order.
+
+	Args:
+		results: Iterable of (index, value) pairs covering 0..N-1.
+
+	Yields:
+		tuple[int, object]: Pairs in ascending index order.
+	"""
+	pending: dict[int, object] = {}
+	next_index = 0
+	for index, value in results:
+		pending[index] = value
+		# Flush every result that is now contiguous with the output
+		while next_index in pending:
+			yield next_index, pending.pop(next_index)
+			next_index += 1
+
+
+#============================================
+
+
+def _init_worker(
+	block_rules: list[dict[str, str]],
+	macro_rules: list[dict[str, object]],
+	plugin_ids: list[str],
+	pg_version: str | None,
+	cache: pgml_lint.cache.ResultCache | None,
+	profile: bool = False,
+	excerpts: bool = True,
+) -> None:
+	"""
+	Build the registry and resolve plugins once per worker process.
+
+	Args:
+		block_rules: Block rules.
+		macro_rules: Macro rules.
+		plugin_ids: Reported plugin ids.
+		pg_version: Target PG version.
+		cache: Optional result cache shared through the cache directory.
+		profile: Return a per-file profile with each result.
+		excerpts: Attach source excerpts to issues.
+	"""
+	registry = pgml_lint.registry.build_registry()
+	# Resolving as an --only set re-adds helper producers in dependency order
+	plugins = registry.resolve_plugins(set(plugin_ids), set(), set())
+	WORKER_STATE["block_rules"] = block_rules
+	WORKER_STATE["macro_rules"] = macro_rules
+	WORKER_STATE["plugins"] = plugins
+	WORKER_STATE["pg_version"] = pg_version
+	WORKER_STATE["cache"] = cache
+	WORKER_STATE["profile"] = profile
+	WORKER_STATE["excerpts"] = excerpts
+
+
+#============================================
+
+
+def _lint_task(task: tuple[int, str]) -> tuple[int, tuple]:
+	"""
+	Lint one file inside a worker process.
+
+	Args:
+		task: (index, file_path) pair.
+
+	Returns:
+		tuple[int, tuple]: Index and (issue list, profile dict or None).
+	"""
+	index, file_path = task
+	profiler = None
+	if WORKER_STATE.get("profile"):
+		profiler = pgml_lint.profiling.LintProfiler(top_files=1)
+	issues = pgml_lint.engine.lint_file(
+		file_path,
+		WORKER_STATE["block_rules"],
+		WORKER_STATE["macro_rules"],
+		WORKER_STATE["plugins"],
+		WORKER_STATE["pg_version"],
+		WORKER_STATE["cache"],
+		profiler,
+		WORKER_STATE.get("excerpts", True),
+	)
+	profile_data = None
+	if profiler is not None:
+		profile_data = profiler.to_dict()
+	return index, (issues, profile_data)
+
+
+#============================================
+
+
+def lint_files_parallel(
+	file_paths: list[str],
+	block_rules: list[dict[str, str]],
+	macro_rules: list[dict[str, object]],
+	plugin_ids: list[str],
+	pg_version: str | None,
+	jobs: int,
+	cache: pgml_lint.cache.ResultCache | None = None,
+	profiler: pgml_lint.profiling.LintProfiler | None = None,
+	excerpts: bool = True,
+) -> collections.abc.Iterator:
+	"""
+	Lint files across worker processes and yield results in input order.
+
+	Args:
+		file_paths: Files to lint, in the order results should be reported.
+		block_rules: Block rules.
+		macro_rules: Macro rules.
+		plugin_ids: Built-in plugin ids to run.
+		pg_version: Target PG version.
+		jobs: Number of worker processes.
+		cache: Optional result cache used by every worker.
+		profiler: Optional profiler that collects every worker's timings.
+		excerpts: Attach source excerpts to issues.
+
+	Yields:
+		tuple[str, list[dict[str, object]]]: File path and its issue list.
+	"""
+	order = order_by_size(file_paths)
+	tasks = [(index, file_paths[index]) for index in order]
+	init_args = (block_rules, macro_rules, plugin_ids, pg_version, cache, profiler is not None, excerpts)
+	with multiprocessing.Pool(jobs, _init_worker, init_args) as pool:
+		# chunksize=1 keeps the largest-first dispatch order intact
+		unordered = pool.imap_unordered(_lint_task, tasks, chunksize=1)
+		for index, (issues, profile_data) in reorder_results(unordered):
+			if profiler is not None and profile_data is not None:
+				profiler.merge(profile_data)
+			yield file_paths[index], issues
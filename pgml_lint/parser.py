@@ -27,6 +27,12 @@ ARRAY_ELEM_ASSIGN_RX = re.compile(r"\$([A-Za-z_][A-Za-z0-9_]*)\s*\[[^\]]+\]\s*="
 HASH_ELEM_ASSIGN_RX = re.compile(r"\$([A-Za-z_][A-Za-z0-9_]*)\s*\{[^\}]+\}\s*=")
 
 MACRO_CALL_NAMES = {"loadMacros", "includePGproblem"}
+# Identifier followed by an opening paren: name( or name (
+CALL_NAME_RX = re.compile(r"\b([A-Za-z_][A-Za-z0-9_]*)\s*\(")
+EMPTY_ARGS_RX = re.compile(r"\s*\(\s*\)")
+PGML_NAMESPACE_RX = re.compile(r"\bPGML::")
+# Line breaks other than "\n" that str.splitlines() also splits on
+OTHER_LINE_BREAK_RX = re.compile("[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
 
 
 #============================================
@@ -99,6 +105,9 @@ def _scan_heredoc_terminator(line: str) -> str | None:
 	Returns:
 		str | None: Terminator token, if present.
 	"""
+	# Fast path: no heredoc introducer can exist without "<<"
+	if "<<" not in line:
+		return None
 	in_sq = False
 	in_dq = False
 	escape = False
@@ -175,6 +184,9 @@ def _strip_line_comment_preserving_strings(line: str) -> str:
 	Returns:
 		str: Line with trailing comment removed.
 	"""
+	# Fast path: nothing to strip without "#"
+	if "#" not in line:
+		return line
 	in_sq = False
 	in_dq = False
 	escape = False
@@ -218,21 +230,9 @@ def strip_comments(text: str) -> str:
 	Returns:
 		str: Text with comments removed.
 	"""
-	out_lines: list[str] = []
-	heredoc_end: str | None = None
-
-	for line in text.splitlines(keepends=True):
-		if heredoc_end is not None:
-			out_lines.append(line)
-			if line.strip() == heredoc_end:
-				heredoc_end = None
-			continue
-
-		heredoc_end = _scan_heredoc_terminator(line)
-		clean_line = _strip_line_comment_preserving_strings(line)
-		out_lines.append(clean_line)
-
-	return "".join(out_lines)
+	structure = scan_structure(text)
+	stripped = str(structure["stripped_comments"])
+	return stripped
 
 
 #============================================
@@ -391,6 +391,72 @@ def iter_calls(text: str, names: set[str], newlines: list[int] | None = None) ->
 #============================================
 
 
+def build_call_index(text: str) -> dict[str, list[int]]:
+	"""
+	Index every name( call site in one pass.
+
+	Args:
+		text: Input text (comments and heredocs already stripped).
+
+	Returns:
+		dict[str, list[int]]: Call name to ascending name start offsets.
+	"""
+	index: dict[str, list[int]] = {}
+	for match in CALL_NAME_RX.finditer(text):
+		name = match.group(1)
+		positions = index.get(name)
+		if positions is None:
+			index[name] = [match.start()]
+		else:
+			positions.append(match.start())
+	return index
+
+
+#============================================
+
+
+def call_index_for(context: dict[str, object]) -> dict[str, list[int]]:
+	"""
+	Return the cached call index of stripped_text, building it if missing.
+
+	Args:
+		context: Shared lint context (LintContext or plain dict).
+
+	Returns:
+		dict[str, list[int]]: Call name to ascending name start offsets.
+	"""
+	index = context.get("call_index")
+	if isinstance(index, dict):
+		return index
+	index = build_call_index(str(context.get("stripped_text", "")))
+	context["call_index"] = index
+	return index
+
+
+#============================================
+
+
+def has_empty_call(text: str, call_index: dict[str, list[int]], name: str) -> bool:
+	"""
+	Return True when name() is called with an empty argument list.
+
+	Args:
+		text: Text the call index was built from.
+		call_index: Output of build_call_index(text).
+		name: Call name, such as DOCUMENT.
+
+	Returns:
+		bool: True when an empty call is present.
+	"""
+	for pos in call_index.get(name, []):
+		if EMPTY_ARGS_RX.match(text, pos + len(name)):
+			return True
+	return False
+
+
+#============================================
+
+
 def extract_loaded_macros(stripped_text: str) -> set[str]:
 	"""
 	Extract macro filenames from loadMacros calls.
@@ -509,147 +575,310 @@ def extract_block_markers(text: str) -> tuple[list[dict[str, object]], list[dict
 	Returns:
 		tuple[list[dict[str, object]], list[dict[str, object]]]: Issues and PGML regions.
 	"""
-	issues: list[dict[str, object]] = []
-	pgml_regions: list[dict[str, object]] = []
-	stack: list[dict[str, object]] = []
+	structure = scan_structure(text)
+	issues = structure["block_marker_issues"]
+	pgml_regions = structure["pgml_block_regions"]
+	return issues, pgml_regions
 
-	heredoc_end: str | None = None
-	pos = 0
-	line_num = 0
-	for line in text.splitlines(keepends=True):
-		line_num += 1
-		if heredoc_end is not None:
-			if line.strip() == heredoc_end:
-				heredoc_end = None
-			pos += len(line)
-			continue
 
-		heredoc_end = _scan_heredoc_terminator(line)
-		if heredoc_end is not None:
-			pos += len(line)
-			continue
+#============================================
 
-		match = BLOCK_MARKER_RX.search(line)
-		if not match:
-			pos += len(line)
-			continue
 
-		action = match.group(1)
-		tag = match.group(2)
-		full_tag = f"{action}_{tag}"
-
-		if action == "BEGIN":
-			if tag in {"PGML_HINT", "PGML_SOLUTION"}:
-				if any(item["tag"].startswith("PGML") for item in stack):
-					message = f"{full_tag} appears inside another PGML block"
-					issue = {"severity": "WARNING", "message": message, "line": line_num}
-					issues.append(issue)
-			start_pos = pos + len(line)
-			entry = {"tag": tag, "start": start_pos, "line": line_num}
-			stack.append(entry)
-			pos += len(line)
-			continue
+def extract_pgml_heredoc_regions(text: str) -> tuple[list[dict[str, object]], list[dict[str, object]]]:
+	"""
+	Extract PGML heredoc regions and report unterminated blocks.
 
-		if action == "END":
-			if not stack:
-				message = f"{full_tag} without matching BEGIN"
-				issue = {"severity": "ERROR", "message": message, "line": line_num}
-				issues.append(issue)
-				pos += len(line)
-				continue
+	Args:
+		text: Full file contents.
 
-			open_entry = stack[-1]
-			if open_entry["tag"] != tag:
-				message = f"{full_tag} does not match BEGIN_{open_entry['tag']}"
-				issue = {"severity": "ERROR", "message": message, "line": line_num}
-				issues.append(issue)
-				pos += len(line)
-				continue
+	Returns:
+		tuple[list[dict[str, object]], list[dict[str, object]]]: Issues and regions.
+	"""
+	structure = scan_structure(text)
+	issues = structure["pgml_heredoc_issues"]
+	regions = structure["pgml_heredoc_regions"]
+	return issues, regions
 
-			stack.pop()
-			if tag.startswith("PGML"):
-				region = {
-					"start": open_entry["start"],
-					"end": pos,
-					"kind": f"BEGIN_{tag}",
-					"line": open_entry["line"],
-				}
-				pgml_regions.append(region)
-			pos += len(line)
-			continue
 
-		pos += len(line)
+#============================================
 
-	for open_entry in stack:
-		message = f"BEGIN_{open_entry['tag']} without matching END"
-		line = int(open_entry["line"])
-		issue = {"severity": "ERROR", "message": message, "line": line}
+
+def _apply_block_marker(
+	match: re.Match,
+	line: str,
+	line_num: int,
+	pos: int,
+	stack: list[dict[str, object]],
+	issues: list[dict[str, object]],
+	pgml_regions: list[dict[str, object]],
+) -> None:
+	"""
+	Update the BEGIN/END stack for one block marker line.
+
+	Args:
+		match: BLOCK_MARKER_RX match on the line.
+		line: Line text including its line ending.
+		line_num: 1-based line number.
+		pos: Offset of the line start in the full text.
+		stack: Open block stack, updated in place.
+		issues: Issue list, appended in place.
+		pgml_regions: PGML region list, appended in place.
+	"""
+	action = match.group(1)
+	tag = match.group(2)
+	full_tag = f"{action}_{tag}"
+
+	if action == "BEGIN":
+		if tag in {"PGML_HINT", "PGML_SOLUTION"}:
+			if any(item["tag"].startswith("PGML") for item in stack):
+				message = f"{full_tag} appears inside another PGML block"
+				issue = {"severity": "WARNING", "message": message, "line": line_num}
+				issues.append(issue)
+		start_pos = pos + len(line)
+		entry = {"tag": tag, "start": start_pos, "line": line_num}
+		stack.append(entry)
+		return
+
+	if not stack:
+		message = f"{full_tag} without matching BEGIN"
+		issue = {"severity": "ERROR", "message": message, "line": line_num}
 		issues.append(issue)
+		return
 
-	return issues, pgml_regions
+	open_entry = stack[-1]
+	if open_entry["tag"] != tag:
+		message = f"{full_tag} does not match BEGIN_{open_entry['tag']}"
+		issue = {"severity": "ERROR", "message": message, "line": line_num}
+		issues.append(issue)
+		return
+
+	stack.pop()
+	if tag.startswith("PGML"):
+		region = {
+			"start": open_entry["start"],
+			"end": pos,
+			"kind": f"BEGIN_{tag}",
+			"line": open_entry["line"],
+		}
+		pgml_regions.append(region)
 
 
 #============================================
 
 
-def extract_pgml_heredoc_regions(text: str) -> tuple[list[dict[str, object]], list[dict[str, object]]]:
+def scan_structure(text: str) -> dict[str, object]:
 	"""
-	Extract PGML heredoc regions and report unterminated blocks.
+	Scan heredocs, comments, and block markers in a single walk over the lines.
+
+	Produces the same results as the separate strip_comments(),
+	strip_heredocs(strip_comments()), extract_block_markers(), and
+	extract_pgml_heredoc_regions() passes, while running the heredoc
+	terminator scan at most once per line for the common case.
+
+	Two heredoc states are tracked. The raw state follows the original lines
+	and drives comment stripping, block markers, and PGML heredoc regions.
+	The clean state follows the comment-stripped lines and drives heredoc
+	stripping, exactly as strip_heredocs() sees them.
 
 	Args:
 		text: Full file contents.
 
 	Returns:
-		tuple[list[dict[str, object]], list[dict[str, object]]]: Issues and regions.
+		dict[str, object]: Keys stripped_comments, stripped_text,
+			block_marker_issues, pgml_block_regions, pgml_heredoc_issues,
+			and pgml_heredoc_regions.
 	"""
-	issues: list[dict[str, object]] = []
-	regions: list[dict[str, object]] = []
+	comment_lines: list[str] = []
+	heredoc_lines: list[str] = []
+	block_issues: list[dict[str, object]] = []
+	block_regions: list[dict[str, object]] = []
+	stack: list[dict[str, object]] = []
+	heredoc_issues: list[dict[str, object]] = []
+	heredoc_regions: list[dict[str, object]] = []
 
-	heredoc_end: str | None = None
+	# Raw-line heredoc state
+	raw_end: str | None = None
 	body_start: int | None = None
 	body_line: int | None = None
 	is_pgml = False
+	# Comment-stripped-line heredoc state
+	clean_end: str | None = None
 
 	pos = 0
 	line_num = 0
 	for line in text.splitlines(keepends=True):
 		line_num += 1
-		if heredoc_end is None:
+		scanned = False
+		terminator: str | None = None
+
+		if raw_end is not None:
+			# Heredoc bodies keep their comments and never hold block markers
+			clean = line
+			if line.strip() == raw_end:
+				if is_pgml and body_start is not None:
+					region = {
+						"start": body_start,
+						"end": pos,
+						"kind": "HEREDOC_PGML",
+						"line": body_line,
+					}
+					heredoc_regions.append(region)
+				raw_end = None
+				body_start = None
+				body_line = None
+				is_pgml = False
+		else:
 			terminator = _scan_heredoc_terminator(line)
-			if terminator is None:
-				pos += len(line)
-				continue
-			is_pgml = "PGML" in terminator or (re.search(r"\bPGML::", line) is not None)
-			heredoc_end = terminator
-			body_start = pos + len(line)
-			body_line = line_num + 1
-			pos += len(line)
-			continue
-
-		if line.strip() == heredoc_end:
-			if is_pgml and body_start is not None:
-				region = {
-					"start": body_start,
-					"end": pos,
-					"kind": "HEREDOC_PGML",
-					"line": body_line,
-				}
-				regions.append(region)
-			heredoc_end = None
-			body_start = None
-			body_line = None
-			is_pgml = False
-			pos += len(line)
-			continue
+			scanned = True
+			clean = _strip_line_comment_preserving_strings(line)
+			if terminator is not None:
+				raw_end = terminator
+				is_pgml = "PGML" in terminator or (PGML_NAMESPACE_RX.search(line) is not None)
+				body_start = pos + len(line)
+				body_line = line_num + 1
+			else:
+				match = BLOCK_MARKER_RX.search(line)
+				if match:
+					_apply_block_marker(
+						match,
+						line,
+						line_num,
+						pos,
+						stack,
+						block_issues,
+						block_regions,
+					)
+		comment_lines.append(clean)
+
+		if clean_end is None:
+			# Reuse the raw scan when comment stripping left the line untouched
+			if scanned and clean is line:
+				clean_end = terminator
+			else:
+				clean_end = _scan_heredoc_terminator(clean)
+			heredoc_lines.append(clean)
+		else:
+			if clean.strip() == clean_end:
+				clean_end = None
+			heredoc_lines.append("\n" if clean.endswith("\n") else "")
 
 		pos += len(line)
 
-	if heredoc_end is not None and is_pgml:
+	for open_entry in stack:
+		message = f"BEGIN_{open_entry['tag']} without matching END"
+		line = int(open_entry["line"])
+		issue = {"severity": "ERROR", "message": message, "line": line}
+		block_issues.append(issue)
+
+	if raw_end is not None and is_pgml:
 		line = 1
 		if body_line is not None:
 			line = body_line - 1
-		message = f"PGML heredoc terminator '{heredoc_end}' not found"
+		message = f"PGML heredoc terminator '{raw_end}' not found"
 		issue = {"severity": "ERROR", "message": message, "line": line}
-		issues.append(issue)
+		heredoc_issues.append(issue)
+
+	stripped_comments = "".join(comment_lines)
+	if OTHER_LINE_BREAK_RX.search(text):
+		# Comment stripping can merge or split lines that end in something
+		# other than "\n", so re-split the stripped text like strip_heredocs() does
+		stripped_text = strip_heredocs(stripped_comments)
+	else:
+		stripped_text = "".join(heredoc_lines)
+
+	structure = {
+		"stripped_comments": stripped_comments,
+		"stripped_text": stripped_text,
+		"block_marker_issues": block_issues,
+		"pgml_block_regions": block_regions,
+		"pgml_heredoc_issues": heredoc_issues,
+		"pgml_heredoc_regions": heredoc_regions,
+	}
+	return structure
 
-	return issues, regions
+
+#============================================
+
+
+def _common_length(text: str, pos: int, chunk: str) -> int:
+	"""
+	Return how many leading characters of chunk appear in text at pos.
+
+	Args:
+		text: Original text.
+		pos: Offset in text.
+		chunk: Candidate characters, usually one line.
+
+	Returns:
+		int: Matching prefix length.
+	"""
+	low = 0
+	high = min(len(chunk), len(text) - pos)
+	while low < high:
+		mid = (low + high + 1) // 2
+		if text.startswith(chunk[:mid], pos):
+			low = mid
+		else:
+			high = mid - 1
+	return low
+
+
+#============================================
+
+
+def kept_spans(text: str, stripped: str) -> list[list[int]] | None:
+	"""
+	Describe a stripped text as the slices of the original text it keeps.
+
+	Comment and heredoc stripping only delete characters, so the stripped
+	text is the original text's slices joined in order; the spans are much
+	smaller than the text when most of it is kept.
+
+	Args:
+		text: Original text.
+		stripped: Text derived from text by deleting characters.
+
+	Returns:
+		list[list[int]] | None: [start, end] offsets into text, or None when
+		stripped is not made of slices of text.
+	"""
+	spans: list[list[int]] = []
+	pos = 0
+	index = 0
+	while index < len(stripped):
+		newline = stripped.find("\n", index)
+		chunk = stripped[index:] if newline < 0 else stripped[index:newline + 1]
+		if text.startswith(chunk, pos):
+			length = len(chunk)
+		else:
+			length = _common_length(text, pos, chunk)
+		if length == 0:
+			# Skip deleted characters up to the next one that was kept
+			pos = text.find(stripped[index], pos)
+			if pos < 0:
+				return None
+			continue
+		if spans and spans[-1][1] == pos:
+			spans[-1][1] = pos + length
+		else:
+			spans.append([pos, pos + length])
+		pos += length
+		index += length
+	return spans
+
+
+#============================================
+
+
+def join_spans(text: str, spans: list[list[int]]) -> str:
+	"""
+	Rebuild a stripped text from kept_spans() output.
+
+	Args:
+		text: Original text.
+		spans: [start, end] offsets into text.
+
+	Returns:
+		str: Stripped text.
+	"""
+	return "".join(text[start:end] for start, end in spans)
@@ -1,7 +1,9 @@
 # Standard Library
+import bisect
 import re
 
 # Local modules
+import pgml_lint.diff_scope
 import pgml_lint.parser
 
 
@@ -9,6 +11,71 @@ PGML_BLANK_RX = re.compile(r"\[[ \t]*_+[ \t]*\]")
 PGML_INLINE_OPEN = "[@"
 PGML_INLINE_CLOSE = "@]"
 VAR_RX = re.compile(r"\$([A-Za-z_][A-Za-z0-9_]*)")
+# Variable interpolation [$name] with an optional raw-output star
+PGML_INTERPOLATION_RX = re.compile(r"\[\s*\$([A-Za-z_][A-Za-z0-9_]*)\s*\](\*)?")
+TAG_WRAPPER_OPEN = "[<"
+TAG_WRAPPER_CLOSE = ">]"
+HEREDOC_REGION_KIND = "HEREDOC_PGML"
+# Inline code markers, and the openers of display and inline math
+INLINE_MARKER_RX = re.compile(r"\[@|@\]")
+MATH_OPEN_RX = re.compile(r"\[[`:]")
+# Characters the bracket balance check looks at
+BRACKET_SCAN_RX = re.compile(r"[\\\[\]]")
+
+
+#============================================
+
+
+class SpanIndex:
+	"""
+	Sorted, merged spans answering "is this position inside a span" by bisect.
+
+	Overlapping and touching spans are merged when the index is built, so
+	memory scales with the number of spans rather than the text length.
+	"""
+
+	__slots__ = ("starts", "ends")
+
+	def __init__(self, spans: list[tuple[int, int]], offset: int = 0) -> None:
+		"""
+		Build the index.
+
+		Args:
+			spans: (start, end) spans; empty spans are ignored.
+			offset: Amount added to every span, for example a region start.
+		"""
+		self.starts: list[int] = []
+		self.ends: list[int] = []
+		for span_start, span_end in sorted(spans):
+			if span_end <= span_start:
+				continue
+			span_start += offset
+			span_end += offset
+			if self.ends and span_start <= self.ends[-1]:
+				if span_end > self.ends[-1]:
+					self.ends[-1] = span_end
+				continue
+			self.starts.append(span_start)
+			self.ends.append(span_end)
+
+	def contains(self, pos: int) -> bool:
+		"""
+		Return True when pos falls inside one of the spans.
+
+		Args:
+			pos: Position to test.
+
+		Returns:
+			bool: True for covered positions.
+		"""
+		idx = bisect.bisect_right(self.starts, pos) - 1
+		return idx >= 0 and pos < self.ends[idx]
+
+	def __contains__(self, pos: object) -> bool:
+		return isinstance(pos, int) and self.contains(pos)
+
+	def __len__(self) -> int:
+		return len(self.starts)
 
 
 #============================================
@@ -34,26 +101,19 @@ def extract_inline_spans(
 	spans: list[tuple[int, int]] = []
 	stack: list[int] = []
 
-	i = 0
-	while i < len(block_text) - 1:
-		snippet = block_text[i : i + 2]
-		if snippet == PGML_INLINE_OPEN:
+	for match in INLINE_MARKER_RX.finditer(block_text):
+		i = match.start()
+		if match.group(0) == PGML_INLINE_OPEN:
 			stack.append(i)
-			i += 2
 			continue
-		if snippet == PGML_INLINE_CLOSE:
-			if not stack:
-				line = pgml_lint.parser.pos_to_line(newlines, start_offset + i)
-				message = "PGML inline close @] without matching [@"
-				issue = {"severity": "WARNING", "message": message, "line": line}
-				issues.append(issue)
-				i += 2
-				continue
-			start = stack.pop()
-			spans.append((start, i + 2))
-			i += 2
+		if not stack:
+			line = pgml_lint.parser.pos_to_line(newlines, start_offset + i)
+			message = "PGML inline close @] without matching [@"
+			issue = {"severity": "WARNING", "message": message, "line": line}
+			issues.append(issue)
 			continue
-		i += 1
+		start = stack.pop()
+		spans.append((start, i + 2))
 
 	for start in stack:
 		line = pgml_lint.parser.pos_to_line(newlines, start_offset + start)
@@ -132,35 +192,38 @@ def _extract_braced_payload(text: str, start: int) -> tuple[str, int, bool]:
 #============================================
 
 
-def scan_pgml_blanks(
+def _scan_blanks(
 	block_text: str,
 	start_offset: int,
 	newlines: list[int],
-	inline_spans: list[tuple[int, int]],
-) -> tuple[list[dict[str, object]], set[str], list[tuple[int, int]]]:
+	inline_index: SpanIndex,
+) -> tuple[list[dict[str, object]], list[dict[str, object]], list[tuple[int, int]]]:
 	"""
-	Check PGML blanks for missing or malformed specs.
+	Parse PGML blanks and their answer specs.
 
 	Args:
 		block_text: PGML block content.
 		start_offset: Offset of the block within the full text.
 		newlines: Newline index.
-		inline_spans: Inline code spans to ignore.
+		inline_index: Absolute inline code spans to ignore.
 
 	Returns:
-		tuple[list[dict[str, object]], set[str], list[tuple[int, int]]]: Issues, variables, blank spans.
+		tuple: Issues, blank records outside inline code (absolute offsets),
+		and every blank marker span (relative to block_text).
 	"""
 	issues: list[dict[str, object]] = []
-	vars_found: set[str] = set()
+	blanks: list[dict[str, object]] = []
 	blank_spans: list[tuple[int, int]] = []
 
 	for match in PGML_BLANK_RX.finditer(block_text):
 		start = match.start()
 		end = match.end()
 		blank_spans.append((start, end))
-		if any(span_start <= start < span_end for span_start, span_end in inline_spans):
+		if inline_index.contains(start_offset + start):
 			continue
 
+		blank = {"start": start_offset + start, "end": start_offset + end, "star": False, "spec": None}
+		blanks.append(blank)
 		line = pgml_lint.parser.pos_to_line(newlines, start_offset + start)
 		cursor = end
 		while cursor < len(block_text) and block_text[cursor].isspace():
@@ -169,6 +232,7 @@ def scan_pgml_blanks(
 		is_star = False
 		if cursor < len(block_text) and block_text[cursor] == "*":
 			is_star = True
+			blank["star"] = True
 			cursor += 1
 			while cursor < len(block_text) and block_text[cursor].isspace():
 				cursor += 1
@@ -185,21 +249,69 @@ def scan_pgml_blanks(
 			issue = {"severity": "ERROR", "message": message, "line": line}
 			issues.append(issue)
 			continue
+		blank["spec"] = payload
 
 		if payload.strip() == "":
 			message = "PGML blank spec is empty"
 			issue = {"severity": "WARNING", "message": message, "line": line}
 			issues.append(issue)
 
-		for var_match in VAR_RX.finditer(payload):
-			vars_found.add(var_match.group(1))
-
 		trail = block_text[end_pos:]
 		if is_star is False and re.match(r"\s*\*\s*\{", trail):
 			message = "PGML blank uses both payload and star specs"
 			issue = {"severity": "WARNING", "message": message, "line": line}
 			issues.append(issue)
 
+	return issues, blanks, blank_spans
+
+
+#============================================
+
+
+def blank_spec_vars(blanks: list[dict[str, object]]) -> set[str]:
+	"""
+	Collect variable names referenced in blank answer specs.
+
+	Args:
+		blanks: Blank records from a PgmlBlock.
+
+	Returns:
+		set[str]: Variable names without the sigil.
+	"""
+	vars_found: set[str] = set()
+	for blank in blanks:
+		spec = blank["spec"]
+		if spec is None:
+			continue
+		for var_match in VAR_RX.finditer(str(spec)):
+			vars_found.add(var_match.group(1))
+	return vars_found
+
+
+#============================================
+
+
+def scan_pgml_blanks(
+	block_text: str,
+	start_offset: int,
+	newlines: list[int],
+	inline_spans: list[tuple[int, int]],
+) -> tuple[list[dict[str, object]], set[str], list[tuple[int, int]]]:
+	"""
+	Check PGML blanks for missing or malformed specs.
+
+	Args:
+		block_text: PGML block content.
+		start_offset: Offset of the block within the full text.
+		newlines: Newline index.
+		inline_spans: Inline code spans to ignore.
+
+	Returns:
+		tuple[list[dict[str, object]], set[str], list[tuple[int, int]]]: Issues, variables, blank spans.
+	"""
+	inline_index = SpanIndex(inline_spans, start_offset)
+	issues, blanks, blank_spans = _scan_blanks(block_text, start_offset, newlines, inline_index)
+	vars_found = blank_spec_vars(blanks)
 	return issues, vars_found, blank_spans
 
 
@@ -222,92 +334,82 @@ def _extract_math_spans(block_text: str) -> list[tuple[int, int]]:
 	"""
 	spans: list[tuple[int, int]] = []
 	i = 0
-	while i < len(block_text) - 1:
+	while True:
+		match = MATH_OPEN_RX.search(block_text, i)
+		if match is None:
+			break
+		start = match.start()
 		# Check for [`...`] display math
-		if block_text[i:i+2] == "[`":
-			start = i
-			j = i + 2
-			while j < len(block_text) - 1:
-				if block_text[j:j+2] == "`]":
-					spans.append((start, j + 2))
-					i = j + 2
-					break
-				j += 1
-			else:
-				i += 1
+		if match.group(0) == "[`":
+			close = block_text.find("`]", start + 2)
+			if close == -1:
+				i = start + 1
+				continue
+			spans.append((start, close + 2))
+			i = close + 2
 			continue
 		# Check for [:...:] inline math (handles modifiers like :+ :* etc)
-		if block_text[i:i+2] == "[:":
-			start = i
-			j = i + 2
-			while j < len(block_text) - 1:
-				if block_text[j] == ":" and j + 1 < len(block_text) and block_text[j+1] == "]":
-					spans.append((start, j + 2))
-					i = j + 2
-					break
-				# Handle modifiers like :+] or :*]
-				if block_text[j] == ":" and j + 2 < len(block_text) and block_text[j+2] == "]":
-					spans.append((start, j + 3))
-					i = j + 3
-					break
-				j += 1
-			else:
-				i += 1
+		end = -1
+		j = block_text.find(":", start + 2)
+		while j != -1 and j < len(block_text) - 1:
+			if block_text[j + 1] == "]":
+				end = j + 2
+				break
+			# Handle modifiers like :+] or :*]
+			if j + 2 < len(block_text) and block_text[j + 2] == "]":
+				end = j + 3
+				break
+			j = block_text.find(":", j + 1)
+		if end == -1:
+			i = start + 1
 			continue
-		i += 1
+		spans.append((start, end))
+		i = end
 	return spans
 
 
 #============================================
 
 
-def check_pgml_bracket_balance(
+def find_unbalanced_brackets(
 	block_text: str,
 	start_offset: int,
 	newlines: list[int],
-	inline_spans: list[tuple[int, int]],
-	blank_spans: list[tuple[int, int]],
+	masked_index: SpanIndex,
 ) -> list[dict[str, object]]:
 	"""
-	Check for unbalanced PGML bracket usage, ignoring blanks, inline code, and math.
+	Report unbalanced [ and ] in PGML text outside the masked spans.
 
 	Args:
 		block_text: PGML block content.
 		start_offset: Offset of the block within the full text.
 		newlines: Newline index.
-		inline_spans: Inline code spans.
-		blank_spans: Blank marker spans.
+		masked_index: Absolute spans to ignore (inline code, blanks, math).
 
 	Returns:
 		list[dict[str, object]]: Issue dicts.
 	"""
 	issues: list[dict[str, object]] = []
-	# Extract math spans to exclude from bracket checking
-	math_spans = _extract_math_spans(block_text)
-	masked = list(block_text)
-	for span_start, span_end in inline_spans + blank_spans + math_spans:
-		for i in range(span_start, min(span_end, len(masked))):
-			masked[i] = " "
-	masked_text = "".join(masked)
-
 	stack: list[int] = []
-	i = 0
-	while i < len(masked_text):
-		ch = masked_text[i]
+	# A backslash escapes the character after it
+	escaped_pos = -1
+	for match in BRACKET_SCAN_RX.finditer(block_text):
+		i = match.start()
+		if i == escaped_pos or masked_index.contains(start_offset + i):
+			continue
+		ch = match.group(0)
 		if ch == "\\":
-			i += 2
+			escaped_pos = i + 1
 			continue
 		if ch == "[":
 			stack.append(i)
-		elif ch == "]":
-			if not stack:
-				line = pgml_lint.parser.pos_to_line(newlines, start_offset + i)
-				message = "PGML bracket close ] without matching ["
-				issue = {"severity": "WARNING", "message": message, "line": line}
-				issues.append(issue)
-			else:
-				stack.pop()
-		i += 1
+		elif not stack:
+			line = pgml_lint.parser.pos_to_line(newlines, start_offset + i)
+			message = "PGML bracket close ] without matching ["
+			issue = {"severity": "WARNING", "message": message, "line": line}
+			issues.append(issue)
+		else:
+			stack.pop()
 
 	for start in stack:
 		line = pgml_lint.parser.pos_to_line(newlines, start_offset + start)
@@ -316,3 +418,329 @@ def check_pgml_bracket_balance(
 		issues.append(issue)
 
 	return issues
+
+
+#============================================
+
+
+def check_pgml_bracket_balance(
+	block_text: str,
+	start_offset: int,
+	newlines: list[int],
+	inline_spans: list[tuple[int, int]],
+	blank_spans: list[tuple[int, int]],
+) -> list[dict[str, object]]:
+	"""
+	Check for unbalanced PGML bracket usage, ignoring blanks, inline code, and math.
+
+	Args:
+		block_text: PGML block content.
+		start_offset: Offset of the block within the full text.
+		newlines: Newline index.
+		inline_spans: Inline code spans.
+		blank_spans: Blank marker spans.
+
+	Returns:
+		list[dict[str, object]]: Issue dicts.
+	"""
+	# Extract math spans to exclude from bracket checking
+	math_spans = _extract_math_spans(block_text)
+	masked_index = SpanIndex(inline_spans + blank_spans + math_spans, start_offset)
+	issues = find_unbalanced_brackets(block_text, start_offset, newlines, masked_index)
+	return issues
+
+
+#============================================
+
+
+def _scan_emphasis_markers(
+	block_text: str,
+	start_offset: int,
+	masked_index: SpanIndex,
+) -> list[list[int]]:
+	"""
+	Find underscore emphasis markers, grouped by paragraph.
+
+	Underscores inside inline code, blanks, or math, escaped with a
+	backslash, or between two word characters are not markers.
+
+	Args:
+		block_text: PGML block content.
+		start_offset: Offset of the block within the full text.
+		masked_index: Absolute spans to ignore.
+
+	Returns:
+		list[list[int]]: Absolute marker positions for each paragraph.
+	"""
+	paragraphs: list[list[int]] = []
+	markers: list[int] = []
+	pos = 0
+	for line in block_text.splitlines(keepends=True):
+		if line.strip() == "":
+			paragraphs.append(markers)
+			markers = []
+			pos += len(line)
+			continue
+		idx = line.find("_")
+		while idx != -1:
+			abs_pos = start_offset + pos + idx
+			prev_ch = line[idx - 1] if idx > 0 else ""
+			next_ch = line[idx + 1] if idx + 1 < len(line) else ""
+			is_marker = prev_ch != "\\" and not masked_index.contains(abs_pos)
+			if is_marker and prev_ch and next_ch and _is_word_char(prev_ch) and _is_word_char(next_ch):
+				is_marker = False
+			if is_marker:
+				markers.append(abs_pos)
+			idx = line.find("_", idx + 1)
+		pos += len(line)
+	paragraphs.append(markers)
+	return paragraphs
+
+
+#============================================
+
+
+def _is_word_char(ch: str) -> bool:
+	"""
+	Check if a character counts as a word character.
+
+	Args:
+		ch: Single character.
+
+	Returns:
+		bool: True if alphanumeric or underscore.
+	"""
+	return ch.isalnum() or ch == "_"
+
+
+#============================================
+
+
+def _scan_interpolations(
+	block_text: str,
+	start_offset: int,
+	inline_index: SpanIndex,
+) -> list[dict[str, object]]:
+	"""
+	Find [$name] variable interpolations outside inline code.
+
+	Args:
+		block_text: PGML block content.
+		start_offset: Offset of the block within the full text.
+		inline_index: Absolute inline code spans to ignore.
+
+	Returns:
+		list[dict[str, object]]: Records with name, start, end (after the
+		closing bracket), and star (raw output) keys.
+	"""
+	interpolations: list[dict[str, object]] = []
+	for match in PGML_INTERPOLATION_RX.finditer(block_text):
+		start = match.start()
+		if inline_index.contains(start_offset + start):
+			continue
+		is_star = match.group(2) is not None
+		close_end = match.start(2) if is_star else match.end()
+		interpolation = {
+			"name": match.group(1),
+			"start": start_offset + start,
+			"end": start_offset + close_end,
+			"star": is_star,
+		}
+		interpolations.append(interpolation)
+	return interpolations
+
+
+#============================================
+
+
+def _wrapper_payloads(line: str, close_idx: int) -> list[str] | None:
+	"""
+	Extract the braced payloads that follow a tag wrapper label on one line.
+
+	Args:
+		line: Line text without its line break.
+		close_idx: Position of the label close marker.
+
+	Returns:
+		list[str] | None: Payloads, or None when a payload is unbalanced.
+	"""
+	cursor = close_idx + 2
+	payloads: list[str] = []
+	while cursor < len(line):
+		while cursor < len(line) and line[cursor].isspace():
+			cursor += 1
+		if cursor >= len(line) or line[cursor] != "{":
+			break
+		payload, end_pos, ok = _extract_braced_payload(line, cursor)
+		if not ok:
+			return None
+		payloads.append(payload)
+		cursor = end_pos
+	return payloads
+
+
+#============================================
+
+
+def _scan_tag_wrappers(
+	block_text: str,
+	start_offset: int,
+	inline_index: SpanIndex,
+) -> list[dict[str, object]]:
+	"""
+	Find [<label>]{...}{...} tag wrapper openers outside inline code.
+
+	Args:
+		block_text: PGML block content.
+		start_offset: Offset of the block within the full text.
+		inline_index: Absolute inline code spans to ignore.
+
+	Returns:
+		list[dict[str, object]]: Records with start, close (label close
+		marker, or None when the line ends first), and payloads keys.
+	"""
+	wrappers: list[dict[str, object]] = []
+	line_offset = 0
+	raw_lines = block_text.splitlines(keepends=True)
+	for line, raw_line in zip(block_text.splitlines(), raw_lines):
+		open_idx = line.find(TAG_WRAPPER_OPEN)
+		while open_idx != -1:
+			rel_open = line_offset + open_idx
+			if not inline_index.contains(start_offset + rel_open):
+				close_idx = line.find(TAG_WRAPPER_CLOSE, open_idx + 2)
+				wrapper: dict[str, object] = {"start": start_offset + rel_open, "close": None, "payloads": []}
+				if close_idx != -1:
+					wrapper["close"] = start_offset + line_offset + close_idx
+					wrapper["payloads"] = _wrapper_payloads(line, close_idx)
+				wrappers.append(wrapper)
+			open_idx = line.find(TAG_WRAPPER_OPEN, open_idx + 2)
+		line_offset += len(raw_line)
+	return wrappers
+
+
+#============================================
+
+
+class PgmlBlock:
+	"""
+	Parsed structure of one PGML region, with absolute text offsets.
+
+	The region is scanned once for inline code, blanks and their specs,
+	math, underscore emphasis markers, [$var] interpolations, and tag
+	wrappers, so PGML plugins read these lists instead of rescanning.
+	inline_index covers inline code; masked_index also covers blanks and
+	math, the spans where PGML prose markup does not apply.
+	"""
+
+	__slots__ = (
+		"start",
+		"end",
+		"kind",
+		"inline_spans",
+		"inline_issues",
+		"blanks",
+		"blank_spans",
+		"blank_issues",
+		"math_spans",
+		"inline_index",
+		"masked_index",
+		"emphasis_markers",
+		"interpolations",
+		"tag_wrappers",
+	)
+
+	def __init__(self, text: str, region: dict[str, object], newlines: list[int]) -> None:
+		start = int(region.get("start", 0))
+		end = int(region.get("end", 0))
+		block_text = text[start:end]
+		self.start = start
+		self.end = end
+		self.kind = str(region.get("kind", ""))
+
+		self.inline_issues, inline_spans = extract_inline_spans(block_text, start, newlines)
+		self.inline_index = SpanIndex(inline_spans, start)
+		self.blank_issues, self.blanks, blank_spans = _scan_blanks(
+			block_text,
+			start,
+			newlines,
+			self.inline_index,
+		)
+		math_spans = _extract_math_spans(block_text)
+		# Text that is not PGML prose markup: inline code, blanks, and math
+		self.masked_index = SpanIndex(inline_spans + blank_spans + math_spans, start)
+		self.emphasis_markers = _scan_emphasis_markers(block_text, start, self.masked_index)
+		self.interpolations = _scan_interpolations(block_text, start, self.inline_index)
+		self.tag_wrappers = _scan_tag_wrappers(block_text, start, self.inline_index)
+
+		self.inline_spans = [(span_start + start, span_end + start) for span_start, span_end in inline_spans]
+		self.blank_spans = [(span_start + start, span_end + start) for span_start, span_end in blank_spans]
+		self.math_spans = [(span_start + start, span_end + start) for span_start, span_end in math_spans]
+
+	def relative(self, spans: list[tuple[int, int]]) -> list[tuple[int, int]]:
+		"""
+		Convert absolute spans to offsets within this block.
+
+		Args:
+			spans: Absolute spans.
+
+		Returns:
+			list[tuple[int, int]]: Spans relative to the block start.
+		"""
+		return [(span_start - self.start, span_end - self.start) for span_start, span_end in spans]
+
+
+#============================================
+
+
+def parse_pgml_blocks(
+	text: str,
+	regions: list[dict[str, object]],
+	newlines: list[int],
+) -> list[PgmlBlock]:
+	"""
+	Parse every PGML region into a PgmlBlock.
+
+	Args:
+		text: Full file contents.
+		regions: PGML regions (blocks, then heredocs).
+		newlines: Newline index.
+
+	Returns:
+		list[PgmlBlock]: One model per region, in region order.
+	"""
+	blocks = [PgmlBlock(text, region, newlines) for region in regions]
+	return blocks
+
+
+#============================================
+
+
+def blocks_for(context: dict[str, object], heredocs: bool = True, scoped: bool = True) -> list[PgmlBlock]:
+	"""
+	Return the cached PGML block models, parsing them if none are cached.
+
+	Under a region_scope (set by the engine for SEGMENT_LOCAL plugins during
+	a --diff run), blocks outside the changed lines are left out unless
+	scoped is False.
+
+	Args:
+		context: Lint context.
+		heredocs: Include PGML heredoc regions as well as BEGIN/END blocks.
+		scoped: Honor region_scope.
+
+	Returns:
+		list[PgmlBlock]: Block models in pgml_regions order.
+	"""
+	blocks = context.get("pgml_blocks")
+	if blocks is None:
+		blocks = parse_pgml_blocks(
+			str(context.get("text", "")),
+			list(context.get("pgml_regions", [])),
+			list(context.get("newlines", [])),
+		)
+		context["pgml_blocks"] = blocks
+	if scoped and context.get("region_scope") is not None:
+		blocks = [block for block in blocks if pgml_lint.diff_scope.span_in_scope(context, block.start, block.end)]
+	if heredocs:
+		return blocks
+	return [block for block in blocks if block.kind != HEREDOC_REGION_KIND]
@@ -1,49 +1,57 @@
-"""Built-in plugin list."""
+"""Built-in plugin manifest."""
 
-BUILTIN_PLUGINS = [
-	"pgml_lint.plugins.block_markers",
-	"pgml_lint.plugins.pgml_heredocs",
-	"pgml_lint.plugins.document_pairs",
-	"pgml_lint.plugins.block_rules",
-	"pgml_lint.plugins.pgml_header_tags",
-	"pgml_lint.plugins.pgml_include_pgproblem",
-	"pgml_lint.plugins.pgml_required_macros",
-	"pgml_lint.plugins.pgml_loadmacros_integrity",
-	"pgml_lint.plugins.macro_rules",
-	"pgml_lint.plugins.pgml_seed_stability",
-	"pgml_lint.plugins.pgml_seed_variation",
-	"pgml_lint.plugins.pgml_function_signatures",
-	"pgml_lint.plugins.pgml_inline",
-	"pgml_lint.plugins.pgml_pgml_parse_hazards",
-	"pgml_lint.plugins.pgml_modes_in_inline",
-	"pgml_lint.plugins.pgml_modes_tex_payload",
-	"pgml_lint.plugins.pgml_modes_html_plain_text",
-	"pgml_lint.plugins.pgml_inline_pgml_syntax",
-	"pgml_lint.plugins.pgml_inline_braces",
-	"pgml_lint.plugins.pgml_blanks",
-	"pgml_lint.plugins.pgml_underscore_emphasis",
-	"pgml_lint.plugins.pgml_brackets",
-	"pgml_lint.plugins.pgml_blank_assignments",
-	"pgml_lint.plugins.pgml_line_length",
-	"pgml_lint.plugins.pgml_blob_payloads",
-	"pgml_lint.plugins.pgml_label_dot",
-	"pgml_lint.plugins.pgml_ans_style",
-	"pgml_lint.plugins.pgml_text_blocks",
-	"pgml_lint.plugins.pgml_html_in_text",
-	"pgml_lint.plugins.pgml_nbsp",
-	"pgml_lint.plugins.pgml_mojibake",
-	"pgml_lint.plugins.pgml_tex_color",
-	"pgml_lint.plugins.pgml_html_policy",
-	"pgml_lint.plugins.pgml_html_forbidden_tags",
-	"pgml_lint.plugins.pgml_html_div",
-	"pgml_lint.plugins.pgml_span_interpolation",
-	"pgml_lint.plugins.pgml_html_var_passthrough",
-	"pgml_lint.plugins.pgml_pgml_wrapper_in_string",
-	"pgml_lint.plugins.pgml_style_string_quotes",
-	"pgml_lint.plugins.pgml_tag_wrapper_tex",
-	"pgml_lint.plugins.pgml_ans_rule",
-	"pgml_lint.plugins.pgml_br_variable",
-	"pgml_lint.plugins.pgml_modes_html_escape",
-	"pgml_lint.plugins.pgml_old_answer_checkers",
-	"pgml_lint.plugins.pgml_solution_hint_macros",
-]
+# Everything build_registry() needs to resolve and order built-in plugins
+# without importing them: id, default flag, and any PROVIDES/REQUIRES keys.
+# Module pgml_lint.plugins.<id> is imported only when the plugin is resolved,
+# and the registry raises ValueError if its metadata disagrees with the entry.
+# pgml_inline_spans and pgml_blank_spans have no built-in consumer. They are
+# kept as a public contract for outside plugins; see PGML_LINT_PLUGIN_DEV.md.
+PLUGIN_MANIFEST = (
+	{"id": "block_markers", "default_enabled": True},
+	{"id": "pgml_heredocs", "default_enabled": True},
+	{"id": "document_pairs", "default_enabled": True},
+	{"id": "block_rules", "default_enabled": True},
+	{"id": "pgml_header_tags", "default_enabled": True},
+	{"id": "pgml_include_pgproblem", "default_enabled": True},
+	{"id": "pgml_required_macros", "default_enabled": True},
+	{"id": "pgml_loadmacros_integrity", "default_enabled": True},
+	{"id": "macro_rules", "default_enabled": True},
+	{"id": "pgml_seed_stability", "default_enabled": True},
+	{"id": "pgml_seed_variation", "default_enabled": True},
+	{"id": "pgml_function_signatures", "default_enabled": True},
+	{"id": "pgml_inline", "default_enabled": True, "provides": ("pgml_inline_spans",)},
+	{"id": "pgml_pgml_parse_hazards", "default_enabled": True},
+	{"id": "pgml_modes_in_inline", "default_enabled": True},
+	{"id": "pgml_modes_tex_payload", "default_enabled": True},
+	{"id": "pgml_modes_html_plain_text", "default_enabled": True},
+	{"id": "pgml_inline_pgml_syntax", "default_enabled": True},
+	{"id": "pgml_inline_braces", "default_enabled": True},
+	{"id": "pgml_blanks", "default_enabled": True, "provides": ("pgml_blank_vars", "pgml_blank_spans")},
+	{"id": "pgml_underscore_emphasis", "default_enabled": True},
+	{"id": "pgml_brackets", "default_enabled": False},
+	{"id": "pgml_blank_assignments", "default_enabled": True, "requires": ("pgml_blank_vars",)},
+	{"id": "pgml_line_length", "default_enabled": True},
+	{"id": "pgml_blob_payloads", "default_enabled": True},
+	{"id": "pgml_label_dot", "default_enabled": True},
+	{"id": "pgml_ans_style", "default_enabled": True},
+	{"id": "pgml_text_blocks", "default_enabled": True},
+	{"id": "pgml_html_in_text", "default_enabled": True},
+	{"id": "pgml_nbsp", "default_enabled": True},
+	{"id": "pgml_mojibake", "default_enabled": True},
+	{"id": "pgml_tex_color", "default_enabled": True},
+	{"id": "pgml_html_policy", "default_enabled": True},
+	{"id": "pgml_html_forbidden_tags", "default_enabled": True},
+	{"id": "pgml_html_div", "default_enabled": True},
+	{"id": "pgml_span_interpolation", "default_enabled": True},
+	{"id": "pgml_html_var_passthrough", "default_enabled": True},
+	{"id": "pgml_pgml_wrapper_in_string", "default_enabled": True},
+	{"id": "pgml_style_string_quotes", "default_enabled": True},
+	{"id": "pgml_tag_wrapper_tex", "default_enabled": True},
+	{"id": "pgml_ans_rule", "default_enabled": True},
+	{"id": "pgml_br_variable", "default_enabled": True},
+	{"id": "pgml_modes_html_escape", "default_enabled": True},
+	{"id": "pgml_old_answer_checkers", "default_enabled": True},
+	{"id": "pgml_solution_hint_macros", "default_enabled": True},
+)
+
+BUILTIN_PLUGINS = [f"pgml_lint.plugins.{entry['id']}" for entry in PLUGIN_MANIFEST]
@@ -2,6 +2,7 @@
 import re
 
 # Local modules
+import pgml_lint.parser
 import pgml_lint.pg_version
 
 DROPDOWN_COMPAT_RX = re.compile(
@@ -10,10 +11,52 @@ DROPDOWN_COMPAT_RX = re.compile(
 )
 
 
+# Rule patterns of the form \bName\s*\( or \b(?:A|B)\s*\( are plain call lookups
+CALL_RULE_RX = re.compile(
+	r"\\b(?:\(\?:(?P<names>[A-Za-z_][A-Za-z0-9_]*(?:\|[A-Za-z_][A-Za-z0-9_]*)*)\)|(?P<name>[A-Za-z_][A-Za-z0-9_]*))\\s\*\\\("
+)
+
 PLUGIN_ID = "macro_rules"
 PLUGIN_NAME = "Macro rule coverage"
 DEFAULT_ENABLED = True
 
+# Pattern text -> call names tuple or compiled regex
+_RULE_MATCHERS: dict[str, object] = {}
+
+
+#============================================
+
+
+def _rule_matcher(pattern: str) -> object:
+	"""
+	Return the call names a rule pattern looks up, or its compiled regex.
+	"""
+	matcher = _RULE_MATCHERS.get(pattern)
+	if matcher is not None:
+		return matcher
+	match = CALL_RULE_RX.fullmatch(pattern)
+	if match is None:
+		matcher = re.compile(pattern)
+	elif match.group("names") is not None:
+		matcher = tuple(match.group("names").split("|"))
+	else:
+		matcher = (match.group("name"),)
+	_RULE_MATCHERS[pattern] = matcher
+	return matcher
+
+
+#============================================
+
+
+def _rule_matches(pattern: str, text: str, call_index: dict[str, list[int]]) -> bool:
+	"""
+	Return True when a rule pattern occurs in text.
+	"""
+	matcher = _rule_matcher(pattern)
+	if isinstance(matcher, tuple):
+		return any(name in call_index for name in matcher)
+	return matcher.search(text) is not None
+
 
 #============================================
 
@@ -35,24 +78,28 @@ def run(context: dict[str, object]) -> list[dict[str, object]]:
 	pg_version_raw = pgml_lint.pg_version.normalize_pg_version(
 		context.get("pg_version")
 	)
-	dropdown_compat = bool(DROPDOWN_COMPAT_RX.search(text))
 	pg_version_tuple = None
 	try:
 		pg_version_tuple = pgml_lint.pg_version.parse_pg_version(pg_version_raw)
 	except ValueError:
 		pg_version_tuple = None
 
-	should_check_macros = bool(macros_loaded) or re.search(r"\bDOCUMENT\s*\(\s*\)", text)
+	call_index = pgml_lint.parser.call_index_for(context)
+	should_check_macros = bool(macros_loaded) or pgml_lint.parser.has_empty_call(
+		text, call_index, "DOCUMENT"
+	)
 	if not should_check_macros:
 		return issues
 
+	dropdown_compat = None
+
 	for rule in rules:
 		label = str(rule.get("label", ""))
 		pattern = str(rule.get("pattern", ""))
 		min_pg_version = rule.get("min_pg_version")
 		max_pg_version = rule.get("max_pg_version")
 		required_macros = [macro.lower() for macro in rule.get("required_macros", [])]
-		if re.search(pattern, text) is None:
+		if not _rule_matches(pattern, text, call_index):
 			continue
 		if pg_version_tuple is not None:
 			min_tuple = None
@@ -72,8 +119,11 @@ def run(context: dict[str, object]) -> list[dict[str, object]]:
 				except ValueError:
 					max_tuple = None
 			if min_tuple is not None and pg_version_tuple < min_tuple:
-				if label == "DropDown" and dropdown_compat:
-					continue
+				if label == "DropDown":
+					if dropdown_compat is None:
+						dropdown_compat = bool(DROPDOWN_COMPAT_RX.search(text))
+					if dropdown_compat:
+						continue
 				label_text = label if label else "Function"
 				message = (
 					f"{label_text} requires PG {min_pg_version}+ "
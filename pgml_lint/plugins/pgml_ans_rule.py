@@ -7,6 +7,8 @@ import pgml_lint.parser
 PLUGIN_ID = "pgml_ans_rule"
 PLUGIN_NAME = "Legacy ans_rule() function"
 DEFAULT_ENABLED = True
+TRIGGERS = ("ans_rule",)
+SEGMENT_LOCAL = True
 
 # Pattern to match ans_rule() and related functions
 ANS_RULE_RX = re.compile(r'\bans_rule\s*\(')
@@ -30,8 +32,11 @@ def run(context: dict[str, object]) -> list[dict[str, object]]:
 	"""
 	issues: list[dict[str, object]] = []
 	stripped_text = str(context.get("stripped_text", ""))
-	newlines_obj = context.get("newlines", [])
-	newlines = list(newlines_obj) if isinstance(newlines_obj, list) else []
+	if not ANS_RULE_RX.search(stripped_text):
+		return issues
+	# Stripping keeps every line but shortens them, so offsets into
+	# stripped_text need its own newline index, not the raw text's
+	newlines = pgml_lint.parser.build_newline_index(stripped_text)
 
 	# Find all ans_rule() calls
 	for match in ANS_RULE_RX.finditer(stripped_text):
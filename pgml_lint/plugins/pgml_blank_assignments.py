@@ -1,6 +1,8 @@
 PLUGIN_ID = "pgml_blank_assignments"
 PLUGIN_NAME = "PGML blank assignments"
 DEFAULT_ENABLED = True
+# Written by pgml_blanks, which the registry schedules first
+REQUIRES = ("pgml_blank_vars",)
 
 
 #============================================
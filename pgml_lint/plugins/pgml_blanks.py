@@ -5,6 +5,10 @@ import pgml_lint.pgml
 PLUGIN_ID = "pgml_blanks"
 PLUGIN_NAME = "PGML blank specs"
 DEFAULT_ENABLED = True
+# Context keys this plugin writes for later plugins; pgml_blank_spans is read
+# only by outside plugins and is part of the public plugin contract
+PROVIDES = ("pgml_blank_vars", "pgml_blank_spans")
+TRIGGER_FIELDS = ("pgml_regions",)
 
 
 #============================================
@@ -21,39 +25,14 @@ def run(context: dict[str, object]) -> list[dict[str, object]]:
 		list[dict[str, object]]: Issue list.
 	"""
 	issues: list[dict[str, object]] = []
-	regions = context.get("pgml_regions", [])
-	text = str(context.get("text", ""))
-	newlines = context.get("newlines", [])
-	inline_spans_by_region = context.get("pgml_inline_spans", [])
 
 	blank_vars: set[str] = set()
 	blank_spans_by_region: list[list[tuple[int, int]]] = []
 
-	for idx, region in enumerate(regions):
-		start = int(region.get("start", 0))
-		end = int(region.get("end", 0))
-		block_text = text[start:end]
-
-		inline_spans: list[tuple[int, int]] = []
-		if idx < len(inline_spans_by_region):
-			inline_spans = inline_spans_by_region[idx]
-		else:
-			inline_issues, inline_spans = pgml_lint.pgml.extract_inline_spans(
-				block_text,
-				start,
-				newlines,
-			)
-			issues.extend(inline_issues)
-
-		blank_issues, vars_found, blank_spans = pgml_lint.pgml.scan_pgml_blanks(
-			block_text,
-			start,
-			newlines,
-			inline_spans,
-		)
-		issues.extend(blank_issues)
-		blank_vars.update(vars_found)
-		blank_spans_by_region.append(blank_spans)
+	for block in pgml_lint.pgml.blocks_for(context):
+		issues.extend(block.blank_issues)
+		blank_vars.update(pgml_lint.pgml.blank_spec_vars(block.blanks))
+		blank_spans_by_region.append(block.relative(block.blank_spans))
 
 	context["pgml_blank_vars"] = blank_vars
 	context["pgml_blank_spans"] = blank_spans_by_region
@@ -7,6 +7,7 @@ import pgml_lint.parser
 PLUGIN_ID = "pgml_blob_payloads"
 PLUGIN_NAME = "Embedded blob payloads"
 DEFAULT_ENABLED = True
+SEGMENT_LOCAL = True
 
 BASE64_RX = re.compile(r"[A-Za-z0-9+/]{800,}={0,2}")
 
@@ -7,6 +7,7 @@ import pgml_lint.parser
 PLUGIN_ID = "pgml_br_variable"
 PLUGIN_NAME = "Legacy $BR variable"
 DEFAULT_ENABLED = True
+TRIGGERS = ("$BR",)
 
 # Pattern to match $BR variable (not in strings)
 BR_VAR_RX = re.compile(r'\$BR\b')
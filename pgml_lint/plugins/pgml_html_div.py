@@ -2,12 +2,17 @@
 import re
 
 # Local modules
+import pgml_lint.diff_scope
 import pgml_lint.parser
 import pgml_lint.pg_version
 
 PLUGIN_ID = "pgml_html_div"
 PLUGIN_NAME = "HTML div tags in PGML"
 DEFAULT_ENABLED = True
+SEGMENT_LOCAL = True
+# ESCAPED_DIV_RX also matches &lt;div without a literal <
+TRIGGERS = ("<", "&lt;")
+TRIGGER_FIELDS = ("pgml_block_regions",)
 
 DIV_TAG_RX = re.compile(r"<\s*/?\s*div\b", re.IGNORECASE)
 ESCAPED_DIV_RX = re.compile(r"&lt;\s*/?\s*div\b", re.IGNORECASE)
@@ -56,6 +61,8 @@ def run(context: dict[str, object]) -> list[dict[str, object]]:
 		end = region.get("end")
 		if not isinstance(start, int) or not isinstance(end, int):
 			continue
+		if not pgml_lint.diff_scope.span_in_scope(context, start, end):
+			continue
 
 		region_text = text[start:end]
 
@@ -2,11 +2,15 @@
 import re
 
 # Local modules
+import pgml_lint.diff_scope
 import pgml_lint.parser
 
 PLUGIN_ID = "pgml_html_forbidden_tags"
 PLUGIN_NAME = "Forbidden HTML tags in PGML"
 DEFAULT_ENABLED = True
+TRIGGERS = ("<",)
+TRIGGER_FIELDS = ("pgml_block_regions",)
+SEGMENT_LOCAL = True
 
 FORBIDDEN_TAGS = {
 	"table": "use DataTable() or LayoutTable() from niceTables.pl",
@@ -58,6 +62,8 @@ def run(context: dict[str, object]) -> list[dict[str, object]]:
 		end = region.get("end")
 		if not isinstance(start, int) or not isinstance(end, int):
 			continue
+		if not pgml_lint.diff_scope.span_in_scope(context, start, end):
+			continue
 
 		region_text = text[start:end]
 		for match in TAG_RX.finditer(region_text):
@@ -3,10 +3,14 @@ import re
 
 # Local modules
 import pgml_lint.parser
+import pgml_lint.pgml
 
 PLUGIN_ID = "pgml_html_in_text"
 PLUGIN_NAME = "Raw HTML in PGML text"
 DEFAULT_ENABLED = True
+TRIGGERS = ("<", "&")
+TRIGGER_FIELDS = ("pgml_block_regions",)
+SEGMENT_LOCAL = True
 
 # HTML tags that are problematic in PGML text
 PROBLEMATIC_TAGS = {
@@ -59,59 +63,17 @@ def run(context: dict[str, object]) -> list[dict[str, object]]:
 	newlines_obj = context.get("newlines", [])
 	newlines = list(newlines_obj) if isinstance(newlines_obj, list) else []
 
-	# Get PGML regions (BEGIN_PGML...END_PGML blocks)
-	pgml_block_regions_obj = context.get("pgml_block_regions", [])
-	pgml_block_regions = (
-		list(pgml_block_regions_obj)
-		if isinstance(pgml_block_regions_obj, list)
-		else []
-	)
-
-	# Get inline code spans to exclude them (HTML is allowed in [@ @]*)
-	# pgml_inline_spans is a list of lists (one per region)
-	inline_spans_by_region_obj = context.get("pgml_inline_spans", [])
-	inline_spans_by_region = (
-		list(inline_spans_by_region_obj)
-		if isinstance(inline_spans_by_region_obj, list)
-		else []
-	)
-
-	for region_idx, region in enumerate(pgml_block_regions):
-		if not isinstance(region, dict):
-			continue
-
-		start = region.get("start")
-		end = region.get("end")
-		if not isinstance(start, int) or not isinstance(end, int):
-			continue
-
-		region_text = text[start:end]
-
-		# Get inline spans for this specific region
-		region_inline_spans: list[tuple[int, int]] = []
-		if region_idx < len(inline_spans_by_region):
-			spans_obj = inline_spans_by_region[region_idx]
-			if isinstance(spans_obj, list):
-				region_inline_spans = spans_obj
-
-		# Build a mask for inline code spans within this region
-		# Note: spans are relative to region_text, not absolute positions
-		mask = [False] * len(region_text)
-		for span in region_inline_spans:
-			if not isinstance(span, tuple) or len(span) != 2:
-				continue
-			span_start, span_end = span
-
-			# Spans are already relative to the region
-			for i in range(span_start, min(span_end, len(mask))):
-				mask[i] = True
+	# Only BEGIN_PGML...END_PGML blocks; HTML is allowed in [@ @]* inline code
+	for block in pgml_lint.pgml.blocks_for(context, heredocs=False):
+		start = block.start
+		region_text = text[start : block.end]
 
 		# Check for problematic HTML tags (opening tags only, not closing tags)
 		# Match <tag> or <tag attr="val"> but not </tag>
 		tag_rx = re.compile(r'<([a-zA-Z]\w*)(?:\s[^>]*)?>|</([a-zA-Z]\w*)>')
 		for match in tag_rx.finditer(region_text):
 			# Skip if inside inline code span
-			if match.start() < len(mask) and mask[match.start()]:
+			if block.inline_index.contains(start + match.start()):
 				continue
 
 			# Only check opening tags (group 1), not closing tags (group 2)
@@ -132,7 +94,7 @@ def run(context: dict[str, object]) -> list[dict[str, object]]:
 		# Check for HTML entities
 		for match in HTML_ENTITY_RX.finditer(region_text):
 			# Skip if inside inline code span
-			if match.start() < len(mask) and mask[match.start()]:
+			if block.inline_index.contains(start + match.start()):
 				continue
 
 			entity = match.group(0)
@@ -147,7 +109,7 @@ def run(context: dict[str, object]) -> list[dict[str, object]]:
 		# Check for tex2jax_ignore class usage
 		for match in TEX2JAX_CLASS_RX.finditer(region_text):
 			# Skip if inside inline code span
-			if match.start() < len(mask) and mask[match.start()]:
+			if block.inline_index.contains(start + match.start()):
 				continue
 
 			line = pgml_lint.parser.pos_to_line(newlines, start + match.start())
@@ -2,11 +2,14 @@
 import re
 
 # Local modules
+import pgml_lint.lexer
 import pgml_lint.parser
 
 PLUGIN_ID = "pgml_html_policy"
 PLUGIN_NAME = "HTML policy checks"
 DEFAULT_ENABLED = True
+# The tex2jax_ignore class check does not need a tag on the same line
+TRIGGERS = ("<", "&lt;", "tex2jax_ignore")
 
 TAG_RULES = {
 	"script": "ERROR",
@@ -65,47 +68,6 @@ def _in_region(pos: int, regions: list[dict[str, object]]) -> bool:
 #============================================
 
 
-def _mask_strings(line: str) -> list[bool]:
-	"""
-	Return a mask indicating which positions are inside strings.
-	"""
-	mask = [False] * len(line)
-	in_sq = False
-	in_dq = False
-	escape = False
-	for idx, ch in enumerate(line):
-		if escape:
-			mask[idx] = True
-			escape = False
-			continue
-		if ch == "\\":
-			mask[idx] = True
-			escape = True
-			continue
-		if in_sq:
-			mask[idx] = True
-			if ch == "'":
-				in_sq = False
-			continue
-		if in_dq:
-			mask[idx] = True
-			if ch == '"':
-				in_dq = False
-			continue
-		if ch == "'":
-			mask[idx] = True
-			in_sq = True
-			continue
-		if ch == '"':
-			mask[idx] = True
-			in_dq = True
-			continue
-	return mask
-
-
-#============================================
-
-
 def run(context: dict[str, object]) -> list[dict[str, object]]:
 	"""
 	Warn on disallowed HTML tags outside PGML-safe paths.
@@ -135,19 +97,19 @@ def run(context: dict[str, object]) -> list[dict[str, object]]:
 		issue = {"severity": "WARNING", "message": message, "line": line}
 		issues.append(issue)
 
-	for line_num, line in enumerate(text.splitlines(), start=1):
-		mask = _mask_strings(line)
-		for match in PGML_WRAPPER_TAG_RX.finditer(line):
-			if match.start() < len(mask) and mask[match.start()]:
-				continue
-			tag = match.group(1).lower()
-			if tag not in TAG_RULES:
-				continue
-			message = (
-				f"PGML tag wrapper uses <{tag}> which is disallowed or sanitized in this install"
-			)
-			issue = {"severity": TAG_RULES[tag], "message": message, "line": line_num}
-			issues.append(issue)
+	tokens = pgml_lint.lexer.tokens_for(context, "stripped_text")
+	for match in PGML_WRAPPER_TAG_RX.finditer(text):
+		if tokens.in_string(match.start()):
+			continue
+		tag = match.group(1).lower()
+		if tag not in TAG_RULES:
+			continue
+		line = tokens.line_of(match.start())
+		message = (
+			f"PGML tag wrapper uses <{tag}> which is disallowed or sanitized in this install"
+		)
+		issue = {"severity": TAG_RULES[tag], "message": message, "line": line}
+		issues.append(issue)
 
 	for match in TAG_RX.finditer(text):
 		tag = match.group(1).lower()
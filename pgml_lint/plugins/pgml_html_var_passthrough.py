@@ -8,6 +8,8 @@ import pgml_lint.pgml
 PLUGIN_ID = "pgml_html_var_passthrough"
 PLUGIN_NAME = "HTML variables without PGML passthrough"
 DEFAULT_ENABLED = True
+TRIGGERS = ("<",)
+TRIGGER_FIELDS = ("pgml_block_regions",)
 
 HTML_ASSIGN_RX = re.compile(
 	r"\$([A-Za-z_][A-Za-z0-9_]*)\s*(?:\.=|=)\s*[^;]*<\s*"
@@ -44,74 +46,31 @@ def run(context: dict[str, object]) -> list[dict[str, object]]:
 	"""
 	issues: list[dict[str, object]] = []
 	text = str(context.get("text", ""))
-	newlines_obj = context.get("newlines", [])
-	newlines = list(newlines_obj) if isinstance(newlines_obj, list) else []
 
 	vars_with_html = _find_html_vars(text)
 	if not vars_with_html:
 		return issues
 
-	pgml_block_regions_obj = context.get("pgml_block_regions", [])
-	pgml_block_regions = (
-		list(pgml_block_regions_obj)
-		if isinstance(pgml_block_regions_obj, list)
-		else []
-	)
-
-	inline_spans_by_region_obj = context.get("pgml_inline_spans", [])
-	inline_spans_by_region = (
-		list(inline_spans_by_region_obj)
-		if isinstance(inline_spans_by_region_obj, list)
-		else []
-	)
-
 	used_with_star: set[str] = set()
 	used_without_star: set[str] = set()
 	used_in_inline: set[str] = set()
 
-	for region_idx, region in enumerate(pgml_block_regions):
-		if not isinstance(region, dict):
-			continue
-		start = region.get("start")
-		end = region.get("end")
-		if not isinstance(start, int) or not isinstance(end, int):
-			continue
-
-		region_text = text[start:end]
-
-		region_inline_spans: list[tuple[int, int]] = []
-		if region_idx < len(inline_spans_by_region):
-			spans_obj = inline_spans_by_region[region_idx]
-			if isinstance(spans_obj, list):
-				region_inline_spans = spans_obj
-		else:
-			inline_issues, inline_spans = pgml_lint.pgml.extract_inline_spans(
-				region_text,
-				start,
-				newlines,
-			)
-			issues.extend(inline_issues)
-			region_inline_spans = inline_spans
-
-		mask = [False] * len(region_text)
-		for span_start, span_end in region_inline_spans:
-			for idx in range(span_start, min(span_end, len(mask))):
-				mask[idx] = True
-			inline_text = region_text[span_start + 2 : span_end - 2]
+	for block in pgml_lint.pgml.blocks_for(context, heredocs=False):
+		for span_start, span_end in block.inline_spans:
+			inline_text = text[span_start + 2 : span_end - 2]
 			for name in vars_with_html:
 				pattern = r"\$" + re.escape(name) + r"\b"
 				if re.search(pattern, inline_text):
 					used_in_inline.add(name)
 
-		for name in vars_with_html:
-			pattern = re.compile(r"\[\s*\$" + re.escape(name) + r"\s*\](\*)?")
-			for match in pattern.finditer(region_text):
-				if match.start() < len(mask) and mask[match.start()]:
-					continue
-				if match.group(1):
-					used_with_star.add(name)
-				else:
-					used_without_star.add(name)
+		for interpolation in block.interpolations:
+			name = str(interpolation["name"])
+			if name not in vars_with_html:
+				continue
+			if interpolation["star"]:
+				used_with_star.add(name)
+			else:
+				used_without_star.add(name)
 
 	for name, line in vars_with_html.items():
 		if name in used_with_star or name in used_in_inline:
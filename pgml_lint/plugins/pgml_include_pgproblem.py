@@ -7,6 +7,7 @@ import pgml_lint.parser
 PLUGIN_ID = "pgml_include_pgproblem"
 PLUGIN_NAME = "includePGproblem usage"
 DEFAULT_ENABLED = True
+TRIGGERS = ("includePGproblem",)
 
 INCLUDE_RX = re.compile(r"\bincludePGproblem\s*\(")
 
@@ -5,6 +5,11 @@ import pgml_lint.pgml
 PLUGIN_ID = "pgml_inline"
 PLUGIN_NAME = "PGML inline markers"
 DEFAULT_ENABLED = True
+# Context keys this plugin writes for later plugins; pgml_inline_spans is read
+# only by outside plugins and is part of the public plugin contract
+PROVIDES = ("pgml_inline_spans",)
+TRIGGER_FIELDS = ("pgml_regions",)
+SEGMENT_LOCAL = True
 
 
 #============================================
@@ -21,22 +26,15 @@ def run(context: dict[str, object]) -> list[dict[str, object]]:
 		list[dict[str, object]]: Issue list.
 	"""
 	issues: list[dict[str, object]] = []
-	regions = context.get("pgml_regions", [])
-	text = str(context.get("text", ""))
-	newlines = context.get("newlines", [])
 
+	for block in pgml_lint.pgml.blocks_for(context):
+		issues.extend(block.inline_issues)
+
+	# Region-relative spans for outside plugins, one entry per pgml_regions
+	# item even under a --diff scope so the lists stay aligned
 	inline_spans_by_region: list[list[tuple[int, int]]] = []
-	for region in regions:
-		start = int(region.get("start", 0))
-		end = int(region.get("end", 0))
-		block_text = text[start:end]
-		inline_issues, inline_spans = pgml_lint.pgml.extract_inline_spans(
-			block_text,
-			start,
-			newlines,
-		)
-		issues.extend(inline_issues)
-		inline_spans_by_region.append(inline_spans)
+	for block in pgml_lint.pgml.blocks_for(context, scoped=False):
+		inline_spans_by_region.append(block.relative(block.inline_spans))
 
 	context["pgml_inline_spans"] = inline_spans_by_region
 	return issues
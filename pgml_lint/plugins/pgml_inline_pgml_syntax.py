@@ -8,6 +8,8 @@ import pgml_lint.pgml
 PLUGIN_ID = "pgml_inline_pgml_syntax"
 PLUGIN_NAME = "PGML syntax inside inline code"
 DEFAULT_ENABLED = True
+TRIGGER_FIELDS = ("pgml_block_regions",)
+SEGMENT_LOCAL = True
 
 FORBIDDEN_SNIPPETS = [
 	("[<", "PGML tag wrapper token '[<' found inside [@ @] block"),
@@ -39,51 +41,14 @@ def run(context: dict[str, object]) -> list[dict[str, object]]:
 	newlines_obj = context.get("newlines", [])
 	newlines = list(newlines_obj) if isinstance(newlines_obj, list) else []
 
-	pgml_block_regions_obj = context.get("pgml_block_regions", [])
-	pgml_block_regions = (
-		list(pgml_block_regions_obj)
-		if isinstance(pgml_block_regions_obj, list)
-		else []
-	)
-
-	inline_spans_by_region_obj = context.get("pgml_inline_spans", [])
-	inline_spans_by_region = (
-		list(inline_spans_by_region_obj)
-		if isinstance(inline_spans_by_region_obj, list)
-		else []
-	)
-
-	for region_idx, region in enumerate(pgml_block_regions):
-		if not isinstance(region, dict):
-			continue
-		start = region.get("start")
-		end = region.get("end")
-		if not isinstance(start, int) or not isinstance(end, int):
-			continue
-
-		region_text = text[start:end]
-
-		region_inline_spans: list[tuple[int, int]] = []
-		if region_idx < len(inline_spans_by_region):
-			spans_obj = inline_spans_by_region[region_idx]
-			if isinstance(spans_obj, list):
-				region_inline_spans = spans_obj
-		else:
-			inline_issues, inline_spans = pgml_lint.pgml.extract_inline_spans(
-				region_text,
-				start,
-				newlines,
-			)
-			issues.extend(inline_issues)
-			region_inline_spans = inline_spans
-
-		for span_start, span_end in region_inline_spans:
+	for block in pgml_lint.pgml.blocks_for(context, heredocs=False):
+		for span_start, span_end in block.inline_spans:
 			code_start = span_start + 2
 			code_end = max(span_start + 2, span_end - 2)
-			if code_start >= len(region_text):
+			if code_start >= block.end:
 				continue
-			code = region_text[code_start:code_end]
-			base_offset = start + code_start
+			code = text[code_start:code_end]
+			base_offset = code_start
 			seen_snippets: set[str] = set()
 			seen_interpolations: set[str] = set()
 
@@ -7,6 +7,8 @@ import pgml_lint.parser
 PLUGIN_ID = "pgml_label_dot"
 PLUGIN_NAME = "PGML label dot list trap"
 DEFAULT_ENABLED = True
+TRIGGERS = ("chr",)
+SEGMENT_LOCAL = True
 
 LABEL_DOT_RX = re.compile(
 	r"chr\s*\(\s*65\s*\+\s*\$[A-Za-z_][A-Za-z0-9_]*\s*\)\s*\.\s*(['\"])"
@@ -4,6 +4,7 @@ import pgml_lint.parser
 PLUGIN_ID = "pgml_line_length"
 PLUGIN_NAME = "Extreme line length"
 DEFAULT_ENABLED = True
+SEGMENT_LOCAL = True
 
 WARN_THRESHOLD = 200
 ERROR_THRESHOLD = 400
@@ -2,7 +2,7 @@
 import re
 
 # Local modules
-import pgml_lint.parser
+import pgml_lint.lexer
 
 PLUGIN_ID = "pgml_loadmacros_integrity"
 PLUGIN_NAME = "loadMacros integrity checks"
@@ -16,110 +16,53 @@ MISSING_COMMA_RX = re.compile(r"(['\"][^'\"]+['\"])\s+(['\"][^'\"]+['\"])")
 #============================================
 
 
-def _mask_strings(line: str) -> list[bool]:
+def _check_macro_list(block_text: str, line: int) -> list[dict[str, object]]:
 	"""
-	Return a mask indicating which positions are inside strings.
+	Check the text between loadMacros( and its closing paren.
 	"""
-	mask = [False] * len(line)
-	in_sq = False
-	in_dq = False
-	escape = False
-	for idx, ch in enumerate(line):
-		if escape:
-			mask[idx] = True
-			escape = False
-			continue
-		if ch == "\\":
-			mask[idx] = True
-			escape = True
-			continue
-		if in_sq:
-			mask[idx] = True
-			if ch == "'":
-				in_sq = False
-			continue
-		if in_dq:
-			mask[idx] = True
-			if ch == '"':
-				in_dq = False
-			continue
-		if ch == "'":
-			mask[idx] = True
-			in_sq = True
-			continue
-		if ch == '"':
-			mask[idx] = True
-			in_dq = True
-			continue
-	return mask
+	issues: list[dict[str, object]] = []
+	if SMART_QUOTES_RX.search(block_text):
+		message = "loadMacros() contains smart quotes"
+		issue = {"severity": "ERROR", "message": message, "line": line}
+		issues.append(issue)
+	trimmed = block_text.strip()
+	if trimmed == "":
+		message = "loadMacros() has an empty macro list"
+		issue = {"severity": "ERROR", "message": message, "line": line}
+		issues.append(issue)
+	if MISSING_COMMA_RX.search(block_text):
+		message = "loadMacros() entries appear to be missing a comma"
+		issue = {"severity": "ERROR", "message": message, "line": line}
+		issues.append(issue)
+	return issues
 
 
 #============================================
 
 
-def _find_loadmacros_open(line: str) -> int | None:
+def _has_trailing_semicolon(tokens: pgml_lint.lexer.LexedCode, close_idx: int) -> bool:
 	"""
-	Locate the '(' after loadMacros outside strings.
-	"""
-	mask = _mask_strings(line)
-	for match in LOADMACROS_RX.finditer(line):
-		if mask[match.start()]:
-			continue
-		return match.end() - 1
-	return None
-
-
-#============================================
-
+	Return True when a semicolon follows the closing paren.
 
-def _scan_parens(line: str, start_idx: int, depth: int) -> tuple[int, int]:
+	The semicolon may sit later on the same line or start the next
+	non-blank line; comments are ignored.
 	"""
-	Scan a line and update paren depth, returning closing index if found.
-	"""
-	in_sq = False
-	in_dq = False
-	escape = False
-	i = start_idx
-	while i < len(line):
-		ch = line[i]
-		if escape:
-			escape = False
-			i += 1
-			continue
-		if ch == "\\":
-			escape = True
-			i += 1
-			continue
-		if in_sq:
-			if ch == "'":
-				in_sq = False
-			i += 1
-			continue
-		if in_dq:
-			if ch == '"':
-				in_dq = False
-			i += 1
-			continue
-		if ch == "'":
-			in_sq = True
-			i += 1
-			continue
-		if ch == '"':
-			in_dq = True
-			i += 1
-			continue
-		if ch == "(":
-			depth += 1
-			i += 1
-			continue
-		if ch == ")":
-			depth -= 1
-			if depth == 0:
-				return depth, i
-			i += 1
-			continue
-		i += 1
-	return depth, -1
+	text = tokens.text
+	line_end = text.find("\n", close_idx)
+	if line_end == -1:
+		return True
+	if ";" in tokens.code_text(close_idx + 1, line_end):
+		return True
+	start = line_end + 1
+	while start < len(text):
+		end = text.find("\n", start)
+		if end == -1:
+			end = len(text)
+		stripped = tokens.code_text(start, end).strip()
+		if stripped != "":
+			return stripped.startswith(";")
+		start = end + 1
+	return True
 
 
 #============================================
@@ -130,94 +73,25 @@ def run(context: dict[str, object]) -> list[dict[str, object]]:
 	Validate loadMacros(...) syntax and common pitfalls.
 	"""
 	issues: list[dict[str, object]] = []
-	text = str(context.get("text", ""))
-
-	lines = text.splitlines()
-	in_load = False
-	load_start_line = 0
-	block_lines: list[str] = []
-	depth = 0
-	pending_semicolon_check = None
-
-	for idx, line in enumerate(lines, start=1):
-		clean = pgml_lint.parser._strip_line_comment_preserving_strings(line)
-
-		if pending_semicolon_check is not None:
-			stripped = clean.strip()
-			if stripped == "":
-				continue
-			if stripped.startswith(";"):
-				pending_semicolon_check = None
-				continue
-			message = "loadMacros() missing trailing semicolon"
-			issue = {
-				"severity": "ERROR",
-				"message": message,
-				"line": pending_semicolon_check,
-			}
-			issues.append(issue)
-			pending_semicolon_check = None
-
-		if not in_load:
-			open_idx = _find_loadmacros_open(clean)
-			if open_idx is None:
-				continue
-			in_load = True
-			load_start_line = idx
-			block_lines = []
-			depth = 1
-			segment = clean[open_idx + 1 :]
-			block_lines.append(segment)
-			depth, close_idx = _scan_parens(clean, open_idx + 1, depth)
-			if close_idx != -1:
-				in_load = False
-				block_lines[-1] = clean[open_idx + 1 : close_idx]
-				remainder = clean[close_idx + 1 :]
-				if ";" not in remainder:
-					pending_semicolon_check = idx
-				block_text = "\n".join(block_lines)
-				if SMART_QUOTES_RX.search(block_text):
-					message = "loadMacros() contains smart quotes"
-					issue = {"severity": "ERROR", "message": message, "line": idx}
-					issues.append(issue)
-				trimmed = block_text.strip()
-				if trimmed == "":
-					message = "loadMacros() has an empty macro list"
-					issue = {"severity": "ERROR", "message": message, "line": idx}
-					issues.append(issue)
-				if MISSING_COMMA_RX.search(block_text):
-					message = "loadMacros() entries appear to be missing a comma"
-					issue = {"severity": "ERROR", "message": message, "line": idx}
-					issues.append(issue)
-			continue
+	text = str(context.get("stripped_text", ""))
+	tokens = pgml_lint.lexer.tokens_for(context, "stripped_text")
 
-		block_lines.append(clean)
-		depth, close_idx = _scan_parens(clean, 0, depth)
-		if close_idx == -1:
+	for match in LOADMACROS_RX.finditer(text):
+		if not tokens.is_code(match.start()):
 			continue
-		in_load = False
-		block_lines[-1] = clean[:close_idx]
-		remainder = clean[close_idx + 1 :]
-		if ";" not in remainder:
-			pending_semicolon_check = idx
-		block_text = "\n".join(block_lines)
-		if SMART_QUOTES_RX.search(block_text):
-			message = "loadMacros() contains smart quotes"
-			issue = {"severity": "ERROR", "message": message, "line": idx}
-			issues.append(issue)
-		trimmed = block_text.strip()
-		if trimmed == "":
-			message = "loadMacros() has an empty macro list"
-			issue = {"severity": "ERROR", "message": message, "line": idx}
+		open_idx = match.end() - 1
+		close_idx = tokens.matching_close(open_idx)
+		if close_idx is None:
+			message = "loadMacros() missing closing parenthesis"
+			issue = {"severity": "ERROR", "message": message, "line": tokens.line_of(open_idx)}
 			issues.append(issue)
-		if MISSING_COMMA_RX.search(block_text):
-			message = "loadMacros() entries appear to be missing a comma"
-			issue = {"severity": "ERROR", "message": message, "line": idx}
+			continue
+		close_line = tokens.line_of(close_idx)
+		block_text = tokens.code_text(open_idx + 1, close_idx)
+		issues.extend(_check_macro_list(block_text, close_line))
+		if not _has_trailing_semicolon(tokens, close_idx):
+			message = "loadMacros() missing trailing semicolon"
+			issue = {"severity": "ERROR", "message": message, "line": close_line}
 			issues.append(issue)
 
-	if in_load:
-		message = "loadMacros() missing closing parenthesis"
-		issue = {"severity": "ERROR", "message": message, "line": load_start_line}
-		issues.append(issue)
-
 	return issues
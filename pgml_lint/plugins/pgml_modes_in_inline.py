@@ -2,6 +2,7 @@
 import re
 
 # Local modules
+import pgml_lint.lexer
 import pgml_lint.parser
 import pgml_lint.pgml
 import pgml_lint.pg_version
@@ -9,6 +10,9 @@ import pgml_lint.pg_version
 PLUGIN_ID = "pgml_modes_in_inline"
 PLUGIN_NAME = "MODES inside inline eval blocks"
 DEFAULT_ENABLED = True
+TRIGGERS = ("MODES",)
+TRIGGER_FIELDS = ("pgml_regions",)
+SEGMENT_LOCAL = True
 
 MODES_RX = re.compile(r"\bMODES\s*\(")
 TEX_EMPTY_RX = re.compile(r"\bTeX\s*=>\s*(['\"])\s*\1")
@@ -29,69 +33,14 @@ ALLOWED_HTML_TAGS = (
 #============================================
 
 
-def _extract_paren_payload(text: str, start: int) -> tuple[str, int] | None:
-	"""
-	Extract a balanced parenthesis payload starting at start.
-	"""
-	if start >= len(text) or text[start] != "(":
-		return None
-	depth = 0
-	in_sq = False
-	in_dq = False
-	escape = False
-	for i in range(start, len(text)):
-		ch = text[i]
-		if escape:
-			escape = False
-			continue
-		if ch == "\\":
-			escape = True
-			continue
-		if in_sq:
-			if ch == "'":
-				in_sq = False
-			continue
-		if in_dq:
-			if ch == '"':
-				in_dq = False
-			continue
-		if ch == "'":
-			in_sq = True
-			continue
-		if ch == '"':
-			in_dq = True
-			continue
-		if ch == "(":
-			depth += 1
-			continue
-		if ch == ")":
-			depth -= 1
-			if depth == 0:
-				return text[start + 1 : i], i + 1
-	return None
-
-
-#============================================
-
-
 def _iter_modes_args(text: str) -> list[str]:
 	"""
 	Extract MODES() argument payloads from text.
 	"""
+	tokens = pgml_lint.lexer.lex_perl(text)
 	payloads: list[str] = []
-	cursor = 0
-	while True:
-		match = MODES_RX.search(text, cursor)
-		if match is None:
-			break
-		open_paren = match.end() - 1
-		result = _extract_paren_payload(text, open_paren)
-		if result is None:
-			cursor = match.end()
-			continue
-		payload, end_pos = result
-		payloads.append(payload)
-		cursor = end_pos
+	for open_paren, close_paren in tokens.call_spans(MODES_RX):
+		payloads.append(text[open_paren + 1 : close_paren])
 	return payloads
 
 
@@ -138,7 +87,6 @@ def run(context: dict[str, object]) -> list[dict[str, object]]:
 	text = str(context.get("text", ""))
 	newlines_obj = context.get("newlines", [])
 	newlines = list(newlines_obj) if isinstance(newlines_obj, list) else []
-	regions = context.get("pgml_regions", [])
 
 	pg_version_raw = pgml_lint.pg_version.normalize_pg_version(
 		context.get("pg_version")
@@ -152,29 +100,9 @@ def run(context: dict[str, object]) -> list[dict[str, object]]:
 		pg_version_tuple is not None and pg_version_tuple <= (2, 17)
 	)
 
-	inline_spans_by_region: list[list[tuple[int, int]]] = []
-	inline_spans_obj = context.get("pgml_inline_spans", [])
-	if isinstance(inline_spans_obj, list):
-		inline_spans_by_region = inline_spans_obj
-
-	for region_idx, region in enumerate(regions):
-		start = int(region.get("start", 0))
-		end = int(region.get("end", 0))
-		block_text = text[start:end]
-
-		inline_spans: list[tuple[int, int]] = []
-		if region_idx < len(inline_spans_by_region):
-			inline_spans = inline_spans_by_region[region_idx]
-		else:
-			inline_issues, inline_spans = pgml_lint.pgml.extract_inline_spans(
-				block_text,
-				start,
-				newlines,
-			)
-			issues.extend(inline_issues)
-
-		for span_start, span_end in inline_spans:
-			inline_text = block_text[span_start + 2 : span_end - 2]
+	for block in pgml_lint.pgml.blocks_for(context):
+		for span_start, span_end in block.inline_spans:
+			inline_text = text[span_start + 2 : span_end - 2]
 			if MODES_RX.search(inline_text) is None:
 				continue
 
@@ -206,7 +134,7 @@ def run(context: dict[str, object]) -> list[dict[str, object]]:
 					"will not emit HTML"
 				)
 
-			line = pgml_lint.parser.pos_to_line(newlines, start + span_start)
+			line = pgml_lint.parser.pos_to_line(newlines, span_start)
 			issue = {"severity": "WARNING", "message": message, "line": line}
 			issues.append(issue)
 
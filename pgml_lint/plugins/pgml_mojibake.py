@@ -4,6 +4,9 @@ import re
 PLUGIN_ID = "pgml_mojibake"
 PLUGIN_NAME = "Mojibake/encoding glitches"
 DEFAULT_ENABLED = True
+SEGMENT_LOCAL = True
+# Every MOJIBAKE_RX alternative starts with one of these characters
+TRIGGERS = ("\u00c2", "\u00c3", "\u00e2", "\ufffd")
 
 MOJIBAKE_RX = re.compile(
 	r"(\u00c2|\u00c3|\u00c2[\u0080-\u00bf]|\u00c3[\u0080-\u00bf]|"
@@ -4,6 +4,8 @@ import re
 PLUGIN_ID = "pgml_nbsp"
 PLUGIN_NAME = "Non-breaking spaces"
 DEFAULT_ENABLED = True
+TRIGGERS = ("\u00a0", "\u202f")
+SEGMENT_LOCAL = True
 
 NBSP_RX = re.compile(r"\u00a0|\u202f")
 
@@ -1,17 +1,23 @@
-# Standard Library
-import re
-
 # Local modules
 import pgml_lint.parser
 
 PLUGIN_ID = "pgml_old_answer_checkers"
 PLUGIN_NAME = "Legacy answer checker functions"
 DEFAULT_ENABLED = True
-
-# Pattern to match old answer checker functions
-OLD_CHECKERS_RX = re.compile(
-	r'\b(num_cmp|str_cmp|fun_cmp|std_num_cmp|std_str_cmp|std_fun_cmp|'
-	r'std_num_str_cmp|strict_num_cmp|strict_str_cmp)\s*\('
+# Every name in OLD_CHECKERS ends in _cmp
+TRIGGERS = ("_cmp",)
+
+# Old answer checker functions
+OLD_CHECKERS = (
+	"num_cmp",
+	"str_cmp",
+	"fun_cmp",
+	"std_num_cmp",
+	"std_str_cmp",
+	"std_fun_cmp",
+	"std_num_str_cmp",
+	"strict_num_cmp",
+	"strict_str_cmp",
 )
 
 
@@ -32,14 +38,17 @@ def run(context: dict[str, object]) -> list[dict[str, object]]:
 		list[dict[str, object]]: Issue list.
 	"""
 	issues: list[dict[str, object]] = []
-	stripped_text = str(context.get("stripped_text", ""))
+	call_index = pgml_lint.parser.call_index_for(context)
 	newlines_obj = context.get("newlines", [])
 	newlines = list(newlines_obj) if isinstance(newlines_obj, list) else []
 
 	# Find all old answer checker calls
-	for match in OLD_CHECKERS_RX.finditer(stripped_text):
-		checker_name = match.group(1)
-		line = pgml_lint.parser.pos_to_line(newlines, match.start())
+	calls: list[tuple[int, str]] = []
+	for checker_name in OLD_CHECKERS:
+		calls.extend((pos, checker_name) for pos in call_index.get(checker_name, []))
+	calls.sort()
+	for pos, checker_name in calls:
+		line = pgml_lint.parser.pos_to_line(newlines, pos)
 		message = (
 			f"{checker_name}() is deprecated legacy PG syntax; "
 			f"use MathObjects with ->cmp() method instead (e.g., $answer->cmp())"
@@ -8,11 +8,11 @@ import pgml_lint.pgml
 PLUGIN_ID = "pgml_pgml_parse_hazards"
 PLUGIN_NAME = "PGML parse hazards"
 DEFAULT_ENABLED = True
+TRIGGER_FIELDS = ("pgml_regions",)
+SEGMENT_LOCAL = True
 
 UNSUPPORTED_BLOCKS = {"balance"}
 BLOCK_TOKEN_RX = re.compile(r"^\s*\[\s*([A-Za-z]+)\s*\]\s*$")
-TAG_WRAPPER_OPEN = "[<"
-TAG_WRAPPER_CLOSE = ">]"
 
 
 #============================================
@@ -65,28 +65,10 @@ def run(context: dict[str, object]) -> list[dict[str, object]]:
 	text = str(context.get("text", ""))
 	newlines_obj = context.get("newlines", [])
 	newlines = list(newlines_obj) if isinstance(newlines_obj, list) else []
-	regions = context.get("pgml_regions", [])
-
-	inline_spans_by_region: list[list[tuple[int, int]]] = []
-	inline_spans_obj = context.get("pgml_inline_spans", [])
-	if isinstance(inline_spans_obj, list):
-		inline_spans_by_region = inline_spans_obj
-
-	for region_idx, region in enumerate(regions):
-		start = int(region.get("start", 0))
-		end = int(region.get("end", 0))
-		block_text = text[start:end]
-
-		inline_spans: list[tuple[int, int]] = []
-		if region_idx < len(inline_spans_by_region):
-			inline_spans = inline_spans_by_region[region_idx]
-		else:
-			inline_issues, inline_spans = pgml_lint.pgml.extract_inline_spans(
-				block_text,
-				start,
-				newlines,
-			)
-			issues.extend(inline_issues)
+
+	for block in pgml_lint.pgml.blocks_for(context):
+		start = block.start
+		block_text = text[start : block.end]
 
 		line_offset = 0
 		for line in block_text.splitlines():
@@ -104,35 +86,27 @@ def run(context: dict[str, object]) -> list[dict[str, object]]:
 			issues.append(issue)
 			line_offset += len(line) + 1
 
-		for span_start, span_end in inline_spans:
-			inline_text = block_text[span_start + 2 : span_end - 2]
+		for span_start, span_end in block.inline_spans:
+			inline_text = text[span_start + 2 : span_end - 2]
 			balance = _paren_balance(inline_text)
 			if balance == 0:
 				continue
-			line_number = pgml_lint.parser.pos_to_line(newlines, start + span_start)
+			line_number = pgml_lint.parser.pos_to_line(newlines, span_start)
 			message = "PGML inline code has unbalanced parentheses"
 			issue = {"severity": "WARNING", "message": message, "line": line_number}
 			issues.append(issue)
 
-		line_offset = 0
-		for line in block_text.splitlines():
-			search_start = 0
-			while True:
-				open_idx = line.find(TAG_WRAPPER_OPEN, search_start)
-				if open_idx == -1:
-					break
-				abs_open = line_offset + open_idx
-				if any(span_start <= abs_open < span_end for span_start, span_end in inline_spans):
-					search_start = open_idx + 2
-					continue
-				close_idx = line.find(TAG_WRAPPER_CLOSE, open_idx + 2)
-				if close_idx == -1:
-					line_number = pgml_lint.parser.pos_to_line(newlines, start + abs_open)
-					message = "PGML tag wrapper '[<' must be closed before line break"
-					issue = {"severity": "ERROR", "message": message, "line": line_number}
-					issues.append(issue)
-					break
-				search_start = close_idx + 2
-			line_offset += len(line) + 1
+		# Report the first unclosed tag wrapper on each line
+		reported_lines: set[int] = set()
+		for wrapper in block.tag_wrappers:
+			if wrapper["close"] is not None:
+				continue
+			line_number = pgml_lint.parser.pos_to_line(newlines, int(wrapper["start"]))
+			if line_number in reported_lines:
+				continue
+			reported_lines.add(line_number)
+			message = "PGML tag wrapper '[<' must be closed before line break"
+			issue = {"severity": "ERROR", "message": message, "line": line_number}
+			issues.append(issue)
 
 	return issues
@@ -7,9 +7,11 @@ import pgml_lint.parser
 PLUGIN_ID = "pgml_pgml_wrapper_in_string"
 PLUGIN_NAME = "PGML tag wrapper in Perl strings"
 DEFAULT_ENABLED = True
+SEGMENT_LOCAL = True
 
 STRING_RX = re.compile(r"('([^'\\\\]|\\\\.)*'|\"([^\"\\\\]|\\\\.)*\")")
 PGML_WRAPPER_TOKENS = ("[<", "]{[", ">]{", "}{[")
+TRIGGERS = PGML_WRAPPER_TOKENS
 
 
 #============================================
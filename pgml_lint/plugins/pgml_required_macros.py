@@ -1,6 +1,7 @@
 PLUGIN_ID = "pgml_required_macros"
 PLUGIN_NAME = "PGML requires PGML.pl"
 DEFAULT_ENABLED = True
+TRIGGER_FIELDS = ("uses_pgml",)
 
 PGML_REQUIRED_MACROS = {"pgml.pl"}
 
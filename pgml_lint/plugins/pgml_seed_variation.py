@@ -2,94 +2,55 @@
 import re
 
 # Local modules
+import pgml_lint.lexer
 import pgml_lint.parser
 
 PLUGIN_ID = "pgml_seed_variation"
 PLUGIN_NAME = "Seed variation detection"
 DEFAULT_ENABLED = True
 
-RANDOMIZATION_PATTERNS = [
-	r"\brandom\s*\(",
-	r"\bnon_zero_random\s*\(",
-	r"\blist_random\s*\(",
-	r"\brandom_subset\s*\(",
-	r"\brandom_coprime\s*\(",
-	r"\brandom_pairwise_coprime\s*\(",
-	r"\bNchooseK\s*\(",
-	r"\bshuffle\s*\(",
-	r"\bshufflemap\s*\(",
-	r"\brandomPermutation\s*\(",
-	r"\brandomPrime\s*\(",
-	r"\brandom_inv_matrix\s*\(",
-	r"\brandom_diag_matrix\s*\(",
-	r"\burand\s*\(",
-	r"\bexprand\s*\(",
-	r"\bpoissonrand\s*\(",
-	r"\bbinomrand\s*\(",
-	r"\bbernoullirand\s*\(",
-	r"\bdiscreterand\s*\(",
-	r"\bGRgraph_size_random\s*\(",
-	r"\bGRgraph_size_random_weight_dweight\s*\(",
-	r"\bGRgraphpic_dim_random_labels_weight_dweight\s*\(",
-	r"\brandomPerson\s*\(",
-	r"\brandomLastName\s*\(",
-	r"\blist_random_multi_uniq\s*\(",
-	r"\bbkell_list_random_selection\s*\(",
-	r"\bProblemRandomize\s*\(",
-	r"\bPeriodicRerandomization\s*\(",
-	r"\brand_button\s*\(",
-	r"\brandomizeCheckbox\s*\(",
-	r"\brandomizeButton\s*\(",
-	r"\brandomizeInput\s*\(",
-	r"\brandomizeHTML\s*\(",
-	r"\bSRAND\s*\(",
-	r"\bPGrandom\b",
-	r"\bPG_random_generator\b",
-	r"\brand\s*\(",
-	r"\$problemSeed\b",
-	r"\$PG_original_problemSeed\b",
-]
-
-
-#============================================
-
-
-def _mask_strings(line: str) -> list[bool]:
-	"""
-	Return a mask for positions inside strings.
-	"""
-	mask = [False] * len(line)
-	in_sq = False
-	in_dq = False
-	escape = False
-	for idx, ch in enumerate(line):
-		if escape:
-			mask[idx] = True
-			escape = False
-			continue
-		if ch == "\\":
-			mask[idx] = True
-			escape = True
-			continue
-		if in_sq:
-			mask[idx] = True
-			if ch == "'":
-				in_sq = False
-			continue
-		if in_dq:
-			mask[idx] = True
-			if ch == '"':
-				in_dq = False
-			continue
-		if ch == "'":
-			mask[idx] = True
-			in_sq = True
-			continue
-		if ch == '"':
-			mask[idx] = True
-			in_dq = True
-			continue
-	return mask
+# Calls that draw from the seeded PG generator
+RANDOMIZATION_CALLS = (
+	"random",
+	"non_zero_random",
+	"list_random",
+	"random_subset",
+	"random_coprime",
+	"random_pairwise_coprime",
+	"NchooseK",
+	"shuffle",
+	"shufflemap",
+	"randomPermutation",
+	"randomPrime",
+	"random_inv_matrix",
+	"random_diag_matrix",
+	"urand",
+	"exprand",
+	"poissonrand",
+	"binomrand",
+	"bernoullirand",
+	"discreterand",
+	"GRgraph_size_random",
+	"GRgraph_size_random_weight_dweight",
+	"GRgraphpic_dim_random_labels_weight_dweight",
+	"randomPerson",
+	"randomLastName",
+	"list_random_multi_uniq",
+	"bkell_list_random_selection",
+	"ProblemRandomize",
+	"PeriodicRerandomization",
+	"rand_button",
+	"randomizeCheckbox",
+	"randomizeButton",
+	"randomizeInput",
+	"randomizeHTML",
+	"SRAND",
+	"rand",
+)
+# Direct references to the generator or the seed itself
+SEED_REFERENCE_RX = re.compile(
+	r"\bPGrandom\b|\bPG_random_generator\b|\$problemSeed\b|\$PG_original_problemSeed\b"
+)
 
 
 #============================================
@@ -101,20 +62,18 @@ def run(context: dict[str, object]) -> list[dict[str, object]]:
 	"""
 	issues: list[dict[str, object]] = []
 	text = str(context.get("stripped_text", ""))
-	should_check = bool(re.search(r"\bDOCUMENT\s*\(\s*\)", text))
-	if not should_check:
+	call_index = pgml_lint.parser.call_index_for(context)
+	if not pgml_lint.parser.has_empty_call(text, call_index, "DOCUMENT"):
 		return issues
 
-	lines = text.splitlines()
-	for line in lines:
-		clean = pgml_lint.parser._strip_line_comment_preserving_strings(line)
-		mask = _mask_strings(clean)
-		for pattern_text in RANDOMIZATION_PATTERNS:
-			pattern = re.compile(pattern_text)
-			for match in pattern.finditer(clean):
-				if mask[match.start()]:
-					continue
+	tokens = pgml_lint.lexer.tokens_for(context, "stripped_text")
+	for name in RANDOMIZATION_CALLS:
+		for pos in call_index.get(name, []):
+			if tokens.is_code(pos):
 				return issues
+	for match in SEED_REFERENCE_RX.finditer(text):
+		if tokens.is_code(match.start()):
+			return issues
 
 	message = "No seed-based randomization detected; answer may not vary with seed"
 	issue = {"severity": "WARNING", "message": message}
@@ -1,6 +1,3 @@
-# Standard Library
-import re
-
 # Local modules
 import pgml_lint.parser
 
@@ -8,11 +5,8 @@ PLUGIN_ID = "pgml_solution_hint_macros"
 PLUGIN_NAME = "Legacy SOLUTION/HINT macros"
 DEFAULT_ENABLED = True
 
-# Pattern to match SOLUTION() and HINT() macro calls
-SOLUTION_HINT_RX = re.compile(
-	r'\b(SOLUTION|HINT)\s*\(',
-	re.IGNORECASE
-)
+# SOLUTION() and HINT() macro names, matched case-insensitively
+SOLUTION_HINT_NAMES = {"SOLUTION", "HINT"}
 
 
 #============================================
@@ -32,14 +26,18 @@ def run(context: dict[str, object]) -> list[dict[str, object]]:
 		list[dict[str, object]]: Issue list.
 	"""
 	issues: list[dict[str, object]] = []
-	stripped_text = str(context.get("stripped_text", ""))
+	call_index = pgml_lint.parser.call_index_for(context)
 	newlines_obj = context.get("newlines", [])
 	newlines = list(newlines_obj) if isinstance(newlines_obj, list) else []
 
 	# Find all SOLUTION() and HINT() macro calls
-	for match in SOLUTION_HINT_RX.finditer(stripped_text):
-		macro_name = match.group(1).upper()
-		line = pgml_lint.parser.pos_to_line(newlines, match.start())
+	calls: list[tuple[int, str]] = []
+	for name, positions in call_index.items():
+		if name.upper() in SOLUTION_HINT_NAMES:
+			calls.extend((pos, name.upper()) for pos in positions)
+	calls.sort()
+	for pos, macro_name in calls:
+		line = pgml_lint.parser.pos_to_line(newlines, pos)
 
 		if macro_name == "SOLUTION":
 			message = (
@@ -7,6 +7,7 @@ import pgml_lint.parser
 PLUGIN_ID = "pgml_style_string_quotes"
 PLUGIN_NAME = "PGML style strings with unescaped quotes"
 DEFAULT_ENABLED = True
+TRIGGERS = ("[<",)
 
 UNESCAPED_SINGLE_QUOTE_RX = re.compile(r"(?<!\\)'")
 
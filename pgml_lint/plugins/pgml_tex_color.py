@@ -4,6 +4,8 @@ import re
 PLUGIN_ID = "pgml_tex_color"
 PLUGIN_NAME = "TeX color commands"
 DEFAULT_ENABLED = True
+TRIGGERS = ("\\color", "\\textcolor")
+SEGMENT_LOCAL = True
 
 COLOR_RX = re.compile(r"\\(?:textcolor|color)\b")
 
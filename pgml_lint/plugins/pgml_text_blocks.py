@@ -7,6 +7,8 @@ import pgml_lint.parser
 PLUGIN_ID = "pgml_text_blocks"
 PLUGIN_NAME = "Deprecated TEXT blocks"
 DEFAULT_ENABLED = True
+TRIGGERS = ("BEGIN_TEXT",)
+SEGMENT_LOCAL = True
 
 
 #============================================
@@ -0,0 +1,231 @@
+# Standard Library
+import heapq
+import time
+
+# Row kinds in profile reports
+KIND_PLUGIN = "plugin"
+KIND_STAGE = "stage"
+# Number of slowest files kept by default
+DEFAULT_TOP_FILES = 10
+
+
+#============================================
+
+
+class LintProfiler:
+	"""
+	Opt-in wall time and call counts for plugins and context stages.
+
+	Times are exclusive: a context stage computed on first access inside a
+	plugin is charged to the stage, not to the plugin that triggered it, so
+	plugin and stage rows never double count. Engine entry
+	points take profiler=None by default and skip all timing in that case.
+	"""
+
+	def __init__(self, top_files: int = DEFAULT_TOP_FILES) -> None:
+		self.top_files = top_files
+		# (kind, name) -> [seconds, calls]
+		self.stats: dict[tuple[str, str], list] = {}
+		self.files_profiled = 0
+		self.total_seconds = 0.0
+		# Min-heap of (seconds, sequence, file_path, breakdown) holding the slowest files
+		self._slowest: list[tuple[float, int, str, dict[str, float]]] = []
+		self._sequence = 0
+		# Child time accumulated by each measure() call still running
+		self._child_stack: list[float] = []
+		self._file_path: str | None = None
+		self._file_start = 0.0
+		self._file_breakdown: dict[str, float] = {}
+
+	def measure(self, kind: str, name: str, func: object, *args: object) -> object:
+		"""
+		Call func(*args) and charge its exclusive wall time to (kind, name).
+
+		Args:
+			kind: KIND_PLUGIN or KIND_STAGE.
+			name: Plugin id or stage name.
+			func: Callable to time.
+			*args: Arguments for func.
+
+		Returns:
+			object: Whatever func returns.
+		"""
+		self._child_stack.append(0.0)
+		start = time.perf_counter()
+		try:
+			result = func(*args)
+		finally:
+			elapsed = time.perf_counter() - start
+			child = self._child_stack.pop()
+			if self._child_stack:
+				self._child_stack[-1] += elapsed
+			self._record(kind, name, elapsed - child)
+		return result
+
+	def _record(self, kind: str, name: str, seconds: float) -> None:
+		"""
+		Add one timed call to the totals and the current file breakdown.
+		"""
+		entry = self.stats.get((kind, name))
+		if entry is None:
+			self.stats[(kind, name)] = [seconds, 1]
+		else:
+			entry[0] += seconds
+			entry[1] += 1
+		if self._file_path is not None:
+			label = f"{kind}:{name}"
+			self._file_breakdown[label] = self._file_breakdown.get(label, 0.0) + seconds
+
+	def begin_file(self, file_path: str) -> None:
+		"""
+		Start timing one file; calls measured until end_file() belong to it.
+
+		Args:
+			file_path: File being linted.
+		"""
+		self._file_path = file_path
+		self._file_breakdown = {}
+		self._file_start = time.perf_counter()
+
+	def end_file(self) -> None:
+		"""
+		Finish the current file and keep it if it is among the slowest.
+		"""
+		if self._file_path is None:
+			return
+		elapsed = time.perf_counter() - self._file_start
+		self.add_file(self._file_path, elapsed, self._file_breakdown)
+		self._file_path = None
+		self._file_breakdown = {}
+
+	def add_file(self, file_path: str, seconds: float, breakdown: dict[str, float]) -> None:
+		"""
+		Count one profiled file and track it among the slowest files.
+
+		Args:
+			file_path: File path.
+			seconds: Wall time for the whole file.
+			breakdown: "kind:name" -> exclusive seconds within the file.
+		"""
+		self.files_profiled += 1
+		self.total_seconds += seconds
+		self._keep_if_slow(file_path, seconds, breakdown)
+
+	def _keep_if_slow(self, file_path: str, seconds: float, breakdown: dict[str, float]) -> None:
+		"""
+		Keep a file in the bounded slowest-files heap when it qualifies.
+		"""
+		if self.top_files <= 0:
+			return
+		# The sequence number keeps ties from comparing breakdown dicts
+		self._sequence += 1
+		item = (seconds, self._sequence, file_path, breakdown)
+		if len(self._slowest) < self.top_files:
+			heapq.heappush(self._slowest, item)
+		elif seconds > self._slowest[0][0]:
+			heapq.heapreplace(self._slowest, item)
+
+	def rows(self) -> list[dict[str, object]]:
+		"""
+		Return one row per plugin and stage, slowest first.
+
+		Returns:
+			list[dict[str, object]]: Rows with kind, name, seconds, calls, and mean_ms.
+		"""
+		rows: list[dict[str, object]] = []
+		for (kind, name), (seconds, calls) in self.stats.items():
+			row = {
+				"kind": kind,
+				"name": name,
+				"seconds": seconds,
+				"calls": calls,
+				"mean_ms": seconds * 1000.0 / calls,
+			}
+			rows.append(row)
+		rows.sort(key=lambda row: (-row["seconds"], row["kind"], row["name"]))
+		return rows
+
+	def slowest_files(self) -> list[dict[str, object]]:
+		"""
+		Return the slowest files, slowest first, each with its breakdown.
+
+		Returns:
+			list[dict[str, object]]: Dicts with file, seconds, and breakdown.
+		"""
+		files: list[dict[str, object]] = []
+		for seconds, _sequence, file_path, breakdown in sorted(self._slowest, key=lambda item: (-item[0], item[1])):
+			ordered = dict(sorted(breakdown.items(), key=lambda pair: (-pair[1], pair[0])))
+			files.append({"file": file_path, "seconds": seconds, "breakdown": ordered})
+		return files
+
+	def to_dict(self) -> dict[str, object]:
+		"""
+		Return the profile as JSON-serializable data.
+
+		Returns:
+			dict[str, object]: Totals, rows, and slowest files.
+		"""
+		data = {
+			"files_profiled": self.files_profiled,
+			"total_seconds": self.total_seconds,
+			"rows": self.rows(),
+			"slowest_files": self.slowest_files(),
+		}
+		return data
+
+	def merge(self, data: dict[str, object]) -> None:
+		"""
+		Fold in a profile produced by to_dict(), for example from a worker process.
+
+		Args:
+			data: Output of another profiler's to_dict().
+		"""
+		for row in data.get("rows", []):
+			key = (str(row["kind"]), str(row["name"]))
+			entry = self.stats.get(key)
+			if entry is None:
+				self.stats[key] = [float(row["seconds"]), int(row["calls"])]
+			else:
+				entry[0] += float(row["seconds"])
+				entry[1] += int(row["calls"])
+		for file_info in data.get("slowest_files", []):
+			self._keep_if_slow(str(file_info["file"]), float(file_info["seconds"]), dict(file_info["breakdown"]))
+		self.files_profiled += int(data.get("files_profiled", 0))
+		self.total_seconds += float(data.get("total_seconds", 0.0))
+
+	def format_table(self, file_limit: int = 5) -> str:
+		"""
+		Render the profile as a plain text report.
+
+		Args:
+			file_limit: Breakdown entries shown per slow file.
+
+		Returns:
+			str: Multi-line report.
+		"""
+		lines: list[str] = []
+		measured = sum(entry[0] for entry in self.stats.values())
+		other = max(0.0, self.total_seconds - measured)
+		lines.append(
+			f"Profile: {self.files_profiled} files, {self.total_seconds:.3f} s "
+			f"({other:.3f} s outside plugins and stages)"
+		)
+		lines.append(f"{'kind':<7} {'name':<34} {'total ms':>10} {'calls':>7} {'mean ms':>9} {'share':>6}")
+		for row in self.rows():
+			share = 0.0
+			if self.total_seconds > 0:
+				share = 100.0 * float(row["seconds"]) / self.total_seconds
+			lines.append(
+				f"{row['kind']:<7} {row['name']:<34} {float(row['seconds']) * 1000.0:>10.2f} "
+				f"{row['calls']:>7} {float(row['mean_ms']):>9.3f} {share:>5.1f}%"
+			)
+		slowest = self.slowest_files()
+		if slowest:
+			lines.append("")
+			lines.append("Slowest files:")
+			for file_info in slowest:
+				lines.append(f"{float(file_info['seconds']) * 1000.0:10.2f} ms  {file_info['file']}")
+				breakdown = list(file_info["breakdown"].items())[:file_limit]
+				for label, seconds in breakdown:
+					lines.append(f"{'':14}{seconds * 1000.0:8.2f} ms  {label}")
+		return "\n".join(lines)
@@ -1,46 +1,145 @@
 # Standard Library
+import heapq
 import importlib
 import importlib.util
 import os
 
 # Local modules
+import pgml_lint.context
 import pgml_lint.plugins
 
 
 #============================================
 
 
-def _register_module(registry: "Registry", module: object) -> None:
+def _module_metadata(module: object) -> dict[str, object]:
 	"""
-	Register a plugin module by reading its metadata.
+	Read plugin metadata from an imported plugin module.
 
 	Args:
-		registry: Plugin registry.
 		module: Imported module object.
+
+	Returns:
+		dict[str, object]: Plugin metadata.
 	"""
 	plugin_id = str(getattr(module, "PLUGIN_ID"))
 	plugin_name = str(getattr(module, "PLUGIN_NAME"))
 	plugin_run = getattr(module, "run")
 	default_enabled = bool(getattr(module, "DEFAULT_ENABLED", True))
-	registry.register(
-		{
-			"id": plugin_id,
-			"name": plugin_name,
-			"run": plugin_run,
-			"default_enabled": default_enabled,
-		}
-	)
+	provides = tuple(getattr(module, "PROVIDES", ()))
+	requires = tuple(getattr(module, "REQUIRES", ()))
+	triggers = tuple(getattr(module, "TRIGGERS", ()))
+	trigger_fields = tuple(getattr(module, "TRIGGER_FIELDS", ()))
+	segment_local = bool(getattr(module, "SEGMENT_LOCAL", False))
+	# Bumped by a plugin author when its output changes, so cached results are not reused
+	plugin_version = str(getattr(module, "PLUGIN_VERSION", "1"))
+	metadata = {
+		"id": plugin_id,
+		"name": plugin_name,
+		"version": plugin_version,
+		"run": plugin_run,
+		"default_enabled": default_enabled,
+		"provides": provides,
+		"requires": requires,
+		"triggers": triggers,
+		"trigger_fields": trigger_fields,
+		"segment_local": segment_local,
+	}
+	return metadata
+
+
+#============================================
+
+
+def _register_module(registry: "Registry", module: object) -> None:
+	"""
+	Register a plugin module by reading its metadata.
+
+	Args:
+		registry: Plugin registry.
+		module: Imported module object.
+	"""
+	registry.register(_module_metadata(module))
+
+
+#============================================
+
+
+def required_producers(
+	selected_ids: set[str],
+	plugins_by_id: dict[str, dict[str, object]],
+	providers: dict[str, str],
+) -> set[str]:
+	"""
+	Return the selected plugin ids plus every producer they need, transitively.
+
+	Args:
+		selected_ids: Ids of the plugins whose issues are wanted.
+		plugins_by_id: Plugin metadata by id; needs only "requires".
+		providers: Context key -> id of the plugin that provides it.
+			Keys with no provider (built-in context fields) are skipped.
+
+	Returns:
+		set[str]: Plugin ids to run.
+	"""
+	needed = set(selected_ids)
+	pending = sorted(needed)
+	while pending:
+		plugin = plugins_by_id[pending.pop()]
+		for key in plugin.get("requires", ()):
+			producer_id = providers.get(key)
+			if producer_id is not None and producer_id not in needed:
+				needed.add(producer_id)
+				pending.append(producer_id)
+	return needed
+
+
+#============================================
+
+
+def with_producers(plugins: list[dict[str, object]], selected_ids: set[str]) -> list[dict[str, object]]:
+	"""
+	Return selected plugins from a resolved list plus the producers they read.
+
+	Producers that were not selected run as "report": False helpers, as in
+	Registry.resolve_plugins().
+
+	Args:
+		plugins: Resolved plugins in run order.
+		selected_ids: Ids of the plugins whose issues are wanted.
+
+	Returns:
+		list[dict[str, object]]: Plugins to run, in resolved order.
+	"""
+	plugins_by_id = {str(plugin.get("id")): plugin for plugin in plugins}
+	providers = {key: plugin_id for plugin_id, plugin in plugins_by_id.items() for key in plugin.get("provides", ())}
+	needed = required_producers(selected_ids, plugins_by_id, providers)
+	run_list: list[dict[str, object]] = []
+	for plugin_id, plugin in plugins_by_id.items():
+		if plugin_id not in needed:
+			continue
+		if plugin_id not in selected_ids and plugin.get("report") is not False:
+			plugin = dict(plugin, report=False)
+		run_list.append(plugin)
+	return run_list
 
 
 #============================================
 
 
 class Registry:
-	"""Plugin registry."""
+	"""
+	Plugin registry.
+
+	Entries registered with a "module" name and no "run" are imported on
+	first use, so resolving a few plugins only imports those plugins.
+	"""
 
 	def __init__(self) -> None:
 		self._plugins: dict[str, dict[str, object]] = {}
 		self._order: list[str] = []
+		# Context key -> id of the plugin that writes it
+		self._providers: dict[str, str] = {}
 
 	def register(self, plugin: dict[str, object]) -> None:
 		"""
@@ -52,17 +151,45 @@ class Registry:
 		plugin_id = str(plugin.get("id"))
 		if plugin_id in self._plugins:
 			raise ValueError(f"Duplicate plugin id: {plugin_id}")
+		for key in plugin.get("provides", ()):
+			if key in pgml_lint.context.FIELD_NAMES:
+				raise ValueError(f"Plugin {plugin_id} provides built-in context field: {key}")
+			if key in self._providers:
+				raise ValueError(f"Plugin {plugin_id} provides {key}, already provided by {self._providers[key]}")
+		for key in plugin.get("provides", ()):
+			self._providers[key] = plugin_id
 		self._plugins[plugin_id] = plugin
 		self._order.append(plugin_id)
 
 	def list_plugins(self) -> list[dict[str, object]]:
 		"""
-		Return plugins in registration order.
+		Return plugins in registration order, importing any not yet loaded.
 
 		Returns:
 			list[dict[str, object]]: Plugin metadata.
 		"""
-		return [self._plugins[plugin_id] for plugin_id in self._order]
+		return [self._load(plugin_id) for plugin_id in self._order]
+
+	def _load(self, plugin_id: str) -> dict[str, object]:
+		"""
+		Import a lazily registered plugin and complete its metadata.
+
+		Args:
+			plugin_id: Registered plugin id.
+
+		Returns:
+			dict[str, object]: Plugin metadata with "run".
+		"""
+		plugin = self._plugins[plugin_id]
+		if "run" in plugin:
+			return plugin
+		module = importlib.import_module(str(plugin["module"]))
+		metadata = _module_metadata(module)
+		for key in ("id", "default_enabled", "provides", "requires"):
+			if metadata[key] != plugin.get(key, ()):
+				raise ValueError(f"Plugin manifest entry for {plugin_id} does not match its module: {key}")
+		plugin.update(metadata)
+		return plugin
 
 	def resolve_plugins(
 		self,
@@ -71,7 +198,12 @@ class Registry:
 		disable_ids: set[str],
 	) -> list[dict[str, object]]:
 		"""
-		Resolve the list of enabled plugins.
+		Resolve the enabled plugins and the producers they depend on.
+
+		Producers that an enabled plugin requires are added even when they
+		are disabled; they run as helpers marked "report": False, and the
+		engine drops their issues. Producers that are disabled and that no
+		enabled plugin requires are left out.
 
 		Args:
 			only_ids: When set, use only these plugin ids.
@@ -79,25 +211,74 @@ class Registry:
 			disable_ids: Plugin ids to disable.
 
 		Returns:
-			list[dict[str, object]]: Enabled plugins.
+			list[dict[str, object]]: Plugins in dependency order.
 		"""
 		if only_ids:
 			enabled = set(only_ids)
 		else:
 			enabled = {
-				plugin["id"]
-				for plugin in self.list_plugins()
+				plugin_id
+				for plugin_id, plugin in self._plugins.items()
 				if plugin.get("default_enabled") is True
 			}
 			enabled.update(enable_ids)
 		enabled.difference_update(disable_ids)
+		enabled.intersection_update(self._plugins)
+
+		selected = required_producers(enabled, self._plugins, self._providers)
+		for plugin_id in sorted(selected):
+			for key in self._plugins[plugin_id].get("requires", ()):
+				if key not in self._providers and key not in pgml_lint.context.FIELD_NAMES:
+					raise ValueError(f"Plugin {plugin_id} requires {key}, which no plugin provides")
 
 		resolved: list[dict[str, object]] = []
-		for plugin_id in self._order:
-			if plugin_id in enabled:
-				resolved.append(self._plugins[plugin_id])
+		for plugin_id in self._schedule(selected):
+			plugin = self._load(plugin_id)
+			if plugin_id not in enabled:
+				plugin = dict(plugin, report=False)
+			resolved.append(plugin)
 		return resolved
 
+	def _schedule(self, selected: set[str]) -> list[str]:
+		"""
+		Order plugin ids so every producer runs before its consumers.
+
+		Ties keep registration order, so plugins without dependencies run in
+		the same order as before.
+
+		Args:
+			selected: Plugin ids to order.
+
+		Returns:
+			list[str]: Plugin ids in run order.
+		"""
+		position = {plugin_id: index for index, plugin_id in enumerate(self._order)}
+		consumers: dict[str, list[str]] = {plugin_id: [] for plugin_id in selected}
+		waiting: dict[str, int] = {}
+		for plugin_id in selected:
+			producers = set()
+			for key in self._plugins[plugin_id].get("requires", ()):
+				producer_id = self._providers.get(key)
+				if producer_id is not None and producer_id != plugin_id:
+					producers.add(producer_id)
+			for producer_id in producers:
+				consumers[producer_id].append(plugin_id)
+			waiting[plugin_id] = len(producers)
+		ready = [(position[plugin_id], plugin_id) for plugin_id in selected if waiting[plugin_id] == 0]
+		heapq.heapify(ready)
+		ordered: list[str] = []
+		while ready:
+			_position, plugin_id = heapq.heappop(ready)
+			ordered.append(plugin_id)
+			for consumer_id in consumers[plugin_id]:
+				waiting[consumer_id] -= 1
+				if waiting[consumer_id] == 0:
+					heapq.heappush(ready, (position[consumer_id], consumer_id))
+		if len(ordered) < len(selected):
+			cycle = sorted(plugin_id for plugin_id in selected if waiting[plugin_id] > 0)
+			raise ValueError(f"Plugin dependency cycle among: {', '.join(cycle)}")
+		return ordered
+
 	def load_plugin_path(self, path: str) -> None:
 		"""
 		Load and register a plugin from a file path.
@@ -120,13 +301,23 @@ class Registry:
 
 def build_registry() -> Registry:
 	"""
-	Build a registry with built-in plugins.
+	Build a registry with built-in plugins from the static manifest.
+
+	No plugin module is imported here; see pgml_lint.plugins.PLUGIN_MANIFEST.
 
 	Returns:
 		Registry: Plugin registry.
 	"""
 	registry = Registry()
-	for module_name in pgml_lint.plugins.BUILTIN_PLUGINS:
-		module = importlib.import_module(module_name)
-		_register_module(registry, module)
+	for entry in pgml_lint.plugins.PLUGIN_MANIFEST:
+		plugin_id = str(entry["id"])
+		registry.register(
+			{
+				"id": plugin_id,
+				"module": f"pgml_lint.plugins.{plugin_id}",
+				"default_enabled": bool(entry["default_enabled"]),
+				"provides": tuple(entry.get("provides", ())),
+				"requires": tuple(entry.get("requires", ())),
+			}
+		)
 	return registry
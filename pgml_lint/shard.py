@@ -0,0 +1,214 @@
+"""Stable path sharding for --shard and the streaming merge of per-shard JSON Lines."""
+
+# Standard Library
+import argparse
+import collections.abc
+import hashlib
+import heapq
+import json
+import os
+import sys
+
+# Bytes of the path digest used to pick a shard
+HASH_BYTES = 8
+
+
+#============================================
+
+
+def shard_for(rel_path: str, shard_count: int) -> int:
+	"""
+	Return the 1-based shard that owns a path.
+
+	The hash is of the path relative to the linted directory, so agents
+	with different checkout locations agree, and it does not depend on
+	Python's per-process string hash seed.
+
+	Args:
+		rel_path: Path relative to the linted directory, with "/" separators.
+		shard_count: Number of shards.
+
+	Returns:
+		int: Shard number.
+	"""
+	digest = hashlib.sha256(rel_path.encode("utf-8", "surrogateescape")).digest()
+	return int.from_bytes(digest[:HASH_BYTES], "big") % shard_count + 1
+
+
+#============================================
+
+
+def select_shard(file_paths: list[str], input_dir: str, shard: int, shard_count: int) -> list[str]:
+	"""
+	Keep the files that belong to one shard, in their original order.
+
+	Args:
+		file_paths: Files from find_files(input_dir).
+		input_dir: Directory the files were found in.
+		shard: 1-based shard number.
+		shard_count: Number of shards.
+
+	Returns:
+		list[str]: This shard's files.
+	"""
+	selected = []
+	for file_path in file_paths:
+		rel_path = os.path.relpath(file_path, input_dir).replace(os.sep, "/")
+		if shard_for(rel_path, shard_count) == shard:
+			selected.append(file_path)
+	return selected
+
+
+#============================================
+
+
+def iter_file_groups(lines: collections.abc.Iterable, source: str) -> collections.abc.Iterator:
+	"""
+	Group a --jsonl stream into per-file records, checking order and completeness.
+
+	Args:
+		lines: Lines of one shard's --jsonl output.
+		source: Shard name for error messages.
+
+	Yields:
+		tuple[str, list[str], dict[str, object]]: File path, its record lines
+		(issues then the file record), and the parsed file record.
+	"""
+	pending: list[str] = []
+	previous = None
+	summary = None
+	for line_number, line in enumerate(lines, 1):
+		line = line.rstrip("\n")
+		if not line:
+			continue
+		try:
+			record = json.loads(line)
+		except ValueError:
+			raise ValueError(f"{source}:{line_number}: not a JSON record")
+		if not isinstance(record, dict):
+			raise ValueError(f"{source}:{line_number}: not a JSON record")
+		if summary is not None:
+			raise ValueError(f"{source}:{line_number}: record after the summary")
+		kind = record.get("type")
+		if kind == "summary":
+			summary = record
+			continue
+		if kind == "issue":
+			pending.append(line)
+			continue
+		if kind != "file":
+			raise ValueError(f"{source}:{line_number}: unknown record type {kind!r}")
+		file_path = str(record.get("file"))
+		if previous is not None and file_path <= previous:
+			raise ValueError(f"{source}:{line_number}: {file_path} is out of order; merge needs --jsonl output of -d runs")
+		pending.append(line)
+		yield file_path, pending, record
+		pending = []
+		previous = file_path
+	if summary is None or pending:
+		raise ValueError(f"{source}: no summary record; the shard run may not have finished")
+
+
+#============================================
+
+
+def merge_shards(sources: list[tuple[str, collections.abc.Iterable]], out: object) -> dict[str, object]:
+	"""
+	Write the shards' records as one report in path order, then a summary.
+
+	Holds one file's records per shard at a time, whatever the shard sizes.
+
+	Args:
+		sources: (name, lines) per shard output.
+		out: Text stream for the merged JSON Lines.
+
+	Returns:
+		dict[str, object]: The summary record that was written.
+	"""
+	streams = [iter_file_groups(lines, name) for name, lines in sources]
+	files_checked = 0
+	errors = 0
+	warnings = 0
+	previous = None
+	for file_path, group, record in heapq.merge(*streams, key=lambda item: item[0]):
+		if file_path == previous:
+			raise ValueError(f"{file_path} appears in more than one shard")
+		previous = file_path
+		files_checked += 1
+		errors += int(record.get("errors", 0))
+		warnings += int(record.get("warnings", 0))
+		out.write("\n".join(group) + "\n")
+	summary = {"type": "summary", "files_checked": files_checked, "errors": errors, "warnings": warnings}
+	out.write(json.dumps(summary, separators=(",", ":")) + "\n")
+	return summary
+
+
+#============================================
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+	"""
+	Parse arguments for the "pgml-lint merge" command.
+
+	Args:
+		argv: Arguments after "merge".
+
+	Returns:
+		argparse.Namespace: Parsed arguments.
+	"""
+	parser = argparse.ArgumentParser(
+		prog="pgml-lint merge",
+		description="Merge the --jsonl outputs of --shard runs into one report sorted by file.",
+	)
+	parser.add_argument(
+		"shard_paths",
+		nargs="+",
+		metavar="SHARD",
+		help="One shard's --jsonl output.",
+	)
+	parser.add_argument(
+		"-o",
+		"--output",
+		dest="output_path",
+		help="Write the merged report here instead of stdout.",
+	)
+	parser.set_defaults(
+		output_path=None,
+	)
+	args = parser.parse_args(argv)
+	return args
+
+
+#============================================
+
+
+def main(argv: list[str], version: str) -> None:
+	"""
+	Run the "pgml-lint merge" command.
+
+	Args:
+		argv: Arguments after "merge".
+		version: Linter version.
+	"""
+	args = parse_args(argv)
+	print(f"pgml-lint {version}", file=sys.stderr)
+	handles = []
+	try:
+		for shard_path in args.shard_paths:
+			handles.append(open(shard_path, "r", encoding="utf-8"))
+		out = sys.stdout
+		if args.output_path:
+			out = open(args.output_path, "w", encoding="utf-8")
+		try:
+			summary = merge_shards(list(zip(args.shard_paths, handles)), out)
+		finally:
+			if out is not sys.stdout:
+				out.close()
+	except (OSError, ValueError) as error:
+		print(f"pgml-lint merge: {error}", file=sys.stderr)
+		raise SystemExit(2)
+	finally:
+		for handle in handles:
+			handle.close()
+	if int(summary["errors"]) > 0:
+		raise SystemExit(1)
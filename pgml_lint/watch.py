@@ -0,0 +1,435 @@
+"""Watch a directory and re-lint only the .pg files that change."""
+
+# Standard Library
+import collections
+import collections.abc
+import ctypes
+import os
+import select
+import struct
+import sys
+import time
+
+# Local modules
+import pgml_lint.cli
+import pgml_lint.core
+
+# Seconds between polls, and the longest single wait for inotify events
+POLL_INTERVAL = 1.0
+# inotify_init1() flags and event bits from <sys/inotify.h>
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+# A file is worth a stat once it is fully written, moved, or removed;
+# IN_CREATE alone is only acted on for new directories
+FILE_EVENTS = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+# struct inotify_event: wd, mask, cookie, len, then a NUL-padded name
+EVENT_HEADER = struct.Struct("iIII")
+READ_SIZE = 65536
+
+
+#============================================
+
+
+def stat_key(file_path: str) -> tuple[int, int] | None:
+	"""
+	Return the (mtime_ns, size) pair used to decide whether a file changed.
+
+	Args:
+		file_path: Path to stat.
+
+	Returns:
+		tuple[int, int] | None: Stat key, or None when the file is gone.
+	"""
+	try:
+		stat = os.stat(file_path)
+	except OSError:
+		return None
+	return stat.st_mtime_ns, stat.st_size
+
+
+#============================================
+
+
+def diff_issues(old: list, new: list) -> tuple[list, list]:
+	"""
+	Split two issue lists of one file into new and resolved issues.
+
+	Issues match on position, severity, message, and plugin first; the
+	remainder then match without line and column, so an issue that only
+	moved because lines were inserted above it is neither new nor resolved.
+
+	Args:
+		old: Issues from the previous lint.
+		new: Issues from this lint.
+
+	Returns:
+		tuple[list, list]: (new issues, resolved issues), each in lint order.
+	"""
+	added = _unmatched(new, old, _exact_key)
+	resolved = _unmatched(old, new, _exact_key)
+	moved_added = _unmatched(added, resolved, _message_key)
+	moved_resolved = _unmatched(resolved, added, _message_key)
+	return moved_added, moved_resolved
+
+
+#============================================
+
+
+def _exact_key(issue: object) -> tuple:
+	return (issue.get("line"), issue.get("column"), issue.get("severity"), issue.get("message"), issue.get("plugin"))
+
+
+def _message_key(issue: object) -> tuple:
+	return (issue.get("severity"), issue.get("message"), issue.get("plugin"))
+
+
+def _unmatched(issues: list, others: list, key: collections.abc.Callable) -> list:
+	"""
+	Return the issues with no counterpart in others, counting duplicates.
+	"""
+	remaining = collections.Counter(key(issue) for issue in others)
+	unmatched = []
+	for issue in issues:
+		issue_key = key(issue)
+		if remaining[issue_key] > 0:
+			remaining[issue_key] -= 1
+		else:
+			unmatched.append(issue)
+	return unmatched
+
+
+#============================================
+
+
+def parse_events(data: bytes) -> list[tuple[int, int, str]]:
+	"""
+	Decode a buffer read from an inotify descriptor.
+
+	Args:
+		data: Raw bytes holding one or more inotify_event records.
+
+	Returns:
+		list[tuple[int, int, str]]: (watch descriptor, mask, name) per event.
+	"""
+	events = []
+	offset = 0
+	while offset + EVENT_HEADER.size <= len(data):
+		wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+		start = offset + EVENT_HEADER.size
+		name = data[start : start + length].split(b"\0", 1)[0]
+		events.append((wd, mask, os.fsdecode(name)))
+		offset = start + length
+	return events
+
+
+#============================================
+
+
+class InotifyWatcher:
+	"""
+	Report changed files from Linux inotify events, called through ctypes.
+
+	Every directory under the root gets a watch, and directories created or
+	moved in later are added as their events arrive, so waiting for changes
+	costs nothing between edits and each batch is proportional to its events.
+	"""
+
+	def __init__(self, input_dir: str, extensions: list[str]) -> None:
+		libc = ctypes.CDLL(None, use_errno=True)
+		self._add_watch = libc.inotify_add_watch
+		self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+		self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+		if self.fd < 0:
+			raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+		self.extensions = extensions
+		self.dirs: dict[int, str] = {}
+		try:
+			self._watch_tree(input_dir)
+		except OSError:
+			self.close()
+			raise
+
+	def _watch_tree(self, root: str) -> list[str]:
+		"""
+		Watch root and every directory below it.
+
+		Args:
+			root: Directory to watch.
+
+		Returns:
+			list[str]: Matching files already present under root.
+		"""
+		found = []
+		for dirpath, dirnames, filenames in os.walk(root):
+			dirnames.sort()
+			wd = self._add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+			if wd < 0:
+				errno = ctypes.get_errno()
+				raise OSError(errno, f"inotify_add_watch failed: {os.strerror(errno)}", dirpath)
+			self.dirs[wd] = dirpath
+			for filename in sorted(filenames):
+				if os.path.splitext(filename)[1].lower() in self.extensions:
+					found.append(os.path.join(dirpath, filename))
+		return found
+
+	def changes(self, timeout: float) -> set[str] | None:
+		"""
+		Wait up to timeout seconds and return the files named by new events.
+
+		Args:
+			timeout: Seconds to wait when nothing is pending.
+
+		Returns:
+			set[str] | None: Candidate paths, or None when the kernel queue
+			overflowed or a directory moved away and the tree needs a rescan.
+		"""
+		if not select.select([self.fd], [], [], timeout)[0]:
+			return set()
+		changed: set[str] = set()
+		while True:
+			try:
+				data = os.read(self.fd, READ_SIZE)
+			except BlockingIOError:
+				return changed
+			for wd, mask, name in parse_events(data):
+				if mask & IN_Q_OVERFLOW:
+					return None
+				if mask & IN_IGNORED:
+					self.dirs.pop(wd, None)
+					continue
+				directory = self.dirs.get(wd)
+				if directory is None or not name:
+					continue
+				path = os.path.join(directory, name)
+				if mask & IN_ISDIR:
+					if mask & (IN_CREATE | IN_MOVED_TO):
+						changed.update(self._watch_tree(path))
+					elif mask & IN_MOVED_FROM:
+						return None
+				elif mask & FILE_EVENTS and os.path.splitext(name)[1].lower() in self.extensions:
+					changed.add(path)
+
+	def close(self) -> None:
+		"""
+		Release the inotify descriptor.
+		"""
+		if self.fd >= 0:
+			os.close(self.fd)
+			self.fd = -1
+
+
+#============================================
+
+
+class PollingWatcher:
+	"""
+	Report changed files by comparing stat keys across the whole tree.
+
+	Used where inotify is unavailable; each poll stats every file but only
+	files whose stat key moved are passed on for linting.
+	"""
+
+	def __init__(self, input_dir: str, extensions: list[str], stats: dict[str, tuple[int, int]]) -> None:
+		self.input_dir = input_dir
+		self.extensions = extensions
+		self.stats = dict(stats)
+
+	def changes(self, timeout: float) -> set[str]:
+		"""
+		Sleep for timeout seconds, then return files that appeared, vanished, or changed.
+
+		Args:
+			timeout: Seconds between polls.
+
+		Returns:
+			set[str]: Changed paths.
+		"""
+		time.sleep(timeout)
+		current = {}
+		for file_path in pgml_lint.cli.find_files(self.input_dir, self.extensions):
+			key = stat_key(file_path)
+			if key is not None:
+				current[file_path] = key
+		changed = {path for path, key in current.items() if self.stats.get(path) != key}
+		changed.update(path for path in self.stats if path not in current)
+		self.stats = current
+		return changed
+
+	def close(self) -> None:
+		"""
+		Nothing to release for polling.
+		"""
+
+
+#============================================
+
+
+class WatchSession:
+	"""
+	In-memory issues, stat keys, and running totals for every watched file.
+
+	The first full scan fills the session through track() and record();
+	update() then re-lints only the paths a watcher reports, and only when
+	their stat key actually moved.
+	"""
+
+	def __init__(
+		self,
+		lint: collections.abc.Callable[[str], list],
+		stat: collections.abc.Callable[[str], tuple[int, int] | None] = stat_key,
+	) -> None:
+		self.lint = lint
+		self.stat = stat
+		self.stats: dict[str, tuple[int, int]] = {}
+		self.results: dict[str, list] = {}
+		self.error_count = 0
+		self.warn_count = 0
+
+	def track(self, file_paths: list[str]) -> None:
+		"""
+		Take stat keys before the first scan, so edits made during it are seen.
+
+		Args:
+			file_paths: Files the first scan lints.
+		"""
+		for file_path in file_paths:
+			key = self.stat(file_path)
+			if key is not None:
+				self.stats[file_path] = key
+
+	def record(self, file_path: str, issues: list) -> None:
+		"""
+		Store one file's issues and update the totals.
+
+		Args:
+			file_path: Linted file.
+			issues: Its issues.
+		"""
+		old_errors, old_warnings = pgml_lint.core.summarize_issues(self.results.pop(file_path, []))
+		new_errors, new_warnings = pgml_lint.core.summarize_issues(issues)
+		self.error_count += new_errors - old_errors
+		self.warn_count += new_warnings - old_warnings
+		if issues:
+			self.results[file_path] = list(issues)
+
+	def update(self, file_paths: collections.abc.Iterable[str]) -> list[tuple[str, list, list]]:
+		"""
+		Re-lint the given files whose stat key changed and collect the deltas.
+
+		Args:
+			file_paths: Candidate paths reported by a watcher.
+
+		Returns:
+			list[tuple[str, list, list]]: (path, new issues, resolved issues)
+			for each file whose issues changed, in path order.
+		"""
+		deltas = []
+		for file_path in sorted(set(file_paths)):
+			key = self.stat(file_path)
+			if key is not None and key == self.stats.get(file_path):
+				continue
+			old = self.results.get(file_path, [])
+			issues: list = []
+			if key is None:
+				self.stats.pop(file_path, None)
+			else:
+				self.stats[file_path] = key
+				try:
+					issues = self.lint(file_path)
+				except FileNotFoundError:
+					# Removed between the stat and the read; the next event drops it
+					self.stats.pop(file_path, None)
+			self.record(file_path, issues)
+			added, resolved = diff_issues(old, issues)
+			if added or resolved:
+				deltas.append((file_path, added, resolved))
+		return deltas
+
+
+#============================================
+
+
+def _make_watcher(input_dir: str, extensions: list[str], stats: dict[str, tuple[int, int]]) -> object:
+	"""
+	Prefer inotify on Linux and fall back to polling.
+	"""
+	if sys.platform.startswith("linux"):
+		try:
+			return InotifyWatcher(input_dir, extensions)
+		except (OSError, AttributeError) as error:
+			print(f"pgml-lint: inotify unavailable ({error}); polling instead", file=sys.stderr)
+	return PollingWatcher(input_dir, extensions, stats)
+
+
+#============================================
+
+
+def run(
+	session: WatchSession,
+	input_dir: str,
+	interval: float | None = None,
+	show_plugin: bool = False,
+	quiet: bool = False,
+	extensions: list[str] = pgml_lint.cli.DEFAULT_EXTENSIONS,
+) -> None:
+	"""
+	Print new ("+") and resolved ("-") issues as files change, until interrupted.
+
+	Args:
+		session: Session filled by the first full scan.
+		input_dir: Directory to watch.
+		interval: Poll interval and longest event wait in seconds.
+		show_plugin: Include plugin ids and excerpts, as with --verbose.
+		quiet: Skip the per-batch summary line.
+		extensions: File extensions to watch.
+	"""
+	if interval is None:
+		interval = POLL_INTERVAL
+	watcher = _make_watcher(input_dir, extensions, session.stats)
+	if not quiet:
+		print(f"Watching {input_dir} for changes (Ctrl-C to stop).", flush=True)
+	try:
+		while True:
+			try:
+				candidates = watcher.changes(interval)
+			except OSError as error:
+				print(f"pgml-lint: {error}; polling instead", file=sys.stderr)
+				watcher.close()
+				watcher = PollingWatcher(input_dir, extensions, session.stats)
+				candidates = None
+			if candidates is None:
+				# Rescan everything the tree holds or the session remembers
+				candidates = set(pgml_lint.cli.find_files(input_dir, extensions)) | set(session.stats)
+			if not candidates:
+				continue
+			deltas = session.update(candidates)
+			if not deltas:
+				continue
+			added_count = 0
+			resolved_count = 0
+			for file_path, added, resolved in deltas:
+				added_count += len(added)
+				resolved_count += len(resolved)
+				for issue in added:
+					print("+ " + pgml_lint.core.format_issue(file_path, issue, show_plugin))
+				for issue in resolved:
+					print("- " + pgml_lint.core.format_issue(file_path, issue, show_plugin))
+			if not quiet:
+				print(
+					f"{added_count} new and {resolved_count} resolved issues in {len(deltas)} files; "
+					f"now {session.error_count} errors and {session.warn_count} warnings."
+				)
+			sys.stdout.flush()
+	except KeyboardInterrupt:
+		pass
+	finally:
+		watcher.close()
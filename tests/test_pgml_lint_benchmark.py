@@ -0,0 +1,60 @@
+# Standard Library
+import random
+
+# Third party
+import pytest
+
+# Local modules
+import pgml_lint.benchmark
+import pgml_lint.engine
+import pgml_lint.registry
+import pgml_lint.rules
+
+
+#============================================
+
+def test_generate_pg_text_is_deterministic() -> None:
+	first = pgml_lint.benchmark.generate_pg_text(random.Random(7), 4)
+	second = pgml_lint.benchmark.generate_pg_text(random.Random(7), 4)
+	assert first == second
+	larger = pgml_lint.benchmark.generate_pg_text(random.Random(7), 12)
+	assert len(larger) > len(first)
+
+
+#============================================
+
+def test_generated_problem_lints_clean() -> None:
+	text = pgml_lint.benchmark.generate_pg_text(random.Random(3), 8)
+	assert "BEGIN_PGML_SOLUTION" in text
+	block_rules, macro_rules = pgml_lint.rules.load_rules(None)
+	plugins = pgml_lint.registry.build_registry().resolve_plugins(set(), set(), set())
+	issues = pgml_lint.engine.lint_text(text, None, block_rules, macro_rules, plugins)
+	assert issues == []
+
+
+#============================================
+
+def _results(us_per_kb: dict[str, float]) -> dict[str, object]:
+	stages = {stage: {"seconds": 0.0, "files_per_sec": 0.0, "us_per_kb": value} for stage, value in us_per_kb.items()}
+	return {"format": pgml_lint.benchmark.BASELINE_FORMAT, "files": 1, "kb": 1.0, "stages": stages}
+
+
+#============================================
+
+def test_find_regressions_applies_threshold_and_floor() -> None:
+	baseline = _results({"build_context": 100.0, "plugin:a": 1.0, "plugin:gone": 5.0})
+	current = _results({"build_context": 130.0, "plugin:a": 2.0, "plugin:new": 9.0})
+	regressions = pgml_lint.benchmark.find_regressions(current, baseline, 20.0, min_us_per_kb=2.0)
+	# plugin:a doubled but only by 1 us/KB, under the noise floor
+	assert [item["stage"] for item in regressions] == ["build_context"]
+	assert regressions[0]["change_pct"] == pytest.approx(30.0)
+	assert pgml_lint.benchmark.find_regressions(current, baseline, 50.0) == [
+		{"stage": "plugin:a", "baseline_us_per_kb": 1.0, "us_per_kb": 2.0, "change_pct": 100.0},
+	]
+
+
+#============================================
+
+def test_find_regressions_rejects_unknown_format() -> None:
+	with pytest.raises(ValueError):
+		pgml_lint.benchmark.find_regressions(_results({"lint_file": 1.0}), {"format": "0"}, 10.0)
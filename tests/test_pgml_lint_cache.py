@@ -0,0 +1,111 @@
+# Third party
+import pytest
+
+# Local modules
+import pgml_lint.cache
+import pgml_lint.rules
+
+
+#============================================
+
+def _key(**overrides: object) -> str:
+	"""
+	Build a cache key from defaults with selected overrides.
+	"""
+	block_rules, macro_rules = pgml_lint.rules.load_rules(None)
+	params: dict[str, object] = {
+		"text_hash": pgml_lint.cache.content_hash("BEGIN_PGML\nx\nEND_PGML\n"),
+		"linter_version": "26.01b1",
+		"rules_hash": pgml_lint.cache.rules_digest(block_rules, macro_rules),
+		"pg_version": None,
+	}
+	params.update(overrides)
+	key = pgml_lint.cache.make_cache_key(**params)
+	return key
+
+
+#============================================
+
+def test_cache_key_is_stable() -> None:
+	assert _key() == _key()
+
+
+#============================================
+
+def test_cache_key_normalizes_pg_version() -> None:
+	assert _key(pg_version=None) == _key(pg_version=" 2.17 ")
+
+
+#============================================
+
+@pytest.mark.parametrize(
+	"overrides",
+	[
+		{"text_hash": pgml_lint.cache.content_hash("other")},
+		{"linter_version": "26.02"},
+		{"rules_hash": pgml_lint.cache.rules_digest([], [])},
+		{"pg_version": "2.18"},
+	],
+)
+def test_cache_key_changes_with_each_input(overrides: dict[str, object]) -> None:
+	assert _key(**overrides) != _key()
+
+
+#============================================
+
+def test_analysis_key_ignores_rules_and_pg_version() -> None:
+	text_hash = pgml_lint.cache.content_hash("x")
+	key = pgml_lint.cache.make_analysis_key(text_hash, "26.01b1")
+	assert key != pgml_lint.cache.make_cache_key(text_hash, "26.01b1", "rules", None)
+	assert key != pgml_lint.cache.make_analysis_key(pgml_lint.cache.content_hash("y"), "26.01b1")
+	assert key != pgml_lint.cache.make_analysis_key(text_hash, "26.02")
+
+
+#============================================
+
+def test_plugin_fingerprints_follow_producer_versions() -> None:
+	producer = {"id": "spans", "version": "2", "provides": ("span_list",)}
+	consumer = {"id": "check", "requires": ("span_list", "stripped_text")}
+	other = {"id": "other", "version": "3"}
+	fingerprints = pgml_lint.cache.plugin_fingerprints([producer, consumer, other])
+	assert fingerprints == {"spans": "spans@2", "check": "check@1<spans@2", "other": "other@3"}
+	bumped = pgml_lint.cache.plugin_fingerprints([dict(producer, version="3"), consumer])
+	assert bumped["check"] == "check@1<spans@3"
+
+
+#============================================
+
+def test_rules_digest_ignores_dict_key_order() -> None:
+	rules_a = [{"label": "x", "pattern": "y"}]
+	rules_b = [{"pattern": "y", "label": "x"}]
+	assert pgml_lint.cache.rules_digest([], rules_a) == pgml_lint.cache.rules_digest([], rules_b)
+
+
+#============================================
+
+def test_entry_round_trip_rejects_torn_and_foreign_entries() -> None:
+	key = _key()
+	value = {"block_markers@1": [{"severity": "ERROR", "message": "x", "line": 1}]}
+	raw = pgml_lint.cache.encode_entry(key, value)
+	assert pgml_lint.cache.decode_entry(raw, key) == value
+	# A partly written file, another key's entry, and the old bare-list layout are misses
+	assert pgml_lint.cache.decode_entry(raw[:-1], key) is None
+	assert pgml_lint.cache.decode_entry(raw, _key(pg_version="2.18")) is None
+	assert pgml_lint.cache.decode_entry("[]", key) is None
+
+
+#============================================
+
+def test_select_garbage_expires_then_evicts_oldest() -> None:
+	entries = [(30, 10, "c"), (10, 10, "a"), (20, 10, "b"), (40, 10, "d")]
+	assert pgml_lint.cache.select_garbage(entries, 40) == []
+	assert [path for _m, _s, path in pgml_lint.cache.select_garbage(entries, 25)] == ["a", "b"]
+	# Age removes old entries even when the rest fit the cap
+	removed = pgml_lint.cache.select_garbage(entries, 100, max_age_ns=15, now_ns=40)
+	assert [path for _m, _s, path in removed] == ["a", "b"]
+
+
+#============================================
+
+def test_result_cache_skipped() -> None:
+	pytest.skip("ResultCache reads and writes cache files on disk, which is not allowed in unit tests", allow_module_level=False)
@@ -0,0 +1,110 @@
+# Standard Library
+import os
+import subprocess
+import sys
+
+# Third party
+import pytest
+
+# Local modules
+import pgml_lint.cli
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# Cumulative -X importtime ceiling for pgml_lint.cli, about three times the
+# typical 30-50 ms; DEFERRED_MODULES names the heavy imports to keep out
+IMPORT_BUDGET_US = 150000
+# Modules that only specific options need; none may load at startup
+DEFERRED_MODULES = (
+	"multiprocessing",
+	"tempfile",
+	"hashlib",
+	"importlib.metadata",
+	"pgml_lint.cache",
+	"pgml_lint.daemon",
+	"pgml_lint.lsp",
+	"pgml_lint.incremental",
+	"pgml_lint.watch",
+	"pgml_lint.manifest",
+	"pgml_lint.git_changes",
+	"pgml_lint.history",
+	"pgml_lint.shard",
+)
+
+
+#============================================
+
+def _import_times(code: str) -> tuple[dict[str, int], list[str]]:
+	"""
+	Run code in a fresh interpreter and return import times and loaded modules.
+
+	-X importtime does not log importlib.import_module() calls, so the
+	code also prints sys.modules on its last stdout line.
+	"""
+	result = subprocess.run(
+		[sys.executable, "-X", "importtime", "-c", code + "import sys\nprint(' '.join(sorted(sys.modules)))\n"],
+		capture_output=True,
+		text=True,
+		cwd=REPO_ROOT,
+		check=True,
+	)
+	times: dict[str, int] = {}
+	for line in result.stderr.splitlines():
+		if not line.startswith("import time:") or "|" not in line:
+			continue
+		_self_us, cumulative, name = line[len("import time:"):].split("|")
+		if cumulative.strip().isdigit():
+			times[name.strip()] = int(cumulative)
+	modules = result.stdout.split()
+	return times, modules
+
+
+#============================================
+
+def test_cli_import_is_fast_and_lazy() -> None:
+	code = (
+		"import pgml_lint.cli, pgml_lint.registry\n"
+		"registry = pgml_lint.registry.build_registry()\n"
+		"registry.resolve_plugins({'pgml_blank_assignments'}, set(), set())\n"
+	)
+	times, modules = _import_times(code)
+	assert times["pgml_lint.cli"] < IMPORT_BUDGET_US
+	plugin_modules = {name for name in modules if name.startswith("pgml_lint.plugins.")}
+	assert plugin_modules == {"pgml_lint.plugins.pgml_blanks", "pgml_lint.plugins.pgml_blank_assignments"}
+	for name in DEFERRED_MODULES:
+		assert name not in modules
+
+
+#============================================
+
+def test_parse_args_defaults() -> None:
+	args = pgml_lint.cli.parse_args(["-j", "2"])
+	assert args.input_dir == "."
+	assert args.input_file is None
+	assert args.jobs == 2
+	assert args.cache_dir is None
+	assert not args.json_output and not args.jsonl_output
+	assert not args.watch
+
+
+#============================================
+
+def test_directory_only_options_are_checked() -> None:
+	args = pgml_lint.cli.parse_args(["-d", "course", "-w", "--watch-interval", "0.5"])
+	assert args.watch and args.watch_interval == 0.5
+	rejected = (
+		["-i", "a.pg", "-w"],
+		["-i", "a.pg", "-m", "manifest.json"],
+		["--staged", "-i", "a.pg"],
+		["--staged", "-w"],
+		["--staged", "--changed-since", "main"],
+		["--diff", "-", "-i", "a.pg"],
+		["-w", "--jsonl"],
+		["-w", "-D"],
+		["--cache-shared"],
+		["-j", "-1"],
+		["--shard", "3/2"],
+		["--shard", "1/2", "--staged"],
+	)
+	for argv in rejected:
+		with pytest.raises(SystemExit):
+			pgml_lint.cli.parse_args(argv)
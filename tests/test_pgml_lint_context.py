@@ -0,0 +1,124 @@
+# Standard Library
+import json
+
+# Third party
+import pytest
+
+# Local modules
+import pgml_lint.context
+
+
+#============================================
+
+def _make_context(text: str) -> pgml_lint.context.LintContext:
+	"""
+	Build a lint context with empty rules.
+	"""
+	context = pgml_lint.context.LintContext(text, "file.pg", [], [])
+	return context
+
+
+#============================================
+
+def test_fields_are_not_computed_until_read() -> None:
+	context = _make_context("BEGIN_PGML\nHello\nEND_PGML\n")
+	assert context.computed_fields() == []
+	assert context.get("newlines") == [10, 16, 25]
+	assert context.computed_fields() == ["newlines"]
+
+
+#============================================
+
+def test_stripped_text_skips_unrelated_fields() -> None:
+	context = _make_context("$a = 1; # note\n")
+	assert context["stripped_text"] == "$a = 1; \n"
+	assert "newlines" not in context.computed_fields()
+	assert "macros_loaded" not in context.computed_fields()
+
+
+#============================================
+
+def test_structure_fields_share_one_scan() -> None:
+	context = _make_context("BEGIN_PGML\nHello\nEND_PGML\n")
+	regions = context.get("pgml_block_regions")
+	assert len(regions) == 1
+	computed = context.computed_fields()
+	assert "block_marker_issues" in computed
+	assert "stripped_text" in computed
+	assert "pgml_heredoc_regions" in computed
+
+
+#============================================
+
+def test_fields_are_memoized() -> None:
+	context = _make_context("BEGIN_PGML\nHello\nEND_PGML\n")
+	assert context.get("pgml_regions") is context.get("pgml_regions")
+
+
+#============================================
+
+def test_plugin_keys_use_dict_interface() -> None:
+	context = _make_context("")
+	assert context.get("pgml_inline_spans", []) == []
+	assert "pgml_inline_spans" not in context
+	context["pgml_inline_spans"] = [[(0, 4)]]
+	assert "pgml_inline_spans" in context
+	assert context["pgml_inline_spans"] == [[(0, 4)]]
+	with pytest.raises(KeyError):
+		context["missing"]
+
+
+#============================================
+
+def test_setting_known_field_overrides_computation() -> None:
+	context = _make_context("BEGIN_PGML\nHello\nEND_PGML\n")
+	context["pgml_regions"] = []
+	assert context.get("pgml_regions") == []
+	assert "pgml_block_regions" not in context.computed_fields()
+
+
+#============================================
+
+def test_pg_version_is_normalized() -> None:
+	context = _make_context("")
+	assert context["pg_version"] == "2.17"
+
+
+#============================================
+
+def test_pgml_blocks_are_lazy_and_memoized() -> None:
+	context = _make_context("BEGIN_PGML\n[_]{$a}\nEND_PGML\n")
+	assert "pgml_blocks" not in context.computed_fields()
+	blocks = context.get("pgml_blocks")
+	assert len(blocks) == 1
+	assert blocks[0].blanks[0]["spec"] == "$a"
+	assert context.get("pgml_blocks") is blocks
+
+
+#============================================
+
+def test_call_index_is_lazy_and_memoized() -> None:
+	context = _make_context("DOCUMENT();\n# random(1)\nrandom(1, 5, 1);\n")
+	assert "call_index" not in context.computed_fields()
+	index = context.get("call_index")
+	# Comments are stripped before indexing
+	stripped = context.get("stripped_text")
+	assert index["random"] == [stripped.index("random(1, 5")]
+	assert context.get("call_index") is index
+
+
+#============================================
+
+def test_analysis_round_trip_skips_the_structure_scan() -> None:
+	text = "DOCUMENT();\nloadMacros('PGML.pl'); # macros\n$a = 1;\nBEGIN_PGML\nHi\nEND_PGML\n"
+	source = _make_context(text)
+	assert "pgml.pl" in source["macros_loaded"]
+	analysis = json.loads(json.dumps(source.export_analysis()))
+	# The comment is dropped; the newline after it is kept
+	assert analysis["stripped_comments"] == [[0, 35], [43, len(text)]]
+	assert "assigned_vars" not in analysis
+	seeded = _make_context(text)
+	seeded.seed_analysis(analysis)
+	for name in analysis:
+		assert seeded[name] == source[name]
+	assert "stripped_text" in seeded.computed_fields()
@@ -1,3 +1,7 @@
+# Standard Library
+import json
+import pickle
+
 # Local modules
 import pgml_lint.core
 
@@ -19,6 +23,41 @@ def test_make_issue_with_line_and_plugin() -> None:
 	assert issue["plugin"] == "plug"
 
 
+#============================================
+
+def test_issue_is_slotted_with_dict_view() -> None:
+	issue = pgml_lint.core.Issue("WARNING", "msg", 3, 7)
+	assert not hasattr(issue, "__dict__")
+	assert list(issue.keys()) == ["severity", "message", "line", "column"]
+	assert "plugin" not in issue
+	assert issue.get("plugin", "none") == "none"
+	issue["plugin"] = "plug"
+	issue["hint"] = "extra"
+	assert issue.plugin == "plug"
+	assert dict(issue) == {
+		"severity": "WARNING",
+		"message": "msg",
+		"line": 3,
+		"column": 7,
+		"plugin": "plug",
+		"hint": "extra",
+	}
+	assert json.loads(json.dumps(dict(issue)))["hint"] == "extra"
+
+
+#============================================
+
+def test_issue_from_mapping_interns_and_round_trips() -> None:
+	data = {"severity": "ERR" + "OR", "message": "bad", "line": 2, "column": 1}
+	issue = pgml_lint.core.Issue.from_mapping(data, "plug")
+	assert issue == dict(data, plugin="plug")
+	assert issue.severity is pgml_lint.core.SEVERITY_ERROR
+	assert pgml_lint.core.Issue.from_mapping(issue) is issue
+	copied = pickle.loads(pickle.dumps(issue))
+	assert copied == issue
+	assert copied.plugin is issue.plugin
+
+
 #============================================
 
 def test_summarize_issues_counts_errors_and_warnings() -> None:
@@ -68,3 +107,17 @@ def test_format_issue_with_excerpt_verbose() -> None:
 	}
 	formatted = pgml_lint.core.format_issue("file.pg", issue, show_plugin=True)
 	assert formatted == "file.pg:10: ERROR(x): bad | context: ...oops..."
+
+
+#============================================
+
+def test_format_jsonl_records() -> None:
+	issues = [
+		{"severity": "ERROR", "message": "bad", "line": 3, "plugin": "x"},
+		{"severity": "WARNING", "message": "meh"},
+	]
+	records = [json.loads(record) for record in pgml_lint.core.format_jsonl_records("a.pg", issues)]
+	assert records[0] == {"type": "issue", "file": "a.pg", "severity": "ERROR", "message": "bad", "line": 3, "plugin": "x"}
+	assert records[1]["type"] == "issue"
+	assert records[2] == {"type": "file", "file": "a.pg", "errors": 1, "warnings": 1}
+	assert pgml_lint.core.format_jsonl_records("b.pg", []) == ['{"type":"file","file":"b.pg","errors":0,"warnings":0}']
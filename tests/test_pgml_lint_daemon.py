@@ -0,0 +1,56 @@
+# Standard Library
+import json
+
+# Local modules
+import pgml_lint.daemon
+
+VERSION = "0.test"
+PG_TEXT = "DOCUMENT();\nBEGIN_PGML\n[_]{$missing}\nEND_PGML\n"
+
+
+#============================================
+
+def test_default_socket_path_honors_environment(monkeypatch) -> None:
+	monkeypatch.setenv(pgml_lint.daemon.SOCKET_ENV, "/run/user/1/custom.sock")
+	assert pgml_lint.daemon.default_socket_path() == "/run/user/1/custom.sock"
+	monkeypatch.delenv(pgml_lint.daemon.SOCKET_ENV)
+	monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+	assert pgml_lint.daemon.default_socket_path().endswith(pgml_lint.daemon.SOCKET_NAME)
+
+
+#============================================
+
+def test_encode_message_is_one_json_line() -> None:
+	data = pgml_lint.daemon.encode_message({"file": "a.pg", "issues": []})
+	assert data.endswith(b"\n") and data.count(b"\n") == 1
+	assert json.loads(data) == {"file": "a.pg", "issues": []}
+
+
+#============================================
+
+def test_lint_text_streams_issues_then_done() -> None:
+	state = pgml_lint.daemon.DaemonState(VERSION)
+	request = {"command": "lint_text", "version": VERSION, "file": "buffer.pg", "text": PG_TEXT}
+	messages = list(state.handle(request))
+	assert messages[-1] == {"done": True}
+	assert messages[0]["file"] == "buffer.pg"
+	issues = messages[0]["issues"]
+	assert issues and all(isinstance(issue, dict) for issue in issues)
+	assert json.loads(json.dumps(messages[0]))["issues"] == issues
+
+
+#============================================
+
+def test_status_stop_and_errors() -> None:
+	state = pgml_lint.daemon.DaemonState(VERSION)
+	status = list(state.handle({"command": "status"}))[0]
+	assert status["version"] == VERSION
+	assert "pgml_blanks" in status["plugins"]
+	mismatch = list(state.handle({"command": "lint", "version": "other", "files": []}))
+	assert "error" in mismatch[0]
+	unknown = list(state.handle({"command": "reload"}))
+	assert "error" in unknown[0]
+	assert not state.stopping
+	assert list(state.handle({"command": "stop"}))[0]["stopped"]
+	assert state.stopping
+	assert state.requests == 4
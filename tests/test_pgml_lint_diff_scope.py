@@ -0,0 +1,110 @@
+# Local modules
+import pgml_lint.diff_scope
+import pgml_lint.engine
+import pgml_lint.pgml
+import pgml_lint.registry
+import pgml_lint.rules
+
+PATCH = (
+	"diff --git a/probs/one.pg b/probs/one.pg\n"
+	"--- a/probs/one.pg\n"
+	"+++ b/probs/one.pg\n"
+	"@@ -1,6 +1,5 @@\n"
+	" DOCUMENT();\n"
+	"-$a = 1;\n"
+	"+$a = 2;\n"
+	" $b = 3;\n"
+	" $c = 4;\n"
+	"-$d = 5;\n"
+	" $e = 6;\n"
+	"\\ No newline at end of file\n"
+	"@@ -20,0 +20,2 @@\n"
+	"+-- a line that looks like a header\n"
+	"++++ another\n"
+	"--- /dev/null\n"
+	'+++ "b/caf\\303\\251.pg"\n'
+	"@@ -0,0 +1 @@\n"
+	"+DOCUMENT();\n"
+	"--- a/gone.pg\n"
+	"+++ /dev/null\n"
+	"@@ -1 +0,0 @@\n"
+	"-DOCUMENT();\n"
+)
+PG_TEXT = (
+	"DOCUMENT();\n"
+	"$x = rand(3);\n"
+	"BEGIN_PGML\n"
+	"First [_] <b>x</b>\n"
+	"END_PGML\n"
+	"$y = rand(4);\n"
+	"BEGIN_PGML\n"
+	"Second [_] <b>y</b>\n"
+	"END_PGML\n"
+	"ENDDOCUMENT();\n"
+)
+
+
+#============================================
+
+def test_parse_unified_diff_keeps_changed_lines_only() -> None:
+	scopes = pgml_lint.diff_scope.parse_unified_diff(PATCH)
+	# Context lines are out of scope; the removed $d line touches lines 4 and 5
+	assert scopes["probs/one.pg"] == [(2, 2), (4, 5), (20, 21)]
+	assert scopes["caf\u00e9.pg"] == [(1, 1)]
+	assert "gone.pg" not in scopes
+
+
+#============================================
+
+def test_lines_in_scope() -> None:
+	scope = [(2, 2), (4, 5), (20, 21)]
+	assert pgml_lint.diff_scope.lines_in_scope(scope, 5, 5)
+	assert pgml_lint.diff_scope.lines_in_scope(scope, 6, 25)
+	assert not pgml_lint.diff_scope.lines_in_scope(scope, 3, 3)
+	assert not pgml_lint.diff_scope.lines_in_scope(scope, 6, 19)
+	assert not pgml_lint.diff_scope.lines_in_scope(scope, 22, 30)
+
+
+#============================================
+
+def test_scoped_lint_reports_only_changed_lines() -> None:
+	block_rules, macro_rules = pgml_lint.rules.load_rules(None)
+	plugins = pgml_lint.registry.build_registry().resolve_plugins(set(), set(), set())
+	scope = [(6, 8)]
+	full = pgml_lint.engine.lint_text(PG_TEXT, None, block_rules, macro_rules, plugins, None, None, False)
+	scoped = pgml_lint.engine.lint_text(PG_TEXT, None, block_rules, macro_rules, plugins, None, None, False, scope)
+	assert scoped == pgml_lint.diff_scope.filter_issues(full, scope)
+	assert {issue["line"] for issue in scoped} == {6, 8}
+	context = pgml_lint.engine.build_context(PG_TEXT, None, block_rules, macro_rules, None, None, scope)
+	blocks = pgml_lint.pgml.blocks_for(context)
+	assert [block.start for block in blocks] == [PG_TEXT.index("First"), PG_TEXT.index("Second")]
+	# Only a SEGMENT_LOCAL plugin's region_scope leaves out the first block
+	context["region_scope"] = scope
+	assert [block.start for block in pgml_lint.pgml.blocks_for(context)] == [PG_TEXT.index("Second")]
+	assert len(pgml_lint.pgml.blocks_for(context, scoped=False)) == 2
+
+
+#============================================
+
+def test_scoped_lint_keeps_cross_region_context() -> None:
+	text = (
+		"DOCUMENT();\n"
+		"loadMacros('PGstandard.pl', 'PGML.pl');\n"
+		"$s = \"<span class='x'>a</span>\";\n"
+		"BEGIN_PGML\n"
+		"Value [$s]*\n"
+		"END_PGML\n"
+		"$t = 1;\n"
+		"BEGIN_PGML\n"
+		"Second [_]{$t}\n"
+		"END_PGML\n"
+		"ENDDOCUMENT();\n"
+	)
+	block_rules, macro_rules = pgml_lint.rules.load_rules(None)
+	plugins = pgml_lint.registry.build_registry().resolve_plugins(set(), set(), set())
+	# The [$s]* use sits in a block outside the scope; $s is still interpolated
+	scope = [(3, 3), (8, 8)]
+	full = pgml_lint.engine.lint_text(text, None, block_rules, macro_rules, plugins, None, None, False)
+	scoped = pgml_lint.engine.lint_text(text, None, block_rules, macro_rules, plugins, None, None, False, scope)
+	assert scoped == pgml_lint.diff_scope.filter_issues(full, scope)
+	assert not [issue for issue in scoped if issue["plugin"] == "pgml_span_interpolation"]
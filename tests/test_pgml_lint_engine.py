@@ -1,7 +1,11 @@
+# Standard Library
+import json
+
 # Third party
 import pytest
 
 # Local modules
+import pgml_lint.cache
 import pgml_lint.engine
 
 
@@ -44,6 +48,53 @@ def test_run_plugins_adds_plugin_id_and_sorts() -> None:
 	assert results[1]["plugin"] == "plug_a"
 
 
+#============================================
+
+def test_run_plugins_drops_helper_issues() -> None:
+	context: dict[str, object] = {}
+
+	def produce(plugin_context: dict[str, object]) -> list[dict[str, object]]:
+		plugin_context["shared"] = 3
+		return [{"severity": "ERROR", "message": "hidden"}]
+
+	def consume(plugin_context: dict[str, object]) -> list[dict[str, object]]:
+		return [{"severity": "WARNING", "message": f"saw {plugin_context['shared']}"}]
+
+	plugins = [
+		{"id": "producer", "run": produce, "report": False},
+		{"id": "consumer", "run": consume},
+	]
+	results = pgml_lint.engine.run_plugins(context, plugins)
+	assert results == [{"severity": "WARNING", "message": "saw 3", "plugin": "consumer"}]
+
+
+#============================================
+
+def test_run_plugins_skips_untriggered_plugins() -> None:
+	calls: list[str] = []
+
+	def make_run(plugin_id: str) -> object:
+		def run_plugin(_context: dict[str, object]) -> list[dict[str, object]]:
+			calls.append(plugin_id)
+			return []
+		return run_plugin
+
+	plugins = [
+		{"id": "modes", "run": make_run("modes"), "triggers": ("MODES",)},
+		{"id": "cmp", "run": make_run("cmp"), "triggers": ("_cmp", "ans_rule")},
+		{"id": "pgml", "run": make_run("pgml"), "trigger_fields": ("uses_pgml",)},
+		{"id": "always", "run": make_run("always")},
+	]
+	context = {"text": "ANS(num_cmp(3));", "uses_pgml": False}
+	pgml_lint.engine.run_plugins(context, plugins)
+	assert calls == ["cmp", "always"]
+
+	calls.clear()
+	context = {"text": "MODES(TeX => '');", "uses_pgml": True}
+	pgml_lint.engine.run_plugins(context, plugins)
+	assert calls == ["modes", "pgml", "always"]
+
+
 #============================================
 
 def test_lint_text_uses_plugins() -> None:
@@ -64,3 +115,70 @@ def test_lint_text_uses_plugins() -> None:
 
 def test_lint_file_skipped() -> None:
 	pytest.skip("lint_file reads files from disk, which is not allowed in unit tests", allow_module_level=False)
+
+
+#============================================
+
+def test_lint_text_excerpts_are_optional() -> None:
+	text = "BEGIN_PGML\n[@ [< @]*\nEND_PGML\n"
+
+	def run_plugin(context: dict[str, object]) -> list[dict[str, object]]:
+		return [{"severity": "ERROR", "message": "m", "line": 2, "column": 4}]
+
+	plugins = [{"id": "p", "run": run_plugin}]
+	with_excerpts = pgml_lint.engine.lint_text(text, None, [], [], plugins)
+	assert with_excerpts[0]["excerpt"] == "[@ [< @]*"
+	without = pgml_lint.engine.lint_text(text, None, [], [], plugins, excerpts=False)
+	assert "excerpt" not in without[0]
+
+
+#============================================
+
+class MemoryCache(pgml_lint.cache.ResultCache):
+	"""
+	ResultCache with entries in a dict instead of a directory.
+	"""
+
+	def __init__(self) -> None:
+		self.linter_version = "test"
+		self._fingerprints = {}
+		self.entries: dict[str, dict[str, object]] = {}
+
+	def get(self, key: str) -> dict[str, object] | None:
+		return self.entries.get(key)
+
+	def put(self, key: str, value: dict[str, object]) -> None:
+		self.entries[key] = json.loads(json.dumps(value))
+
+
+#============================================
+
+def test_lint_source_runs_only_plugins_without_cached_results() -> None:
+	text = "DOCUMENT();\n# note\n$x = 1;\nENDDOCUMENT();\n"
+	calls: list[str] = []
+
+	def make_run(plugin_id: str, line: int) -> object:
+		def run_plugin(context: dict[str, object]) -> list[dict[str, object]]:
+			calls.append(plugin_id)
+			if plugin_id == "producer":
+				context["shared"] = line
+				return [{"severity": "WARNING", "message": "made", "line": line}]
+			return [{"severity": "ERROR", "message": f"{plugin_id} {context.get('shared')}", "line": line}]
+		return run_plugin
+
+	producer = {"id": "producer", "run": make_run("producer", 2), "provides": ("shared",)}
+	first = {"id": "first", "run": make_run("first", 1)}
+	consumer = {"id": "consumer", "run": make_run("consumer", 1), "requires": ("shared",)}
+	cache = MemoryCache()
+	expected = pgml_lint.engine.lint_text(text, "a.pg", [], [], [producer, first, consumer], excerpts=False)
+	calls.clear()
+	pgml_lint.engine.lint_source(text, "a.pg", [], [], [producer, first], None, cache)
+	assert calls == ["producer", "first"]
+	calls.clear()
+	issues = pgml_lint.engine.lint_source(text, "a.pg", [], [], [producer, first, consumer], None, cache, excerpts=False)
+	# The cached producer runs again only as a helper for the new consumer
+	assert calls == ["producer", "consumer"]
+	assert issues == expected
+	calls.clear()
+	pgml_lint.engine.lint_source(text, "a.pg", [], [], [producer, first, consumer], None, cache)
+	assert calls == []
@@ -0,0 +1,44 @@
+# Standard Library
+import io
+import os
+
+# Third party
+import pytest
+
+# Local modules
+import pgml_lint.git_changes
+
+
+#============================================
+
+def test_read_batch_object_parses_headers_and_payloads() -> None:
+	oid = "a" * 40
+	# Answers as git cat-file --batch writes them; payloads may hold newlines
+	stream = io.BytesIO(
+		f"{oid} blob 6\n".encode("ascii") + b"ab\ncd\n" + b"\n"
+		+ b"HEAD:no/such/file.pg missing\n"
+		+ f"{oid} tree 0\n".encode("ascii") + b"\n"
+		+ b"abc ambiguous\n"
+	)
+	read = pgml_lint.git_changes.read_batch_object
+	assert read(stream, "HEAD:a.pg") == ("blob", b"ab\ncd\n")
+	assert read(stream, "HEAD:no/such/file.pg") is None
+	assert read(stream, "HEAD:lib") == ("tree", b"")
+	assert read(stream, "abc") is None
+	with pytest.raises(RuntimeError):
+		read(stream, "HEAD:b.pg")
+
+
+#============================================
+
+def test_parse_name_list_keeps_lint_files() -> None:
+	output = b"b.pg\0a.PG\0notes.txt\0odd\nname.pg\0\0"
+	names = pgml_lint.git_changes.parse_name_list(output, [".pg"])
+	assert names == ["a.PG", "b.pg"]
+	assert pgml_lint.git_changes.display_path(os.getcwd(), "a/b.pg") == os.path.join("a", "b.pg")
+
+
+#============================================
+
+def test_iter_blobs_skipped() -> None:
+	pytest.skip("iter_blobs and changed_files run subprocess git calls, which is not allowed in unit tests", allow_module_level=False)
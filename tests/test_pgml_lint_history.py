@@ -0,0 +1,84 @@
+# Standard Library
+import hashlib
+
+# Local modules
+import pgml_lint.core
+import pgml_lint.history
+
+
+#============================================
+
+def _oid(label: str) -> bytes:
+	return hashlib.sha1(label.encode("ascii")).digest()
+
+
+#============================================
+
+class FakeReader:
+	"""
+	Serve tree and blob objects from a dict, counting reads.
+	"""
+
+	def __init__(self, objects: dict[str, tuple[str, bytes]]) -> None:
+		self.objects = objects
+		self.reads = []
+
+	def read(self, object_name: str) -> tuple[str, bytes] | None:
+		self.reads.append(object_name)
+		return self.objects.get(object_name)
+
+
+#============================================
+
+def test_parse_tree_and_commit() -> None:
+	data = b"40000 sub\0" + _oid("sub") + b"100644 caf\xc3\xa9.pg\0" + _oid("pg")
+	entries = pgml_lint.history.parse_tree(data)
+	assert entries == [
+		(b"40000", "sub", _oid("sub").hex()),
+		(b"100644", "caf\u00e9.pg", _oid("pg").hex()),
+	]
+	commit = b"tree abc\nparent def\nauthor A <a@b> 1 +0000\ncommitter C <c@d> 1700000000 -0500\n\ntree not a header\n"
+	assert pgml_lint.history.parse_commit(commit) == ("abc", 1700000000)
+
+
+#============================================
+
+def test_scanner_lints_each_blob_once_and_reuses_unchanged_trees() -> None:
+	same, changed, new = _oid("same").hex(), _oid("changed").hex(), _oid("new").hex()
+	lib_one, lib_two = _oid("lib1").hex(), _oid("lib2").hex()
+	objects = {
+		"c1": ("commit", b"tree root1\ncommitter C <c@d> 10 +0000\n"),
+		"c2": ("commit", b"tree root2\ncommitter C <c@d> 20 +0000\n"),
+		"root1": ("tree", b"40000 lib\0" + bytes.fromhex(lib_one) + b"100644 README\0" + bytes.fromhex(same)),
+		# Only lib/b.pg changed; a.pg keeps its blob id
+		"root2": ("tree", b"40000 lib\0" + bytes.fromhex(lib_two)),
+		lib_one: ("tree", b"100644 a.pg\0" + bytes.fromhex(same) + b"100644 b.pg\0" + bytes.fromhex(changed)),
+		lib_two: (
+			"tree",
+			b"100644 a.pg\0" + bytes.fromhex(same) + b"100644 b.pg\0" + bytes.fromhex(new)
+			+ b"120000 link.pg\0" + bytes.fromhex(same),
+		),
+		same: ("blob", b"ok"),
+		changed: ("blob", b"bad"),
+		new: ("blob", b"bad\r\nbad"),
+	}
+	linted = []
+
+	def lint(text: str, name: str) -> list:
+		linted.append(name)
+		return [pgml_lint.core.Issue("ERROR", "bad", 1, None, "demo") for line in text.split("\n") if line == "bad"]
+
+	reader = FakeReader(objects)
+	scanner = pgml_lint.history.HistoryScanner(reader, lint)
+	first, time_one = scanner.commit_totals("c1")
+	second, time_two = scanner.commit_totals("c2", "lib")
+	assert (time_one, time_two) == (10, 20)
+	assert first.to_dict() == {"files": 2, "errors": 1, "warnings": 0, "plugins": {"demo": 1}}
+	# The symlink is skipped; a.pg is not linted again
+	assert second.to_dict() == {"files": 2, "errors": 2, "warnings": 0, "plugins": {"demo": 2}}
+	assert linted == ["lib/a.pg", "lib/b.pg", "lib/b.pg"]
+	# A tree seen before is not read again
+	del reader.reads[:]
+	assert scanner.commit_totals("c1")[0].files == 2
+	assert reader.reads == ["c1"]
+	assert scanner.commit_totals("c1", "missing")[0].files == 0
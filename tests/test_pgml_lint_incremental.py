@@ -0,0 +1,106 @@
+# Standard Library
+import random
+
+# Local modules
+import pgml_lint.benchmark
+import pgml_lint.engine
+import pgml_lint.incremental
+import pgml_lint.registry
+import pgml_lint.rules
+
+PG_TEXT = (
+	"DOCUMENT();\n"
+	"loadMacros('PGstandard.pl', 'PGML.pl');\n"
+	"$a = Compute(\n"
+	"  '1 + x'\n"
+	");\n"
+	"$b = 'two\n"
+	"lines';\n"
+	"BEGIN_PGML\n"
+	"Enter [_]{$a}\n"
+	"\n"
+	"and [_]{$b}\n"
+	"END_PGML\n"
+	"ENDDOCUMENT();\n"
+)
+
+
+#============================================
+
+def _keys(issues: list) -> list[tuple]:
+	return [(issue.line, issue.column, issue.message, issue.severity, issue.plugin) for issue in issues]
+
+
+#============================================
+
+def test_segment_starts_keep_statements_and_blocks_whole() -> None:
+	block_rules, macro_rules = pgml_lint.rules.load_rules(None)
+	context = pgml_lint.engine.build_context(PG_TEXT, None, block_rules, macro_rules)
+	# The Compute() call, the two-line string, and the PGML block each stay in one segment;
+	# the empty line after the final newline is a segment too
+	assert pgml_lint.incremental.segment_starts(context) == [0, 1, 2, 5, 7, 12, 13]
+
+
+#============================================
+
+def test_incremental_lint_matches_full_lint_across_edits() -> None:
+	block_rules, macro_rules = pgml_lint.rules.load_rules(None)
+	registry = pgml_lint.registry.build_registry()
+	plugins = registry.resolve_plugins({plugin["id"] for plugin in registry.list_plugins()}, set(), set())
+	linter = pgml_lint.incremental.IncrementalLinter(block_rules, macro_rules, plugins)
+	rng = random.Random(5)
+	text = pgml_lint.benchmark.generate_pg_text(rng, 4)
+	for _ in range(40):
+		pos = rng.randint(0, len(text))
+		if rng.random() < 0.6:
+			text = text[:pos] + rng.choice(["[", "]", "'", "\n", "x", "[_]{$v}", "BEGIN_PGML\n", "END_PGML\n"]) + text[pos:]
+		else:
+			text = text[:pos] + text[pos + rng.randint(1, 4) :]
+		expected = pgml_lint.engine.lint_text(text, None, block_rules, macro_rules, plugins, None, None, False)
+		assert _keys(linter.lint(text)) == _keys(expected)
+
+
+#============================================
+
+def test_incremental_lint_matches_full_lint_with_comments_and_heredocs() -> None:
+	block_rules, macro_rules = pgml_lint.rules.load_rules(None)
+	registry = pgml_lint.registry.build_registry()
+	plugins = registry.resolve_plugins({plugin["id"] for plugin in registry.list_plugins()}, set(), set())
+	linter = pgml_lint.incremental.IncrementalLinter(block_rules, macro_rules, plugins)
+	rng = random.Random(17)
+	text = pgml_lint.benchmark.generate_pg_text(rng, 3)
+	# Comments and heredoc bodies shorten stripped_text; blanked segments change by how much
+	edits = [
+		"# a comment that stripping removes\n",
+		"$x = 1; # trailing comment\n",
+		"$h = <<'EOT';\nheredoc body\nEOT\n",
+		"TEXT(ans_rule(3));\n",
+		"[@ ans_rule(4) @]*",
+		"#",
+		"\n",
+	]
+	for _ in range(40):
+		pos = rng.randint(0, len(text))
+		if rng.random() < 0.7:
+			text = text[:pos] + rng.choice(edits) + text[pos:]
+		else:
+			text = text[:pos] + text[pos + rng.randint(1, 6) :]
+		expected = pgml_lint.engine.lint_text(text, None, block_rules, macro_rules, plugins, None, None, False)
+		assert _keys(linter.lint(text)) == _keys(expected)
+
+
+#============================================
+
+def test_unchanged_segments_are_reused() -> None:
+	block_rules, macro_rules = pgml_lint.rules.load_rules(None)
+	plugins = pgml_lint.registry.build_registry().resolve_plugins(set(), set(), set())
+	linter = pgml_lint.incremental.IncrementalLinter(block_rules, macro_rules, plugins)
+	linter.lint(PG_TEXT)
+	assert linter.segments_linted == 7
+	assert linter.segments_reused == 0
+	edited = PG_TEXT.replace("and [_]{$b}", "and [_]{$c}")
+	issues = linter.lint(edited)
+	# Only the edited PGML block is linted again
+	assert linter.segments_linted == 8
+	assert linter.segments_reused == 6
+	assert any("$c" in str(issue.message) for issue in issues)
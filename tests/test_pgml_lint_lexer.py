@@ -0,0 +1,161 @@
+# Standard Library
+import re
+
+# Third party
+import pytest
+
+# Local modules
+import pgml_lint.lexer
+
+
+#============================================
+
+def test_strings_and_comments() -> None:
+	text = "my $x = \"a(b\"; # c(\nmy $y = 1;\n"
+	tokens = pgml_lint.lexer.lex_perl(text)
+	assert tokens.in_string(text.index("a(b"))
+	assert tokens.in_comment(text.index("c("))
+	assert tokens.is_code(text.index("$y"))
+	# Parens inside the string and the comment are not brackets
+	assert tokens.closers == {}
+
+
+#============================================
+
+def test_code_strings_span_lines() -> None:
+	text = "$s = \"first\nrandom(1)\";\nrandom(2);\n"
+	tokens = pgml_lint.lexer.lex_perl(text)
+	assert tokens.in_string(text.index("random(1)"))
+	assert tokens.is_code(text.index("random(2)"))
+
+
+#============================================
+
+@pytest.mark.parametrize(
+	"literal",
+	["q{a(b}", "qq(a(b))", "qw[a( b]", "s/a(/b/g", "tr{a(}{b}", "m!a(!i"],
+)
+def test_quote_like_literals(literal: str) -> None:
+	text = f"$v = {literal}; f(1);\n"
+	tokens = pgml_lint.lexer.lex_perl(text)
+	assert tokens.in_string(text.index("a("))
+	open_pos = text.index("f(") + 1
+	assert tokens.matching_close(open_pos) == text.index(");\n")
+
+
+#============================================
+
+@pytest.mark.parametrize(
+	"text",
+	["$h{s} = 1;\n", "%h = (s => 1, y => 2);\n", "$q = $s->y(3);\n", "$this = 1;\n"],
+)
+def test_quote_operator_names_stay_code(text: str) -> None:
+	tokens = pgml_lint.lexer.lex_perl(text)
+	assert tokens.starts == []
+
+
+#============================================
+
+def test_last_index_is_not_comment() -> None:
+	text = "$n = $#list; f(1);\n"
+	tokens = pgml_lint.lexer.lex_perl(text)
+	assert tokens.is_code(text.index("f(1)"))
+
+
+#============================================
+
+def test_regex_literal_versus_division() -> None:
+	text = "@p = split /'/, $x;\n$r = $a / 2; $c = 'z';\n"
+	tokens = pgml_lint.lexer.lex_perl(text)
+	assert tokens.in_string(text.index("'/"))
+	assert tokens.is_code(text.index("/ 2"))
+	assert tokens.in_string(text.index("'z'"))
+
+
+#============================================
+
+def test_heredoc_body_is_string() -> None:
+	text = "$t = <<END;\nrandom(1) don't\nEND\nrandom(2);\n"
+	tokens = pgml_lint.lexer.lex_perl(text)
+	assert tokens.in_string(text.index("random(1)"))
+	assert tokens.is_code(text.index("random(2)"))
+	# Blanked heredoc bodies (stripped_text) must not pair with a later line
+	skipped = pgml_lint.lexer.lex_perl(text, heredocs=False)
+	assert skipped.is_code(text.index("random(1)"))
+
+
+#============================================
+
+def test_pgml_prose_and_inline_code() -> None:
+	text = (
+		"BEGIN_PGML\n"
+		"It's [@ MODES(TeX => q{}, HTML => '<br>') @]* and 'x\n"
+		"END_PGML\n"
+		"f(1);\n"
+	)
+	tokens = pgml_lint.lexer.lex_perl(text)
+	# The apostrophe in It's does not open a string
+	assert tokens.is_code(text.index("[@"))
+	assert tokens.string_at(text.index("q{}")) == (text.index("q{}") + 2, text.index("q{}") + 2)
+	# An unterminated prose quote stops at the end of its line
+	assert tokens.in_string(text.index("'x") + 1)
+	assert tokens.is_code(text.index("f(1)"))
+
+
+#============================================
+
+def test_pod_is_comment() -> None:
+	text = "=pod\n\nrandom(1)\n\n=cut\nrandom(2);\n"
+	tokens = pgml_lint.lexer.lex_perl(text)
+	assert tokens.in_comment(text.index("random(1)"))
+	assert tokens.is_code(text.index("random(2)"))
+
+
+#============================================
+
+def test_argument_spans() -> None:
+	text = "f(1, [2, 3], {a => 4},\n  g(5, 6));\ne();\nt(1,);\n"
+	tokens = pgml_lint.lexer.lex_perl(text)
+	spans = tokens.argument_spans(text.index("f(") + 1)
+	args = [text[start:end].strip() for start, end in spans]
+	assert args == ["1", "[2, 3]", "{a => 4}", "g(5, 6)"]
+	assert tokens.argument_spans(text.index("e(") + 1) == []
+	trailing = tokens.argument_spans(text.index("t(") + 1)
+	assert [text[start:end].strip() for start, end in trailing] == ["1", ""]
+
+
+#============================================
+
+def test_unbalanced_paren_has_no_close() -> None:
+	text = "loadMacros(\n'a.pl',\nf(1);\n"
+	tokens = pgml_lint.lexer.lex_perl(text)
+	assert tokens.matching_close(text.index("(")) is None
+	assert tokens.argument_spans(text.index("(")) is None
+
+
+#============================================
+
+def test_call_spans_skip_strings_and_nested_calls() -> None:
+	text = "$a = 'MODES(x)';\nMODES(TeX => MODES(1), HTML => 2);\n"
+	tokens = pgml_lint.lexer.lex_perl(text)
+	spans = tokens.call_spans(re.compile(r"\bMODES\s*\("))
+	assert len(spans) == 1
+	open_pos, close_pos = spans[0]
+	assert text[open_pos : close_pos + 1] == "(TeX => MODES(1), HTML => 2)"
+
+
+#============================================
+
+def test_code_text_drops_comments() -> None:
+	text = "a(1, # one\n2);\n"
+	tokens = pgml_lint.lexer.lex_perl(text)
+	assert tokens.code_text(0, len(text)) == "a(1, \n2);\n"
+	assert tokens.line_of(text.index("2);")) == 2
+
+
+#============================================
+
+def test_tokens_for_falls_back_to_lexing() -> None:
+	context = {"stripped_text": "f('a');\n"}
+	tokens = pgml_lint.lexer.tokens_for(context, "stripped_text")
+	assert tokens.in_string(3)
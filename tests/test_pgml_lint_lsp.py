@@ -0,0 +1,120 @@
+# Standard Library
+import io
+import random
+
+# Local modules
+import pgml_lint.lsp
+import pgml_lint.parser
+
+VERSION = "0.test"
+URI = "file:///work/problem%20one.pg"
+PG_TEXT = 'DOCUMENT();\nBEGIN_PGML\n\U0001d465 [@ "[$x]" @]*\nEND_PGML\nENDDOCUMENT();\n'
+
+
+#============================================
+
+def _frame(*messages: dict[str, object]) -> io.BytesIO:
+	stream = io.BytesIO()
+	for message in messages:
+		pgml_lint.lsp.write_message(stream, message)
+	stream.seek(0)
+	return stream
+
+
+#============================================
+
+def _read_all(stream: io.BytesIO) -> list[dict[str, object]]:
+	stream.seek(0)
+	messages = []
+	while True:
+		message = pgml_lint.lsp.read_message(stream)
+		if message is None:
+			return messages
+		messages.append(message)
+
+
+#============================================
+
+def test_message_framing_round_trips() -> None:
+	messages = [{"jsonrpc": "2.0", "id": 1, "method": "initialize"}, {"text": "caf\u00e9 \U0001d465"}]
+	assert _read_all(_frame(*messages)) == messages
+
+
+#============================================
+
+def test_edits_keep_the_newline_index_current() -> None:
+	rng = random.Random(3)
+	document = pgml_lint.lsp.TextDocument(URI, PG_TEXT, 1)
+	for _ in range(200):
+		start_line = rng.randint(0, len(document.newlines))
+		end_line = min(len(document.newlines), start_line + rng.randint(0, 2))
+		change = {
+			"range": {
+				"start": {"line": start_line, "character": rng.randint(0, 6)},
+				"end": {"line": end_line, "character": rng.randint(0, 6)},
+			},
+			"text": rng.choice(["", "x", "\n", "a\nb", "[_]\r\n", "\U0001d465"]),
+		}
+		document.apply_change(change)
+		assert document.newlines == pgml_lint.parser.build_newline_index(document.text)
+
+
+#============================================
+
+def test_positions_count_utf16_code_units() -> None:
+	document = pgml_lint.lsp.TextDocument(URI, "a\U0001d465b\r\nc\n")
+	# The astral character takes two UTF-16 code units
+	assert document.offset_at({"line": 0, "character": 3}) == 2
+	assert document.position_at(1, 3) == {"line": 0, "character": 3}
+	# Line ends exclude the CR of a CRLF
+	assert document.line_end(1) == {"line": 0, "character": 4}
+	assert document.offset_at({"line": 0, "character": 99}) == 3
+	document.apply_change({"range": {"start": {"line": 0, "character": 1}, "end": {"line": 0, "character": 3}}, "text": "="})
+	assert document.text == "a=b\r\nc\n"
+
+
+#============================================
+
+def test_server_publishes_debounced_diagnostics() -> None:
+	writer = io.BytesIO()
+	server = pgml_lint.lsp.LanguageServer(writer, VERSION, debounce=10.0)
+	server.handle({"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}})
+	item = {"uri": URI, "languageId": "pg", "version": 1, "text": PG_TEXT}
+	server.handle({"jsonrpc": "2.0", "method": "textDocument/didOpen", "params": {"textDocument": item}})
+	server.publish_due()
+	# Replace [$x]; the astral character before it takes two UTF-16 code units
+	change = {"range": {"start": {"line": 2, "character": 7}, "end": {"line": 2, "character": 11}}, "text": "y"}
+	params = {"textDocument": {"uri": URI, "version": 2}, "contentChanges": [change]}
+	server.handle({"jsonrpc": "2.0", "method": "textDocument/didChange", "params": params})
+	# Nothing is published until the debounce delay has passed
+	server.publish_due()
+	assert len(_read_all(writer)) == 2
+	server.publish_due(server.next_deadline())
+	server.handle({"jsonrpc": "2.0", "id": 2, "method": "hover", "params": {}})
+	messages = _read_all(writer)
+	assert messages[0]["result"]["capabilities"]["textDocumentSync"]["change"] == 2
+	opened = messages[1]["params"]
+	assert opened["uri"] == URI and opened["version"] == 1
+	diagnostic = next(item for item in opened["diagnostics"] if "[$x]" in item["message"])
+	assert diagnostic["range"] == {"start": {"line": 2, "character": 7}, "end": {"line": 2, "character": 16}}
+	assert diagnostic["severity"] == 1
+	assert diagnostic["code"] == "pgml_inline_pgml_syntax"
+	changed = messages[2]["params"]
+	assert changed["version"] == 2
+	assert not any("[$x]" in item["message"] for item in changed["diagnostics"])
+	assert messages[3]["error"]["code"] == pgml_lint.lsp.METHOD_NOT_FOUND
+
+
+#============================================
+
+def test_serve_exits_after_shutdown_and_exit() -> None:
+	reader = _frame(
+		{"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}},
+		{"jsonrpc": "2.0", "id": 2, "method": "shutdown"},
+		{"jsonrpc": "2.0", "method": "exit"},
+	)
+	writer = io.BytesIO()
+	assert pgml_lint.lsp.serve(reader, writer, VERSION) == 0
+	assert [message["id"] for message in _read_all(writer)] == [1, 2]
+	assert pgml_lint.lsp.uri_to_path(URI) == "/work/problem one.pg"
+	assert pgml_lint.lsp.uri_to_path("untitled:Untitled-1") is None
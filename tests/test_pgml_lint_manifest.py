@@ -0,0 +1,44 @@
+# Standard Library
+import os
+
+# Local modules
+import pgml_lint.core
+import pgml_lint.manifest
+import pgml_lint.rules
+
+MISSING_PATH = os.path.join(os.path.dirname(__file__), "no_such_dir", "manifest.json")
+
+
+#============================================
+
+def test_config_key_tracks_settings() -> None:
+	block_rules, macro_rules = pgml_lint.rules.load_rules(None)
+	plugin_ids = ["block_markers", "pgml_inline"]
+	key = pgml_lint.manifest.config_key("26.01b1", None, plugin_ids, block_rules, macro_rules)
+	assert key == pgml_lint.manifest.config_key("26.01b1", " 2.17 ", plugin_ids, block_rules, macro_rules)
+	assert key != pgml_lint.manifest.config_key("26.02", None, plugin_ids, block_rules, macro_rules)
+	assert key != pgml_lint.manifest.config_key("26.01b1", "2.18", plugin_ids, block_rules, macro_rules)
+	assert key != pgml_lint.manifest.config_key("26.01b1", None, ["block_markers"], block_rules, macro_rules)
+	# A rule edit without a version bump must not reuse old results
+	assert key != pgml_lint.manifest.config_key("26.01b1", None, plugin_ids, block_rules[1:], macro_rules)
+	assert key != pgml_lint.manifest.config_key("26.01b1", None, plugin_ids, block_rules, macro_rules[1:])
+
+
+#============================================
+
+def test_merge_keeps_order_and_records_linted_files() -> None:
+	manifest = pgml_lint.manifest.LibraryManifest(MISSING_PATH, "config")
+	assert manifest.entries == {}
+	manifest.next_entries[os.path.abspath("b.pg")] = {"size": 5, "mtime_ns": 7, "sha256": "ab"}
+	reused = {
+		"a.pg": [pgml_lint.core.Issue("WARNING", "old", 1, 1, "demo", "kept")],
+		"c.pg": [],
+	}
+	linted = [("b.pg", [pgml_lint.core.Issue("ERROR", "new", 2, 3, "demo", "x = [")])]
+	merged = list(manifest.merge(["a.pg", "b.pg", "c.pg"], reused, linted, False))
+	assert [file_path for file_path, _issues in merged] == ["a.pg", "b.pg", "c.pg"]
+	# Output drops excerpts that were not asked for; the record keeps them
+	assert merged[1][1] == [{"severity": "ERROR", "message": "new", "line": 2, "column": 3, "plugin": "demo"}]
+	entry = manifest.next_entries[os.path.abspath("b.pg")]
+	assert entry["issues"][0]["excerpt"] == "x = ["
+	assert (entry["errors"], entry["warnings"]) == (1, 0)
@@ -0,0 +1,31 @@
+# Local modules
+import pgml_lint.parallel
+
+
+#============================================
+
+def test_reorder_results_restores_index_order() -> None:
+	results = [(2, "c"), (0, "a"), (3, "d"), (1, "b")]
+	ordered = list(pgml_lint.parallel.reorder_results(results))
+	assert ordered == [(0, "a"), (1, "b"), (2, "c"), (3, "d")]
+
+
+#============================================
+
+def test_reorder_results_yields_as_soon_as_contiguous() -> None:
+	results = iter([(1, "b"), (0, "a"), (3, "d"), (2, "c")])
+	ordered = pgml_lint.parallel.reorder_results(results)
+	# Index 0 unblocks both 0 and 1 before index 3 is consumed
+	assert next(ordered) == (0, "a")
+	assert next(ordered) == (1, "b")
+	assert next(ordered) == (2, "c")
+	assert next(ordered) == (3, "d")
+
+
+#============================================
+
+def test_init_worker_resolves_plugins_once() -> None:
+	pgml_lint.parallel._init_worker([], [], ["pgml_inline", "block_markers"], None, None)
+	plugins = pgml_lint.parallel.WORKER_STATE["plugins"]
+	# Registry order is kept regardless of the requested id order
+	assert [plugin["id"] for plugin in plugins] == ["block_markers", "pgml_inline"]
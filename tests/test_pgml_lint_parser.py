@@ -114,3 +114,86 @@ def test_extract_pgml_heredoc_regions_missing_terminator() -> None:
 	assert regions == []
 	assert len(issues) == 1
 	assert "not found" in issues[0]["message"]
+
+
+#============================================
+
+def test_scan_structure_matches_separate_passes() -> None:
+	text = (
+		"DOCUMENT();\n"
+		"my $a = 1; # comment\n"
+		"my $t = <<END_TEXT;\n"
+		"# kept inside heredoc\n"
+		"END_TEXT\n"
+		"BEGIN_PGML\n"
+		"[_]{$a}\n"
+		"END_PGML\n"
+		"my $h = PGML::Format(<<PGML);\n"
+		"Value\n"
+		"PGML\n"
+		"END_TEXT\n"
+		"ENDDOCUMENT();\n"
+	)
+	structure = pgml_lint.parser.scan_structure(text)
+	stripped_comments = pgml_lint.parser.strip_comments(text)
+	assert structure["stripped_comments"] == stripped_comments
+	assert structure["stripped_text"] == pgml_lint.parser.strip_heredocs(stripped_comments)
+	block_issues, block_regions = pgml_lint.parser.extract_block_markers(text)
+	assert structure["block_marker_issues"] == block_issues
+	assert structure["pgml_block_regions"] == block_regions
+	heredoc_issues, heredoc_regions = pgml_lint.parser.extract_pgml_heredoc_regions(text)
+	assert structure["pgml_heredoc_issues"] == heredoc_issues
+	assert structure["pgml_heredoc_regions"] == heredoc_regions
+	assert len(block_regions) == 1
+	assert len(heredoc_regions) == 1
+
+
+#============================================
+
+def test_scan_structure_commented_heredoc_not_stripped() -> None:
+	# A heredoc opener inside a comment must not swallow the following lines
+	text = "my $a = 1; # <<END\nmy $b = 2;\nEND\n"
+	structure = pgml_lint.parser.scan_structure(text)
+	assert "my $b = 2;" in structure["stripped_text"]
+
+
+#============================================
+
+def test_scan_structure_carriage_return_line_breaks() -> None:
+	text = "my $t = <<END;\rhidden\rEND\rmy $b = 2;\n"
+	structure = pgml_lint.parser.scan_structure(text)
+	stripped_comments = pgml_lint.parser.strip_comments(text)
+	assert structure["stripped_text"] == pgml_lint.parser.strip_heredocs(stripped_comments)
+
+
+#============================================
+
+def test_build_call_index() -> None:
+	text = "DOCUMENT();\n$a = random (1, 2, 1);\n$b = $x->random(3);\nPopUp\n([1], 0);\n$c = Real;\n"
+	index = pgml_lint.parser.build_call_index(text)
+	assert index["random"] == [text.index("random ("), text.index("random(3)")]
+	assert index["PopUp"] == [text.index("PopUp")]
+	assert "Real" not in index
+	assert pgml_lint.parser.has_empty_call(text, index, "DOCUMENT")
+	assert not pgml_lint.parser.has_empty_call(text, index, "random")
+
+
+#============================================
+
+def test_call_index_for_plain_dict_context() -> None:
+	context = {"stripped_text": "f(1); g (2); f(3);\n"}
+	index = pgml_lint.parser.call_index_for(context)
+	assert index == {"f": [0, 13], "g": [6]}
+	assert context["call_index"] is index
+
+
+#============================================
+
+def test_kept_spans_rebuild_stripped_text() -> None:
+	text = "$a = 1; # one\r\n$t = <<EOT;\nbody # kept\nEOT\n$b = '#';\n"
+	structure = pgml_lint.parser.scan_structure(text)
+	for name in ("stripped_comments", "stripped_text"):
+		spans = pgml_lint.parser.kept_spans(text, structure[name])
+		assert pgml_lint.parser.join_spans(text, spans) == structure[name]
+	assert pgml_lint.parser.kept_spans(text, text) == [[0, len(text)]]
+	assert pgml_lint.parser.kept_spans("abc", "x") is None
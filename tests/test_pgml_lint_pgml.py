@@ -99,3 +99,113 @@ def test_check_pgml_bracket_balance_ignores_masks() -> None:
 		blank_spans,
 	)
 	assert issues == []
+
+
+#============================================
+
+def _block_for(text: str) -> pgml_lint.pgml.PgmlBlock:
+	"""
+	Parse text as a single PGML region.
+	"""
+	region = {"start": 0, "end": len(text), "kind": "BEGIN_PGML"}
+	newlines = pgml_lint.parser.build_newline_index(text)
+	block = pgml_lint.pgml.PgmlBlock(text, region, newlines)
+	return block
+
+
+#============================================
+
+def test_pgml_block_model_offsets_are_absolute() -> None:
+	prefix = "xxxx"
+	body = "A [@ $a @]* [_]{$ans} [`x_1`] [$s]* [<b>]{['c']}{''}\n"
+	text = prefix + body
+	region = {"start": len(prefix), "end": len(text), "kind": "BEGIN_PGML"}
+	newlines = pgml_lint.parser.build_newline_index(text)
+	block = pgml_lint.pgml.PgmlBlock(text, region, newlines)
+	assert block.inline_spans == [(text.index("[@"), text.index("@]") + 2)]
+	assert block.blanks[0]["start"] == text.index("[_]")
+	assert block.blanks[0]["spec"] == "$ans"
+	assert pgml_lint.pgml.blank_spec_vars(block.blanks) == {"ans"}
+	assert block.math_spans == [(text.index("[`"), text.index("`]") + 2)]
+	interpolation = block.interpolations[0]
+	assert interpolation["name"] == "s"
+	assert interpolation["star"] is True
+	assert text[interpolation["start"] : interpolation["end"]] == "[$s]"
+	wrapper = block.tag_wrappers[0]
+	assert wrapper["start"] == text.index("[<")
+	assert wrapper["payloads"] == ["['c']", "''"]
+	assert block.relative(block.inline_spans) == [(body.index("[@"), body.index("@]") + 2)]
+
+
+#============================================
+
+def test_pgml_block_skips_inline_code() -> None:
+	block = _block_for("[@ '[$a] [_] [<b>]' @]*\n")
+	assert block.interpolations == []
+	assert block.blanks == []
+	assert block.tag_wrappers == []
+	# Blank markers inside inline code still count as blank spans for masking
+	assert len(block.blank_spans) == 1
+
+
+#============================================
+
+def test_pgml_block_emphasis_markers_by_paragraph() -> None:
+	block = _block_for("_a_ snake_case [`x_1`] \\_\n\n_open\n")
+	assert [len(markers) for markers in block.emphasis_markers] == [2, 1]
+
+
+#============================================
+
+def test_pgml_block_unclosed_tag_wrapper() -> None:
+	block = _block_for("[<span\n[<b>]{['x']}\n")
+	assert block.tag_wrappers[0]["close"] is None
+	assert block.tag_wrappers[1]["close"] is not None
+
+
+#============================================
+
+def test_blocks_for_caches_and_filters_heredocs() -> None:
+	text = "BEGIN_PGML\nA\nEND_PGML\n"
+	context = {
+		"text": text,
+		"newlines": pgml_lint.parser.build_newline_index(text),
+		"pgml_regions": [
+			{"start": 11, "end": 13, "kind": "BEGIN_PGML"},
+			{"start": 0, "end": 4, "kind": "HEREDOC_PGML"},
+		],
+	}
+	blocks = pgml_lint.pgml.blocks_for(context)
+	assert len(blocks) == 2
+	assert context["pgml_blocks"] is blocks
+	only_blocks = pgml_lint.pgml.blocks_for(context, heredocs=False)
+	assert [block.kind for block in only_blocks] == ["BEGIN_PGML"]
+
+
+#============================================
+
+def test_span_index_merges_and_bisects() -> None:
+	index = pgml_lint.pgml.SpanIndex([(10, 14), (2, 5), (4, 8), (8, 9), (20, 20)], 100)
+	assert index.starts == [102, 110]
+	assert index.ends == [109, 114]
+	assert len(index) == 2
+	assert index.contains(102)
+	assert index.contains(108)
+	assert not index.contains(109)
+	assert 113 in index
+	assert 120 not in index
+
+
+#============================================
+
+def test_find_unbalanced_brackets_escapes_and_masks() -> None:
+	block_text = "\\[ [@ [ @] ok ] ["
+	newlines = pgml_lint.parser.build_newline_index(block_text)
+	_issues, inline_spans = pgml_lint.pgml.extract_inline_spans(block_text, 0, newlines)
+	index = pgml_lint.pgml.SpanIndex(inline_spans)
+	issues = pgml_lint.pgml.find_unbalanced_brackets(block_text, 0, newlines, index)
+	messages = [issue["message"] for issue in issues]
+	assert messages == [
+		"PGML bracket close ] without matching [",
+		"PGML bracket open [ without matching ]",
+	]
@@ -109,3 +109,30 @@ def test_dropdown_compat_skips_pg_version_warning() -> None:
 	}
 	issues = pgml_lint.plugins.macro_rules.run(context)
 	assert issues == []
+
+
+#============================================
+
+def test_run_matches_alternation_and_complex_patterns() -> None:
+	rules = [
+		{
+			"label": "MathObjects",
+			"pattern": r"\b(?:Context|Compute|Formula|Real)\s*\(",
+			"required_macros": ["mathobjects.pl"],
+		},
+		{
+			"label": "Fraction context",
+			"pattern": r"\bContext\s*\(\s*['\"]Fraction['\"]\s*\)",
+			"required_macros": ["contextfraction.pl"],
+		},
+	]
+	context = {
+		"stripped_text": "DOCUMENT();\n$f = Formula('x');\nContext( 'Fraction' );\n",
+		"macros_loaded": set(),
+		"macro_rules": rules,
+	}
+	issues = pgml_lint.plugins.macro_rules.run(context)
+	messages = [issue["message"] for issue in issues]
+	assert len(messages) == 2
+	assert messages[0].startswith("MathObjects")
+	assert messages[1].startswith("Fraction context")
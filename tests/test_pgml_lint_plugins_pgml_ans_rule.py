@@ -98,3 +98,20 @@ ENDDOCUMENT();
 	context = pgml_lint.engine.build_context(text, None, [], [])
 	issues = pgml_lint.plugins.pgml_ans_rule.run(context)
 	assert len(issues) == 1
+
+
+#============================================
+
+def test_run_reports_lines_after_stripped_comments() -> None:
+	text = (
+		"DOCUMENT();\n"
+		"# A comment long enough to shift offsets in stripped_text by a full line\n"
+		"$h = <<'EOT';\n"
+		"heredoc body text that stripping blanks out\n"
+		"EOT\n"
+		"TEXT(ans_rule(3));\n"
+		"ENDDOCUMENT();\n"
+	)
+	context = pgml_lint.engine.build_context(text, None, [], [])
+	issues = pgml_lint.plugins.pgml_ans_rule.run(context)
+	assert [issue["line"] for issue in issues] == [6]
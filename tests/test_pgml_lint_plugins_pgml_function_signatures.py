@@ -66,3 +66,14 @@ def test_passthrough_args_skip_warning() -> None:
 	context = pgml_lint.engine.build_context(text, None, [], [])
 	issues = pgml_lint.plugins.pgml_function_signatures.run(context)
 	assert issues == []
+
+
+#============================================
+
+def test_multiline_call_args_counted() -> None:
+	text = "my $x = random(\n\t1,\n\t10\n);\n"
+	context = pgml_lint.engine.build_context(text, None, [], [])
+	issues = pgml_lint.plugins.pgml_function_signatures.run(context)
+	assert len(issues) == 1
+	assert issues[0]["line"] == 1
+	assert "called with 2 args" in str(issues[0]["message"])
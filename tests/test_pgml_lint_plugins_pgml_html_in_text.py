@@ -1,6 +1,7 @@
 # Local modules
 import pgml_lint.engine
 import pgml_lint.plugins.pgml_html_in_text
+import pgml_lint.registry
 
 
 #============================================
@@ -160,3 +161,23 @@ ENDDOCUMENT();
 	issues = pgml_lint.plugins.pgml_html_in_text.run(context)
 	assert len(issues) == 2
 	assert any("tex2jax_ignore" in str(issue.get("message", "")) for issue in issues)
+
+
+#============================================
+
+def test_lint_text_reports_entities_without_tags() -> None:
+	text = """DOCUMENT();
+loadMacros('PGstandard.pl', 'PGML.pl');
+
+BEGIN_PGML
+This has &nbsp; and &lt; and &copy; entities.
+END_PGML
+
+ENDDOCUMENT();
+"""
+	# Through the engine, so the plugin's TRIGGERS must admit a file with no "<"
+	registry = pgml_lint.registry.build_registry()
+	plugins = registry.resolve_plugins({"pgml_html_in_text"}, set(), set())
+	issues = pgml_lint.engine.lint_text(text, None, [], [], plugins)
+	assert len(issues) == 3
+	assert all(issue["plugin"] == "pgml_html_in_text" for issue in issues)
@@ -76,3 +76,18 @@ ENDDOCUMENT();
 	context = pgml_lint.engine.build_context(text, None, [], [])
 	issues = pgml_lint.plugins.pgml_loadmacros_integrity.run(context)
 	assert len(issues) == 0
+
+
+#============================================
+
+def test_comment_inside_list_ignored() -> None:
+	text = """DOCUMENT();
+loadMacros(
+  'PGstandard.pl', # 'old.pl' 'older.pl'
+  'PGML.pl',
+);
+ENDDOCUMENT();
+"""
+	context = pgml_lint.engine.build_context(text, None, [], [])
+	issues = pgml_lint.plugins.pgml_loadmacros_integrity.run(context)
+	assert issues == []
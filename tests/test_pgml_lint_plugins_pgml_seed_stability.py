@@ -46,3 +46,22 @@ def test_problem_randomize_warns() -> None:
 	context = pgml_lint.engine.build_context(text, None, [], [])
 	issues = pgml_lint.plugins.pgml_seed_stability.run(context)
 	assert any("ProblemRandomize" in str(issue.get("message", "")) for issue in issues)
+
+
+#============================================
+
+def test_quote_like_literal_ignored() -> None:
+	text = "my $msg = q{rand(3) is not used};\n"
+	context = pgml_lint.engine.build_context(text, None, [], [])
+	issues = pgml_lint.plugins.pgml_seed_stability.run(context)
+	assert issues == []
+
+
+#============================================
+
+def test_call_split_across_lines_warns() -> None:
+	text = "DOCUMENT();\n$now = time\n  ();\n$s = 'srand(1)';\nENDDOCUMENT();\n"
+	context = pgml_lint.engine.build_context(text, None, [], [])
+	issues = pgml_lint.plugins.pgml_seed_stability.run(context)
+	assert len(issues) == 1
+	assert issues[0]["line"] == 2
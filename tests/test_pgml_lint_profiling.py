@@ -0,0 +1,86 @@
+# Standard Library
+import json
+
+# Local modules
+import pgml_lint.engine
+import pgml_lint.profiling
+
+
+#============================================
+
+def _plugin(plugin_id: str, run: object) -> dict[str, object]:
+	return {"id": plugin_id, "run": run}
+
+
+#============================================
+
+def test_stage_time_is_not_charged_to_plugin() -> None:
+	profiler = pgml_lint.profiling.LintProfiler()
+
+	def read_tokens(context: dict[str, object]) -> list[dict[str, object]]:
+		context.get("stripped_tokens")
+		return []
+
+	plugins = [_plugin("reader", read_tokens), _plugin("again", read_tokens)]
+	text = "DOCUMENT();\n$a = 'x';\nENDDOCUMENT();\n"
+	pgml_lint.engine.lint_text(text, None, [], [], plugins, None, profiler)
+	stats = profiler.stats
+	assert stats[("plugin", "reader")][1] == 1
+	assert stats[("plugin", "again")][1] == 1
+	# Computed once, inside the first plugin, and charged to the stage
+	assert stats[("stage", "stripped_tokens")][1] == 1
+	assert stats[("stage", "structure")][1] == 1
+	assert profiler._child_stack == []
+
+
+#============================================
+
+def test_measure_is_exclusive() -> None:
+	profiler = pgml_lint.profiling.LintProfiler()
+
+	def inner() -> str:
+		return "done"
+
+	def outer() -> str:
+		return profiler.measure("stage", "inner", inner)
+
+	assert profiler.measure("plugin", "outer", outer) == "done"
+	outer_seconds = profiler.stats[("plugin", "outer")][0]
+	assert outer_seconds >= 0.0
+	names = [row["name"] for row in profiler.rows()]
+	assert sorted(names) == ["inner", "outer"]
+
+
+#============================================
+
+def test_file_timings_keep_the_slowest_files() -> None:
+	profiler = pgml_lint.profiling.LintProfiler(top_files=2)
+	plugins = [_plugin("noop", lambda context: [])]
+	for index in range(3):
+		profiler.begin_file(f"p{index}.pg")
+		text = "DOCUMENT();\n" * (index + 1)
+		pgml_lint.engine.lint_text(text, None, [], [], plugins, None, profiler)
+		profiler.end_file()
+	assert profiler.files_profiled == 3
+	slowest = profiler.slowest_files()
+	assert len(slowest) == 2
+	assert slowest[0]["seconds"] >= slowest[1]["seconds"]
+	assert "plugin:noop" in slowest[0]["breakdown"]
+	report = profiler.format_table()
+	assert "noop" in report
+	assert "Slowest files:" in report
+
+
+#============================================
+
+def test_merge_worker_profiles() -> None:
+	worker = pgml_lint.profiling.LintProfiler()
+	worker.add_file("a.pg", 0.5, {"plugin:x": 0.4})
+	worker.stats[("plugin", "x")] = [0.4, 1]
+	data = json.loads(json.dumps(worker.to_dict()))
+	profiler = pgml_lint.profiling.LintProfiler()
+	profiler.merge(data)
+	profiler.merge(data)
+	assert profiler.files_profiled == 2
+	assert profiler.stats[("plugin", "x")] == [0.8, 2]
+	assert [info["file"] for info in profiler.slowest_files()] == ["a.pg", "a.pg"]
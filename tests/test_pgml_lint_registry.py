@@ -46,6 +46,90 @@ def test_resolve_plugins_default_and_overrides() -> None:
 	assert only_ids == ["b"]
 
 
+def _plugin(plugin_id: str, enabled: bool = True, provides: tuple = (), requires: tuple = ()) -> dict[str, object]:
+	plugin = {
+		"id": plugin_id,
+		"name": plugin_id.upper(),
+		"run": lambda _ctx: [],
+		"default_enabled": enabled,
+		"provides": provides,
+		"requires": requires,
+	}
+	return plugin
+
+
+#============================================
+
+def test_resolve_plugins_orders_and_adds_producers() -> None:
+	registry = pgml_lint.registry.Registry()
+	registry.register(_plugin("consumer", requires=("spans", "text")))
+	registry.register(_plugin("other"))
+	registry.register(_plugin("producer", enabled=False, provides=("spans",)))
+	registry.register(_plugin("unused", enabled=False, provides=("vars",)))
+
+	resolved = registry.resolve_plugins(set(), set(), set())
+	assert [(plugin["id"], plugin.get("report")) for plugin in resolved] == [
+		("other", None),
+		("producer", False),
+		("consumer", None),
+	]
+	# Helpers are copies; the registered metadata is left untouched
+	assert "report" not in registry.list_plugins()[2]
+	# A subset of a resolved list keeps its order and pulls producers in as helpers
+	subset = pgml_lint.registry.with_producers(resolved, {"consumer"})
+	assert [(plugin["id"], plugin.get("report")) for plugin in subset] == [("producer", False), ("consumer", None)]
+	assert [plugin["id"] for plugin in pgml_lint.registry.with_producers(resolved, {"other"})] == ["other"]
+
+	only_ids = [plugin["id"] for plugin in registry.resolve_plugins({"other"}, set(), set())]
+	assert only_ids == ["other"]
+	enabled = registry.resolve_plugins(set(), {"producer"}, set())
+	assert all(plugin.get("report") is None for plugin in enabled)
+
+
+#============================================
+
+def test_dependency_errors_raise() -> None:
+	registry = pgml_lint.registry.Registry()
+	registry.register(_plugin("a", provides=("x",)))
+	with pytest.raises(ValueError):
+		registry.register(_plugin("b", provides=("x",)))
+	with pytest.raises(ValueError):
+		registry.register(_plugin("c", provides=("text",)))
+	registry.register(_plugin("d", requires=("missing",)))
+	with pytest.raises(ValueError):
+		registry.resolve_plugins({"d"}, set(), set())
+
+	cyclic = pgml_lint.registry.Registry()
+	cyclic.register(_plugin("a", provides=("x",), requires=("y",)))
+	cyclic.register(_plugin("b", provides=("y",), requires=("x",)))
+	with pytest.raises(ValueError):
+		cyclic.resolve_plugins(set(), set(), set())
+
+
+#============================================
+
+def test_builtin_blank_assignments_pulls_in_blanks() -> None:
+	registry = pgml_lint.registry.build_registry()
+	resolved = registry.resolve_plugins({"pgml_blank_assignments"}, set(), {"pgml_blanks"})
+	assert [(plugin["id"], plugin.get("report")) for plugin in resolved] == [
+		("pgml_blanks", False),
+		("pgml_blank_assignments", None),
+	]
+
+
+#============================================
+
+def test_outside_plugin_can_require_builtin_span_keys() -> None:
+	registry = pgml_lint.registry.build_registry()
+	registry.register(_plugin("outside", requires=("pgml_inline_spans", "pgml_blank_spans")))
+	resolved = registry.resolve_plugins({"outside"}, set(), set())
+	assert [(plugin["id"], plugin.get("report")) for plugin in resolved] == [
+		("pgml_inline", False),
+		("pgml_blanks", False),
+		("outside", None),
+	]
+
+
 #============================================
 
 def test_build_registry_matches_builtin_plugins() -> None:
@@ -54,6 +138,38 @@ def test_build_registry_matches_builtin_plugins() -> None:
 	assert len(plugins) == len(pgml_lint.plugins.BUILTIN_PLUGINS)
 	plugin_ids = [plugin["id"] for plugin in plugins]
 	assert len(plugin_ids) == len(set(plugin_ids))
+	by_id = {plugin["id"]: plugin for plugin in plugins}
+	assert by_id["pgml_modes_tex_payload"]["triggers"] == ("MODES",)
+	assert by_id["pgml_required_macros"]["trigger_fields"] == ("uses_pgml",)
+	assert by_id["block_markers"]["triggers"] == ()
+	assert by_id["pgml_inline"]["segment_local"] is True
+	assert by_id["pgml_ans_style"]["segment_local"] is False
+
+
+#============================================
+
+def test_build_registry_defers_plugin_imports() -> None:
+	registry = pgml_lint.registry.build_registry()
+	stubs = [registry._plugins[entry["id"]] for entry in pgml_lint.plugins.PLUGIN_MANIFEST]
+	assert all("run" not in stub for stub in stubs)
+	default_ids = [plugin["id"] for plugin in registry.resolve_plugins(set(), set(), set())]
+	assert "pgml_brackets" not in default_ids
+	# Only resolved plugins are completed with their module metadata
+	assert "run" in registry._plugins["block_markers"]
+	assert "run" not in registry._plugins["pgml_brackets"]
+
+
+#============================================
+
+def test_manifest_mismatch_raises() -> None:
+	registry = pgml_lint.registry.Registry()
+	registry.register({
+		"id": "block_markers",
+		"module": "pgml_lint.plugins.block_markers",
+		"default_enabled": False,
+	})
+	with pytest.raises(ValueError):
+		registry.resolve_plugins({"block_markers"}, set(), set())
 
 
 #============================================
@@ -0,0 +1,78 @@
+# Standard Library
+import io
+import json
+import os
+
+# Third party
+import pytest
+
+# Local modules
+import pgml_lint.core
+import pgml_lint.shard
+
+
+#============================================
+
+def _shard_lines(results: list[tuple[str, list[pgml_lint.core.Issue]]]) -> list[str]:
+	"""
+	Build --jsonl output lines for (path, issues) pairs, summary last.
+	"""
+	lines = []
+	errors = 0
+	warnings = 0
+	for file_path, issues in results:
+		lines.extend(pgml_lint.core.format_jsonl_records(file_path, issues))
+		file_errors, file_warnings = pgml_lint.core.summarize_issues(issues)
+		errors += file_errors
+		warnings += file_warnings
+	summary = {"type": "summary", "files_checked": len(results), "errors": errors, "warnings": warnings}
+	lines.append(json.dumps(summary, separators=(",", ":")))
+	return [line + "\n" for line in lines]
+
+
+#============================================
+
+def test_shards_partition_files_stably() -> None:
+	input_dir = os.path.join("lib", "course")
+	file_paths = [os.path.join(input_dir, "set1", f"p{index}.pg") for index in range(200)]
+	shards = [pgml_lint.shard.select_shard(file_paths, input_dir, shard, 4) for shard in range(1, 5)]
+	assert sorted(path for shard in shards for path in shard) == sorted(file_paths)
+	assert all(shard for shard in shards)
+	# Only the path below the linted directory counts, not where it is checked out
+	moved = [os.path.join("elsewhere", os.path.relpath(path, input_dir)) for path in shards[1]]
+	assert pgml_lint.shard.select_shard(moved, "elsewhere", 2, 4) == moved
+	# Pinned so a change of hash, and of every agent's split, is deliberate
+	assert [pgml_lint.shard.shard_for(f"set1/p{index}.pg", 4) for index in range(6)] == [1, 2, 3, 1, 1, 3]
+
+
+#============================================
+
+def test_merge_interleaves_shards_in_path_order() -> None:
+	warning = pgml_lint.core.Issue("WARNING", "w", 1, None, "demo")
+	error = pgml_lint.core.Issue("ERROR", "e", 2, None, "demo")
+	full = [("a.pg", [warning]), ("b.pg", []), ("c.pg", [warning, error]), ("d.pg", [])]
+	out = io.StringIO()
+	summary = pgml_lint.shard.merge_shards(
+		[("one", _shard_lines([full[1], full[2]])), ("two", _shard_lines([full[0], full[3]]))],
+		out,
+	)
+	assert out.getvalue() == "".join(_shard_lines(full))
+	assert summary == {"type": "summary", "files_checked": 4, "errors": 1, "warnings": 2}
+
+
+#============================================
+
+@pytest.mark.parametrize(
+	"second",
+	[
+		# The same file in two shards
+		_shard_lines([("a.pg", [])]),
+		# A shard cut off before its summary
+		_shard_lines([("b.pg", [])])[:-1],
+		# Files out of order
+		_shard_lines([("d.pg", []), ("c.pg", [])]),
+	],
+)
+def test_merge_rejects_overlapping_incomplete_or_unsorted_shards(second: list[str]) -> None:
+	with pytest.raises(ValueError):
+		pgml_lint.shard.merge_shards([("one", _shard_lines([("a.pg", [])])), ("two", second)], io.StringIO())
@@ -0,0 +1,62 @@
+# Local modules
+import pgml_lint.watch
+
+
+#============================================
+
+def _issue(line: int, message: str, severity: str = "WARNING") -> dict[str, object]:
+	return {"severity": severity, "message": message, "line": line, "plugin": "demo"}
+
+
+#============================================
+
+def test_diff_ignores_issues_that_only_moved() -> None:
+	old = [_issue(3, "a"), _issue(5, "b"), _issue(5, "b"), _issue(9, "c")]
+	new = [_issue(4, "a"), _issue(6, "b"), _issue(9, "d")]
+	added, resolved = pgml_lint.watch.diff_issues(old, new)
+	assert added == [_issue(9, "d")]
+	# One duplicate "b" went away, and "c" was fixed
+	assert resolved == [_issue(5, "b"), _issue(9, "c")]
+
+
+#============================================
+
+def test_session_relints_only_files_whose_stat_moved() -> None:
+	stats = {"a.pg": (1, 10), "b.pg": (1, 20)}
+	contents = {"a.pg": [_issue(1, "x", "ERROR")], "b.pg": []}
+	linted = []
+
+	def lint(file_path: str) -> list:
+		linted.append(file_path)
+		return list(contents[file_path])
+
+	session = pgml_lint.watch.WatchSession(lint, stats.get)
+	session.track(["a.pg", "b.pg"])
+	for file_path in ("a.pg", "b.pg"):
+		session.record(file_path, lint(file_path))
+	assert (session.error_count, session.warn_count) == (1, 0)
+	# An event without a stat change (or for a file that never existed) lints nothing
+	assert session.update(["a.pg", "c.pg"]) == []
+	stats["a.pg"] = (2, 10)
+	contents["a.pg"] = [_issue(2, "y")]
+	assert session.update(["a.pg", "b.pg"]) == [("a.pg", [_issue(2, "y")], [_issue(1, "x", "ERROR")])]
+	assert linted == ["a.pg", "b.pg", "a.pg"]
+	assert (session.error_count, session.warn_count) == (0, 1)
+	# A removed file resolves everything it reported
+	del stats["a.pg"]
+	assert session.update(["a.pg"]) == [("a.pg", [], [_issue(2, "y")])]
+	assert (session.error_count, session.warn_count) == (0, 0)
+	assert "a.pg" not in session.stats
+
+
+#============================================
+
+def test_parse_events_reads_padded_names() -> None:
+	header = pgml_lint.watch.EVENT_HEADER
+	data = header.pack(1, pgml_lint.watch.IN_CLOSE_WRITE, 0, 16) + b"p1.pg".ljust(16, b"\0")
+	data += header.pack(2, pgml_lint.watch.IN_CREATE | pgml_lint.watch.IN_ISDIR, 0, 0)
+	events = pgml_lint.watch.parse_events(data)
+	assert events == [
+		(1, pgml_lint.watch.IN_CLOSE_WRITE, "p1.pg"),
+		(2, pgml_lint.watch.IN_CREATE | pgml_lint.watch.IN_ISDIR, ""),
+	]
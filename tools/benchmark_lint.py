@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+
+# Standard Library
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+# Determine repo root and add to path for local imports
+REPO_ROOT = subprocess.run(
+	["git", "rev-parse", "--show-toplevel"],
+	capture_output=True,
+	text=True,
+	check=True,
+).stdout.strip()
+if REPO_ROOT not in sys.path:
+	sys.path.insert(0, REPO_ROOT)
+
+# Local modules
+import pgml_lint.benchmark
+import pgml_lint.pg_version
+import pgml_lint.registry
+import pgml_lint.rules
+
+
+#============================================
+
+
+def parse_args() -> argparse.Namespace:
+	"""
+	Parse command-line arguments.
+
+	Returns:
+		argparse.Namespace: Parsed arguments.
+	"""
+	parser = argparse.ArgumentParser(
+		description="Time build_context, each plugin, and lint_file over a .pg corpus.",
+	)
+	parser.add_argument(
+		"-d",
+		"--directory",
+		dest="input_dir",
+		help="Benchmark the .pg files in this directory instead of a synthetic corpus.",
+	)
+	parser.add_argument(
+		"-g",
+		"--generate",
+		dest="generate_count",
+		type=int,
+		help="Number of synthetic files to generate (default: 150).",
+	)
+	parser.add_argument(
+		"-s",
+		"--seed",
+		dest="seed",
+		type=int,
+		help="Random seed for the synthetic corpus (default: 1).",
+	)
+	parser.add_argument(
+		"-o",
+		"--output-dir",
+		dest="output_dir",
+		help="Keep the synthetic corpus in this directory (default: a temp directory).",
+	)
+	parser.add_argument(
+		"-r",
+		"--repeat",
+		dest="repeat",
+		type=int,
+		help="Timing rounds; the fastest round per stage is reported (default: 3).",
+	)
+	parser.add_argument(
+		"-b",
+		"--baseline",
+		dest="baseline_path",
+		help="Compare against this stored baseline and exit 1 on a regression.",
+	)
+	parser.add_argument(
+		"-w",
+		"--write-baseline",
+		dest="write_baseline",
+		help="Store this run as a baseline at the given path.",
+	)
+	parser.add_argument(
+		"-t",
+		"--threshold",
+		dest="threshold_pct",
+		type=float,
+		help="Allowed per-stage slowdown in percent (default: 20).",
+	)
+	parser.add_argument(
+		"-m",
+		"--min-us-per-kb",
+		dest="min_us_per_kb",
+		type=float,
+		help="Ignore slowdowns smaller than this many us/KB (default: 2.0).",
+	)
+	parser.add_argument(
+		"-p",
+		"--pg-version",
+		dest="pg_version",
+		help="Target PG version for versioned rules (default: 2.17).",
+	)
+	parser.set_defaults(
+		input_dir=None,
+		generate_count=150,
+		seed=1,
+		output_dir=None,
+		repeat=3,
+		baseline_path=None,
+		write_baseline=None,
+		threshold_pct=20.0,
+		min_us_per_kb=2.0,
+		pg_version=None,
+	)
+	args = parser.parse_args()
+	return args
+
+
+#============================================
+
+
+def find_pg_files(input_dir: str) -> list[str]:
+	"""
+	Return sorted .pg paths under input_dir.
+
+	Args:
+		input_dir: Corpus root.
+
+	Returns:
+		list[str]: File paths.
+	"""
+	paths: list[str] = []
+	for root, dirs, files in os.walk(input_dir):
+		dirs.sort()
+		for filename in sorted(files):
+			if filename.lower().endswith(".pg"):
+				paths.append(os.path.join(root, filename))
+	return paths
+
+
+#============================================
+
+
+def print_results(results: dict[str, object]) -> None:
+	"""
+	Print one line per stage.
+
+	Args:
+		results: Output of run_benchmark().
+	"""
+	print(f"Corpus: {results['files']} files, {float(results['kb']):.1f} KB")
+	print(f"{'stage':<40} {'ms':>10} {'files/s':>12} {'us/KB':>10}")
+	for stage, stats in results["stages"].items():
+		print(
+			f"{stage:<40} {stats['seconds'] * 1000.0:>10.2f} "
+			f"{stats['files_per_sec']:>12.1f} {stats['us_per_kb']:>10.2f}"
+		)
+
+
+#============================================
+
+
+def run(args: argparse.Namespace, file_paths: list[str]) -> int:
+	"""
+	Benchmark file_paths and apply the baseline options.
+
+	Args:
+		args: Parsed arguments.
+		file_paths: Corpus files.
+
+	Returns:
+		int: Exit status.
+	"""
+	if not file_paths:
+		raise ValueError("No .pg files to benchmark")
+	block_rules, macro_rules = pgml_lint.rules.load_rules(None)
+	registry = pgml_lint.registry.build_registry()
+	plugins = registry.resolve_plugins(set(), set(), set())
+	pg_version = pgml_lint.pg_version.normalize_pg_version(args.pg_version)
+	results = pgml_lint.benchmark.run_benchmark(
+		file_paths,
+		block_rules,
+		macro_rules,
+		plugins,
+		pg_version,
+		args.repeat,
+	)
+	print_results(results)
+	if args.write_baseline:
+		pgml_lint.benchmark.save_baseline(args.write_baseline, results)
+		print(f"Baseline written to {args.write_baseline}")
+	if not args.baseline_path:
+		return 0
+	baseline = pgml_lint.benchmark.load_baseline(args.baseline_path)
+	regressions = pgml_lint.benchmark.find_regressions(
+		results,
+		baseline,
+		args.threshold_pct,
+		args.min_us_per_kb,
+	)
+	if not regressions:
+		print(f"No stage regressed by more than {args.threshold_pct:.0f}%")
+		return 0
+	print(f"{len(regressions)} stage(s) regressed by more than {args.threshold_pct:.0f}%:")
+	for item in regressions:
+		print(
+			f"  {item['stage']}: {item['baseline_us_per_kb']:.2f} -> "
+			f"{item['us_per_kb']:.2f} us/KB (+{item['change_pct']:.1f}%)"
+		)
+	return 1
+
+
+#============================================
+
+
+def main() -> None:
+	"""
+	Benchmark a given or generated corpus.
+	"""
+	args = parse_args()
+	if args.input_dir:
+		status = run(args, find_pg_files(args.input_dir))
+	elif args.output_dir:
+		file_paths = pgml_lint.benchmark.generate_corpus(args.output_dir, args.generate_count, args.seed)
+		status = run(args, file_paths)
+	else:
+		with tempfile.TemporaryDirectory(prefix="pgml_bench_") as temp_dir:
+			file_paths = pgml_lint.benchmark.generate_corpus(temp_dir, args.generate_count, args.seed)
+			status = run(args, file_paths)
+	if status:
+		raise SystemExit(status)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,524 @@
+#!/usr/bin/env python3
+
+# Standard Library
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+# Determine repo root and add to path for local imports
+REPO_ROOT = subprocess.run(
+	["git", "rev-parse", "--show-toplevel"],
+	capture_output=True,
+	text=True,
+	check=True,
+).stdout.strip()
+if REPO_ROOT not in sys.path:
+	sys.path.insert(0, REPO_ROOT)
+
+# Local modules
+import pgml_lint.parser
+
+# The legacy passes below are frozen copies of the per-pass parser functions
+# from before the fused scan, so the comparison does not move when parser.py does
+LEGACY_BLOCK_MARKER_RX = re.compile(
+	r"(?m)^[ \t]*(BEGIN|END)_(PGML(?:_(SOLUTION|HINT))?|TEXT|SOLUTION|HINT)\b",
+)
+
+
+#============================================
+
+
+def legacy_scan_heredoc_terminator(line: str) -> str | None:
+	"""
+	Detect a heredoc introducer outside of strings and return its terminator token.
+
+	Args:
+		line: Single line of text.
+
+	Returns:
+		str | None: Terminator token, if present.
+	"""
+	in_sq = False
+	in_dq = False
+	escape = False
+	i = 0
+	while i < len(line) - 1:
+		ch = line[i]
+		if escape:
+			escape = False
+			i += 1
+			continue
+		if ch == "\\":
+			escape = True
+			i += 1
+			continue
+		if (not in_dq) and (ch == "'") and (not in_sq):
+			in_sq = True
+			i += 1
+			continue
+		if in_sq and ch == "'":
+			in_sq = False
+			i += 1
+			continue
+		if (not in_sq) and (ch == '"') and (not in_dq):
+			in_dq = True
+			i += 1
+			continue
+		if in_dq and ch == '"':
+			in_dq = False
+			i += 1
+			continue
+
+		if (not in_sq) and (not in_dq) and (ch == "<") and (line[i + 1] == "<"):
+			j = i + 2
+			if j < len(line) and line[j] == "-":
+				j += 1
+			while j < len(line) and line[j].isspace():
+				j += 1
+			if j >= len(line):
+				return None
+
+			if line[j] in ("'", '"'):
+				quote = line[j]
+				j += 1
+				start = j
+				while j < len(line) and line[j] != quote:
+					j += 1
+				if j >= len(line):
+					return None
+				return line[start:j]
+
+			start = j
+			if not (line[j].isalpha() or line[j] == "_"):
+				return None
+			j += 1
+			while j < len(line) and (line[j].isalnum() or line[j] == "_"):
+				j += 1
+			return line[start:j]
+
+		i += 1
+
+	return None
+
+
+#============================================
+
+
+def legacy_strip_line_comment_preserving_strings(line: str) -> str:
+	"""
+	Strip a Perl-style comment from a line while preserving strings.
+
+	Args:
+		line: Single line of text.
+
+	Returns:
+		str: Line with trailing comment removed.
+	"""
+	in_sq = False
+	in_dq = False
+	escape = False
+	for i, ch in enumerate(line):
+		if escape:
+			escape = False
+			continue
+		if ch == "\\":
+			escape = True
+			continue
+		if (not in_dq) and (ch == "'") and (not in_sq):
+			in_sq = True
+			continue
+		if in_sq and ch == "'":
+			in_sq = False
+			continue
+		if (not in_sq) and (ch == '"') and (not in_dq):
+			in_dq = True
+			continue
+		if in_dq and ch == '"':
+			in_dq = False
+			continue
+		if (not in_sq) and (not in_dq) and ch == "#":
+			trimmed = line[:i]
+			if line.endswith("\n"):
+				trimmed = trimmed + "\n"
+			return trimmed
+	return line
+
+
+#============================================
+
+
+def legacy_strip_comments(text: str) -> str:
+	"""
+	Remove Perl line comments, preserving strings and heredocs.
+
+	Args:
+		text: Full file contents.
+
+	Returns:
+		str: Text with comments removed.
+	"""
+	out_lines: list[str] = []
+	heredoc_end: str | None = None
+
+	for line in text.splitlines(keepends=True):
+		if heredoc_end is not None:
+			out_lines.append(line)
+			if line.strip() == heredoc_end:
+				heredoc_end = None
+			continue
+
+		heredoc_end = legacy_scan_heredoc_terminator(line)
+		clean_line = legacy_strip_line_comment_preserving_strings(line)
+		out_lines.append(clean_line)
+
+	return "".join(out_lines)
+
+
+#============================================
+
+
+def legacy_strip_heredocs(text: str) -> str:
+	"""
+	Remove heredoc bodies while preserving line count.
+
+	Args:
+		text: Full file contents.
+
+	Returns:
+		str: Text with heredoc bodies removed.
+	"""
+	out_lines: list[str] = []
+	heredoc_end: str | None = None
+
+	for line in text.splitlines(keepends=True):
+		if heredoc_end is None:
+			heredoc_end = legacy_scan_heredoc_terminator(line)
+			out_lines.append(line)
+			continue
+
+		if line.strip() == heredoc_end:
+			out_lines.append("\n" if line.endswith("\n") else "")
+			heredoc_end = None
+			continue
+
+		out_lines.append("\n" if line.endswith("\n") else "")
+
+	return "".join(out_lines)
+
+
+#============================================
+
+
+def legacy_extract_block_markers(text: str) -> tuple[list[dict[str, object]], list[dict[str, object]]]:
+	"""
+	Check BEGIN/END markers with a stack and collect PGML regions.
+
+	Args:
+		text: Full file contents.
+
+	Returns:
+		tuple[list[dict[str, object]], list[dict[str, object]]]: Issues and PGML regions.
+	"""
+	issues: list[dict[str, object]] = []
+	pgml_regions: list[dict[str, object]] = []
+	stack: list[dict[str, object]] = []
+
+	heredoc_end: str | None = None
+	pos = 0
+	line_num = 0
+	for line in text.splitlines(keepends=True):
+		line_num += 1
+		if heredoc_end is not None:
+			if line.strip() == heredoc_end:
+				heredoc_end = None
+			pos += len(line)
+			continue
+
+		heredoc_end = legacy_scan_heredoc_terminator(line)
+		if heredoc_end is not None:
+			pos += len(line)
+			continue
+
+		match = LEGACY_BLOCK_MARKER_RX.search(line)
+		if not match:
+			pos += len(line)
+			continue
+
+		action = match.group(1)
+		tag = match.group(2)
+		full_tag = f"{action}_{tag}"
+
+		if action == "BEGIN":
+			if tag in {"PGML_HINT", "PGML_SOLUTION"}:
+				if any(item["tag"].startswith("PGML") for item in stack):
+					message = f"{full_tag} appears inside another PGML block"
+					issue = {"severity": "WARNING", "message": message, "line": line_num}
+					issues.append(issue)
+			start_pos = pos + len(line)
+			entry = {"tag": tag, "start": start_pos, "line": line_num}
+			stack.append(entry)
+			pos += len(line)
+			continue
+
+		if action == "END":
+			if not stack:
+				message = f"{full_tag} without matching BEGIN"
+				issue = {"severity": "ERROR", "message": message, "line": line_num}
+				issues.append(issue)
+				pos += len(line)
+				continue
+
+			open_entry = stack[-1]
+			if open_entry["tag"] != tag:
+				message = f"{full_tag} does not match BEGIN_{open_entry['tag']}"
+				issue = {"severity": "ERROR", "message": message, "line": line_num}
+				issues.append(issue)
+				pos += len(line)
+				continue
+
+			stack.pop()
+			if tag.startswith("PGML"):
+				region = {
+					"start": open_entry["start"],
+					"end": pos,
+					"kind": f"BEGIN_{tag}",
+					"line": open_entry["line"],
+				}
+				pgml_regions.append(region)
+			pos += len(line)
+			continue
+
+		pos += len(line)
+
+	for open_entry in stack:
+		message = f"BEGIN_{open_entry['tag']} without matching END"
+		line = int(open_entry["line"])
+		issue = {"severity": "ERROR", "message": message, "line": line}
+		issues.append(issue)
+
+	return issues, pgml_regions
+
+
+#============================================
+
+
+def legacy_extract_pgml_heredoc_regions(text: str) -> tuple[list[dict[str, object]], list[dict[str, object]]]:
+	"""
+	Extract PGML heredoc regions and report unterminated blocks.
+
+	Args:
+		text: Full file contents.
+
+	Returns:
+		tuple[list[dict[str, object]], list[dict[str, object]]]: Issues and regions.
+	"""
+	issues: list[dict[str, object]] = []
+	regions: list[dict[str, object]] = []
+
+	heredoc_end: str | None = None
+	body_start: int | None = None
+	body_line: int | None = None
+	is_pgml = False
+
+	pos = 0
+	line_num = 0
+	for line in text.splitlines(keepends=True):
+		line_num += 1
+		if heredoc_end is None:
+			terminator = legacy_scan_heredoc_terminator(line)
+			if terminator is None:
+				pos += len(line)
+				continue
+			is_pgml = "PGML" in terminator or (re.search(r"\bPGML::", line) is not None)
+			heredoc_end = terminator
+			body_start = pos + len(line)
+			body_line = line_num + 1
+			pos += len(line)
+			continue
+
+		if line.strip() == heredoc_end:
+			if is_pgml and body_start is not None:
+				region = {
+					"start": body_start,
+					"end": pos,
+					"kind": "HEREDOC_PGML",
+					"line": body_line,
+				}
+				regions.append(region)
+			heredoc_end = None
+			body_start = None
+			body_line = None
+			is_pgml = False
+			pos += len(line)
+			continue
+
+		pos += len(line)
+
+	if heredoc_end is not None and is_pgml:
+		line = 1
+		if body_line is not None:
+			line = body_line - 1
+		message = f"PGML heredoc terminator '{heredoc_end}' not found"
+		issue = {"severity": "ERROR", "message": message, "line": line}
+		issues.append(issue)
+
+	return issues, regions
+
+
+#============================================
+
+
+def parse_args() -> argparse.Namespace:
+	"""
+	Parse command-line arguments.
+
+	Returns:
+		argparse.Namespace: Parsed arguments.
+	"""
+	parser = argparse.ArgumentParser(
+		description="Time the fused structural pre-scan against the legacy separate parser passes.",
+	)
+	parser.add_argument(
+		"-d",
+		"--directory",
+		dest="input_dir",
+		required=True,
+		help="Directory of .pg files to benchmark.",
+	)
+	parser.add_argument(
+		"-r",
+		"--repeat",
+		dest="repeat",
+		type=int,
+		help="Timing rounds; the fastest round is reported (default: 3).",
+	)
+	parser.set_defaults(repeat=3)
+	args = parser.parse_args()
+	return args
+
+
+#============================================
+
+
+def load_corpus(input_dir: str) -> list[str]:
+	"""
+	Read every .pg file under input_dir.
+
+	Args:
+		input_dir: Corpus root.
+
+	Returns:
+		list[str]: File contents.
+	"""
+	texts: list[str] = []
+	for root, dirs, files in os.walk(input_dir):
+		dirs.sort()
+		for filename in sorted(files):
+			if not filename.lower().endswith(".pg"):
+				continue
+			with open(os.path.join(root, filename), "r", encoding="utf-8") as handle:
+				texts.append(handle.read())
+	return texts
+
+
+#============================================
+
+
+def run_separate(text: str) -> dict[str, object]:
+	"""
+	Run the four legacy structural passes one by one.
+
+	Args:
+		text: File contents.
+
+	Returns:
+		dict[str, object]: The same keys as pgml_lint.parser.scan_structure().
+	"""
+	stripped_comments = legacy_strip_comments(text)
+	stripped_text = legacy_strip_heredocs(stripped_comments)
+	block_issues, block_regions = legacy_extract_block_markers(text)
+	heredoc_issues, heredoc_regions = legacy_extract_pgml_heredoc_regions(text)
+	result = {
+		"stripped_comments": stripped_comments,
+		"stripped_text": stripped_text,
+		"block_marker_issues": block_issues,
+		"pgml_block_regions": block_regions,
+		"pgml_heredoc_issues": heredoc_issues,
+		"pgml_heredoc_regions": heredoc_regions,
+	}
+	return result
+
+
+#============================================
+
+
+def run_fused(text: str) -> dict[str, object]:
+	"""
+	Run the single fused structural scan.
+
+	Args:
+		text: File contents.
+
+	Returns:
+		dict[str, object]: Scan results.
+	"""
+	return pgml_lint.parser.scan_structure(text)
+
+
+#============================================
+
+
+def time_mode(texts: list[str], mode_func: object, repeat: int) -> float:
+	"""
+	Return the fastest wall time over repeat rounds for one mode.
+
+	Args:
+		texts: Corpus file contents.
+		mode_func: Function called once per text.
+		repeat: Number of rounds.
+
+	Returns:
+		float: Best round time in seconds.
+	"""
+	best = float("inf")
+	for _round in range(repeat):
+		start = time.perf_counter()
+		for text in texts:
+			mode_func(text)
+		elapsed = time.perf_counter() - start
+		best = min(best, elapsed)
+	return best
+
+
+#============================================
+
+
+def main() -> None:
+	"""
+	Benchmark the structural pre-scan over a corpus.
+	"""
+	args = parse_args()
+	texts = load_corpus(args.input_dir)
+	if not texts:
+		raise ValueError(f"No .pg files found in {args.input_dir}")
+	total_kb = sum(len(text.encode("utf-8")) for text in texts) / 1024.0
+	print(f"Corpus: {len(texts)} files, {total_kb:.1f} KB")
+	mismatched = sum(1 for text in texts if run_separate(text) != run_fused(text))
+	if mismatched:
+		raise RuntimeError(f"Fused scan differs from the legacy passes on {mismatched} files")
+
+	separate_time = time_mode(texts, run_separate, args.repeat)
+	fused_time = time_mode(texts, run_fused, args.repeat)
+	for label, elapsed in (("separate", separate_time), ("fused", fused_time)):
+		files_per_sec = len(texts) / elapsed
+		us_per_kb = elapsed * 1e6 / total_kb
+		print(f"{label:>9}: {elapsed:8.3f} s  {files_per_sec:10.1f} files/s  {us_per_kb:8.1f} us/KB")
+	speedup = separate_time / fused_time
+	print(f"Speedup: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+	main()